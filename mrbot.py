@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -173,5 +174,7 @@ class MainMenu(tk.Tk):
 
 
 if __name__ == "__main__":
+    # Necesario en el ejecutable de PyInstaller para el pool de procesos del Control de Monotributistas
+    multiprocessing.freeze_support()
     app = MainMenu()
     app.mainloop()
@@ -0,0 +1,5 @@
+import sys
+
+from mrbot_app.cli import main
+
+sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Manifiesto local (SQLite) de los archivos descargados.
+
+Cada descarga (download_links/download_targets, descargar_archivos_minio_concurrente
+y las descargas del Control de Monotributistas) registra la ruta del archivo con
+modulo, CUIT, periodo y tipo. El reporte del Control de Monotributistas consulta
+este indice en lugar de recorrer la carpeta de descargas con glob.
+
+Los datos de la descarga en curso se fijan con artifact_context() en el hilo que
+descarga; record_artifacts() los toma de ahi (o de los argumentos). Los registros
+de archivos que ya no existen se descartan al consultarlos.
+ARTIFACT_MANIFEST_PATH vacio en el .env desactiva el manifiesto.
+
+Comandos:
+    python -m mrbot_app.artifact_manifest estadisticas
+    python -m mrbot_app.artifact_manifest indexar [carpeta]
+"""
+import argparse
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from mrbot_app.config import get_artifact_manifest_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artefactos (
+    path TEXT PRIMARY KEY,
+    modulo TEXT NOT NULL,
+    cuit TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    tamano INTEGER,
+    registrado TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artefactos_modulo_tipo ON artefactos (modulo, tipo);
+CREATE INDEX IF NOT EXISTS artefactos_cuit ON artefactos (cuit);
+CREATE TABLE IF NOT EXISTS carpetas_indexadas (
+    carpeta TEXT PRIMARY KEY,
+    indexada TEXT NOT NULL
+);
+"""
+
+# Datos de la descarga en curso del hilo actual (ver artifact_context)
+_context = threading.local()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def tipo_de_archivo(path: str) -> str:
+    """Tipo por defecto: la extension en minusculas, sin el punto ("pdf", "zip", ...)."""
+    return os.path.splitext(path)[1].lower().lstrip(".")
+
+
+class ArtifactManifest:
+    """Indice SQLite de archivos descargados (una conexion protegida por lock)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add(
+        self,
+        paths: Iterable[str],
+        modulo: str = "",
+        cuit: str = "",
+        periodo: str = "",
+        tipo: Optional[str] = None,
+    ) -> int:
+        """Registra (o actualiza) los archivos existentes de paths. Devuelve cuantos registro."""
+        now = _now()
+        rows = []
+        for path in paths:
+            if not path:
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            rows.append((os.path.abspath(path), modulo, cuit, periodo, tipo or tipo_de_archivo(path), size, now))
+        if rows:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO artefactos (path, modulo, cuit, periodo, tipo, tamano, registrado) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def find(
+        self,
+        modulo: Optional[str] = None,
+        tipo: Optional[str] = None,
+        cuit: Optional[str] = None,
+        periodo: Optional[str] = None,
+        existing_only: bool = True,
+    ) -> List[str]:
+        """
+        Rutas registradas que cumplen los filtros (None = sin filtro), ordenadas.
+        Con existing_only=True descarta del indice las que ya no estan en disco.
+        """
+        filtros = [("modulo", modulo), ("tipo", tipo), ("cuit", cuit), ("periodo", periodo)]
+        condiciones = [f"{columna} = ?" for columna, valor in filtros if valor is not None]
+        sql = "SELECT path FROM artefactos"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY path", tuple(v for _, v in filtros if v is not None)).fetchall()
+        paths = [row[0] for row in rows]
+        if not existing_only:
+            return paths
+        faltantes = {path for path in paths if not os.path.exists(path)}
+        if faltantes:
+            self.forget(faltantes)
+        return [path for path in paths if path not in faltantes]
+
+    def forget(self, paths: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM artefactos WHERE path = ?", [(os.path.abspath(path),) for path in paths]
+            )
+
+    def is_indexed(self, carpeta: str) -> bool:
+        """La carpeta ya se recorrio una vez para registrar archivos previos al manifiesto."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM carpetas_indexadas WHERE carpeta = ?", (os.path.abspath(carpeta),)
+            ).fetchone()
+        return row is not None
+
+    def mark_indexed(self, carpeta: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO carpetas_indexadas (carpeta, indexada) VALUES (?, ?)",
+                (os.path.abspath(carpeta), _now()),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Archivos y bytes registrados, en total y por modulo/tipo."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT modulo, tipo, COUNT(*), COALESCE(SUM(tamano), 0) FROM artefactos GROUP BY modulo, tipo"
+            ).fetchall()
+        return {
+            "archivos": sum(row[2] for row in rows),
+            "bytes": sum(row[3] for row in rows),
+            "por_tipo": {(modulo, tipo): total for modulo, tipo, total, _ in rows},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_manifest: Optional[ArtifactManifest] = None
+_manifest_path: Optional[str] = None
+_manifest_lock = threading.Lock()
+
+
+def get_artifact_manifest() -> Optional[ArtifactManifest]:
+    """Devuelve el manifiesto compartido, o None si ARTIFACT_MANIFEST_PATH esta vacio."""
+    global _manifest, _manifest_path
+    path = get_artifact_manifest_path()
+    with _manifest_lock:
+        if not path:
+            return None
+        if _manifest is None or _manifest_path != path:
+            try:
+                _manifest = ArtifactManifest(path)
+            except (OSError, sqlite3.Error):
+                return None
+            _manifest_path = path
+        return _manifest
+
+
+@contextmanager
+def artifact_context(modulo: str = "", cuit: str = "", periodo: str = "", tipo: Optional[str] = None):
+    """
+    Fija modulo, CUIT, periodo y tipo (opcional) de lo que se descargue desde el
+    hilo actual. Los contextos anidados completan los campos vacios con los del
+    contexto exterior.
+    """
+    previous = getattr(_context, "campos", None)
+    campos = dict(previous or {})
+    for clave, valor in (("modulo", modulo), ("cuit", cuit), ("periodo", periodo), ("tipo", tipo)):
+        if valor:
+            campos[clave] = str(valor)
+    _context.campos = campos
+    try:
+        yield campos
+    finally:
+        _context.campos = previous
+
+
+def record_artifacts(paths: Iterable[str], **campos: Any) -> int:
+    """
+    Registra paths en el manifiesto con los datos del contexto del hilo actual
+    (los argumentos modulo/cuit/periodo/tipo tienen prioridad). Nunca interrumpe
+    la descarga: si el manifiesto esta desactivado o falla devuelve 0.
+    """
+    manifest = get_artifact_manifest()
+    if manifest is None:
+        return 0
+    datos = dict(getattr(_context, "campos", None) or {})
+    datos.update({clave: valor for clave, valor in campos.items() if valor})
+    try:
+        return manifest.add(
+            list(paths),
+            modulo=datos.get("modulo", ""),
+            cuit=datos.get("cuit", ""),
+            periodo=datos.get("periodo", ""),
+            tipo=datos.get("tipo"),
+        )
+    except sqlite3.Error:
+        return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mrbot_app.artifact_manifest",
+        description="Consulta o completa el manifiesto de archivos descargados.",
+    )
+    parser.add_argument("comando", choices=["estadisticas", "indexar"])
+    parser.add_argument("carpeta", nargs="?", default="descargas", help="indexar: carpeta a recorrer (default: descargas)")
+    args = parser.parse_args(argv)
+    manifest = get_artifact_manifest()
+    if manifest is None:
+        print("Manifiesto desactivado (ARTIFACT_MANIFEST_PATH vacio).")
+        return 2
+    if args.comando == "estadisticas":
+        stats = manifest.stats()
+        print(f"Archivos: {stats['archivos']}, {stats['bytes'] / (1024 * 1024):.1f} MB")
+        for (modulo, tipo), total in sorted(stats["por_tipo"].items()):
+            print(f"  {modulo or '-'} / {tipo or '-'}: {total}")
+        return 0
+    if not os.path.isdir(args.carpeta):
+        print(f"No existe la carpeta: {args.carpeta}")
+        return 2
+    # El Control de Monotributistas es el que consulta el manifiesto
+    from mrbot_app.control_monotributistas import indexar_archivos_control
+
+    archivos_mc, archivos_json = indexar_archivos_control(args.carpeta, manifest)
+    print(f"Registrados: {len(archivos_mc)} CSVs (MC), {len(archivos_json)} JSONs (RCEL)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
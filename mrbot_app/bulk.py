@@ -0,0 +1,294 @@
+"""
+Motor masivo asyncio para los modulos que procesan un Excel fila por fila.
+
+Cada modulo implementa un RowJob (armar la request de la fila / procesar la
+respuesta) y el motor se encarga de la concurrencia acotada, los reintentos,
+los bloques de log por contribuyente y el progreso.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from mrbot_app.download_queue import rows_in_flight
+from mrbot_app.helpers import safe_get, safe_post
+from mrbot_app.job_store import JobRun, JobStore, payload_hash
+from mrbot_app.minio_helpers import collect_minio_links, process_downloads, record_downloads
+from mrbot_app.rate_limit import get_api_limiter
+
+
+def row_attempts(row: pd.Series) -> int:
+    """Cantidad de intentos de la fila segun la columna 'retry' (minimo 1)."""
+    try:
+        retry_val = int(row.get("retry", 0))
+    except (ValueError, TypeError):
+        retry_val = 0
+    return retry_val if retry_val > 1 else 1
+
+
+def row_download_dir(row: pd.Series) -> str:
+    """Carpeta de descarga indicada en la fila (ubicacion_descarga / path_descarga / carpeta_descarga)."""
+    return str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
+
+
+def filter_procesar(df: pd.DataFrame) -> pd.DataFrame:
+    """Filtra las filas donde la columna 'procesar' es afirmativa (si no existe, devuelve todas)."""
+    if "procesar" in df.columns:
+        procesar_series = df["procesar"].astype(str).str.strip().str.lower()
+        return df[procesar_series.isin(["si", "sí", "yes", "y", "1"])]
+    return df
+
+
+def row_failed(result: Any) -> bool:
+    """
+    Una fila cuenta como fallida si no devolvio resultado (validacion, excepcion),
+    si el HTTP no fue 200, si la API respondio success=false o si hubo un error.
+    """
+    if isinstance(result, tuple):
+        result = result[0] if result else None
+    if result is None:
+        return True
+    if not isinstance(result, dict):
+        return False
+    if "http_status" in result and result["http_status"] != 200:
+        return True
+    if result.get("success") is False:
+        return True
+    return bool(result.get("error"))
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Clave de checkpoint de una fila: metodo + URL + payload sin claves."""
+    method = str(request.get("method", "POST")).upper()
+    return payload_hash(method, request.get("url"), request.get("safe_payload", request.get("payload")))
+
+
+def run_key(job: "RowJob", df: pd.DataFrame) -> str:
+    """Identifica una corrida por modulo, endpoint y contenido de las filas a procesar."""
+    return payload_hash(type(job).__name__, job.url, df.to_json(orient="records", force_ascii=False))
+
+
+def redact(payload: Dict[str, Any], keys: Tuple[str, ...] = ("clave", "clave_representante")) -> Dict[str, Any]:
+    safe = dict(payload)
+    for key in keys:
+        if key in safe:
+            safe[key] = "***"
+    return safe
+
+
+class RowJob:
+    """
+    Interfaz por fila del motor masivo.
+
+    - build_request(row): devuelve un dict con url, payload, safe_payload, attempts
+      (y method="GET" si corresponde), o None para omitir la fila. Si el dict trae
+      la clave "result", la fila no se envia y ese valor se usa como resultado.
+      Cualquier otra clave queda disponible para handle_response.
+    - handle_response(row, request, resp): procesa la respuesta de safe_post/safe_get
+      (descargas, JSON, etc.) y devuelve el resultado de la fila.
+
+    El atributo log debe exponer la API de logs de BaseWindow (log_info, log_error,
+    log_separator, log_request_started, log_response_finished, log_block).
+    """
+
+    MODULE_DIR = ""
+    SERVICE_KEY = "archivo"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], download_dir: str = ""):
+        self.log = log
+        self.url = url
+        self.headers = headers
+        self.download_dir = download_dir or ""
+
+    def row_label(self, row: pd.Series) -> str:
+        for key in ("cuit_representado", "representado_cuit", "cuit_representante", "cuit_login", "cuit"):
+            value = str(row.get(key, "") or "").strip()
+            if value:
+                return value
+        return "sin_cuit"
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return collect_minio_links(data, self.SERVICE_KEY)
+
+    def process_downloads(
+        self,
+        data: Any,
+        cuit_repr: str,
+        override_dir: Optional[str] = None,
+    ) -> Tuple[int, List[str], Optional[str]]:
+        """Equivalente sin Tk de DownloadHandlerMixin._process_downloads."""
+        links = self.extract_links(data)
+        if not links:
+            return 0, [], None
+        return process_downloads(
+            links,
+            self.MODULE_DIR,
+            override_dir or self.download_dir,
+            cuit_repr,
+            log_fn=self.log.log_info,
+        )
+
+    def log_download_summary(self, downloads: int, errors: List[str], download_dir: Optional[str], data: Any) -> None:
+        if downloads:
+            self.log.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
+        elif data:
+            self.log.log_info("Sin links de descarga")
+        for err in errors:
+            self.log.log_error(f"Descarga: {err}")
+
+
+def send_request(request: Dict[str, Any], log=None) -> Dict[str, Any]:
+    """Envia la request de una fila con los reintentos indicados en request['attempts']."""
+    method = str(request.get("method", "POST")).upper()
+    url = request["url"]
+    headers = request.get("headers") or {}
+    payload = request.get("payload")
+    safe_payload = request.get("safe_payload", payload)
+    total_attempts = max(1, int(request.get("attempts", 1)))
+
+    resp: Dict[str, Any] = {}
+    for attempt in range(1, total_attempts + 1):
+        if log is not None:
+            log.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
+        if method == "GET":
+            resp = safe_get(url, headers)
+        else:
+            resp = safe_post(url, headers, payload)
+        if log is not None:
+            if resp.get("cached"):
+                log.log_info("Respuesta obtenida de la cache local (sin consumir la API)")
+            log.log_response_finished(resp.get("http_status"), resp.get("data"))
+        if resp.get("http_status") == 200:
+            break
+    return resp
+
+
+def _process_row(
+    job: RowJob,
+    row: pd.Series,
+    abort_event=None,
+    run: Optional[JobRun] = None,
+    api_slots: Optional[threading.BoundedSemaphore] = None,
+) -> Any:
+    if abort_event is not None and abort_event.is_set():
+        return None
+    log = job.log
+    with log.log_block(job.row_label(row)):
+        key = None
+        resp: Dict[str, Any] = {}
+        try:
+            request = job.build_request(row)
+            if request is None:
+                return None
+            if "result" in request:
+                return request["result"]
+            if run is not None:
+                key = request_key(request)
+                previous = run.completed_result(key)
+                if previous is not None:
+                    log.log_info("Fila ya procesada correctamente en una ejecucion anterior: se omite")
+                    return previous["resultado"]
+                run.mark_pending(key)
+            with record_downloads() as archivos:
+                # El lugar de la API se ocupa solo durante la consulta: las descargas
+                # de handle_response van a la cola compartida y no lo retienen
+                if api_slots is not None:
+                    with api_slots:
+                        resp = send_request(request, log)
+                else:
+                    resp = send_request(request, log)
+                result = job.handle_response(row, request, resp)
+            if key is not None:
+                run.record(key, not row_failed(result), resp.get("http_status"), archivos, result)
+            return result
+        except Exception as exc:
+            log.log_error(f"Excepcion en bloque: {exc}")
+            if key is not None:
+                run.record(key, False, resp.get("http_status"))
+            return None
+
+
+async def run_rows_async(
+    rows: List[pd.Series],
+    job: RowJob,
+    max_concurrency: Optional[int] = None,
+    progress_fn: Optional[Callable[[int, int], None]] = None,
+    abort_event=None,
+    run: Optional[JobRun] = None,
+) -> List[Any]:
+    """
+    Procesa las filas con a lo sumo max_concurrency requests en vuelo.
+    Las llamadas bloqueantes (requests, descargas, disco) corren en un pool
+    dedicado; el loop solo coordina turnos, abortos y progreso.
+    Una fila libera su lugar de la API apenas llega la respuesta: mientras espera
+    sus descargas (cola compartida, DOWNLOAD_QUEUE_WORKERS) otras filas ya consultan.
+    Si se pasa run (JobStore), las filas que ya terminaron bien en esa corrida se omiten.
+    Devuelve los resultados en el orden de las filas (None si se omitio).
+    """
+    # Por defecto se lanzan tantas filas como el techo del limitador global:
+    # cuantas requests salen realmente lo decide el control adaptativo en safe_post/safe_get
+    limit = max(1, int(max_concurrency or get_api_limiter().max_concurrency))
+    total = len(rows)
+    results: List[Any] = [None] * total
+    if progress_fn:
+        progress_fn(0, total)
+    if not rows:
+        return results
+
+    loop = asyncio.get_running_loop()
+    in_flight = rows_in_flight(limit)
+    semaphore = asyncio.Semaphore(in_flight)
+    api_slots = threading.BoundedSemaphore(limit)
+    completed = 0
+
+    with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix=f"bulk-{job.MODULE_DIR or 'mrbot'}") as executor:
+
+        async def _run_one(idx: int, row: pd.Series) -> None:
+            nonlocal completed
+            async with semaphore:
+                if abort_event is not None and abort_event.is_set():
+                    return
+                results[idx] = await loop.run_in_executor(executor, _process_row, job, row, abort_event, run, api_slots)
+            completed += 1
+            if progress_fn and not (abort_event is not None and abort_event.is_set()):
+                progress_fn(completed, total)
+
+        await asyncio.gather(*(_run_one(idx, row) for idx, row in enumerate(rows)))
+
+    return results
+
+
+def run_bulk(
+    df: pd.DataFrame,
+    job: RowJob,
+    max_concurrency: Optional[int] = None,
+    progress_fn: Optional[Callable[[int, int], None]] = None,
+    abort_event=None,
+    store: Optional[JobStore] = None,
+    reset: bool = False,
+) -> List[Any]:
+    """
+    Punto de entrada sincronico (worker de la GUI o CLI) para run_rows_async.
+    Con store, la corrida queda registrada para reanudarla si se interrumpe
+    (reset=True descarta lo registrado y reprocesa todo).
+    """
+    rows = [row for _, row in df.iterrows()]
+    run = None
+    if store is not None:
+        run = store.open_run(job.MODULE_DIR or type(job).__name__, run_key(job, df), reset=reset)
+        if run.resumed:
+            done = run.counts().get("ok", 0)
+            job.log.log_info(f"Reanudando ejecucion anterior: {done} fila(s) ya completadas se omiten")
+    results = asyncio.run(run_rows_async(rows, job, max_concurrency, progress_fn, abort_event, run))
+    if run is not None:
+        aborted = abort_event is not None and abort_event.is_set()
+        run.finish(not aborted and not any(row_failed(result) for result in results))
+    return results
@@ -0,0 +1,190 @@
+"""
+Linea de comandos para los procesamientos masivos (sin Tk).
+
+    python -m mrbot_app <modulo> <excel> [--desde DD/MM/AAAA] [--hasta ...] [--proxy si]
+                        [--opcion clave=valor ...] [--descargas DIR] [--log-file PATH]
+                        [--resultado salida.xlsx|.csv] [--workers N]
+
+Usa los mismos RowJob que las ventanas (mrbot_app.jobs) y el motor mrbot_app.bulk.
+Mis Comprobantes se procesa con consulta_mc_csv. Codigos de salida: 0 todo ok,
+1 alguna fila fallo, 2 error de uso/configuracion, 130 interrumpido.
+"""
+import argparse
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from mrbot_app.bulk import filter_procesar, row_failed, run_bulk
+from mrbot_app.config import reload_env_defaults
+from mrbot_app.helpers import build_headers
+from mrbot_app.job_store import get_job_store
+from mrbot_app.jobs.registry import JOB_REGISTRY, build_job
+from mrbot_app.logs import ConsoleLogger
+from mrbot_app.mis_comprobantes import consulta_mc_csv
+
+MC_MODULE = "mis_comprobantes"
+EXIT_OK = 0
+EXIT_ROWS_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def row_results(results: List[Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for result in results:
+        if isinstance(result, tuple):
+            result = result[0] if result else None
+        if isinstance(result, dict):
+            rows.append(result)
+    return rows
+
+
+def read_excel(path: str) -> pd.DataFrame:
+    """Lee el Excel igual que ExcelHandlerMixin.cargar_excel (texto, columnas en minuscula)."""
+    df = pd.read_excel(path, dtype=str).fillna("")
+    df.columns = [c.strip().lower() for c in df.columns]
+    return df
+
+
+def parse_options(pairs: Sequence[str]) -> Dict[str, str]:
+    opciones: Dict[str, str] = {}
+    for pair in pairs:
+        if "=" not in pair:
+            raise ValueError(f"Opcion invalida '{pair}', se espera clave=valor")
+        key, value = pair.split("=", 1)
+        opciones[key.strip()] = value.strip()
+    return opciones
+
+
+def _module_overrides(modulo: str, args: argparse.Namespace) -> Dict[str, Any]:
+    defaults = JOB_REGISTRY[modulo]["opciones"]
+    overrides: Dict[str, Any] = {}
+    if args.desde and "default_desde" in defaults:
+        overrides["default_desde"] = args.desde
+    if args.hasta and "default_hasta" in defaults:
+        overrides["default_hasta"] = args.hasta
+    if args.proxy:
+        proxy_key = next((key for key in ("default_proxy", "proxy_default", "proxy") if key in defaults), None)
+        if proxy_key:
+            overrides[proxy_key] = args.proxy
+    overrides.update(parse_options(args.opcion))
+    return overrides
+
+
+def _write_results(rows: List[Dict[str, Any]], path: str, log: ConsoleLogger) -> None:
+    out_df = pd.DataFrame(rows)
+    if path.lower().endswith(".csv"):
+        out_df.to_csv(path, index=False, sep=";", encoding="utf-8-sig")
+    else:
+        out_df.to_excel(path, index=False)
+    log.log_info(f"Resultados guardados en {path}")
+
+
+def _run_mis_comprobantes(args: argparse.Namespace, log: ConsoleLogger) -> int:
+    resumen = consulta_mc_csv(
+        args.excel,
+        log_fn=log.log_message,
+        show_summary=False,
+        store=None if args.sin_registro else get_job_store(),
+        reset=args.reiniciar,
+    )
+    if resumen is None:
+        return EXIT_USAGE
+    log.log_info(
+        f"Resumen: {resumen['total']} filas, {resumen['exitosos']} ok, "
+        f"{resumen['errores']} errores, {resumen['errores_api']} errores de API"
+    )
+    return EXIT_ROWS_FAILED if resumen["errores"] or resumen["errores_api"] else EXIT_OK
+
+
+def run(args: argparse.Namespace, log: ConsoleLogger, abort_event: Optional[threading.Event] = None) -> int:
+    if not os.path.exists(args.excel):
+        log.log_error(f"No existe el archivo: {args.excel}")
+        return EXIT_USAGE
+    if args.modulo == MC_MODULE:
+        return _run_mis_comprobantes(args, log)
+
+    env_url, env_api_key, env_email = reload_env_defaults()
+    base_url = args.url or env_url
+    headers = build_headers(args.api_key or env_api_key, args.mail or env_email)
+    try:
+        job = build_job(args.modulo, log, base_url, headers, args.descargas or "", _module_overrides(args.modulo, args))
+        df = filter_procesar(read_excel(args.excel))
+    except Exception as exc:
+        log.log_error(str(exc))
+        return EXIT_USAGE
+    if df.empty:
+        log.log_error("No hay filas marcadas con procesar=SI.")
+        return EXIT_USAGE
+
+    log.log_start(args.modulo, {"modo": "consola", "archivo": args.excel, "filas": len(df)})
+
+    def _progress(current: int, total: int) -> None:
+        if current and (current == total or current % 10 == 0):
+            log.log_info(f"Progreso: {current}/{total}")
+
+    results = run_bulk(
+        df,
+        job,
+        max_concurrency=args.workers,
+        progress_fn=_progress,
+        abort_event=abort_event,
+        store=None if args.sin_registro else get_job_store(),
+        reset=args.reiniciar,
+    )
+    failed = sum(1 for result in results if row_failed(result))
+    rows = row_results(results)
+    if args.resultado:
+        _write_results(rows, args.resultado, log)
+    log.log_info(f"Procesamiento masivo finalizado: {len(results)} filas, {len(results) - failed} ok, {failed} con error")
+    return EXIT_ROWS_FAILED if failed else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    modulos = sorted([*JOB_REGISTRY, MC_MODULE])
+    parser = argparse.ArgumentParser(
+        prog="python -m mrbot_app",
+        description="Procesa un Excel masivo de un modulo de Mr Bot sin interfaz grafica.",
+    )
+    parser.add_argument("modulo", choices=modulos, help="Modulo a ejecutar")
+    parser.add_argument("excel", help="Excel de entrada (mismo formato que en la ventana)")
+    parser.add_argument("--desde", help="Fecha desde por defecto (DD/MM/AAAA)")
+    parser.add_argument("--hasta", help="Fecha hasta por defecto (DD/MM/AAAA)")
+    parser.add_argument("--proxy", help="proxy_request por defecto (si/no)")
+    parser.add_argument(
+        "--opcion",
+        action="append",
+        default=[],
+        metavar="CLAVE=VALOR",
+        help="Opcion del modulo (ej. movimientos_default=no, b64_pdf=si, pdf=si). Repetible.",
+    )
+    parser.add_argument("--descargas", help="Carpeta de descargas por defecto")
+    parser.add_argument("--resultado", help="Guarda el resumen por fila en .xlsx o .csv")
+    parser.add_argument("--log-file", help="Ademas de stdout, agrega los logs a este archivo")
+    parser.add_argument("--workers", type=int, help="Filas en vuelo (default: techo del limitador de la API)")
+    parser.add_argument(
+        "--reiniciar",
+        action="store_true",
+        help="Ignora el avance registrado de una corrida anterior del mismo Excel y reprocesa todo",
+    )
+    parser.add_argument("--sin-registro", action="store_true", help="No registra la corrida (sin reanudacion)")
+    parser.add_argument("--url", help="URL base de la API (default: .env)")
+    parser.add_argument("--api-key", help="API key (default: .env)")
+    parser.add_argument("--mail", help="Email (default: .env)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    log = ConsoleLogger(log_file=args.log_file)
+    abort_event = threading.Event()
+    try:
+        return run(args, log, abort_event)
+    except KeyboardInterrupt:
+        abort_event.set()
+        log.log_error("Proceso interrumpido por el usuario.")
+        return EXIT_INTERRUPTED
+    finally:
+        log.close()
@@ -11,6 +11,16 @@ def _load_env() -> None:
     load_dotenv(ENV_FILE, override=True)
 
 
+def _get_env_float(name: str, default: float) -> float:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    try:
+        return float(val.replace(",", "."))
+    except ValueError:
+        return default
+
+
 def _get_env_int(name: str, default: int) -> int:
     val = os.getenv(name)
     if val is None:
@@ -29,6 +39,20 @@ DEFAULT_EMAIL = os.getenv("MAIL", "")
 DEFAULT_POST_TIMEOUT = _get_env_int("TIMEOUT_POST", 120)
 DEFAULT_GET_TIMEOUT = _get_env_int("TIMEOUT_GET", 60)
 DEFAULT_MAX_WORKERS = _get_env_int("MAX_WORKERS_MRBOT_API", 1)
+DEFAULT_MIN_WORKERS_LIMIT = 1
+DEFAULT_MAX_WORKERS_LIMIT = 8
+DEFAULT_API_RATE = 0.0
+DEFAULT_POOL_CONNECTIONS = _get_env_int("HTTP_POOL_CONNECTIONS", 10)
+DEFAULT_DOWNLOAD_RETRIES = _get_env_int("DOWNLOAD_RETRIES", 3)
+DEFAULT_DOWNLOAD_WORKERS = _get_env_int("DOWNLOAD_MAX_WORKERS", 8)
+DEFAULT_DOWNLOAD_PER_HOST = _get_env_int("DOWNLOAD_MAX_PER_HOST", 4)
+DEFAULT_DOWNLOAD_QUEUE_WORKERS = 16
+DEFAULT_JOB_STORE_PATH = "mrbot_jobs.sqlite3"
+DEFAULT_RESPONSE_CACHE_PATH = "mrbot_cache.sqlite3"
+DEFAULT_ARTIFACT_MANIFEST_PATH = "mrbot_artifacts.sqlite3"
+DEFAULT_RESPONSE_CACHE_TTL = 600
+DEFAULT_RESPONSE_CACHE_MAX_MB = 200
+DEFAULT_INGEST_WORKERS = min(os.cpu_count() or 1, 8)
 
 
 def reload_env_defaults() -> tuple[str, str, str]:
@@ -55,7 +79,167 @@ def get_request_timeouts() -> tuple[int, int]:
 
 def get_max_workers() -> int:
     """
-    Devuelve el numero maximo de workers para requests a la API.
-    Lee MAX_WORKERS_MRBOT_API del entorno, default 1.
+    Devuelve la concurrencia inicial para requests a la API.
+    Lee MAX_WORKERS_MRBOT_API del entorno, default 1. El limitador global
+    (mrbot_app.rate_limit) la ajusta luego dentro de get_max_workers_range().
     """
     return _get_env_int("MAX_WORKERS_MRBOT_API", DEFAULT_MAX_WORKERS)
+
+
+def get_max_workers_range() -> tuple[int, int]:
+    """
+    Devuelve el rango (minimo, maximo) en el que el controlador adaptativo puede
+    mover la concurrencia de la API. MAX_WORKERS_MRBOT_API es el valor inicial.
+    """
+    initial = max(1, get_max_workers())
+    minimum = max(1, _get_env_int("MAX_WORKERS_MRBOT_API_MIN", DEFAULT_MIN_WORKERS_LIMIT))
+    maximum = _get_env_int("MAX_WORKERS_MRBOT_API_MAX", max(initial, DEFAULT_MAX_WORKERS_LIMIT))
+    return min(minimum, initial), max(maximum, initial)
+
+
+def get_api_rate_limits() -> tuple[float, int, int, int, int, float]:
+    """
+    Devuelve la configuracion del limitador global de la API:
+    (requests por segundo, rafaga, concurrencia inicial, minima, maxima, latencia objetivo).
+    MRBOT_API_RATE=0 (default) no limita requests por segundo; MRBOT_API_LATENCY_TARGET=0
+    usa como referencia la latencia media observada.
+    """
+    minimum, maximum = get_max_workers_range()
+    rate = max(0.0, _get_env_float("MRBOT_API_RATE", DEFAULT_API_RATE))
+    burst = max(1, _get_env_int("MRBOT_API_BURST", maximum))
+    latency_target = max(0.0, _get_env_float("MRBOT_API_LATENCY_TARGET", 0.0))
+    return rate, burst, max(1, get_max_workers()), minimum, maximum, latency_target
+
+
+def get_http_pool_limits() -> tuple[int, int]:
+    """
+    Devuelve los limites del pool HTTP compartido (hosts cacheados, conexiones por host).
+    HTTP_POOL_MAXSIZE por defecto acompaña al techo de concurrencia de la API
+    (MAX_WORKERS_MRBOT_API_MAX) para que cada worker tenga su conexion keep-alive.
+    """
+    pool_connections = _get_env_int("HTTP_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)
+    pool_maxsize = _get_env_int("HTTP_POOL_MAXSIZE", get_max_workers_range()[1])
+    return max(1, pool_connections), max(1, pool_maxsize)
+
+
+def get_download_retries() -> int:
+    """
+    Devuelve cuantas veces se reanuda (Range) una descarga MinIO cortada.
+    Lee DOWNLOAD_RETRIES del entorno, default 3.
+    """
+    return max(0, _get_env_int("DOWNLOAD_RETRIES", DEFAULT_DOWNLOAD_RETRIES))
+
+
+def get_download_limits() -> tuple[int, int]:
+    """
+    Devuelve los limites de descargas MinIO concurrentes (workers por lote, conexiones por host).
+    El limite por host es global al proceso: lo comparten todas las filas en vuelo.
+    """
+    workers = _get_env_int("DOWNLOAD_MAX_WORKERS", DEFAULT_DOWNLOAD_WORKERS)
+    per_host = _get_env_int("DOWNLOAD_MAX_PER_HOST", DEFAULT_DOWNLOAD_PER_HOST)
+    return max(1, workers), max(1, per_host)
+
+
+def get_download_queue_workers() -> int:
+    """
+    Devuelve cuantas descargas MinIO corren a la vez en la cola compartida del proceso
+    (mrbot_app.download_queue), independiente de MAX_WORKERS_MRBOT_API.
+    Lee DOWNLOAD_QUEUE_WORKERS del entorno; default 16.
+    """
+    return max(1, _get_env_int("DOWNLOAD_QUEUE_WORKERS", DEFAULT_DOWNLOAD_QUEUE_WORKERS))
+
+
+def get_job_store_path() -> str:
+    """
+    Devuelve la ruta de la base SQLite donde se registran las filas de las corridas masivas
+    (para reanudarlas). JOB_STORE_PATH vacio desactiva el registro.
+    """
+    return os.getenv("JOB_STORE_PATH", DEFAULT_JOB_STORE_PATH).strip()
+
+
+def get_artifact_manifest_path() -> str:
+    """
+    Devuelve la ruta de la base SQLite donde se registran los archivos descargados
+    (modulo, CUIT, periodo, tipo). ARTIFACT_MANIFEST_PATH vacio desactiva el manifiesto.
+    """
+    return os.getenv("ARTIFACT_MANIFEST_PATH", DEFAULT_ARTIFACT_MANIFEST_PATH).strip()
+
+
+def get_response_cache_settings() -> tuple[bool, str, int, int, dict]:
+    """
+    Devuelve la configuracion de la cache de respuestas:
+    (activa, ruta, tamaño maximo en bytes, TTL por defecto, TTL por endpoint).
+    RESPONSE_CACHE=1 la activa (default desactivada). RESPONSE_CACHE_TTLS permite
+    TTL por endpoint, por ejemplo "ccma=900,sct=1800,rcel=0".
+    """
+    enabled = os.getenv("RESPONSE_CACHE", "0").strip().lower() in ("1", "si", "true", "yes")
+    path = os.getenv("RESPONSE_CACHE_PATH", DEFAULT_RESPONSE_CACHE_PATH).strip() or DEFAULT_RESPONSE_CACHE_PATH
+    max_mb = max(1, _get_env_int("RESPONSE_CACHE_MAX_MB", DEFAULT_RESPONSE_CACHE_MAX_MB))
+    default_ttl = max(0, _get_env_int("RESPONSE_CACHE_TTL", DEFAULT_RESPONSE_CACHE_TTL))
+    overrides = {}
+    for item in os.getenv("RESPONSE_CACHE_TTLS", "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            overrides[name.strip()] = int(value)
+        except ValueError:
+            continue
+    return enabled, path, max_mb * 1024 * 1024, default_ttl, overrides
+
+
+def get_ingest_workers() -> int:
+    """
+    Devuelve cuantos procesos leen en paralelo los CSV/JSON del Control de Monotributistas.
+    Lee INGEST_WORKERS del entorno, default min(nucleos, 8); 1 lee todo en el proceso actual.
+    """
+    return max(1, _get_env_int("INGEST_WORKERS", DEFAULT_INGEST_WORKERS))
+
+
+def get_csv_cache_enabled() -> bool:
+    """
+    Indica si el Control de Monotributistas cachea los CSV de Mis Comprobantes ya parseados
+    (mrbot_app.csv_cache). CSV_CACHE=0 la desactiva; default activa.
+    """
+    return os.getenv("CSV_CACHE", "1").strip().lower() not in ("0", "no", "false")
+
+
+def get_csv_engine() -> str:
+    """
+    Devuelve el motor para leer los CSV de Mis Comprobantes (mrbot_app.lector_csv_mc):
+    "auto" (pyarrow si esta instalado, si no el motor C de pandas), "c" o "pyarrow".
+    Lee CSV_ENGINE del entorno; default auto.
+    """
+    engine = os.getenv("CSV_ENGINE", "auto").strip().lower()
+    return engine if engine in ("auto", "c", "pyarrow") else "auto"
+
+
+def get_control_memo_enabled() -> bool:
+    """
+    Indica si el Control de Monotributistas reutiliza la corrida anterior segun la huella
+    de sus entradas (mrbot_app.reporte_memo). CONTROL_MEMO=0 la desactiva; default activa.
+    """
+    return os.getenv("CONTROL_MEMO", "1").strip().lower() not in ("0", "no", "false")
+
+
+def get_control_float32() -> bool:
+    """
+    Indica si el Control de Monotributistas guarda los importes en float32 (menos memoria,
+    redondeo distinto en el ultimo decimal). CONTROL_IMPORTES_FLOAT32=1 lo activa; default no.
+    """
+    return os.getenv("CONTROL_IMPORTES_FLOAT32", "0").strip().lower() in ("1", "si", "true", "yes")
+
+
+def get_control_por_cliente() -> bool:
+    """
+    Indica si el Control de Monotributistas procesa y escribe un cliente por vez
+    (memoria acotada por el cliente mas grande). CONTROL_POR_CLIENTE=1 lo activa; default no.
+    """
+    return os.getenv("CONTROL_POR_CLIENTE", "0").strip().lower() in ("1", "si", "true", "yes")
+
+
+def get_control_sin_extraer() -> bool:
+    """
+    Indica si el Control de Monotributistas deja los CSV de Mis Comprobantes dentro del ZIP
+    descargado (sin copia en extraido/); el reporte los lee del ZIP. CONTROL_SIN_EXTRAER=1
+    lo activa; default no.
+    """
+    return os.getenv("CONTROL_SIN_EXTRAER", "0").strip().lower() in ("1", "si", "true", "yes")
@@ -1,11 +1,18 @@
+import json
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
 from dotenv import load_dotenv
 
+from mrbot_app.artifact_manifest import record_artifacts
+from mrbot_app.config import get_download_retries
+from mrbot_app.download_queue import get_download_queue
+from mrbot_app.http_client import get_session
+
 
 load_dotenv(".env", override=True)
 
@@ -15,6 +22,13 @@ api_key = os.getenv("API_KEY")
 # Configuración para descargas concurrentes
 MAX_WORKERS = 10
 
+# Descargas MinIO reanudables
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = ".part"
+DOWNLOAD_JOURNAL_NAME = ".mrbot_descargas.json"
+_journal_lock = threading.Lock()
+
 
 def consulta_requests_restantes(mail: str) -> Dict[str, Any]:
     """
@@ -45,33 +59,168 @@ def consulta_requests_restantes(mail: str) -> Dict[str, Any]:
         }
 
 
-def descargar_archivo_minio(url: str, destino: str) -> Dict[str, Any]:
+class _DescargaIncompleta(Exception):
+    """Corte de la transferencia que se puede reanudar con Range."""
+
+
+def _url_key(url: str) -> str:
+    # Las URLs prefirmadas cambian la query en cada respuesta; el objeto es host + path
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path}"
+
+
+def _journal_path(destino: str) -> str:
+    return os.path.join(os.path.dirname(destino) or ".", DOWNLOAD_JOURNAL_NAME)
+
+
+def _read_journal(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _journal_get(destino: str) -> Optional[Dict[str, Any]]:
+    with _journal_lock:
+        entry = _read_journal(_journal_path(destino)).get(os.path.basename(destino))
+    return dict(entry) if isinstance(entry, dict) else None
+
+
+def _journal_set(destino: str, entry: Optional[Dict[str, Any]]) -> None:
+    """Actualiza (o borra si entry es None) la entrada de destino en el journal de su carpeta."""
+    path = _journal_path(destino)
+    name = os.path.basename(destino)
+    with _journal_lock:
+        data = _read_journal(path)
+        if entry is None:
+            if name not in data:
+                return
+            data.pop(name)
+        else:
+            data[name] = entry
+        if not data:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _total_from_headers(response: requests.Response) -> Optional[int]:
+    if response.status_code == 206:
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    if response.headers.get("Content-Encoding"):
+        # iter_content descomprime: Content-Length no coincide con lo escrito
+        return None
+    length = response.headers.get("Content-Length", "")
+    return int(length) if length.isdigit() else None
+
+
+def _descargar_tramo(url: str, part_path: str, destino: str, entry: Dict[str, Any]) -> Tuple[Optional[int], bool]:
+    """
+    Descarga en part_path desde el byte en que quedo (Range + If-Range).
+    Devuelve (tamaño_total_esperado, reanudado).
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers: Dict[str, str] = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        validator = entry.get("etag") or entry.get("last_modified")
+        if validator:
+            # Si el objeto cambio, el servidor responde 200 con el archivo completo
+            headers["If-Range"] = validator
+
+    with get_session().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+        if response.status_code == 416:
+            os.remove(part_path)
+            raise _DescargaIncompleta("Rango no valido, se reinicia la descarga")
+        response.raise_for_status()
+
+        resumed = bool(offset) and response.status_code == 206
+        mode = "ab" if resumed else "wb"
+        total = _total_from_headers(response)
+        entry.update(
+            {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "total": total,
+            }
+        )
+        _journal_set(destino, entry)
+
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+    return total, resumed
+
+
+def descargar_archivo_minio(url: str, destino: str, reintentos: Optional[int] = None) -> Dict[str, Any]:
     """
     Descarga un archivo desde MinIO.
 
+    El contenido se escribe en destino + ".part" y se renombra al terminar, de modo
+    que destino nunca queda truncado. Si la conexion se corta se reanuda con Range
+    (hasta `reintentos` veces, default DOWNLOAD_RETRIES). El journal de la carpeta
+    (.mrbot_descargas.json) recuerda los .part pendientes para que una ejecucion
+    posterior que descargue el mismo objeto al mismo destino continue desde ahi.
+
     Args:
         url: URL del archivo en MinIO
         destino: Ruta local donde guardar el archivo
+        reintentos: Reanudaciones ante cortes (None = DOWNLOAD_RETRIES)
 
     Returns:
         Dict con información del resultado de la descarga
     """
+    total_reintentos = get_download_retries() if reintentos is None else max(0, reintentos)
+    part_path = destino + PART_SUFFIX
     try:
-        response = requests.get(url, stream=True, timeout=60)
-        response.raise_for_status()
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
 
-        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        entry = _journal_get(destino)
+        if entry is None or entry.get("url") != _url_key(url):
+            # .part sin journal o de otro objeto: no se puede validar, se empieza de cero
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            entry = {"url": _url_key(url)}
 
-        with open(destino, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        return {
-            "success": True,
-            "url": url,
-            "destino": destino,
-            "size": os.path.getsize(destino),
-        }
+        resumed_any = False
+        last_error: Optional[Exception] = None
+        for _ in range(total_reintentos + 1):
+            try:
+                total, resumed = _descargar_tramo(url, part_path, destino, entry)
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+                _DescargaIncompleta,
+            ) as exc:
+                last_error = exc
+                continue
+            resumed_any = resumed_any or resumed
+            size = os.path.getsize(part_path)
+            if total is not None and size < total:
+                last_error = _DescargaIncompleta(f"Descarga incompleta: {size} de {total} bytes")
+                continue
+            os.replace(part_path, destino)
+            _journal_set(destino, None)
+            return {
+                "success": True,
+                "url": url,
+                "destino": destino,
+                "size": size,
+                "resumed": resumed_any,
+            }
+        raise last_error or _DescargaIncompleta("Descarga incompleta")
     except Exception as e:
         return {
             "success": False,
@@ -98,35 +247,40 @@ def descargar_archivos_minio_concurrente(
     urls: List[Dict[str, str]],
     max_workers: int = MAX_WORKERS,
     log_fn: Optional[Callable[[str], None]] = None,
+    al_terminar: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Descarga múltiples archivos desde MinIO de forma concurrente.
 
     Args:
         urls: Lista de dicts con "url" y "destino"
-        max_workers: Número de workers concurrentes (default: 10)
+        max_workers: Máximo de archivos de este lote en vuelo en la cola compartida de
+            descargas (default: 10)
         log_fn: Funcion opcional para registrar logs (UI/CLI)
+        al_terminar: Opcional; se llama con el resultado de cada descarga exitosa apenas
+            termina (en el hilo que llamo), sin esperar al resto
 
     Returns:
         Lista de resultados de las descargas
+        (los archivos descargados se registran en el manifiesto, ver artifact_manifest)
     """
     resultados = []
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(descargar_archivo_minio, item["url"], item["destino"]): item
-            for item in urls
-        }
-
-        for future in as_completed(futures):
-            resultado = future.result()
-            resultados.append(resultado)
+    # Cola compartida del proceso: a lo sumo max_workers archivos de este lote en vuelo
+    completadas = get_download_queue().iter_completed(
+        lambda item: descargar_archivo_minio(item["url"], item["destino"]), urls, window=max_workers
+    )
+    for _, resultado in completadas:
+        resultados.append(resultado)
 
-            if resultado["success"]:
-                _log_message(f"INFO: Descargado: {os.path.basename(resultado['destino'])}", log_fn)
-            else:
-                _log_message(f"ERROR: Error descargando: {resultado['destino']} - {resultado['error']}", log_fn)
+        if resultado["success"]:
+            _log_message(f"INFO: Descargado: {os.path.basename(resultado['destino'])}", log_fn)
+            if al_terminar is not None:
+                al_terminar(resultado)
+        else:
+            _log_message(f"ERROR: Error descargando: {resultado['destino']} - {resultado['error']}", log_fn)
 
+    record_artifacts(resultado["destino"] for resultado in resultados if resultado["success"])
     return resultados
 
 
@@ -2,24 +2,47 @@ import os
 import json
 import glob
 import re
+import multiprocessing
+import queue
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Optional, Callable, Dict, Any, List, Tuple
 from urllib.parse import urlparse, unquote
 
-from openpyxl import load_workbook, Workbook
-
+from mrbot_app.config import (
+    get_control_float32,
+    get_control_memo_enabled,
+    get_control_por_cliente,
+    get_control_sin_extraer,
+    get_csv_cache_enabled,
+    get_ingest_workers,
+)
+from mrbot_app.artifact_manifest import ArtifactManifest, artifact_context, get_artifact_manifest, record_artifacts
+from mrbot_app.csv_cache import load_cached, store_cached
+from mrbot_app.reporte_memo import MEMO_VERSION, MemoReporte, huella_archivos, huella_contenido, huella_valor
 from mrbot_app.mis_comprobantes import consulta_mc, crear_directorio_seguro, extraer_csv_de_zip, FALLBACK_BASE_DIR
+from mrbot_app.lector_csv_mc import leer_csv_mc
 from mrbot_app.consulta import descargar_archivos_minio_concurrente
 from mrbot_app.helpers import format_date_str, safe_post, build_headers, ensure_trailing_slash
-from mrbot_app.formatos import (
-    aplicar_formato_encabezado,
-    aplicar_formato_moneda,
-    autoajustar_columnas,
-    agregar_filtros,
-    alinear_columnas
-)
+from mrbot_app.formatos import EscritorExcel
+
+# Por debajo de esta cantidad de archivos no conviene levantar procesos
+MIN_ARCHIVOS_POOL = 16
+
+# Registro en el manifiesto de artefactos (ver artifact_manifest)
+MODULO_CONTROL = "control_monotributistas"
+TIPO_MC_CSV = "csv"
+# ZIP descargado que el reporte lee sin extraer (CONTROL_SIN_EXTRAER)
+TIPO_MC_CSV_ZIP = "csv_zip"
+TIPO_RCEL_JSON = "json"
 
 NOTAS_DE_CREDITO = [3, 8, 13, 21, 38, 43, 44, 48, 53, 90, 110, 112, 113, 114, 119, 203, 208, 213]
 
@@ -62,13 +85,177 @@ def _parse_bool(valor: Any, default: bool = False) -> bool:
         return False
     return default
 
+def preparar_csv_mc(
+    zip_path: str,
+    csv_path: str,
+    cuit: str = "",
+    periodo: str = "",
+    log_fn: Optional[Callable[[str], None]] = None,
+) -> Optional[str]:
+    """
+    Deja listo para el reporte el ZIP de MC descargado: extrae el CSV a csv_path o,
+    con CONTROL_SIN_EXTRAER, deja el ZIP. Lo registra en el manifiesto y devuelve la
+    ruta que lee el reporte (None si no se pudo extraer).
+    """
+    if get_control_sin_extraer():
+        # El reporte lee el CSV desde el ZIP; una copia extraida antes quedaria vieja
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+        record_artifacts([zip_path], modulo=MODULO_CONTROL, cuit=cuit, periodo=periodo, tipo=TIPO_MC_CSV_ZIP)
+        return zip_path
+    _log_info(f"Extrayendo CSV de {os.path.basename(zip_path)}", log_fn)
+    if not extraer_csv_de_zip(zip_path, csv_path, log_fn):
+        return None
+    # El reporte busca estos CSV en el manifiesto
+    record_artifacts([csv_path], modulo=MODULO_CONTROL, cuit=cuit, periodo=periodo, tipo=TIPO_MC_CSV)
+    return csv_path
+
+
+def _cachear_csv_mc(path: str) -> bool:
+    # Corre en el pool de PipelineMC: deja la entrada en csv_cache sin devolver el DataFrame
+    _, cacheado = _leer_csv_mc_cacheado(path)
+    return cacheado
+
+
+class PipelineMC:
+    """
+    Etapas de extraccion y parseo que corren mientras siguen las descargas de MC:
+    cada ZIP descargado entra a una cola acotada de extraccion (hilos, disco) y el
+    CSV resultante a otra de parseo (pool de procesos, CPU) que deja la entrada en
+    la cache columnar (csv_cache), asi "Generar Reporte" ya no parsea esos CSV.
+    Con colas llenas, quien descarga espera (la memoria y el disco quedan acotados).
+
+        with PipelineMC(log_fn=...) as pipeline:
+            procesar_descarga_mc(row, log_fn, pipeline=pipeline)
+
+    Sin CSV_CACHE no hay etapa de parseo.
+    """
+
+    def __init__(
+        self,
+        extractores: int = 2,
+        workers: Optional[int] = None,
+        capacidad: int = 8,
+        usar_cache: Optional[bool] = None,
+        abort_event: Optional[threading.Event] = None,
+        log_fn: Optional[Callable[[str], None]] = None,
+    ):
+        self.log_fn = log_fn
+        self.abort_event = abort_event or threading.Event()
+        self.workers = max(1, workers or get_ingest_workers())
+        self.usar_cache = get_csv_cache_enabled() if usar_cache is None else usar_cache
+        self.contadores = {"descargados": 0, "listos": 0, "parseados": 0, "errores": 0}
+        self._lock = threading.Lock()
+        self._extraccion: "queue.Queue[Optional[Tuple[str, str, str, str]]]" = queue.Queue(maxsize=capacidad)
+        self._parseo: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=capacidad)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._extractores = [
+            threading.Thread(target=self._extraer, name=f"mc-extraer-{i}", daemon=True) for i in range(max(1, extractores))
+        ]
+        self._parseadores = [
+            threading.Thread(target=self._parsear, name=f"mc-parsear-{i}", daemon=True)
+            for i in range(self.workers if self.usar_cache else 0)
+        ]
+        self._inicio = time.perf_counter()
+
+    def __enter__(self) -> "PipelineMC":
+        if self.workers > 1 and self._parseadores:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, RuntimeError):
+                self._pool = None
+        for hilo in self._extractores + self._parseadores:
+            hilo.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.cerrar()
+
+    def _contar(self, clave: str) -> None:
+        with self._lock:
+            self.contadores[clave] += 1
+
+    def zip_descargado(self, zip_path: str, csv_path: str, cuit: str = "", periodo: str = "") -> None:
+        """Encola un ZIP recien descargado (se llama desde los hilos de descarga)."""
+        if self.abort_event.is_set():
+            return
+        self._contar("descargados")
+        self._extraccion.put((zip_path, csv_path, cuit, periodo))
+
+    def _extraer(self) -> None:
+        while True:
+            item = self._extraccion.get()
+            if item is None:
+                return
+            if self.abort_event.is_set():
+                continue
+            try:
+                listo = preparar_csv_mc(*item, log_fn=self.log_fn)
+            except Exception as e:
+                _log_error(f"Error preparando {item[0]}: {e}", self.log_fn)
+                listo = None
+            if listo is None:
+                self._contar("errores")
+                continue
+            self._contar("listos")
+            if self._parseadores:
+                self._parseo.put(listo)
+
+    def _parsear(self) -> None:
+        while True:
+            path = self._parseo.get()
+            if path is None:
+                return
+            if self.abort_event.is_set():
+                continue
+            try:
+                if self._pool is not None:
+                    try:
+                        self._pool.submit(_cachear_csv_mc, path).result()
+                    except BrokenProcessPool:
+                        # Sin multiproceso disponible: se parsea en este hilo
+                        _cachear_csv_mc(path)
+                else:
+                    _cachear_csv_mc(path)
+                self._contar("parseados")
+            except Exception as e:
+                _log_error(f"Error leyendo CSV {path}: {e}", self.log_fn)
+                self._contar("errores")
+
+    def cerrar(self) -> Dict[str, int]:
+        """Espera que terminen las etapas (o las vacia si se aborto) y devuelve los contadores."""
+        for _ in self._extractores:
+            self._extraccion.put(None)
+        for hilo in self._extractores:
+            hilo.join()
+        for _ in self._parseadores:
+            self._parseo.put(None)
+        for hilo in self._parseadores:
+            hilo.join()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self.contadores["descargados"]:
+            c = self.contadores
+            _log_info(
+                f"Pipeline MC: {c['descargados']} ZIP descargados, {c['listos']} listos, "
+                f"{c['parseados']} CSV en cache, {c['errores']} errores "
+                f"({time.perf_counter() - self._inicio:.1f} s)",
+                self.log_fn,
+            )
+        return dict(self.contadores)
+
+
 def procesar_descarga_mc(
     row: pd.Series,
-    log_fn: Optional[Callable[[str], None]] = None
+    log_fn: Optional[Callable[[str], None]] = None,
+    pipeline: Optional[PipelineMC] = None,
 ) -> None:
     """
     Procesa la descarga de Mis Comprobantes para un contribuyente.
     Utiliza las variables de entorno para credenciales (como consulta_mc original).
+    pipeline: si se pasa, cada ZIP descargado sigue en sus etapas de extraccion y
+    parseo mientras continuan las descargas (ver PipelineMC); si no, se extrae al final.
     """
     cuit_representante = str(row.get('cuit_representante', '')).strip()
     clave_representante = str(row.get('clave_representante', '')).strip()
@@ -163,15 +350,23 @@ def procesar_descarga_mc(
             _log_info(f"Descargando {len(archivos_a_descargar)} archivos MC...", log_fn)
             # Adapt structure for downloader
             download_items = [{"url": item["url"], "destino": item["destino"]} for item in archivos_a_descargar]
-            results = descargar_archivos_minio_concurrente(download_items, log_fn=log_fn)
+            periodo = f"{desde} - {hasta}"
+            csv_de_zip = {item["destino"]: item["csv_destino"] for item in archivos_a_descargar}
 
-            for item in archivos_a_descargar:
-                if os.path.exists(item["destino"]):
-                    _log_info(f"Extrayendo CSV de {os.path.basename(item['destino'])}", log_fn)
-                    if extraer_csv_de_zip(item["destino"], item["csv_destino"], log_fn):
-                        # Optionally remove zip
-                        # os.remove(item["destino"])
-                        pass
+            def al_terminar(resultado: Dict[str, Any]) -> None:
+                # Cada ZIP pasa a extraccion apenas termina de bajar (ver PipelineMC)
+                destino = resultado["destino"]
+                pipeline.zip_descargado(destino, csv_de_zip[destino], cuit_representado, periodo)
+
+            with artifact_context(modulo=MODULO_CONTROL, cuit=cuit_representado, periodo=periodo):
+                descargar_archivos_minio_concurrente(
+                    download_items, log_fn=log_fn, al_terminar=al_terminar if pipeline is not None else None
+                )
+
+            if pipeline is None:
+                for item in archivos_a_descargar:
+                    if os.path.exists(item["destino"]):
+                        preparar_csv_mc(item["destino"], item["csv_destino"], cuit_representado, periodo, log_fn)
 
     except Exception as e:
         _log_error(f"Excepcion en proceso MC: {e}", log_fn)
@@ -299,10 +494,13 @@ def procesar_descarga_rcel(
             dest = os.path.join(ubicacion_base, filename)
             download_items.append({"url": url, "destino": dest})
 
-        results = descargar_archivos_minio_concurrente(download_items, log_fn=log_fn)
+        periodo = f"{desde} - {hasta}"
+        with artifact_context(modulo=MODULO_CONTROL, cuit=cuit_representado, periodo=periodo):
+            results = descargar_archivos_minio_concurrente(download_items, log_fn=log_fn)
 
         # Save JSON metadata for each downloaded file
         saved_jsons = 0
+        json_paths = []
         for item in download_items:
             dest_pdf = item["destino"]
             if os.path.exists(dest_pdf):
@@ -315,334 +513,1065 @@ def procesar_descarga_rcel(
                         with open(json_path, "w", encoding="utf-8") as f:
                             json.dump(meta, f, ensure_ascii=False, indent=2)
                         saved_jsons += 1
+                        json_paths.append(json_path)
                     except Exception as e:
                         _log_error(f"Error guardando JSON {json_name}: {e}", log_fn)
 
+        record_artifacts(json_paths, modulo=MODULO_CONTROL, cuit=cuit_representado, periodo=periodo, tipo=TIPO_RCEL_JSON)
         _log_info(f"Descargas RCEL completadas: {len(results)}. JSONs guardados: {saved_jsons}", log_fn)
 
     except Exception as e:
         _log_error(f"Excepcion en proceso RCEL: {e}", log_fn)
 
-def leer_archivos_csv_batch(archivos_mc: List[str], log_fn: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
-    dataframes = []
-    for f in archivos_mc:
-        if not os.path.isfile(f):
-            continue
+def indexar_archivos_control(search_path: str, manifest: Optional[ArtifactManifest] = None) -> Tuple[List[str], List[str]]:
+    """
+    Recorre search_path como antes del manifiesto (CSV en */extraido/, ZIP de MC sin
+    extraer, JSON en */RCEL/) y registra lo encontrado. Devuelve (archivos_mc, archivos_json).
+    """
+    archivos_mc = sorted(glob.glob(os.path.join(search_path, "**", "extraido", "*.csv"), recursive=True))
+    extraidos = set(archivos_mc)
+    # ZIP sin extraer (CONTROL_SIN_EXTRAER) de la carpeta por defecto de procesar_descarga_mc
+    archivos_zip = [
+        f for f in sorted(glob.glob(os.path.join(search_path, "**", "Mis Comprobantes", "*", "*.zip"), recursive=True))
+        if os.path.join(os.path.dirname(f), "extraido", nombre_csv_mc(f)) not in extraidos
+    ]
+    archivos_json = sorted(glob.glob(os.path.join(search_path, "**", "RCEL", "**", "*.json"), recursive=True))
+    if manifest is not None:
+        manifest.add(archivos_mc, modulo=MODULO_CONTROL, tipo=TIPO_MC_CSV)
+        manifest.add(archivos_zip, modulo=MODULO_CONTROL, tipo=TIPO_MC_CSV_ZIP)
+        manifest.add(archivos_json, modulo=MODULO_CONTROL, tipo=TIPO_RCEL_JSON)
+        manifest.mark_indexed(search_path)
+    return archivos_mc + archivos_zip, archivos_json
+
+
+def buscar_archivos_control(search_path: str, log_fn: Optional[Callable[[str], None]] = None) -> Tuple[List[str], List[str]]:
+    """
+    CSV de MC y JSON de RCEL de search_path para el reporte, desde el manifiesto de artefactos.
+    La primera vez que se usa una carpeta se recorre una sola vez con glob para
+    registrar las descargas previas al manifiesto. Sin manifiesto (desactivado)
+    se recorre la carpeta en cada corrida, incluyendo cualquier JSON si no hay
+    carpetas RCEL.
+    """
+    manifest = get_artifact_manifest()
+    if manifest is None:
+        _log_info(f"Buscando archivos en: {search_path}", log_fn)
+        archivos_mc, archivos_json = indexar_archivos_control(search_path)
+        if not archivos_json:
+            archivos_json = sorted(glob.glob(os.path.join(search_path, "**", "*.json"), recursive=True))
+        return archivos_mc, archivos_json
+
+    if not manifest.is_indexed(search_path):
+        _log_info(f"Registrando en el manifiesto las descargas previas de: {search_path}", log_fn)
+        indexar_archivos_control(search_path, manifest)
+    # El manifiesto tiene las descargas de todas las carpetas: solo las de search_path
+    prefijo = os.path.join(os.path.normcase(os.path.abspath(search_path)), "")
+
+    def _buscar(tipo: str) -> List[str]:
+        return [
+            path for path in manifest.find(modulo=MODULO_CONTROL, tipo=tipo)
+            if os.path.normcase(path).startswith(prefijo)
+        ]
+
+    archivos_mc = _buscar(TIPO_MC_CSV) + _buscar(TIPO_MC_CSV_ZIP)
+    archivos_json = _buscar(TIPO_RCEL_JSON)
+    _log_info(f"Archivos tomados del manifiesto: {manifest.path}", log_fn)
+    return archivos_mc, archivos_json
+
+
+def nombre_csv_mc(path: str) -> str:
+    """Nombre del CSV de MC; para un ZIP sin extraer, el que tendria en extraido/ (mismo reporte)."""
+    nombre = os.path.basename(path)
+    if nombre.lower().endswith(".zip"):
+        return os.path.splitext(nombre)[0] + ".csv"
+    return nombre
+
+
+def _leer_csv_mc(f: str) -> Optional[pd.DataFrame]:
+    """
+    Lee un CSV de Mis Comprobantes y devuelve solo las columnas del reporte (None si esta vacio).
+    Si f es el ZIP descargado, lee el CSV descomprimiendo al vuelo (sin extraerlo a disco).
+    Encoding, tipos y motor: ver lector_csv_mc.
+    """
+    data = leer_csv_mc(f)
+    if data.empty:
+        return None
+
+    data['Archivo'] = nombre_csv_mc(f)
+
+    # Logic from control.py
+    partes_archivo = data["Archivo"].str.split("-")
+    # control.py assumes format: [Something]-[Something]-[Something]-[Something]-[CUIT]-[Cliente].csv or similar
+    # Actually, `get_unique_filename` might have changed the name.
+    # But the content of CSV usually has columns that matter.
+    # control.py relies on filename to get "Fin CUIT" and "Cliente".
+    # "partes_archivo.str[4]" implies at least 5 parts.
+    # If our filename doesn't match, this will fail.
+    # The CSVs from MC usually have standard names like:
+    # "Mis Comprobantes Emitidos - 2024-01-01 - 2024-12-31 - 20123456789.csv" (example)
+    # control.py seems to expect a specific format.
+    # Let's look at `control.py`:
+    # partes_archivo = data["Archivo"].str.split("-")
+    # data['Fin CUIT'] = partes_archivo.str[4].str.strip().astype(np.int64)
+    # data['Cliente'] = partes_archivo.str[5].str.strip().str.replace('.csv','', regex=True)
+
+    # If we renamed files differently in `procesar_descarga_mc`, this will break.
+    # `procesar_descarga_mc` used `filename_zip` from URL.
+    # MinIO URLs often have names like "MCE-20123456789-20240101-20241231.zip" or similar?
+    # Or maybe "20123456789-MCE-..."
+
+    # If parsing fails, we should try to extract from content if possible, but MC csv doesn't always have client CUIT/Name in rows (it has user's CUIT).
+    # But wait, `data['CUIT Cliente']` and `data['Cliente']` seem to be the represented entity.
+    # In `control.py`, it uses filename.
+
+    # Let's try to be robust. If splits are not enough, maybe regex.
+    # Or just use the file parent folder name if available?
+    # But here we are reading many files in batch, potentially from different clients.
+
+    # Let's assume the filename format is preserved from MinIO and matches what control.py expects OR we adjust.
+    # If not, we might need to rely on the folder structure if `leer_archivos_csv_batch` is called per client?
+    # No, `control()` receives a list of ALL files.
+
+    # Workaround: Check if we can extract from filename safely.
+
+    try:
+        data['Fin CUIT'] = partes_archivo.str[4].str.strip().astype(np.int64)
+        data['CUIT Cliente'] = partes_archivo.str[4].str.strip().astype(np.int64)
+        if len(data["Archivo"].iloc[0].split("-")) > 5:
+             data['Cliente'] = partes_archivo.str[5].str.strip().str.replace('.csv','', regex=True)
+        else:
+             data['Cliente'] = "Desconocido"
+    except Exception:
+        # Fallback: try to extract from folder name?
+        # or just use a placeholder
+         data['Fin CUIT'] = 0
+         data['CUIT Cliente'] = 0
+         data['Cliente'] = "Desconocido"
+
+    es_emitido = 'Denominación Receptor' in data.columns
+    es_recibido = 'Denominación Emisor' in data.columns
+
+    if es_emitido:
+        data['Nro. Doc. Receptor/Emisor'] = data['Denominación Receptor'] # Wait, control.py mapped 'Nro. Doc. Receptor' -> 'Nro. Doc. Receptor/Emisor'??
+        # control.py:
+        # data['Nro. Doc. Receptor/Emisor'] = data['Nro. Doc. Receptor']
+        # data['Denominación Receptor/Emisor'] = data['Denominación Receptor']
+        data['Nro. Doc. Receptor/Emisor'] = data.get('Nro. Doc. Receptor', '')
+        data['Denominación Receptor/Emisor'] = data.get('Denominación Receptor', '')
+    elif es_recibido:
+        data['Nro. Doc. Receptor/Emisor'] = data.get('Nro. Doc. Emisor', '')
+        data['Denominación Receptor/Emisor'] = data.get('Denominación Emisor', '')
+
+    cols = [
+        'Fecha de Emisión', 'Tipo de Comprobante', 'Punto de Venta',
+        'Número Desde', 'Número Hasta', 'Cód. Autorización',
+        'Tipo Cambio', 'Moneda',
+        'Imp. Neto Gravado Total', 'Imp. Neto No Gravado',
+        'Imp. Op. Exentas', 'Otros Tributos', 'Total IVA', 'Imp. Total',
+        'Nro. Doc. Receptor/Emisor', 'Denominación Receptor/Emisor',
+        'Archivo', 'CUIT Cliente', 'Fin CUIT', 'Cliente'
+    ]
+    # Ensure columns exist
+    for c in cols:
+        if c not in data.columns:
+            data[c] = 0 if 'Imp.' in c or 'Total' in c else ''
+
+    return data[cols]
+
+
+def _leer_csv_mc_cacheado(f: str, usar_cache: bool = True) -> Tuple[Optional[pd.DataFrame], bool]:
+    """_leer_csv_mc con la cache columnar de csv_cache. Devuelve (data, leido_de_cache)."""
+    if usar_cache:
+        cached = load_cached(f)
+        if cached is not None:
+            return cached, True
+    data = _leer_csv_mc(f)
+    if usar_cache and data is not None:
+        store_cached(f, data)
+    return data, False
+
+
+def _leer_json_rcel(factura: str) -> Dict[str, Any]:
+    """Lee el JSON de una factura RCEL y le agrega archivo, CUIT y cliente."""
+    with open(factura, 'r', encoding='utf-8-sig') as f:
+        data_dict = json.load(f)
+
+    data_dict['Archivo PDF'] = os.path.basename(factura)
+
+    # Extract CUIT from filename if possible. control.py: partes = ... split("-")[0]
+    partes = data_dict['Archivo PDF'].split("-")
+    if len(partes) >= 1 and partes[0].isdigit():
+        data_dict['CUIT Cliente'] = int(partes[0].strip())
+        data_dict['Fin CUIT'] = int(partes[0].strip())
+
+    # Extract Client from parent dir
+    try:
+        parent = os.path.basename(os.path.dirname(factura))
+        # control.py: split("_", 1)[1]
+        if "_" in parent:
+            data_dict['Cliente'] = parent.split("_", 1)[1]
+        else:
+            data_dict['Cliente'] = parent
+    except Exception:
+        pass
+
+    return data_dict
+
+
+def _leer_archivo(lector: Callable[[str], Any], path: str) -> Tuple[str, Any, Optional[str]]:
+    # Corre en los procesos del pool: los errores vuelven como texto para loguearlos en el proceso principal
+    try:
+        return path, lector(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _leer_archivos(
+    lector: Callable[[str], Any],
+    archivos: List[str],
+    workers: Optional[int] = None,
+) -> List[Tuple[str, Any, Optional[str]]]:
+    """
+    Aplica lector a cada archivo existente, en un pool de procesos si hay suficientes
+    archivos (INGEST_WORKERS). Devuelve (path, resultado, error) en el orden de entrada,
+    asi el consolidado queda igual que con la lectura secuencial.
+    """
+    archivos = [f for f in archivos if os.path.isfile(f)]
+    workers = min(workers or get_ingest_workers(), len(archivos))
+    if workers > 1 and len(archivos) >= MIN_ARCHIVOS_POOL:
+        chunksize = max(1, len(archivos) // (workers * 4))
         try:
-            # Attempt reading with different encodings/separators if needed, but control.py used sep=';', decimal=','
-            data = pd.read_csv(f, sep=';', decimal=',', encoding='utf-8-sig')
-            if data.empty:
-                continue
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(partial(_leer_archivo, lector), archivos, chunksize=chunksize))
+        except (BrokenProcessPool, OSError, RuntimeError):
+            # Sin multiproceso disponible (ej. entorno restringido): lectura secuencial
+            pass
+    return [_leer_archivo(lector, f) for f in archivos]
 
-            data['Archivo'] = os.path.basename(f)
-
-            # Logic from control.py
-            partes_archivo = data["Archivo"].str.split("-")
-            # control.py assumes format: [Something]-[Something]-[Something]-[Something]-[CUIT]-[Cliente].csv or similar
-            # Actually, `get_unique_filename` might have changed the name.
-            # But the content of CSV usually has columns that matter.
-            # control.py relies on filename to get "Fin CUIT" and "Cliente".
-            # "partes_archivo.str[4]" implies at least 5 parts.
-            # If our filename doesn't match, this will fail.
-            # The CSVs from MC usually have standard names like:
-            # "Mis Comprobantes Emitidos - 2024-01-01 - 2024-12-31 - 20123456789.csv" (example)
-            # control.py seems to expect a specific format.
-            # Let's look at `control.py`:
-            # partes_archivo = data["Archivo"].str.split("-")
-            # data['Fin CUIT'] = partes_archivo.str[4].str.strip().astype(np.int64)
-            # data['Cliente'] = partes_archivo.str[5].str.strip().str.replace('.csv','', regex=True)
-
-            # If we renamed files differently in `procesar_descarga_mc`, this will break.
-            # `procesar_descarga_mc` used `filename_zip` from URL.
-            # MinIO URLs often have names like "MCE-20123456789-20240101-20241231.zip" or similar?
-            # Or maybe "20123456789-MCE-..."
-
-            # If parsing fails, we should try to extract from content if possible, but MC csv doesn't always have client CUIT/Name in rows (it has user's CUIT).
-            # But wait, `data['CUIT Cliente']` and `data['Cliente']` seem to be the represented entity.
-            # In `control.py`, it uses filename.
-
-            # Let's try to be robust. If splits are not enough, maybe regex.
-            # Or just use the file parent folder name if available?
-            # But here we are reading many files in batch, potentially from different clients.
-
-            # Let's assume the filename format is preserved from MinIO and matches what control.py expects OR we adjust.
-            # If not, we might need to rely on the folder structure if `leer_archivos_csv_batch` is called per client?
-            # No, `control()` receives a list of ALL files.
-
-            # Workaround: Check if we can extract from filename safely.
 
-            try:
-                data['Fin CUIT'] = partes_archivo.str[4].str.strip().astype(np.int64)
-                data['CUIT Cliente'] = partes_archivo.str[4].str.strip().astype(np.int64)
-                if len(data["Archivo"].iloc[0].split("-")) > 5:
-                     data['Cliente'] = partes_archivo.str[5].str.strip().str.replace('.csv','', regex=True)
-                else:
-                     data['Cliente'] = "Desconocido"
-            except Exception:
-                # Fallback: try to extract from folder name?
-                # or just use a placeholder
-                 data['Fin CUIT'] = 0
-                 data['CUIT Cliente'] = 0
-                 data['Cliente'] = "Desconocido"
-
-            es_emitido = 'Denominación Receptor' in data.columns
-            es_recibido = 'Denominación Emisor' in data.columns
-
-            if es_emitido:
-                data['Nro. Doc. Receptor/Emisor'] = data['Denominación Receptor'] # Wait, control.py mapped 'Nro. Doc. Receptor' -> 'Nro. Doc. Receptor/Emisor'??
-                # control.py:
-                # data['Nro. Doc. Receptor/Emisor'] = data['Nro. Doc. Receptor']
-                # data['Denominación Receptor/Emisor'] = data['Denominación Receptor']
-                data['Nro. Doc. Receptor/Emisor'] = data.get('Nro. Doc. Receptor', '')
-                data['Denominación Receptor/Emisor'] = data.get('Denominación Receptor', '')
-            elif es_recibido:
-                data['Nro. Doc. Receptor/Emisor'] = data.get('Nro. Doc. Emisor', '')
-                data['Denominación Receptor/Emisor'] = data.get('Denominación Emisor', '')
-
-            cols = [
-                'Fecha de Emisión', 'Tipo de Comprobante', 'Punto de Venta',
-                'Número Desde', 'Número Hasta', 'Cód. Autorización',
-                'Tipo Cambio', 'Moneda',
-                'Imp. Neto Gravado Total', 'Imp. Neto No Gravado',
-                'Imp. Op. Exentas', 'Otros Tributos', 'Total IVA', 'Imp. Total',
-                'Nro. Doc. Receptor/Emisor', 'Denominación Receptor/Emisor',
-                'Archivo', 'CUIT Cliente', 'Fin CUIT', 'Cliente'
-            ]
-            # Ensure columns exist
-            for c in cols:
-                if c not in data.columns:
-                    data[c] = 0 if 'Imp.' in c or 'Total' in c else ''
-
-            data = data[cols]
-            dataframes.append(data)
-        except Exception as e:
-            _log_error(f"Error leyendo CSV {f}: {e}", log_fn)
+def leer_archivos_csv_batch(
+    archivos_mc: List[str],
+    log_fn: Optional[Callable[[str], None]] = None,
+    workers: Optional[int] = None,
+    usar_cache: Optional[bool] = None,
+    contadores: Optional[Dict[str, int]] = None,
+) -> pd.DataFrame:
+    """
+    contadores: si se pasa, acumula ahi {"cache": .., "parseados": ..} en lugar de
+    loguear el resumen de cache (lectura por partes).
+    """
+    if usar_cache is None:
+        usar_cache = get_csv_cache_enabled()
+    lector = partial(_leer_csv_mc_cacheado, usar_cache=usar_cache)
+    dataframes = []
+    desde_cache = parseados = 0
+    for f, resultado, error in _leer_archivos(lector, archivos_mc, workers):
+        if error is not None:
+            _log_error(f"Error leyendo CSV {f}: {error}", log_fn)
             continue
+        data, cacheado = resultado
+        desde_cache += cacheado
+        parseados += not cacheado
+        if data is not None:
+            dataframes.append(data)
+    if contadores is not None:
+        contadores["cache"] = contadores.get("cache", 0) + desde_cache
+        contadores["parseados"] = contadores.get("parseados", 0) + parseados
+    elif usar_cache and (desde_cache or parseados):
+        _log_info(f"CSV de MC: {desde_cache} desde cache, {parseados} parseados", log_fn)
 
     if dataframes:
         return pd.concat(dataframes, ignore_index=True)
     return pd.DataFrame()
 
-def leer_archivos_json_batch(archivos_json: List[str], log_fn: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
+def leer_archivos_json_batch(
+    archivos_json: List[str],
+    log_fn: Optional[Callable[[str], None]] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
     registros = []
-    for factura in archivos_json:
-        if not os.path.isfile(factura):
-            continue
-        try:
-            with open(factura, 'r', encoding='utf-8-sig') as f:
-                data_dict = json.load(f)
-
-            data_dict['Archivo PDF'] = os.path.basename(factura)
-
-            # Extract CUIT from filename if possible. control.py: partes = ... split("-")[0]
-            partes = data_dict['Archivo PDF'].split("-")
-            if len(partes) >= 1 and partes[0].isdigit():
-                data_dict['CUIT Cliente'] = int(partes[0].strip())
-                data_dict['Fin CUIT'] = int(partes[0].strip())
-
-            # Extract Client from parent dir
-            try:
-                parent = os.path.basename(os.path.dirname(factura))
-                # control.py: split("_", 1)[1]
-                if "_" in parent:
-                    data_dict['Cliente'] = parent.split("_", 1)[1]
-                else:
-                    data_dict['Cliente'] = parent
-            except Exception:
-                pass
-
+    for factura, data_dict, error in _leer_archivos(_leer_json_rcel, archivos_json, workers):
+        if error is not None:
+            _log_error(f"Error leyendo JSON {factura}: {error}", log_fn)
+        else:
             registros.append(data_dict)
-        except Exception as e:
-             _log_error(f"Error leyendo JSON {factura}: {e}", log_fn)
 
     if registros:
         return pd.DataFrame(registros)
     return pd.DataFrame()
 
-def generar_reporte_control(
-    archivos_mc: List[str],
-    archivos_json: List[str],
-    path_categorias: str,
-    output_path: str,
-    log_fn: Optional[Callable[[str], None]] = None
-) -> None:
+def leer_configuracion_control(path_categorias: str) -> Tuple[pd.DataFrame, List[Tuple[Any, Any]]]:
     """
-    Core logic for generating the report.
+    Lee Categorias.xlsx abriendo el libro una sola vez: la hoja 'Categorias' y las
+    ventanas de control de la hoja 'Rango de Fechas' (columna A inicial, B final,
+    desde la fila 2; filas incompletas se ignoran).
     """
-    _log_info("Iniciando generación de reporte...", log_fn)
+    with pd.ExcelFile(path_categorias) as libro:
+        categorias = pd.read_excel(libro, sheet_name='Categorias')
+        rango = pd.read_excel(libro, sheet_name='Rango de Fechas', header=None, skiprows=1, usecols=[0, 1])
+    ventanas = [(desde, hasta) for desde, hasta in rango.itertuples(index=False) if pd.notna(desde) and pd.notna(hasta)]
+    return categorias, ventanas
+
+
+def leer_categorias(path_categorias: str) -> Tuple[pd.DataFrame, Any, Any]:
+    """Categorias y fechas A2 (inicial) y B2 (final) de la hoja 'Rango de Fechas'."""
+    categorias, ventanas = leer_configuracion_control(path_categorias)
+    if not ventanas:
+        raise ValueError("La hoja 'Rango de Fechas' no tiene fechas en A2/B2")
+    return categorias, ventanas[0][0], ventanas[0][1]
 
-    if not os.path.exists(path_categorias):
-        _log_error(f"No se encontró archivo de categorías: {path_categorias}", log_fn)
-        return
 
+def construir_aux(fin_cuit: pd.Series, tipo: pd.Series, punto_venta: pd.Series, numero: pd.Series) -> pd.Series:
+    """
+    Clave de cruce con RCEL: CUIT-TIPO(3)-PTOVTA(5)-NUMERO(8), igual que zfill por columna.
+    CUIT, tipo y punto de venta se empaquetan en un entero (hay pocas combinaciones), se
+    formatea cada combinacion distinta una sola vez y solo el numero se formatea por fila.
+    """
+    cuit, tipo_, pto_vta, nro = (col.astype(int).to_numpy() for col in (fin_cuit, tipo, punto_venta, numero))
+    empaquetable = (
+        len(cuit) > 0
+        and ((cuit >= 0) & (cuit < 90_000_000_000)).all()
+        and ((tipo_ >= 0) & (tipo_ < 1_000)).all()
+        and ((pto_vta >= 0) & (pto_vta < 100_000)).all()
+    )
+    if not empaquetable:
+        claves = [f"{c}-{t:03d}-{p:05d}-{n:08d}" for c, t, p, n in zip(cuit.tolist(), tipo_.tolist(), pto_vta.tolist(), nro.tolist())]
+        return pd.Series(claves, index=fin_cuit.index, dtype=object)
+    codigos, combinaciones = pd.factorize((cuit * 1_000 + tipo_) * 100_000 + pto_vta)
+    prefijos = np.array(
+        [f"{k // 100_000_000}-{k // 100_000 % 1_000:03d}-{k % 100_000:05d}-" for k in combinaciones.tolist()],
+        dtype=object,
+    )
+    numeros = np.char.zfill(nro.astype(str), 8).astype(object)
+    return pd.Series(prefijos[codigos] + numeros, index=fin_cuit.index, dtype=object)
+
+
+def categorizar(importes: pd.Series, categorias: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """
+    Para cada importe, la primera fila de categorias (en el orden de la hoja) cuyo
+    'Ingresos brutos' es >= importe: devuelve (tope de la categoria, categoria).
+    Sin categoria alcanzable: tope 0 y "Excedido".
+    Se resuelve con searchsorted sobre los topes ordenados; el minimo de indice por
+    sufijo respeta el orden original aunque la hoja no este ordenada.
+    """
+    topes = categorias['Ingresos brutos'].to_numpy()
+    nombres = categorias['Categoria'].to_numpy(dtype=object)
+    posiciones = np.flatnonzero(pd.notna(topes))
+    fila = np.zeros(len(importes), dtype=np.intp)
+    encontrado = np.zeros(len(importes), dtype=bool)
+    if len(posiciones):
+        orden = np.argsort(topes[posiciones], kind="stable")
+        topes_ordenados = topes[posiciones][orden]
+        # primera_fila[k]: menor posicion original entre los topes ordenados desde k en adelante
+        primera_fila = np.minimum.accumulate(posiciones[orden][::-1])[::-1]
+        idx = np.searchsorted(topes_ordenados, importes.to_numpy(dtype=float), side="left")
+        encontrado = idx < len(topes_ordenados)
+        fila[encontrado] = primera_fila[idx[encontrado]]
+        maximos = np.where(encontrado, topes[fila], 0)
+    else:
+        maximos = np.zeros(len(importes), dtype=np.int64)
+    asignadas = np.where(encontrado, nombres[fila] if len(nombres) else "Excedido", "Excedido")
+    return (
+        pd.Series(maximos, index=importes.index, name=importes.name),
+        pd.Series(asignadas, index=importes.index, dtype=object, name=importes.name),
+    )
+
+
+# Texto de pocos valores distintos que conviene guardar como categoria
+COLUMNAS_CATEGORICAS = [
+    'Tipo', 'Moneda', 'Cliente', 'MC', 'Archivo', 'Denominación Receptor/Emisor', 'Cruzado', 'Archivo PDF',
+]
+COLUMNAS_ENTERAS = {'Punto de Venta': 'Int32', 'Número Desde': 'Int64', 'Número Hasta': 'Int64'}
+COLUMNAS_IMPORTES = ['Otros Tributos', 'Imp. Total', 'Tipo Cambio']
+
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def compactar_consolidado(
+    consolidado: pd.DataFrame,
+    importes_float32: bool = False,
+    log_fn: Optional[Callable[[str], None]] = None,
+) -> pd.DataFrame:
+    """
+    Reduce la memoria del consolidado sin cambiar los valores:
+    - texto con pocos valores distintos (menos de la mitad de las filas) -> category
+      (Tipo numerico se achica al entero mas chico que lo contiene)
+    - punto de venta y numeros de comprobante -> enteros nullable
+    - importes_float32=True pasa los importes a float32 (opcional: deja de ser
+      identico al centavo en carteras muy grandes)
+    Loguea la memoria antes y despues.
+    """
+    antes = memoria_mb(consolidado)
+    for col in COLUMNAS_CATEGORICAS:
+        if col not in consolidado.columns:
+            continue
+        serie = consolidado[col]
+        if pd.api.types.is_integer_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+            consolidado[col] = pd.to_numeric(serie, downcast='integer')
+        elif not pd.api.types.is_numeric_dtype(serie) and serie.nunique(dropna=False) < len(serie) / 2:
+            consolidado[col] = serie.astype('category')
+    for col, dtype in COLUMNAS_ENTERAS.items():
+        if col not in consolidado.columns:
+            continue
+        serie = consolidado[col]
+        if pd.api.types.is_numeric_dtype(serie):
+            valores = serie.dropna()
+            if (valores == valores.round()).all():
+                consolidado[col] = serie.astype(dtype)
+    if importes_float32:
+        for col in COLUMNAS_IMPORTES:
+            if col in consolidado.columns and pd.api.types.is_float_dtype(consolidado[col]):
+                consolidado[col] = consolidado[col].astype('float32')
+    _log_info(f"Memoria del consolidado: {antes:.1f} MB -> {memoria_mb(consolidado):.1f} MB", log_fn)
+    return consolidado
+
+
+def preparar_consolidado(
+    consolidado: pd.DataFrame,
+    info_facturas_pdf: pd.DataFrame,
+    importes_float32: bool = False,
+    log_fn: Optional[Callable[[str], None]] = None,
+) -> pd.DataFrame:
+    """
+    Normaliza importes (tipo de cambio, notas de credito), arma MC y AUX, cruza con
+    los PDF de RCEL y compacta. Trabaja fila a fila, asi que da lo mismo aplicarlo
+    a toda la cartera o a cada cliente por separado.
+    """
+    # Rename columns to shorter names for processing
+    consolidado.rename(columns={
+        'Fecha de Emisión': 'Fecha',
+        'Tipo de Comprobante': 'Tipo',
+        'Imp. Neto Gravado Total': 'Imp. Neto Gravado',
+        'Total IVA': 'IVA'
+    }, inplace=True)
+
+    # Process amounts
+    columnas_numericas = ['Imp. Neto Gravado', 'Imp. Neto No Gravado', 'Imp. Op. Exentas', 'Otros Tributos', 'IVA', 'Imp. Total']
+    # Convert to float (handling commas)
+    for col in columnas_numericas:
+        if col in consolidado.columns:
+             # Clean string if needed
+             if consolidado[col].dtype == object:
+                  consolidado[col] = consolidado[col].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+                  consolidado[col] = pd.to_numeric(consolidado[col], errors='coerce').fillna(0)
+
+    if 'Tipo Cambio' in consolidado.columns:
+         if consolidado['Tipo Cambio'].dtype == object:
+              consolidado['Tipo Cambio'] = consolidado['Tipo Cambio'].astype(str).str.replace(',', '.', regex=False)
+              consolidado['Tipo Cambio'] = pd.to_numeric(consolidado['Tipo Cambio'], errors='coerce').fillna(1)
+         consolidado.loc[consolidado['Tipo Cambio'] == 0, 'Tipo Cambio'] = 1
+
+         for col in columnas_numericas:
+             if col in consolidado.columns:
+                 consolidado[col] = consolidado[col] * consolidado['Tipo Cambio']
+
+    # Handle Credit Notes
+    consolidado.loc[consolidado['Tipo'].isin(NOTAS_DE_CREDITO), columnas_numericas] *= -1
+
+    # Drop unused
+    consolidado.drop(['Imp. Neto Gravado', 'Imp. Neto No Gravado', 'Imp. Op. Exentas', 'IVA'], axis=1, inplace=True, errors='ignore')
+
+    # MC column (extracted from filename part 1?)
+    # control.py: consolidado['MC'] = consolidado['Archivo'].str.split("-").str[1].str.strip()
+    # Dependent on filename format. Safe to skip or try.
     try:
-        categorias = pd.read_excel(path_categorias, sheet_name='Categorias')
+         consolidado['MC'] = consolidado['Archivo'].str.split("-").str[1].str.strip()
+    except:
+         consolidado['MC'] = ""
+
+    # Build AUX
+    # CUIT_Emisor-COD(3)-PtoVenta(5)-Numero(8)
+    # Fin CUIT is emisor
+    consolidado['AUX'] = construir_aux(
+        consolidado['Fin CUIT'],
+        consolidado['Tipo'],
+        consolidado['Punto de Venta'],
+        consolidado['Número Desde'],
+    )
+
+    if not info_facturas_pdf.empty:
+         consolidado = pd.merge(consolidado, info_facturas_pdf[['AUX', 'Desde', 'Hasta', 'Archivo PDF']], how='left', on='AUX')
+    else:
+         consolidado['Desde'] = pd.NaT
+         consolidado['Hasta'] = pd.NaT
+         consolidado['Archivo PDF'] = None
 
-        # Read dates
-        # control.py logic: sheet 'Rango de Fechas', A2 and B2.
-        # pandas read_excel with header=None, skiprows=1 means A2 is at iloc[0,0] if we read col 0.
-        fecha_inicial_raw = pd.read_excel(path_categorias, sheet_name='Rango de Fechas', header=None, skiprows=1, usecols=[0]).iloc[0,0]
-        fecha_final_raw = pd.read_excel(path_categorias, sheet_name='Rango de Fechas', header=None, skiprows=1, usecols=[1]).iloc[0,0]
+    consolidado['Cruzado'] = np.where(consolidado['Archivo PDF'].notnull(), 'Si', 'No')
 
-        # Ensure datetime
-        fecha_inicial = pd.to_datetime(fecha_inicial_raw, dayfirst=True)
-        fecha_final = pd.to_datetime(fecha_final_raw, dayfirst=True)
+    return compactar_consolidado(consolidado, importes_float32, log_fn)
 
-        _log_info(f"Rango fechas control: {fecha_inicial.date()} - {fecha_final.date()}", log_fn)
 
-        consolidado = leer_archivos_csv_batch(archivos_mc, log_fn)
-        info_facturas_pdf = leer_archivos_json_batch(archivos_json, log_fn)
+def prorratear(consolidado: pd.DataFrame, fecha_inicial: pd.Timestamp, fecha_final: pd.Timestamp) -> pd.DataFrame:
+    """Agrega las columnas del prorrateo de cada comprobante sobre el rango de control."""
+    # Dates processing
+    consolidado['Fecha'] = pd.to_datetime(consolidado['Fecha'], format='ISO8601', errors='coerce')
+    if 'Desde' in consolidado.columns:
+         consolidado['Desde'] = pd.to_datetime(consolidado['Desde'], dayfirst=True, errors='coerce')
+    if 'Hasta' in consolidado.columns:
+         consolidado['Hasta'] = pd.to_datetime(consolidado['Hasta'], dayfirst=True, errors='coerce')
 
-        if consolidado.empty:
-            _log_info("No se encontraron datos en los archivos CSV (MC).", log_fn)
-            return
+    consolidado['Desde'] = consolidado['Desde'].fillna(consolidado['Fecha'])
+    consolidado['Hasta'] = consolidado['Hasta'].fillna(consolidado['Fecha'])
 
-        # Rename columns to shorter names for processing
-        consolidado.rename(columns={
-            'Fecha de Emisión': 'Fecha',
-            'Tipo de Comprobante': 'Tipo',
-            'Imp. Neto Gravado Total': 'Imp. Neto Gravado',
-            'Total IVA': 'IVA'
-        }, inplace=True)
-
-        # Process amounts
-        columnas_numericas = ['Imp. Neto Gravado', 'Imp. Neto No Gravado', 'Imp. Op. Exentas', 'Otros Tributos', 'IVA', 'Imp. Total']
-        # Convert to float (handling commas)
-        for col in columnas_numericas:
-            if col in consolidado.columns:
-                 # Clean string if needed
-                 if consolidado[col].dtype == object:
-                      consolidado[col] = consolidado[col].astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-                      consolidado[col] = pd.to_numeric(consolidado[col], errors='coerce').fillna(0)
-
-        if 'Tipo Cambio' in consolidado.columns:
-             if consolidado['Tipo Cambio'].dtype == object:
-                  consolidado['Tipo Cambio'] = consolidado['Tipo Cambio'].astype(str).str.replace(',', '.', regex=False)
-                  consolidado['Tipo Cambio'] = pd.to_numeric(consolidado['Tipo Cambio'], errors='coerce').fillna(1)
-             consolidado.loc[consolidado['Tipo Cambio'] == 0, 'Tipo Cambio'] = 1
-
-             for col in columnas_numericas:
-                 if col in consolidado.columns:
-                     consolidado[col] = consolidado[col] * consolidado['Tipo Cambio']
-
-        # Handle Credit Notes
-        consolidado.loc[consolidado['Tipo'].isin(NOTAS_DE_CREDITO), columnas_numericas] *= -1
-
-        # Drop unused
-        consolidado.drop(['Imp. Neto Gravado', 'Imp. Neto No Gravado', 'Imp. Op. Exentas', 'IVA'], axis=1, inplace=True, errors='ignore')
-
-        # MC column (extracted from filename part 1?)
-        # control.py: consolidado['MC'] = consolidado['Archivo'].str.split("-").str[1].str.strip()
-        # Dependent on filename format. Safe to skip or try.
-        try:
-             consolidado['MC'] = consolidado['Archivo'].str.split("-").str[1].str.strip()
-        except:
-             consolidado['MC'] = ""
-
-        # Build AUX
-        # CUIT_Emisor-COD(3)-PtoVenta(5)-Numero(8)
-        # Fin CUIT is emisor
-        consolidado['AUX'] = (
-            consolidado['Fin CUIT'].astype(int).astype(str) + "-" +
-            consolidado['Tipo'].astype(int).astype(str).str.zfill(3) + "-" +
-            consolidado['Punto de Venta'].astype(int).astype(str).str.zfill(5) + "-" +
-            consolidado['Número Desde'].astype(int).astype(str).str.zfill(8)
-        )
+    # Filter by dates? control.py has a commented out line for this. I'll skip.
 
-        if not info_facturas_pdf.empty:
-             consolidado = pd.merge(consolidado, info_facturas_pdf[['AUX', 'Desde', 'Hasta', 'Archivo PDF']], how='left', on='AUX')
-        else:
-             consolidado['Desde'] = pd.NaT
-             consolidado['Hasta'] = pd.NaT
-             consolidado['Archivo PDF'] = None
+    # Pro-rating
+    consolidado['Fecha Inicial'] = fecha_inicial
+    consolidado['Fecha_Inicial_max'] = consolidado[['Fecha Inicial', 'Desde']].max(axis=1)
+    del consolidado['Fecha Inicial']
 
-        consolidado['Cruzado'] = np.where(consolidado['Archivo PDF'].notnull(), 'Si', 'No')
+    consolidado['Fecha Final'] = fecha_final
+    consolidado['Fecha_Final_min'] = consolidado[['Fecha Final', 'Hasta']].min(axis=1)
+    del consolidado['Fecha Final']
 
-        # Dates processing
-        consolidado['Fecha'] = pd.to_datetime(consolidado['Fecha'], format='ISO8601', errors='coerce')
-        if 'Desde' in consolidado.columns:
-             consolidado['Desde'] = pd.to_datetime(consolidado['Desde'], dayfirst=True, errors='coerce')
-        if 'Hasta' in consolidado.columns:
-             consolidado['Hasta'] = pd.to_datetime(consolidado['Hasta'], dayfirst=True, errors='coerce')
+    consolidado['Dias de facturación'] = (consolidado['Hasta'] - consolidado['Desde']).dt.days + 1
+    consolidado['Días Efectivos'] = (consolidado['Fecha_Final_min'] - consolidado['Fecha_Inicial_max']).dt.days + 1
+    consolidado.loc[consolidado['Días Efectivos'] < 0, 'Días Efectivos'] = 0
 
-        consolidado['Desde'] = consolidado['Desde'].fillna(consolidado['Fecha'])
-        consolidado['Hasta'] = consolidado['Hasta'].fillna(consolidado['Fecha'])
+    # Avoid division by zero
+    consolidado['Dias de facturación'] = consolidado['Dias de facturación'].replace(0, 1)
 
-        # Filter by dates? control.py has a commented out line for this. I'll skip.
+    consolidado['Importe por día'] = consolidado['Imp. Total'] / consolidado['Dias de facturación']
+    consolidado['Importe Prorrateado'] = consolidado['Importe por día'] * consolidado['Días Efectivos']
+    return consolidado
 
-        # Pro-rating
-        consolidado['Fecha Inicial'] = fecha_inicial
-        consolidado['Fecha_Inicial_max'] = consolidado[['Fecha Inicial', 'Desde']].max(axis=1)
-        del consolidado['Fecha Inicial']
 
-        consolidado['Fecha Final'] = fecha_final
-        consolidado['Fecha_Final_min'] = consolidado[['Fecha Final', 'Hasta']].min(axis=1)
-        del consolidado['Fecha Final']
+def agregar_por_cliente(consolidado: pd.DataFrame) -> pd.DataFrame:
+    """Importe prorrateado y cantidad de comprobantes por (Cliente, MC)."""
+    tabla_dinamica = pd.pivot_table(
+        consolidado,
+        values=['Importe Prorrateado', 'Tipo'],
+        index=['Cliente', 'MC'],
+        aggfunc={'Importe Prorrateado': 'sum', 'Tipo': 'count'},
+        observed=True,
+    )
+    return tabla_dinamica.rename(columns={'Tipo': 'Cantidad de Comprobantes'})
 
-        consolidado['Dias de facturación'] = (consolidado['Hasta'] - consolidado['Desde']).dt.days + 1
-        consolidado['Días Efectivos'] = (consolidado['Fecha_Final_min'] - consolidado['Fecha_Inicial_max']).dt.days + 1
-        consolidado.loc[consolidado['Días Efectivos'] < 0, 'Días Efectivos'] = 0
 
-        # Avoid division by zero
-        consolidado['Dias de facturación'] = consolidado['Dias de facturación'].replace(0, 1)
+# Celdas (clientes x dias) de las sumas acumuladas que se arman por bloque
+CELDAS_POR_BLOQUE = 4_000_000
 
-        consolidado['Importe por día'] = consolidado['Imp. Total'] / consolidado['Dias de facturación']
-        consolidado['Importe Prorrateado'] = consolidado['Importe por día'] * consolidado['Días Efectivos']
 
-        # Pivot Table
-        tabla_dinamica = pd.pivot_table(
-            consolidado,
-            values=['Importe Prorrateado', 'Tipo'],
-            index=['Cliente', 'MC'],
-            aggfunc={'Importe Prorrateado': 'sum', 'Tipo': 'count'}
-        )
-        tabla_dinamica.rename(columns={'Tipo': 'Cantidad de Comprobantes'}, inplace=True)
-
-        # Categorization
-        def get_max_ingresos(x):
-            matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Ingresos brutos']
-            return matches.iloc[0] if not matches.empty else 0
-
-        def get_categoria(x):
-            matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Categoria']
-            return matches.iloc[0] if not matches.empty else "Excedido"
-
-        tabla_dinamica['Ingresos brutos máximos por la categoría'] = tabla_dinamica['Importe Prorrateado'].apply(get_max_ingresos)
-        tabla_dinamica['Categoría'] = tabla_dinamica['Importe Prorrateado'].apply(get_categoria)
-
-        # Formatting Dates for export
-        for c in ['Desde', 'Hasta', 'Fecha', 'Fecha_Inicial_max', 'Fecha_Final_min']:
-             consolidado[c] = consolidado[c].dt.strftime('%d/%m/%Y')
-
-        # Export
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            tabla_dinamica.to_excel(writer, sheet_name='Tabla Dinámica')
-            consolidado.to_excel(writer, sheet_name='Consolidado', index=False)
-
-        # Apply Styles
-        wb = load_workbook(output_path)
-
-        if 'Tabla Dinámica' in wb.sheetnames:
-            ws = wb['Tabla Dinámica']
-            aplicar_formato_encabezado(ws)
-            aplicar_formato_moneda(ws, 3, 3) # Approx cols
-            aplicar_formato_moneda(ws, 5, 5)
-            autoajustar_columnas(ws)
-            agregar_filtros(ws)
-
-        if 'Consolidado' in wb.sheetnames:
-            ws = wb['Consolidado']
-            aplicar_formato_encabezado(ws)
-            # Apply currency to Imp Total and Prorrateado (find indices or guess)
-            # Imp Total is ~14, Importe Prorrateado is last
-            # Just applying auto width and header is enough for MVP, or use logic from control.py
-            autoajustar_columnas(ws)
-            agregar_filtros(ws)
-
-        wb.save(output_path)
+def etiqueta_ventana(desde: pd.Timestamp, hasta: pd.Timestamp) -> str:
+    return f"{desde:%d/%m/%Y} - {hasta:%d/%m/%Y}"
+
+
+def _dias(fechas: pd.Series) -> np.ndarray:
+    # Dias desde 1970-01-01 (NaT -> -1, se descarta antes por la mascara de validos)
+    return fechas.to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def importes_por_ventana(consolidado: pd.DataFrame, ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> pd.DataFrame:
+    """
+    Importe prorrateado por (Cliente, MC) para varias ventanas de control en una sola
+    pasada. Con el importe por día de cada comprobante se arma, por cliente, el importe
+    diario (arreglo de diferencias) y su suma acumulada; cada ventana sale de dos
+    lecturas de esa suma. Es el mismo importe que prorratear con cada ventana por
+    separado (salvo redondeo en los últimos decimales).
+    Requiere las columnas de prorratear (Desde, Hasta, Importe por día).
+    Devuelve una columna por ventana (etiqueta_ventana) y 'Cantidad de Comprobantes'.
+    """
+    agrupado = consolidado.groupby(['Cliente', 'MC'], observed=True, sort=True)
+    resultado = agrupado['Tipo'].count().to_frame('Cantidad de Comprobantes')
+    etiquetas = [etiqueta_ventana(desde, hasta) for desde, hasta in ventanas]
+    importes = np.zeros((len(resultado), len(ventanas)))
+
+    if len(resultado) and ventanas:
+        inicios = np.array([pd.Timestamp(desde).to_datetime64().astype('datetime64[D]').astype(np.int64) for desde, _ in ventanas])
+        fines = np.array([pd.Timestamp(hasta).to_datetime64().astype('datetime64[D]').astype(np.int64) for _, hasta in ventanas])
+        primero, ultimo = int(inicios.min()), int(fines.max())
+
+        # Filas sin Cliente/MC quedan fuera de la tabla dinamica (ngroup NaN)
+        grupos = agrupado.ngroup().fillna(-1).to_numpy().astype(np.int64)
+        tasa = consolidado['Importe por día'].to_numpy(dtype=np.float64, na_value=np.nan)
+        validos = (grupos >= 0) & consolidado['Desde'].notna().to_numpy() & consolidado['Hasta'].notna().to_numpy() & ~np.isnan(tasa)
+        desde = np.maximum(_dias(consolidado['Desde']), primero)
+        hasta = np.minimum(_dias(consolidado['Hasta']), ultimo)
+        # Fuera de todas las ventanas (o con Hasta < Desde) no suma en ninguna
+        validos &= desde <= hasta
+        orden = np.argsort(grupos[validos], kind='stable')
+        grupos, tasa = grupos[validos][orden], tasa[validos][orden]
+        desde, hasta = desde[validos][orden] - primero, hasta[validos][orden] - primero
+
+        dias = ultimo - primero + 1
+        bloque = max(1, CELDAS_POR_BLOQUE // (dias + 1))
+        for g0 in range(0, len(resultado), bloque):
+            g1 = min(g0 + bloque, len(resultado))
+            a, b = np.searchsorted(grupos, [g0, g1])
+            diferencias = np.zeros((g1 - g0, dias + 1))
+            np.add.at(diferencias, (grupos[a:b] - g0, desde[a:b]), tasa[a:b])
+            np.add.at(diferencias, (grupos[a:b] - g0, hasta[a:b] + 1), -tasa[a:b])
+            acumulado = np.zeros((g1 - g0, dias + 1))
+            np.cumsum(np.cumsum(diferencias[:, :dias], axis=1), axis=1, out=acumulado[:, 1:])
+            importes[g0:g1] = acumulado[:, fines - primero + 1] - acumulado[:, inicios - primero]
+
+    for posicion, etiqueta in enumerate(etiquetas):
+        resultado[etiqueta] = importes[:, posicion]
+    return resultado
+
+
+def tabla_ventanas(
+    importes: pd.DataFrame,
+    ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]],
+    categorias: pd.DataFrame,
+) -> pd.DataFrame:
+    """Una tabla dinámica por ventana (ver importes_por_ventana), apiladas y categorizadas."""
+    tablas = []
+    for desde, hasta in ventanas:
+        etiqueta = etiqueta_ventana(desde, hasta)
+        tabla = pd.DataFrame({'Ventana': etiqueta, 'Importe Prorrateado': importes[etiqueta]}, index=importes.index)
+        tabla['Cantidad de Comprobantes'] = importes['Cantidad de Comprobantes']
+        tablas.append(_categorizar_tabla(tabla, categorias))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def _fechas_para_exportar(consolidado: pd.DataFrame) -> pd.DataFrame:
+    # Formatting Dates for export
+    for c in ['Desde', 'Hasta', 'Fecha', 'Fecha_Inicial_max', 'Fecha_Final_min']:
+         consolidado[c] = consolidado[c].dt.strftime('%d/%m/%Y')
+    return consolidado
+
+
+def cliente_de_archivo(path: str) -> str:
+    """Cliente segun el nombre del CSV (misma regla que _leer_csv_mc), para agrupar sin leerlo."""
+    partes = nombre_csv_mc(path).split("-")
+    if len(partes) > 5:
+        return re.sub('.csv', '', partes[5].strip())
+    return "Desconocido"
+
+
+def agrupar_por_cliente(archivos_mc: List[str]) -> List[Tuple[str, List[str]]]:
+    """(cliente, archivos) ordenado por cliente; cada grupo conserva el orden de entrada."""
+    grupos: Dict[str, List[str]] = {}
+    for f in archivos_mc:
+        grupos.setdefault(cliente_de_archivo(f), []).append(f)
+    return sorted(grupos.items())
+
+
+def _hojas_reporte(escritor: EscritorExcel, con_ventanas: bool = False) -> None:
+    # Tabla Dinámica primero: en el modo por partes se escribe al final
+    escritor.hoja('Tabla Dinámica', moneda=['Importe Prorrateado', 'Ingresos brutos máximos por la categoría'])
+    if con_ventanas:
+        escritor.hoja('Ventanas', moneda=['Importe Prorrateado', 'Ingresos brutos máximos por la categoría'])
+    # Hoja grande: anchos por percentil sobre una muestra
+    escritor.hoja('Consolidado', moneda=['Imp. Total', 'Importe Prorrateado'],
+                  anchos={"percentil": 99, "muestra": 50_000, "maximo": 60})
+
+
+def _categorizar_tabla(tabla_dinamica: pd.DataFrame, categorias: pd.DataFrame) -> pd.DataFrame:
+    # Categorization
+    maximos, categorias_asignadas = categorizar(tabla_dinamica['Importe Prorrateado'], categorias)
+    tabla_dinamica['Ingresos brutos máximos por la categoría'] = maximos
+    tabla_dinamica['Categoría'] = categorias_asignadas
+    return tabla_dinamica.reset_index()
+
+
+def _progreso(
+    progress_fn: Optional[Callable[[Dict[str, Any]], None]],
+    etapa: str,
+    inicio: Optional[float] = None,
+    **datos: Any,
+) -> None:
+    # Evento de avance del reporte: {"etapa": ..., "segundos": duracion de la etapa, ...datos}
+    if progress_fn is None:
+        return
+    evento: Dict[str, Any] = {"etapa": etapa, **datos}
+    if inicio is not None:
+        evento["segundos"] = round(time.perf_counter() - inicio, 3)
+    progress_fn(evento)
+
+
+def _datos_cliente(consolidado: Optional[pd.DataFrame], ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]]) -> Dict[str, Any]:
+    # Lo que se guarda por cliente: su consolidado prorrateado y sus tablas parciales
+    if consolidado is None or consolidado.empty:
+        return {"consolidado": None, "tabla": None, "ventanas": None}
+    return {
+        "consolidado": consolidado,
+        "tabla": agregar_por_cliente(consolidado),
+        "ventanas": importes_por_ventana(consolidado, ventanas) if len(ventanas) > 1 else None,
+    }
+
+
+def _sumar_parciales(
+    datos: List[Dict[str, Any]],
+    categorias: pd.DataFrame,
+    ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]],
+) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    # Los parciales no se superponen salvo que dos grupos compartan (Cliente, MC): se suman
+    tabla_dinamica = pd.concat([d["tabla"] for d in datos if d["tabla"] is not None]).groupby(level=[0, 1], sort=True).sum()
+    ventanas_cartera = None
+    if len(ventanas) > 1:
+        importes = pd.concat([d["ventanas"] for d in datos if d["ventanas"] is not None]).groupby(level=[0, 1], sort=True).sum()
+        ventanas_cartera = tabla_ventanas(importes, ventanas, categorias)
+    return _categorizar_tabla(tabla_dinamica, categorias), ventanas_cartera
+
+
+def _reporte_por_cliente(
+    grupos: List[Tuple[str, List[str]]],
+    info_facturas: Callable[[], pd.DataFrame],
+    categorias: pd.DataFrame,
+    ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]],
+    importes_float32: bool,
+    escritor: EscritorExcel,
+    memo: Optional[MemoReporte] = None,
+    huellas: Optional[Dict[str, str]] = None,
+    log_fn: Optional[Callable[[str], None]] = None,
+    progress_fn: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[Tuple[pd.DataFrame, Optional[pd.DataFrame]]]:
+    """
+    Procesa un cliente por vez: lee sus CSV (o toma su entrada de la memo),
+    prorratea, escribe sus filas en 'Consolidado' y guarda solo sus tablas
+    parciales. Devuelve (tabla dinamica, tabla de ventanas o None) de toda la
+    cartera, o None si no hubo datos.
+    """
+    fecha_inicial, fecha_final = ventanas[0]
+    _log_info(f"Procesando {len(grupos)} clientes por partes", log_fn)
+    contadores: Dict[str, int] = {}
+    parciales = []
+    columnas = None
+    mayor = 0.0
+    recalculados = 0
+    for actual, (cliente, archivos) in enumerate(grupos, start=1):
+        inicio = time.perf_counter()
+        datos = memo.cargar_cliente(cliente, huellas[cliente]) if memo else None
+        if datos is None:
+            recalculados += 1
+            consolidado = leer_archivos_csv_batch(archivos, log_fn, contadores=contadores)
+            if not consolidado.empty:
+                # Sin el log de memoria por cliente: al final se informa el mayor
+                consolidado = preparar_consolidado(consolidado, info_facturas(), importes_float32, lambda _: None)
+                consolidado = prorratear(consolidado, fecha_inicial, fecha_final)
+            datos = _datos_cliente(consolidado, ventanas)
+            if memo:
+                memo.guardar_cliente(cliente, huellas[cliente], datos)
+        consolidado = datos.pop("consolidado")
+        if consolidado is None:
+            _progreso(progress_fn, "cliente", inicio, actual=actual, total=len(grupos), archivos=len(archivos), filas=0)
+            continue
+        mayor = max(mayor, memoria_mb(consolidado))
+        parciales.append(datos)
+        consolidado = _fechas_para_exportar(consolidado)
+        if columnas is None:
+            columnas = list(consolidado.columns)
+        escritor.escribir('Consolidado', consolidado.reindex(columns=columnas))
+        _progreso(progress_fn, "cliente", inicio, actual=actual, total=len(grupos), archivos=len(archivos), filas=len(consolidado))
+        del consolidado
+
+    if contadores.get("cache") or contadores.get("parseados"):
+        _log_info(f"CSV de MC: {contadores.get('cache', 0)} desde cache, {contadores.get('parseados', 0)} parseados", log_fn)
+    if memo:
+        _log_info(f"Memo del reporte: {recalculados} clientes recalculados, {len(grupos) - recalculados} sin cambios", log_fn)
+    if not parciales:
+        return None
+    _log_info(f"Memoria del cliente más grande: {mayor:.1f} MB", log_fn)
+    return _sumar_parciales(parciales, categorias, ventanas)
+
+
+def _consolidado_con_memo(
+    grupos: List[Tuple[str, List[str]]],
+    archivos_mc: List[str],
+    info_facturas: Callable[[], pd.DataFrame],
+    ventanas: List[Tuple[pd.Timestamp, pd.Timestamp]],
+    importes_float32: bool,
+    memo: MemoReporte,
+    huellas: Dict[str, str],
+    log_fn: Optional[Callable[[str], None]] = None,
+    progress_fn: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]]:
+    """
+    Consolidado de toda la cartera tomando de la memo los clientes sin cambios;
+    los demas se leen y prorratean juntos (una sola lectura en paralelo) y se
+    guardan por cliente. Las filas quedan en el orden de archivos_mc, igual que
+    sin memo. Devuelve (consolidado o None si no hay datos, tablas parciales).
+    """
+    datos: Dict[str, Dict[str, Any]] = {}
+    for cliente, _ in grupos:
+        entrada = memo.cargar_cliente(cliente, huellas[cliente])
+        if entrada is not None:
+            datos[cliente] = entrada
+    pendientes = [(cliente, archivos) for cliente, archivos in grupos if cliente not in datos]
+    _log_info(f"Memo del reporte: {len(pendientes)} clientes recalculados, {len(datos)} sin cambios", log_fn)
+
+    if pendientes:
+        fecha_inicial, fecha_final = ventanas[0]
+        archivos = [f for _, archivos_cliente in pendientes for f in archivos_cliente]
+        inicio = time.perf_counter()
+        consolidado = leer_archivos_csv_batch(archivos, log_fn)
+        _progreso(progress_fn, "lectura", inicio, archivos=len(archivos), filas=len(consolidado))
+        piezas: Dict[str, pd.DataFrame] = {}
+        if not consolidado.empty:
+            inicio = time.perf_counter()
+            consolidado = preparar_consolidado(consolidado, info_facturas(), importes_float32, log_fn)
+            _progreso(progress_fn, "preparacion", inicio, filas=len(consolidado))
+            inicio = time.perf_counter()
+            consolidado = prorratear(consolidado, fecha_inicial, fecha_final)
+            _progreso(progress_fn, "prorrateo", inicio, filas=len(consolidado))
+            clientes = {nombre_csv_mc(f): cliente for cliente, archivos_cliente in pendientes for f in archivos_cliente}
+            claves = consolidado['Archivo'].astype(object).map(clientes)
+            piezas = {cliente: pieza for cliente, pieza in consolidado.groupby(claves, sort=False)}
+            del consolidado
+        for cliente, _ in pendientes:
+            datos[cliente] = _datos_cliente(piezas.pop(cliente, None), ventanas)
+            memo.guardar_cliente(cliente, huellas[cliente], datos[cliente])
+
+    parciales = [datos[cliente] for cliente, _ in grupos]
+    piezas_cartera = [d["consolidado"] for d in parciales if d["consolidado"] is not None]
+    if not piezas_cartera:
+        return None, parciales
+    consolidado = pd.concat(piezas_cartera, ignore_index=True)
+    posicion = {nombre_csv_mc(f): i for i, f in enumerate(archivos_mc)}
+    orden = np.argsort(consolidado['Archivo'].astype(object).map(posicion).to_numpy(), kind='stable')
+    return consolidado.take(orden).reset_index(drop=True), parciales
+
+
+def generar_reporte_control(
+    archivos_mc: List[str],
+    archivos_json: List[str],
+    path_categorias: str,
+    output_path: str,
+    log_fn: Optional[Callable[[str], None]] = None,
+    importes_float32: Optional[bool] = None,
+    por_cliente: Optional[bool] = None,
+    ventanas: Optional[List[Tuple[Any, Any]]] = None,
+    progress_fn: Optional[Callable[[Dict[str, Any]], None]] = None,
+    memo: Optional[bool] = None,
+) -> bool:
+    """
+    Core logic for generating the report.
+    importes_float32: None toma CONTROL_IMPORTES_FLOAT32 del .env (ver compactar_consolidado).
+    por_cliente: procesa y escribe un cliente por vez (memoria acotada por el cliente
+    más grande en vez de toda la cartera); None toma CONTROL_POR_CLIENTE del .env.
+    La tabla dinámica es la misma; en 'Consolidado' las filas quedan agrupadas por cliente.
+    ventanas: lista de (desde, hasta); None toma todas las filas de 'Rango de Fechas'.
+    La primera es la del prorrateo y la tabla dinámica; si hay más de una se agrega la
+    hoja 'Ventanas' con una tabla por ventana (ver importes_por_ventana).
+    progress_fn: recibe un dict por etapa terminada (lectura_json, lectura, preparacion,
+    prorrateo, tabla, escritura, cliente en el modo por partes, guardado y fin) con la
+    duracion en "segundos" y conteos de archivos/filas.
+    memo: reutiliza la corrida anterior segun la huella de las entradas (ver
+    mrbot_app.reporte_memo): si nada cambió no regenera el reporte y si cambiaron
+    algunos clientes solo recalcula esos. None toma CONTROL_MEMO del .env.
+    El libro se escribe en output_path + ".part" y se renombra al terminar, asi nunca
+    queda un reporte a medio escribir. Devuelve True si se genero el reporte.
+    """
+    _log_info("Iniciando generación de reporte...", log_fn)
+
+    if not os.path.exists(path_categorias):
+        _log_error(f"No se encontró archivo de categorías: {path_categorias}", log_fn)
+        return False
+
+    temporal = f"{output_path}.part"
+    try:
+        categorias, ventanas_libro = leer_configuracion_control(path_categorias)
+        if ventanas is None:
+            ventanas = ventanas_libro
+        if not ventanas:
+            _log_error("La hoja 'Rango de Fechas' no tiene fechas en A2/B2", log_fn)
+            return False
+
+        # Ensure datetime
+        ventanas = [(pd.to_datetime(desde, dayfirst=True), pd.to_datetime(hasta, dayfirst=True)) for desde, hasta in ventanas]
+        fecha_inicial, fecha_final = ventanas[0]
+
+        _log_info(f"Rango fechas control: {fecha_inicial.date()} - {fecha_final.date()}", log_fn)
+        if len(ventanas) > 1:
+            _log_info(f"Ventanas adicionales: {len(ventanas) - 1}", log_fn)
+
+        comienzo = time.perf_counter()
+        if importes_float32 is None:
+            importes_float32 = get_control_float32()
+        if por_cliente is None:
+            por_cliente = get_control_por_cliente()
+        if memo is None:
+            memo = get_control_memo_enabled()
+
+        grupos = agrupar_por_cliente(archivos_mc) if por_cliente or memo else []
+        memo_reporte, huellas, huella = None, {}, None
+        if memo:
+            memo_reporte = MemoReporte(output_path)
+            base = huella_valor([
+                MEMO_VERSION, [(desde.isoformat(), hasta.isoformat()) for desde, hasta in ventanas],
+                importes_float32, huella_archivos(archivos_json),
+            ])
+            huellas = {cliente: huella_valor([base, huella_archivos(archivos)]) for cliente, archivos in grupos}
+            huella = huella_valor([base, huella_contenido(path_categorias), por_cliente, huellas])
+            if memo_reporte.sin_cambios(huella):
+                _log_info(f"Sin cambios en las entradas desde la última corrida: se conserva {output_path}", log_fn)
+                _progreso(progress_fn, "fin", comienzo, salida=output_path, sin_cambios=True)
+                return True
+
+        # JSON de RCEL: solo si hay clientes para recalcular
+        info: Dict[str, pd.DataFrame] = {}
+
+        def info_facturas() -> pd.DataFrame:
+            if "pdf" not in info:
+                inicio = time.perf_counter()
+                info["pdf"] = leer_archivos_json_batch(archivos_json, log_fn)
+                _progreso(progress_fn, "lectura_json", inicio, archivos=len(archivos_json), filas=len(info["pdf"]))
+            return info["pdf"]
+
+        escritor = EscritorExcel()
+        _hojas_reporte(escritor, len(ventanas) > 1)
+
+        if por_cliente:
+            tablas = _reporte_por_cliente(
+                grupos, info_facturas, categorias, ventanas, importes_float32,
+                escritor, memo_reporte, huellas, log_fn, progress_fn,
+            )
+            if tablas is None:
+                _log_info("No se encontraron datos en los archivos CSV (MC).", log_fn)
+                return False
+            tabla_dinamica, ventanas_cartera = tablas
+        else:
+            if memo_reporte is not None:
+                consolidado, parciales = _consolidado_con_memo(
+                    grupos, archivos_mc, info_facturas, ventanas, importes_float32,
+                    memo_reporte, huellas, log_fn, progress_fn,
+                )
+                if consolidado is None:
+                    _log_info("No se encontraron datos en los archivos CSV (MC).", log_fn)
+                    return False
+                inicio = time.perf_counter()
+                tabla_dinamica, ventanas_cartera = _sumar_parciales(parciales, categorias, ventanas)
+            else:
+                info_facturas()
+                inicio = time.perf_counter()
+                consolidado = leer_archivos_csv_batch(archivos_mc, log_fn)
+                _progreso(progress_fn, "lectura", inicio, archivos=len(archivos_mc), filas=len(consolidado))
+                if consolidado.empty:
+                    _log_info("No se encontraron datos en los archivos CSV (MC).", log_fn)
+                    return False
+                inicio = time.perf_counter()
+                consolidado = preparar_consolidado(consolidado, info_facturas(), importes_float32, log_fn)
+                _progreso(progress_fn, "preparacion", inicio, filas=len(consolidado))
+                inicio = time.perf_counter()
+                consolidado = prorratear(consolidado, fecha_inicial, fecha_final)
+                _progreso(progress_fn, "prorrateo", inicio, filas=len(consolidado))
+                inicio = time.perf_counter()
+                tabla_dinamica = _categorizar_tabla(agregar_por_cliente(consolidado), categorias)
+                ventanas_cartera = None
+                if len(ventanas) > 1:
+                    ventanas_cartera = tabla_ventanas(importes_por_ventana(consolidado, ventanas), ventanas, categorias)
+            _progreso(progress_fn, "tabla", inicio, filas=len(tabla_dinamica))
+            inicio = time.perf_counter()
+            escritor.escribir('Consolidado', _fechas_para_exportar(consolidado))
+            _progreso(progress_fn, "escritura", inicio, filas=len(consolidado))
+
+        # Export: un solo pasaje con los estilos (sin reabrir el libro)
+        inicio = time.perf_counter()
+        escritor.escribir('Tabla Dinámica', tabla_dinamica)
+        if ventanas_cartera is not None:
+            escritor.escribir('Ventanas', ventanas_cartera)
+        escritor.guardar(temporal)
+        os.replace(temporal, output_path)
+        if memo_reporte is not None:
+            memo_reporte.guardar_indice(huella, huellas)
+        _progreso(progress_fn, "guardado", inicio, filas=len(tabla_dinamica))
+        _progreso(progress_fn, "fin", comienzo, salida=output_path)
         _log_info(f"Reporte generado exitosamente: {output_path}", log_fn)
+        return True
 
     except Exception as e:
         _log_error(f"Error generando reporte: {e}", log_fn)
         import traceback
         _log_error(traceback.format_exc(), log_fn)
+        return False
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _proceso_reporte(cola: Any, args: Tuple[Any, ...], opciones: Dict[str, Any]) -> None:
+    # Proceso hijo: logs y avance van por la cola; el ultimo mensaje es ("fin", ok)
+    if hasattr(os, "setpgrp"):
+        # Grupo propio: al abortar se mata tambien el pool de lectura (ver _matar_proceso)
+        os.setpgrp()
+    ok = False
+    try:
+        ok = generar_reporte_control(
+            *args,
+            log_fn=lambda mensaje: cola.put(("log", mensaje)),
+            progress_fn=lambda evento: cola.put(("progreso", evento)),
+            **opciones,
+        )
+    finally:
+        cola.put(("fin", bool(ok)))
+
+
+def _matar_proceso(proceso: Any) -> None:
+    # Mata el proceso del reporte y sus hijos (pool de lectura de CSV)
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(proceso.pid)], capture_output=True, check=False)
+    else:
+        try:
+            os.killpg(proceso.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    if proceso.is_alive():
+        proceso.kill()
+    proceso.join(timeout=5)
+
+
+def generar_reporte_en_proceso(
+    archivos_mc: List[str],
+    archivos_json: List[str],
+    path_categorias: str,
+    output_path: str,
+    log_fn: Optional[Callable[[str], None]] = None,
+    progress_fn: Optional[Callable[[Dict[str, Any]], None]] = None,
+    abort_event: Optional[threading.Event] = None,
+    **opciones: Any,
+) -> bool:
+    """
+    Corre generar_reporte_control en un proceso aparte para que la ventana no se
+    congele mientras se arma y escribe el libro (el trabajo pesado retiene el GIL).
+    Los logs y los eventos de avance llegan por una cola y se pasan a log_fn y
+    progress_fn desde el hilo que llama. Si abort_event se activa se mata el proceso
+    (y su pool) y se borra el .part: no queda un reporte a medio escribir.
+    opciones: argumentos de generar_reporte_control (por_cliente, ventanas, ...).
+    Devuelve True si se genero el reporte.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    cola = contexto.Queue()
+    proceso = contexto.Process(
+        target=_proceso_reporte,
+        args=(cola, (archivos_mc, archivos_json, path_categorias, output_path), opciones),
+        name="reporte-control",
+    )
+    proceso.start()
+    ok: Optional[bool] = None
+    try:
+        while ok is None:
+            if abort_event is not None and abort_event.is_set():
+                _matar_proceso(proceso)
+                _log_info("Generación de reporte cancelada.", log_fn)
+                return False
+            try:
+                tipo, dato = cola.get(timeout=0.2)
+            except queue.Empty:
+                if proceso.is_alive():
+                    continue
+                try:
+                    # Lo que quedo en la cola antes de que terminara
+                    tipo, dato = cola.get(timeout=1)
+                except queue.Empty:
+                    _log_error(f"El proceso del reporte terminó sin resultado (código {proceso.exitcode}).", log_fn)
+                    return False
+            if tipo == "log":
+                _log_message(dato, log_fn)
+            elif tipo == "progreso":
+                if progress_fn:
+                    progress_fn(dato)
+            else:
+                ok = dato
+        return ok
+    finally:
+        if proceso.is_alive():
+            proceso.join(timeout=5)
+        if proceso.is_alive():
+            _matar_proceso(proceso)
+        if not ok and os.path.exists(f"{output_path}.part"):
+            os.remove(f"{output_path}.part")
+        cola.close()
+        cola.join_thread()
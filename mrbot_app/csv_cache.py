@@ -0,0 +1,214 @@
+"""
+Cache columnar de los CSV de Mis Comprobantes ya parseados (Control de Monotributistas).
+
+Por cada CSV se guarda, en la carpeta oculta .mrbot_cache junto al archivo, el
+DataFrame ya proyectado a las columnas del reporte. La entrada vale mientras el
+CSV conserve tamaño y fecha de modificacion (una re-descarga lo reemplaza y se
+vuelve a parsear).
+
+- Con pyarrow instalado se guarda en Parquet y se lee con memory_map.
+- Sin pyarrow (o si una columna mixta no se puede convertir a Arrow) se usa pickle.
+- CSV_CACHE=0 en el .env la desactiva.
+
+Comandos:
+    python -m mrbot_app.csv_cache estadisticas [carpeta]
+    python -m mrbot_app.csv_cache invalidar [carpeta] [--solo-obsoletas]
+"""
+import argparse
+import json
+import os
+import pickle
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depende del entorno
+    pa = None
+    pq = None
+
+CACHE_DIRNAME = ".mrbot_cache"
+# Subir si cambia la proyeccion o los tipos de columnas (control_monotributistas._leer_csv_mc)
+CACHE_VERSION = 2
+_META_KEY = b"mrbot_fuente"
+_EXTENSIONS = (".parquet", ".pkl")
+
+
+def cache_paths(csv_path: str) -> Tuple[str, str]:
+    """Rutas (parquet, pickle) de la entrada de cache de csv_path."""
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    base = os.path.join(folder, CACHE_DIRNAME, name)
+    return base + ".parquet", base + ".pkl"
+
+
+def source_signature(csv_path: str) -> Dict[str, int]:
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "version": CACHE_VERSION}
+
+
+def _load_parquet(path: str, signature: Dict[str, int]) -> Optional[pd.DataFrame]:
+    metadata = pq.read_schema(path).metadata or {}
+    if json.loads(metadata.get(_META_KEY, b"{}")) != signature:
+        return None
+    table = pq.read_table(path, memory_map=True)
+    data = table.to_pandas()
+    # Las columnas de texto vuelven como object (igual que al parsear el CSV), no como el
+    # dtype string que infiere pandas 3 al convertir desde Arrow
+    columnas_object = [
+        columna["name"] for columna in (table.schema.pandas_metadata or {}).get("columns", [])
+        if columna.get("numpy_type") == "object" and columna.get("name") in data.columns
+    ]
+    if columnas_object:
+        data[columnas_object] = data[columnas_object].astype(object)
+    return data
+
+
+def _load_pickle(path: str, signature: Dict[str, int]) -> Optional[pd.DataFrame]:
+    with open(path, "rb") as fh:
+        entry = pickle.load(fh)
+    if entry.get("fuente") != signature:
+        return None
+    return entry["data"]
+
+
+def load_cached(csv_path: str) -> Optional[pd.DataFrame]:
+    """DataFrame cacheado de csv_path, o None si no hay entrada vigente."""
+    try:
+        signature = source_signature(csv_path)
+    except OSError:
+        return None
+    parquet_path, pickle_path = cache_paths(csv_path)
+    try:
+        if pq is not None and os.path.exists(parquet_path):
+            return _load_parquet(parquet_path, signature)
+        if os.path.exists(pickle_path):
+            return _load_pickle(pickle_path, signature)
+    except Exception:
+        # Entrada corrupta o de otra version de pandas/pyarrow: se vuelve a parsear
+        return None
+    return None
+
+
+def _write_atomic(path: str, writer) -> None:
+    tmp_path = path + ".part"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def store_cached(csv_path: str, data: pd.DataFrame) -> bool:
+    """Guarda data como entrada de cache de csv_path. Devuelve False si no se pudo escribir."""
+    try:
+        signature = source_signature(csv_path)
+        parquet_path, pickle_path = cache_paths(csv_path)
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    except OSError:
+        return False
+    if pa is not None:
+        try:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[_META_KEY] = json.dumps(signature).encode("utf-8")
+            table = table.replace_schema_metadata(metadata)
+            _write_atomic(parquet_path, lambda tmp: pq.write_table(table, tmp))
+            if os.path.exists(pickle_path):
+                os.remove(pickle_path)
+            return True
+        except Exception:
+            # Columnas con tipos mezclados (ej. numero y '') no pasan a Arrow: se usa pickle
+            pass
+
+    def _dump(tmp: str) -> None:
+        with open(tmp, "wb") as fh:
+            pickle.dump({"fuente": signature, "data": data}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        _write_atomic(pickle_path, _dump)
+    except Exception:
+        return False
+    if os.path.exists(parquet_path):
+        os.remove(parquet_path)
+    return True
+
+
+def _iter_entries(root: str) -> Iterator[Tuple[str, str]]:
+    """(ruta de la entrada, ruta del CSV de origen) de todas las caches bajo root."""
+    for folder, dirnames, filenames in os.walk(root):
+        if os.path.basename(folder) != CACHE_DIRNAME:
+            continue
+        dirnames[:] = []
+        for filename in filenames:
+            for ext in _EXTENSIONS:
+                if filename.endswith(ext):
+                    source = os.path.join(os.path.dirname(folder), filename[: -len(ext)])
+                    yield os.path.join(folder, filename), source
+
+
+def _is_current(entry_path: str, source: str) -> bool:
+    try:
+        signature = source_signature(source)
+        if entry_path.endswith(".parquet"):
+            if pq is None:
+                return False
+            metadata = pq.read_schema(entry_path).metadata or {}
+            return json.loads(metadata.get(_META_KEY, b"{}")) == signature
+        return _load_pickle(entry_path, signature) is not None
+    except Exception:
+        return False
+
+
+def cache_stats(root: str) -> Dict[str, Any]:
+    """Entradas, bytes en disco y cuantas siguen vigentes u obsoletas (CSV borrado o modificado)."""
+    stats = {"entradas": 0, "bytes": 0, "vigentes": 0, "obsoletas": 0, "formato": "parquet" if pa else "pickle"}
+    for entry_path, source in _iter_entries(root):
+        stats["entradas"] += 1
+        stats["bytes"] += os.path.getsize(entry_path)
+        stats["vigentes" if _is_current(entry_path, source) else "obsoletas"] += 1
+    return stats
+
+
+def invalidar_cache(root: str, solo_obsoletas: bool = False) -> int:
+    """Borra las entradas de cache bajo root (o solo las obsoletas). Devuelve cuantas borro."""
+    removed = 0
+    for entry_path, source in list(_iter_entries(root)):
+        if solo_obsoletas and _is_current(entry_path, source):
+            continue
+        os.remove(entry_path)
+        removed += 1
+    for folder, _, _ in list(os.walk(root, topdown=False)):
+        if os.path.basename(folder) == CACHE_DIRNAME and not os.listdir(folder):
+            os.rmdir(folder)
+    return removed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m mrbot_app.csv_cache",
+        description="Administra la cache de CSV de Mis Comprobantes del Control de Monotributistas.",
+    )
+    parser.add_argument("comando", choices=["estadisticas", "invalidar"])
+    parser.add_argument("carpeta", nargs="?", default="descargas", help="Carpeta a recorrer (default: descargas)")
+    parser.add_argument("--solo-obsoletas", action="store_true", help="invalidar: borra solo entradas obsoletas")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.carpeta):
+        print(f"No existe la carpeta: {args.carpeta}")
+        return 2
+    if args.comando == "estadisticas":
+        stats = cache_stats(args.carpeta)
+        print(
+            f"Entradas: {stats['entradas']} ({stats['vigentes']} vigentes, {stats['obsoletas']} obsoletas), "
+            f"{stats['bytes'] / (1024 * 1024):.1f} MB, formato {stats['formato']}"
+        )
+    else:
+        removed = invalidar_cache(args.carpeta, args.solo_obsoletas)
+        print(f"Entradas borradas: {removed}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
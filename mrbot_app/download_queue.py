@@ -0,0 +1,133 @@
+"""
+Cola de descargas MinIO compartida por todo el proceso.
+
+Las filas de las corridas masivas (motor bulk, ventanas de Mis Comprobantes y
+Control de Monotributistas) dejan sus links en esta cola en lugar de abrir un
+pool propio. La cola tiene su propio tamaño (DOWNLOAD_QUEUE_WORKERS),
+independiente de los lugares de la API (MAX_WORKERS_MRBOT_API): mientras una fila
+espera sus descargas, otra ya puede hacer su consulta, asi las consultas y las
+transferencias de distintas filas se superponen.
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from mrbot_app.config import get_download_queue_workers
+
+# Marca los hilos de la cola (una descarga que encola otra no debe esperar un lugar)
+_worker = threading.local()
+
+
+def _mark_worker() -> None:
+    _worker.active = True
+
+
+class DownloadQueue:
+    """Pool de hilos de descarga compartido; cada lote limita cuantos archivos suyos hay en vuelo."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="descargas", initializer=_mark_worker)
+        # Lotes iterando esta cola; una cola reemplazada se apaga cuando termina el ultimo
+        self._batches = 0
+        self._retired = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def iter_completed(
+        self,
+        fn: Callable[[Any], Any],
+        items: Sequence[Any],
+        window: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Aplica fn a cada item en la cola y devuelve (indice, resultado) a medida que
+        terminan. window: maximo de items de este lote en vuelo (default: todos).
+        """
+        if getattr(_worker, "active", False):
+            # Llamado desde un hilo de la cola: se resuelve en el lugar
+            for idx, item in enumerate(items):
+                yield idx, fn(item)
+            return
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._batches += 1
+        if closed:
+            # Se reemplazo y apago antes de empezar este lote: va a la cola vigente
+            yield from get_download_queue().iter_completed(fn, items, window)
+            return
+        pending: Dict[Future, int] = {}
+        upcoming = iter(enumerate(items))
+
+        def submit_next() -> None:
+            for idx, item in upcoming:
+                pending[self._executor.submit(fn, item)] = idx
+                return
+
+        try:
+            for _ in range(max(1, window or len(items))):
+                submit_next()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = pending.pop(future)
+                    submit_next()
+                    yield idx, future.result()
+        finally:
+            # Si el que consume deja de iterar (error, aborto) no se encola nada mas
+            for future in pending:
+                future.cancel()
+            with self._lock:
+                self._batches -= 1
+            self._close_if_idle()
+
+    def map(self, fn: Callable[[Any], Any], items: Sequence[Any], window: Optional[int] = None) -> List[Any]:
+        """Como iter_completed, pero espera todo y devuelve los resultados en el orden de items."""
+        results: List[Any] = [None] * len(items)
+        for idx, result in self.iter_completed(fn, items, window):
+            results[idx] = result
+        return results
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def retire(self) -> None:
+        """No recibe lotes nuevos; los que estan iterando terminan y despues se apaga."""
+        with self._lock:
+            self._retired = True
+        self._close_if_idle()
+
+    def _close_if_idle(self) -> None:
+        with self._lock:
+            if not self._retired or self._batches or self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=False)
+
+
+_queue: Optional[DownloadQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_download_queue() -> DownloadQueue:
+    """Devuelve la cola compartida (se recrea si cambia DOWNLOAD_QUEUE_WORKERS)."""
+    global _queue
+    workers = get_download_queue_workers()
+    with _queue_lock:
+        if _queue is None or _queue.workers != workers:
+            # Los lotes que ya iteran la cola anterior la siguen usando hasta terminar;
+            # los lotes nuevos usan la nueva
+            previous = _queue
+            _queue = DownloadQueue(workers)
+            if previous is not None:
+                previous.retire()
+        return _queue
+
+
+def rows_in_flight(api_slots: int) -> int:
+    """
+    Filas que conviene tener en vuelo: las que hacen su consulta (lugares de la API)
+    mas las que pueden estar esperando descargas en la cola.
+    """
+    return max(1, api_slots) + get_download_queue_workers()
@@ -1,8 +1,20 @@
-from openpyxl.styles import PatternFill, Font , Alignment
+import zlib
+from copy import copy
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font , Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
 # Funciones para formatear Excel
 
+FORMATO_MONEDA = '_-* #,##0.00_-;-* #,##0.00_-;_-* "-"??_-;_-@_-'
+COLOR_ENCABEZADO = '002060'
+
 # Aplicar formato al encabezado
 def aplicar_formato_encabezado(hojaActual : Worksheet):
     '''
@@ -10,7 +22,7 @@ def aplicar_formato_encabezado(hojaActual : Worksheet):
     '''
             
     # Darle formato a los Títulos de las columnas
-    fondotitulo = PatternFill(start_color='002060' , end_color='002060' ,  fill_type='solid')
+    fondotitulo = PatternFill(start_color=COLOR_ENCABEZADO , end_color=COLOR_ENCABEZADO ,  fill_type='solid')
     letraColor = Font(color='FFFFFF')
 
     for cell in hojaActual[1]:
@@ -24,19 +36,17 @@ def aplicar_formato_moneda(hojaActual : Worksheet ,
                            columnaFinal : int):
     '''
     Función que aplica formato de moneda a las columnas de importes
+    (estilo con nombre "mrbot moneda"; reemplaza el estilo de las celdas de datos)
     '''
-    
-    formato = '_-* #,##0.00_-;-* #,##0.00_-;_-* "-"??_-;_-@_-'
 
-    for cell in hojaActual.iter_rows(min_row=2, min_col=columnaInicial, max_row=hojaActual.max_row, max_col=columnaFinal):
-        for celda in cell:
-            celda.number_format = formato
+    _aplicar_estilo_rango(hojaActual, estilo_nombrado(hojaActual.parent, FORMATO_MONEDA), columnaInicial, columnaFinal)
 
 
 # Autoajustar los anchos de las columnas según el contenido
 def autoajustar_columnas(hojaActual : Worksheet):
     '''
     Función que autoajusta las columnas de la hoja
+    (recorre todas las celdas; si se tiene el DataFrame de origen usar ajustar_anchos)
     '''
     
     for column_cells in hojaActual.columns:
@@ -59,9 +69,231 @@ def alinear_columnas(hojaActual : Worksheet ,
                      alineacion : str ):
     '''
     Función que alinea las columnas de la hoja
+    (estilo con nombre; reemplaza el estilo de las celdas de datos)
     '''
-    alineacion = Alignment(horizontal=alineacion)
-    
-    for cell in hojaActual.iter_rows(min_row=2, min_col=columnaInicial, max_row=hojaActual.max_row, max_col=columnaFinal):
-        for celda in cell:
-            celda.alignment = alineacion
\ No newline at end of file
+
+    _aplicar_estilo_rango(hojaActual, estilo_nombrado(hojaActual.parent, alineacion=alineacion), columnaInicial, columnaFinal)
+
+
+# Anchos de columna calculados desde el DataFrame (sin recorrer celdas)
+def calcular_anchos(df : pd.DataFrame ,
+                    percentil : Optional[float] = None ,
+                    muestra : Optional[int] = None ,
+                    maximo : Optional[float] = None) -> List[float]:
+    '''
+    Función que calcula el ancho de cada columna (largo del texto + 2) con
+    estadísticas vectorizadas sobre el DataFrame, incluyendo el encabezado.
+    percentil: usa ese percentil de los largos en vez del máximo (ej. 95 para que
+    un valor atípico no ensanche toda la columna).
+    muestra: calcula sobre una muestra de filas (tablas grandes).
+    maximo: tope del ancho.
+    '''
+
+    if muestra and len(df) > muestra:
+        df = df.sample(n=muestra, random_state=0)
+    anchos = []
+    for posicion, columna in enumerate(df.columns):
+        serie = df.iloc[:, posicion]
+        largos = serie[serie.notna()].astype(str).str.len().to_numpy()
+        if not len(largos):
+            largo = 0
+        elif percentil is None:
+            largo = int(largos.max())
+        else:
+            largo = int(np.ceil(np.percentile(largos, percentil)))
+        ancho = max(len(str(columna)), largo) + 2
+        anchos.append(min(ancho, maximo) if maximo else ancho)
+    return anchos
+
+
+# Ajustar anchos de una hoja ya escrita a partir del DataFrame de origen
+def ajustar_anchos(hojaActual : Worksheet ,
+                   df : pd.DataFrame ,
+                   columnaInicial : int = 1 ,
+                   **opciones):
+    '''
+    Función que fija los anchos de las columnas desde df (ver calcular_anchos)
+    en lugar de recorrer las celdas como autoajustar_columnas
+    '''
+
+    for indice, ancho in enumerate(calcular_anchos(df, **opciones), start=columnaInicial):
+        hojaActual.column_dimensions[get_column_letter(indice)].width = ancho
+
+
+# Estilos con nombre (se registran una vez por libro)
+def estilo_nombrado(libro : Workbook ,
+                    formato : Optional[str] = None ,
+                    alineacion : Optional[str] = None ,
+                    encabezado : bool = False) -> str:
+    '''
+    Función que registra (si hace falta) y devuelve el nombre del estilo con ese
+    formato numérico / alineación, o el estilo de encabezado
+    '''
+
+    if encabezado:
+        nombre = "mrbot encabezado"
+    else:
+        partes = ["mrbot", "moneda" if formato == FORMATO_MONEDA else (formato and f"fmt{zlib.crc32(formato.encode())}"), alineacion]
+        nombre = " ".join(parte for parte in partes if parte)
+    if nombre in libro.named_styles:
+        return nombre
+    estilo = NamedStyle(name=nombre)
+    if encabezado:
+        estilo.fill = PatternFill(start_color=COLOR_ENCABEZADO, end_color=COLOR_ENCABEZADO, fill_type='solid')
+        estilo.font = Font(color='FFFFFF')
+        estilo.border = Border(*(Side(style='thin'),) * 4)
+        estilo.alignment = Alignment(horizontal='center', vertical='top')
+    if formato:
+        estilo.number_format = formato
+    if alineacion:
+        estilo.alignment = Alignment(horizontal=alineacion)
+    libro.add_named_style(estilo)
+    return nombre
+
+
+def _plantilla_estilo(hojaActual : Any , nombre : str):
+    # StyleArray del estilo resuelto una sola vez; cada celda solo guarda la referencia
+    # (las celdas no modifican su estilo después, así que se puede compartir)
+    plantilla = WriteOnlyCell(hojaActual)
+    plantilla.style = nombre
+    return plantilla._style
+
+
+def _aplicar_estilo_rango(hojaActual : Worksheet ,
+                          nombre : str ,
+                          columnaInicial : int ,
+                          columnaFinal : int):
+    estilo = _plantilla_estilo(hojaActual, nombre)
+    for fila in hojaActual.iter_rows(min_row=2, min_col=columnaInicial, max_row=hojaActual.max_row, max_col=columnaFinal):
+        for celda in fila:
+            celda._style = copy(estilo)
+
+
+def _filas(df : pd.DataFrame) -> Iterator[Tuple[Any, ...]]:
+    # Valores nativos de Python por columna; NaN/NaT/NA quedan como celdas vacías
+    columnas = []
+    for posicion in range(df.shape[1]):
+        serie = df.iloc[:, posicion]
+        columnas.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return zip(*columnas)
+
+
+# Libro write-only que se escribe por partes (hojas grandes sin tenerlas enteras en memoria)
+class EscritorExcel:
+    '''
+    Clase que arma un libro en modo write-only. Cada hoja se declara con hoja() y
+    recibe filas con escribir(), en una o varias partes y en cualquier orden entre
+    hojas; guardar() cierra el libro. Encabezado, formatos, anchos y filtros se
+    aplican durante la escritura (ver escribir_excel).
+    Los anchos se calculan con la primera parte escrita de cada hoja.
+    '''
+
+    def __init__(self):
+        self.libro = Workbook(write_only=True)
+        self._hojas: Dict[str, Dict[str, Any]] = {}
+
+    def hoja(self ,
+             nombre : str ,
+             moneda : Optional[List[str]] = None ,
+             alineacion : Optional[Dict[str, str]] = None ,
+             anchos : Any = True ,
+             filtros : bool = True):
+        self._hojas[nombre] = {
+            "ws": self.libro.create_sheet(title=nombre),
+            "moneda": list(moneda or []),
+            "alineacion": dict(alineacion or {}),
+            "anchos": anchos,
+            "filtros": filtros,
+            "columnas": None,
+            "filas": 0,
+        }
+
+    def _iniciar(self , hoja : Dict[str, Any] , df : pd.DataFrame):
+        # Anchos, formatos de columna y encabezado: van antes de la primera fila
+        ws = hoja["ws"]
+        columnas = [str(columna) for columna in df.columns]
+        hoja["columnas"] = columnas
+
+        formatos: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        for columna in hoja["moneda"]:
+            if columna in columnas:
+                formatos[columnas.index(columna)] = (FORMATO_MONEDA, None)
+        for columna, alineacion in hoja["alineacion"].items():
+            if columna in columnas:
+                posicion = columnas.index(columna)
+                formatos[posicion] = (formatos.get(posicion, (None, None))[0], alineacion)
+
+        if hoja["anchos"]:
+            opciones = hoja["anchos"] if isinstance(hoja["anchos"], dict) else {}
+            for indice, ancho in enumerate(calcular_anchos(df, **opciones), start=1):
+                ws.column_dimensions[get_column_letter(indice)].width = ancho
+        # Formato también a nivel de columna (celdas que el usuario agregue después)
+        for posicion, (formato, alineacion) in formatos.items():
+            dimension = ws.column_dimensions[get_column_letter(posicion + 1)]
+            if formato:
+                dimension.number_format = formato
+            if alineacion:
+                dimension.alignment = Alignment(horizontal=alineacion)
+
+        estilo_encabezado = _plantilla_estilo(ws, estilo_nombrado(self.libro, encabezado=True))
+        encabezado = []
+        for columna in columnas:
+            celda = WriteOnlyCell(ws, value=columna)
+            celda._style = estilo_encabezado
+            encabezado.append(celda)
+        ws.append(encabezado)
+        hoja["estilos"] = {
+            posicion: _plantilla_estilo(ws, estilo_nombrado(self.libro, *formato))
+            for posicion, formato in formatos.items()
+        }
+
+    def escribir(self , nombre : str , df : pd.DataFrame):
+        hoja = self._hojas[nombre]
+        if hoja["columnas"] is None:
+            self._iniciar(hoja, df)
+        ws, estilos = hoja["ws"], hoja["estilos"]
+        for fila in _filas(df):
+            if estilos:
+                fila = list(fila)
+                for posicion, estilo in estilos.items():
+                    if fila[posicion] is None:
+                        continue
+                    celda = WriteOnlyCell(ws, value=fila[posicion])
+                    celda._style = estilo
+                    fila[posicion] = celda
+            ws.append(fila)
+        hoja["filas"] += len(df)
+
+    def guardar(self , destino : Any):
+        for hoja in self._hojas.values():
+            columnas = hoja["columnas"]
+            if hoja["filtros"] and columnas:
+                hoja["ws"].auto_filter.ref = f"A1:{get_column_letter(len(columnas))}{hoja['filas'] + 1}"
+        self.libro.save(destino)
+
+
+# Escribir un libro en una sola pasada (openpyxl write-only)
+def escribir_excel(destino : Any ,
+                   hojas : List[Dict[str, Any]]):
+    '''
+    Función que escribe las hojas en un solo pasaje, aplicando encabezado, formato
+    de moneda, alineación, anchos y filtros durante la escritura (sin reabrir el libro).
+    destino: ruta o buffer (BytesIO).
+    Cada hoja es un dict con "nombre" y "df" (se escribe sin índice) y opcionalmente
+    "moneda" (columnas con formato de moneda), "alineacion" ({columna: "center"}),
+    "anchos" (True, False o dict con las opciones de calcular_anchos; default True)
+    y "filtros" (default True).
+    Los formatos se aplican con estilos con nombre (también a nivel de columna).
+    '''
+
+    escritor = EscritorExcel()
+    for hoja in hojas:
+        escritor.hoja(
+            hoja["nombre"],
+            moneda=hoja.get("moneda"),
+            alineacion=hoja.get("alineacion"),
+            anchos=hoja.get("anchos", True),
+            filtros=hoja.get("filtros", True),
+        )
+        escritor.escribir(hoja["nombre"], hoja["df"])
+    escritor.guardar(destino)
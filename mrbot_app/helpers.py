@@ -1,14 +1,18 @@
 import os
 import re
-import sys
+import io
 import zipfile
 import shutil
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
-import requests
 from mrbot_app.config import get_request_timeouts
+from mrbot_app.formatos import escribir_excel
+from mrbot_app.http_client import get_session
+from mrbot_app.rate_limit import get_api_limiter
+from mrbot_app.response_cache import get_response_cache
 
 
 def ensure_trailing_slash(url: str) -> str:
@@ -27,13 +31,23 @@ def build_headers(api_key: str, email: str) -> Dict[str, str]:
 def safe_post(url: str, headers: Dict[str, str], payload: Dict[str, Any], timeout_sec: Optional[int] = None) -> Dict[str, Any]:
     post_timeout, _ = get_request_timeouts()
     effective_timeout = timeout_sec if timeout_sec is not None else post_timeout
+    cache = get_response_cache()
+    if cache is not None:
+        cached = cache.get("POST", url, headers, payload)
+        if cached is not None:
+            return cached
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=effective_timeout)
+        with get_api_limiter().slot() as outcome:
+            resp = get_session().post(url, headers=headers, json=payload, timeout=effective_timeout)
+            outcome["http_status"] = resp.status_code
         try:
             data = resp.json()
         except Exception:
             data = {"raw_text": resp.text}
-        return {"http_status": resp.status_code, "data": data}
+        result = {"http_status": resp.status_code, "data": data}
+        if cache is not None:
+            cache.put("POST", url, headers, payload, result)
+        return result
     except Exception as exc:
         return {"http_status": None, "data": {"success": False, "message": f"Error de conexion: {exc}"}}
 
@@ -41,13 +55,23 @@ def safe_post(url: str, headers: Dict[str, str], payload: Dict[str, Any], timeou
 def safe_get(url: str, headers: Dict[str, str], timeout_sec: Optional[int] = None) -> Dict[str, Any]:
     _, get_timeout = get_request_timeouts()
     effective_timeout = timeout_sec if timeout_sec is not None else get_timeout
+    cache = get_response_cache()
+    if cache is not None:
+        cached = cache.get("GET", url, headers, None)
+        if cached is not None:
+            return cached
     try:
-        resp = requests.get(url, headers=headers, timeout=effective_timeout)
+        with get_api_limiter().slot() as outcome:
+            resp = get_session().get(url, headers=headers, timeout=effective_timeout)
+            outcome["http_status"] = resp.status_code
         try:
             data = resp.json()
         except Exception:
             data = {"raw_text": resp.text}
-        return {"http_status": resp.status_code, "data": data}
+        result = {"http_status": resp.status_code, "data": data}
+        if cache is not None:
+            cache.put("GET", url, headers, None, result)
+        return result
     except Exception as exc:
         return {"http_status": None, "data": {"success": False, "message": f"Error de conexion: {exc}"}}
 
@@ -145,16 +169,81 @@ def format_date_str(value: Any) -> str:
     return text
 
 
+def _map_unique(values: pd.Series, fn) -> pd.Series:
+    """Aplica fn una sola vez por valor distinto (las columnas de fechas repiten mucho)."""
+    cache: Dict[Tuple[type, Any], Any] = {}
+
+    def _cached(value: Any) -> Any:
+        try:
+            key = (type(value), value)
+            if key not in cache:
+                cache[key] = fn(value)
+            return cache[key]
+        except TypeError:
+            return fn(value)
+
+    return pd.Series([_cached(value) for value in values], index=values.index, dtype=object)
+
+
+# Formatos que se resuelven por columna completa; lo que no encaja (o no parsea) va a format_date_str
+_DMY_RE = r"[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}"
+_ISO_RE = r"[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}"
+# Con hora: se valida completa (una hora imposible queda como texto, igual que format_date_str);
+# segundos hasta 59 porque strptime acepta 60 y format_date_str no
+_ISO_HORA_RE = r"[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}[ T][0-9]{2}:[0-9]{2}:[0-5][0-9]"
+_AAAAMMDD_RE = r"[0-9]{8}"
+_SERIAL_RE = r"[0-9]{1,5}"
+
+
+def format_dates_series(values: pd.Series) -> pd.Series:
+    """
+    Version vectorizada de values.apply(format_date_str), con el mismo resultado.
+    dd/mm/aaaa, ISO (con o sin hora), aaaammdd y seriales de Excel se parsean por
+    columna completa con formato estricto; el resto de los valores (numeros, fechas
+    ya parseadas, textos libres) se resuelven con format_date_str una vez por valor distinto.
+    """
+    index = values.index
+    values = values.reset_index(drop=True)  # indice posicional (el del DataFrame puede repetirse)
+    out = pd.Series([None] * len(values), dtype=object)
+    is_text = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    text = values[is_text].astype(object).str.strip()
+
+    def _resolve(parsed: pd.Series) -> None:
+        ok = parsed.notna()
+        if ok.any():
+            out.loc[parsed.index[ok]] = parsed[ok].dt.strftime("%d/%m/%Y").astype(object)
+
+    out.loc[text.index[text == ""]] = ""
+    dmy = text[text.str.fullmatch(_DMY_RE)]
+    _resolve(pd.to_datetime(dmy, format="%d/%m/%Y", errors="coerce"))
+    iso = text[text.str.fullmatch(_ISO_RE)]
+    _resolve(pd.to_datetime(iso, format="%Y-%m-%d", errors="coerce"))
+    iso_hora = text[text.str.fullmatch(_ISO_HORA_RE)]
+    _resolve(pd.to_datetime(iso_hora.str.replace("T", " ", regex=False), format="%Y-%m-%d %H:%M:%S", errors="coerce"))
+    digits8 = text[text.str.fullmatch(_AAAAMMDD_RE)]
+    digits8 = digits8[digits8.str.slice(0, 4).astype(int).between(1900, 2100)]
+    _resolve(pd.to_datetime(digits8, format="%Y%m%d", errors="coerce"))
+    serial = text[text.str.fullmatch(_SERIAL_RE)].astype(int)
+    serial = serial[serial.between(1, 80000)]
+    _resolve(pd.to_datetime(serial, unit="D", origin="1899-12-30", errors="coerce"))
+
+    pending = out.isna().to_numpy()
+    if pending.any():
+        out.loc[pending] = _map_unique(values[pending], format_date_str).to_numpy()
+    out.index = index
+    return out
+
+
 def _format_dates_str(df: pd.DataFrame) -> pd.DataFrame:
     """Intenta formatear columnas con nombres que contengan desde/hasta/fecha a dd/mm/aaaa como string."""
     out = df.copy()
     for col in out.columns:
         lower_col = col.lower()
         if "periodo" in lower_col and any(key in lower_col for key in ["desde", "hasta"]):
-            out[col] = out[col].apply(_format_period_aaaamm)
+            out[col] = _map_unique(out[col], _format_period_aaaamm)
             continue
         if any(key in lower_col for key in ["desde", "hasta", "fecha"]):
-            out[col] = out[col].apply(format_date_str)
+            out[col] = format_dates_series(out[col])
     return out
 
 
@@ -205,25 +294,26 @@ def make_today_str() -> str:
 
 
 def to_excel_bytes(df: pd.DataFrame, sheet_name: str = "Datos") -> bytes:
-    with pd.ExcelWriter(os.devnull if sys.platform == "win32" else "/tmp/ignore.xlsx", engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
-    from io import BytesIO
-
-    buf = BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    buf = io.BytesIO()
+    escribir_excel(buf, [{"nombre": sheet_name, "df": df}])
     return buf.getvalue()
 
 
-def get_unique_filename(directory: str, filename: str) -> str:
+def get_unique_filename(directory: str, filename: str, taken: Optional[Set[str]] = None) -> str:
     """
     Genera un nombre único para el archivo en el directorio.
     Si el archivo ya existe, agrega un timestamp al nombre (antes de la extensión).
     Formato timestamp: _YYYYMMDD-HH_MM_SS
     Si aun con timestamp existe (muy raro), agrega contador.
+    taken: rutas ya reservadas por descargas en curso (se tratan como existentes).
     """
-    path = os.path.join(directory, filename)
-    if not os.path.exists(path):
+    reserved = taken or set()
+
+    def exists(name: str) -> bool:
+        path = os.path.join(directory, name)
+        return path in reserved or os.path.exists(path)
+
+    if not exists(filename):
         return filename
 
     base, ext = os.path.splitext(filename)
@@ -232,13 +322,52 @@ def get_unique_filename(directory: str, filename: str) -> str:
 
     # Loop de seguridad por si acaso cae en el mismo segundo
     counter = 1
-    while os.path.exists(os.path.join(directory, new_name)):
+    while exists(new_name):
         new_name = f"{base}_{timestamp}_{counter}{ext}"
         counter += 1
 
     return new_name
 
 
+ZIP_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_zip_member(
+    zf: zipfile.ZipFile,
+    member: str,
+    dest_path: str,
+    source_encoding: Optional[str] = None,
+    target_encoding: Optional[str] = None,
+    chunk_size: int = ZIP_COPY_CHUNK_SIZE,
+) -> None:
+    """
+    Copia un archivo del ZIP a dest_path por bloques, sin cargarlo entero en memoria.
+    Con source_encoding y target_encoding (ej. cp1252 -> utf-8) decodifica y re-codifica
+    en la misma pasada. Escribe en dest_path + ".part" y renombra al terminar, asi un
+    error (encoding invalido, disco lleno) no deja un CSV a medias.
+    """
+    tmp_path = dest_path + ".part"
+    transcode = bool(source_encoding and target_encoding and source_encoding.lower() != target_encoding.lower())
+    try:
+        with zf.open(member) as source:
+            if transcode:
+                reader = io.TextIOWrapper(source, encoding=source_encoding, newline="")
+                with open(tmp_path, "w", encoding=target_encoding, newline="") as target:
+                    while True:
+                        chunk = reader.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+            else:
+                with open(tmp_path, "wb") as target:
+                    shutil.copyfileobj(source, target, chunk_size)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def unzip_and_rename(zip_path: str, target_name_no_ext: str) -> Optional[str]:
     """
     Descomprime el zip en la misma ubicación.
@@ -265,9 +394,7 @@ def unzip_and_rename(zip_path: str, target_name_no_ext: str) -> Optional[str]:
             final_path = os.path.join(directory, unique_target_filename)
 
             # Streaming copy directly to target
-            with zf.open(inner_filename) as source:
-                with open(final_path, 'wb') as target:
-                    shutil.copyfileobj(source, target)
+            copy_zip_member(zf, inner_filename, final_path)
 
             return final_path
     except Exception:
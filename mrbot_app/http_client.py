@@ -0,0 +1,47 @@
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mrbot_app.config import get_http_pool_limits
+
+_session: Optional[requests.Session] = None
+_session_limits: Optional[Tuple[int, int]] = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Keep-alive explícito: las conexiones TCP/TLS se reutilizan entre filas
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Devuelve la sesión HTTP compartida por todas las ventanas.
+    El pool por host se dimensiona con get_http_pool_limits(); si los límites
+    cambian (por ejemplo al recargar el .env) se crea una sesión nueva y la
+    anterior se libera cuando terminan las requests en curso.
+    """
+    global _session, _session_limits
+    limits = get_http_pool_limits()
+    with _session_lock:
+        if _session is None or _session_limits != limits:
+            _session = _build_session(*limits)
+            _session_limits = limits
+        return _session
+
+
+def close_session() -> None:
+    """Cierra la sesión compartida y sus conexiones abiertas."""
+    global _session, _session_limits
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_limits = None
@@ -0,0 +1,198 @@
+"""
+Registro local (SQLite) de las filas procesadas en corridas masivas.
+
+Cada corrida se identifica por modulo + endpoint + contenido del Excel. Si una
+corrida se interrumpe (Abortar, cierre de la app, filas con error), al volver a
+lanzar el mismo Excel se reanuda: las filas que ya terminaron bien se omiten y
+solo se reenvian las fallidas o pendientes. Cuando todas las filas terminan bien
+la corrida queda "completada" y la siguiente ejecucion arranca de cero.
+
+Por fila se guarda el hash del payload (sin claves), estado, HTTP, archivos
+descargados, intentos y fechas.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from mrbot_app.config import get_job_store_path
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_OK = "ok"
+ESTADO_ERROR = "error"
+CORRIDA_EN_CURSO = "en_curso"
+CORRIDA_COMPLETADA = "completada"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    run_id TEXT PRIMARY KEY,
+    modulo TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    creada TEXT NOT NULL,
+    actualizada TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filas (
+    run_id TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    http_status INTEGER,
+    archivos TEXT,
+    resultado TEXT,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    creada TEXT NOT NULL,
+    actualizada TEXT NOT NULL,
+    PRIMARY KEY (run_id, row_key)
+);
+"""
+
+
+def payload_hash(*parts: Any) -> str:
+    """Hash estable (sha256) de las partes de una request; usar siempre el payload sin claves."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _dump_result(result: Any) -> str:
+    # Las tuplas (CCMA) se marcan para devolverlas como tupla al reanudar
+    if isinstance(result, tuple):
+        result = {"__tuple__": list(result)}
+    return json.dumps(result, ensure_ascii=False, default=str)
+
+
+def _load_result(raw: Optional[str]) -> Any:
+    if raw is None:
+        return None
+    value = json.loads(raw)
+    if isinstance(value, dict) and set(value) == {"__tuple__"}:
+        return tuple(value["__tuple__"])
+    return value
+
+
+class JobStore:
+    """Base SQLite compartida por todas las ventanas (una conexion protegida por lock)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def open_run(self, modulo: str, run_id: str, reset: bool = False) -> "JobRun":
+        """
+        Abre (o reanuda) la corrida run_id. Una corrida completada o reset=True
+        descarta las filas anteriores y empieza de cero.
+        """
+        now = _now()
+        with self._lock:
+            row = self._conn.execute("SELECT estado FROM corridas WHERE run_id = ?", (run_id,)).fetchone()
+            resumed = bool(row) and row[0] == CORRIDA_EN_CURSO and not reset
+            if not resumed:
+                self._conn.execute("DELETE FROM filas WHERE run_id = ?", (run_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO corridas (run_id, modulo, estado, creada, actualizada) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, modulo, CORRIDA_EN_CURSO, now, now),
+                )
+        return JobRun(self, run_id, resumed)
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobRun:
+    """Checkpoints de una corrida: consultar filas ya resueltas y registrar resultados."""
+
+    def __init__(self, store: JobStore, run_id: str, resumed: bool):
+        self.store = store
+        self.run_id = run_id
+        self.resumed = resumed
+
+    def completed_result(self, row_key: str) -> Optional[Dict[str, Any]]:
+        """Si la fila ya termino bien en esta corrida, devuelve {"resultado", "archivos"}."""
+        rows = self.store._execute(
+            "SELECT resultado, archivos FROM filas WHERE run_id = ? AND row_key = ? AND estado = ?",
+            (self.run_id, row_key, ESTADO_OK),
+        )
+        if not rows:
+            return None
+        resultado, archivos = rows[0]
+        return {"resultado": _load_result(resultado), "archivos": json.loads(archivos or "[]")}
+
+    def mark_pending(self, row_key: str) -> None:
+        now = _now()
+        self.store._execute(
+            "INSERT INTO filas (run_id, row_key, estado, intentos, creada, actualizada) VALUES (?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT(run_id, row_key) DO UPDATE SET estado = excluded.estado, "
+            "intentos = filas.intentos + 1, actualizada = excluded.actualizada",
+            (self.run_id, row_key, ESTADO_PENDIENTE, now, now),
+        )
+
+    def record(
+        self,
+        row_key: str,
+        ok: bool,
+        http_status: Optional[int] = None,
+        archivos: Optional[List[str]] = None,
+        resultado: Any = None,
+    ) -> None:
+        self.store._execute(
+            "UPDATE filas SET estado = ?, http_status = ?, archivos = ?, resultado = ?, actualizada = ? "
+            "WHERE run_id = ? AND row_key = ?",
+            (
+                ESTADO_OK if ok else ESTADO_ERROR,
+                http_status,
+                json.dumps(archivos or [], ensure_ascii=False),
+                _dump_result(resultado),
+                _now(),
+                self.run_id,
+                row_key,
+            ),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.store._execute("SELECT estado, COUNT(*) FROM filas WHERE run_id = ? GROUP BY estado", (self.run_id,))
+        return {estado: total for estado, total in rows}
+
+    def finish(self, complete: bool) -> None:
+        """complete=True (todas las filas ok, sin aborto) cierra la corrida; si no, queda para reanudar."""
+        estado = CORRIDA_COMPLETADA if complete else CORRIDA_EN_CURSO
+        self.store._execute(
+            "UPDATE corridas SET estado = ?, actualizada = ? WHERE run_id = ?",
+            (estado, _now(), self.run_id),
+        )
+
+
+_store: Optional[JobStore] = None
+_store_path: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> Optional[JobStore]:
+    """Devuelve el registro compartido, o None si JOB_STORE_PATH esta vacio (reanudacion desactivada)."""
+    global _store, _store_path
+    path = get_job_store_path()
+    with _store_lock:
+        if not path:
+            return None
+        if _store is None or _store_path != path:
+            try:
+                _store = JobStore(path)
+            except (OSError, sqlite3.Error):
+                return None
+            _store_path = path
+        return _store
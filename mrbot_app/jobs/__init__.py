@@ -0,0 +1,34 @@
+"""
+Trabajos por fila del motor masivo (mrbot_app.bulk), uno por modulo.
+No dependen de Tk: las ventanas y la linea de comandos los reutilizan.
+"""
+from mrbot_app.jobs.apocrifos import ApocrifosJob
+from mrbot_app.jobs.aportes_en_linea import AportesEnLineaJob
+from mrbot_app.jobs.ccma import CcmaJob
+from mrbot_app.jobs.declaracion_en_linea import DeclaracionEnLineaJob
+from mrbot_app.jobs.hacienda import HaciendaJob
+from mrbot_app.jobs.liquidacion_granos import LiquidacionGranosJob
+from mrbot_app.jobs.mis_facilidades import MisFacilidadesJob
+from mrbot_app.jobs.mis_retenciones import MisRetencionesJob
+from mrbot_app.jobs.pago_devoluciones import PagoDevolucionesJob
+from mrbot_app.jobs.rcel import RcelJob
+from mrbot_app.jobs.sct import SctJob
+from mrbot_app.jobs.sifere import SifereJob
+from mrbot_app.jobs.registry import JOB_REGISTRY, build_job
+
+__all__ = [
+    "ApocrifosJob",
+    "AportesEnLineaJob",
+    "CcmaJob",
+    "DeclaracionEnLineaJob",
+    "HaciendaJob",
+    "LiquidacionGranosJob",
+    "MisFacilidadesJob",
+    "MisRetencionesJob",
+    "PagoDevolucionesJob",
+    "RcelJob",
+    "SctJob",
+    "SifereJob",
+    "JOB_REGISTRY",
+    "build_job",
+]
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob
+from mrbot_app.helpers import ensure_trailing_slash
+
+
+def apocrifos_url(base_url: str, cuit: str) -> str:
+    return ensure_trailing_slash(base_url) + f"api/v1/apoc/consulta/{cuit}"
+
+
+class ApocrifosJob(RowJob):
+    """Consulta masiva de apocrifos: un GET por CUIT."""
+
+    MODULE_DIR = "apocrifos"
+
+    def __init__(self, log, base_url: str, headers: Dict[str, str]):
+        super().__init__(log, base_url, headers)
+
+    def row_label(self, row: pd.Series) -> str:
+        return str(row.get("cuit", "")).strip() or "sin_cuit"
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit = str(row.get("cuit", "")).strip()
+        return {
+            "method": "GET",
+            "url": apocrifos_url(self.url, cuit),
+            "headers": self.headers,
+            "payload": None,
+            "safe_payload": {"cuit": cuit},
+            "attempts": 1,
+            "cuit": cuit,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        return {
+            "cuit": request["cuit"],
+            "http_status": resp.get("http_status"),
+            "apoc": data.get("apoc") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+        }
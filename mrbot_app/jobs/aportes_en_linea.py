@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def extract_aportes_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    if isinstance(data, dict):
+        url = data.get("archivo_historico_minio_url")
+        link = build_link(url, "aportes_historico", "aportes", 1)
+        if link:
+            links.append(link)
+    if not links:
+        links = collect_minio_links(data, "aportes")
+    return links
+
+
+class AportesEnLineaJob(RowJob):
+    MODULE_DIR = "Aportes_en_linea"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], download_dir: str = "", default_proxy: bool = False):
+        super().__init__(log, url, headers, download_dir)
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_aportes_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_login = str(row.get("cuit_login", "")).strip()
+        cuit_repr = optional_value(str(row.get("cuit_representado", "")))
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "cuit_login": cuit_login,
+            "clave": str(row.get("clave", "")),
+            "cuit_representado": cuit_repr,
+            "archivo_historico_b64": False,
+            "archivo_historico_minio": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_login,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "status": data.get("status") if isinstance(data, dict) else None,
+            "error_message": data.get("error_message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
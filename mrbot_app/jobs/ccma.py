@@ -0,0 +1,251 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import build_link, sanitize_identifier
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Convierte strings con separador de miles y decimal a float.
+    Admite formatos tipo 22,307.22 (coma miles, punto decimal) y 22.307,22.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("\xa0", "").replace(" ", "")
+    if text == "":
+        return None
+    try:
+        if "," in text and "." in text:
+            if text.rfind(".") > text.rfind(","):
+                text = text.replace(",", "")
+            else:
+                text = text.replace(".", "").replace(",", ".")
+        elif "," in text:
+            text = text.replace(".", "").replace(",", ".")
+        return float(text)
+    except Exception:
+        return None
+
+
+def parse_optional_bool(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        try:
+            if pd.isna(value):
+                return None
+        except Exception:
+            pass
+        return bool(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    lowered = text.lower()
+    if lowered in {"true", "1", "si", "sí", "yes", "y"}:
+        return True
+    if lowered in {"false", "0", "no", "n"}:
+        return False
+    return None
+
+
+def resolve_cuit_label(cuit_repr: str, cuit_rep: str, data: Any) -> str:
+    if cuit_repr:
+        return cuit_repr
+    if isinstance(data, dict):
+        response_ccma = data.get("response_ccma")
+        if isinstance(response_ccma, dict):
+            cuit_data = str(response_ccma.get("cuit", "")).strip()
+            if cuit_data:
+                return cuit_data
+    return cuit_rep
+
+
+def save_ccma_response_json(dest_dir: Optional[str], cuit_label: str, data: Any) -> Tuple[Optional[str], Optional[str]]:
+    if not dest_dir:
+        return None, "No hay carpeta de descarga disponible."
+    try:
+        os.makedirs(dest_dir, exist_ok=True)
+        safe_cuit = sanitize_identifier(cuit_label)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
+        filename = f"{safe_cuit}_{timestamp}.json"
+        path = os.path.join(dest_dir, filename)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2, default=str)
+        return path, None
+    except Exception as exc:
+        return None, str(exc)
+
+
+def extract_ccma_links(data: Any) -> List[Dict[str, str]]:
+    if not isinstance(data, dict):
+        return []
+    response_obj = data.get("response_ccma", data)
+    if not isinstance(response_obj, dict):
+        return []
+    url = response_obj.get("pdf_url_minio")
+    if isinstance(url, str) and url.strip().lower().startswith("http"):
+        link = build_link(url, None, "ccma", 1)
+        return [link] if link else []
+    return []
+
+
+class CcmaJob(RowJob):
+    """
+    Cuenta corriente (CCMA). Cada fila devuelve (fila_resumen, movimientos, movimientos_solicitados)
+    para que la ventana arme el ReporteCCMA.xlsx consolidado.
+    """
+
+    MODULE_DIR = "CCMA"
+
+    def __init__(
+        self,
+        log,
+        url: str,
+        headers: Dict[str, str],
+        download_dir: str = "",
+        movimientos_default: bool = False,
+        pdf_default: bool = False,
+        proxy_default: bool = False,
+    ):
+        super().__init__(log, url, headers, download_dir)
+        self.movimientos_default = movimientos_default
+        self.pdf_default = pdf_default
+        self.proxy_default = proxy_default
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_ccma_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = str(row.get("cuit_representado", "")).strip()
+        movimientos_flag = parse_bool_cell(row.get("movimientos"), default=self.movimientos_default)
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.proxy_default)
+
+        # Special case for pdf flag from excel which could be None to use default
+        pdf_flag = parse_optional_bool(row.get("pdf"))
+        if pdf_flag is None:
+            pdf_flag = self.pdf_default
+
+        payload = {
+            "cuit_representante": cuit_rep,
+            "clave_representante": str(row.get("clave_representante", "")),
+            "cuit_representado": cuit_repr,
+            "movimientos": movimientos_flag,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        if pdf_flag:
+            payload["pdf"] = True
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave_representante",)),
+            "attempts": row_attempts(row),
+            "cuit_rep": cuit_rep,
+            "cuit_repr": cuit_repr,
+            "movimientos": movimientos_flag,
+            "pdf": pdf_flag,
+        }
+
+    def handle_response(
+        self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        log = self.log
+        cuit_rep = request["cuit_rep"]
+        cuit_repr = request["cuit_repr"]
+        movimientos_flag = request["movimientos"]
+        pdf_flag = request["pdf"]
+        http_status = resp.get("http_status")
+        data = resp.get("data")
+
+        if http_status != 200:
+            detail = resp.get("error") or resp.get("detail") or data
+            log.log_error(f"HTTP {http_status}: {detail}")
+
+        cuit_label = resolve_cuit_label(cuit_repr, cuit_rep, data)
+        downloads, errors, download_dir = self.process_downloads(data, cuit_label, override_dir=row_download_dir(row))
+
+        json_path, json_error = save_ccma_response_json(download_dir, cuit_label, data)
+        if json_path:
+            log.log_info(f"JSON guardado: {json_path}")
+        if json_error:
+            log.log_error(f"JSON: {json_error}")
+
+        if downloads:
+            log.log_info(f"PDF descargado: {downloads} -> {download_dir}")
+        elif pdf_flag:
+            log.log_info("PDF: no se encontro link en la respuesta.")
+
+        for err in errors:
+            log.log_error(f"PDF: {err}")
+
+        movs_result: List[Dict[str, Any]] = []
+
+        if http_status == 200 and isinstance(data, dict):
+            # Extraer clave "response_ccma" si existe, para replicar ejemplo
+            response_obj = data.get("response_ccma", data)
+            if isinstance(response_obj, dict):
+                row_result = {
+                    "cuit_representante": cuit_rep,
+                    "cuit_representado": cuit_repr,
+                    "cuit": response_obj.get("cuit"),
+                    "periodo": response_obj.get("periodo"),
+                    "deuda_capital": parse_amount(response_obj.get("deuda_capital")),
+                    "deuda_accesorios": parse_amount(response_obj.get("deuda_accesorios")),
+                    "total_deuda": parse_amount(response_obj.get("total_deuda")),
+                    "credito_capital": parse_amount(response_obj.get("credito_capital")),
+                    "credito_accesorios": parse_amount(response_obj.get("credito_accesorios")),
+                    "total_a_favor": parse_amount(response_obj.get("total_a_favor")),
+                    "pdf_url_minio": response_obj.get("pdf_url_minio"),
+                    "response_json": json.dumps({"response_ccma": response_obj}, ensure_ascii=False),
+                    "movimientos_solicitados": movimientos_flag,
+                    "pdf_solicitado": pdf_flag,
+                    "error": None,
+                }
+                movimientos_list = response_obj.get("movimientos")
+                if movimientos_flag and isinstance(movimientos_list, list):
+                    for mov in movimientos_list:
+                        if not isinstance(mov, dict):
+                            continue
+                        movs_result.append(
+                            {
+                                "cuit_representante": cuit_rep,
+                                "cuit_representado": cuit_repr or response_obj.get("cuit"),
+                                **mov,
+                            }
+                        )
+            else:
+                row_result = {
+                    "cuit_representante": cuit_rep,
+                    "cuit_representado": cuit_repr,
+                    "movimientos_solicitados": movimientos_flag,
+                    "pdf_url_minio": None,
+                    "response_json": json.dumps(data, ensure_ascii=False),
+                    "pdf_solicitado": pdf_flag,
+                    "error": None,
+                }
+        else:
+            row_result = {
+                "cuit_representante": cuit_rep,
+                "cuit_representado": cuit_repr,
+                "movimientos_solicitados": movimientos_flag,
+                "pdf_url_minio": None,
+                "response_json": None,
+                "pdf_solicitado": pdf_flag,
+                "error": json.dumps(resp, ensure_ascii=False),
+            }
+
+        return row_result, movs_result, movimientos_flag
@@ -0,0 +1,186 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links, sanitize_identifier
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def extract_ddjj_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[tuple[str, str]] = set()
+    if isinstance(data, dict):
+        archivos = data.get("archivos")
+        if isinstance(archivos, list):
+            for idx, item in enumerate(archivos, start=1):
+                if not isinstance(item, dict):
+                    continue
+                candidates = {
+                    "ddjj_excel": item.get("link_minio_ddjj_excel"),
+                    "dj": item.get("link_minio_dj"),
+                    "vep": item.get("link_minio_vep"),
+                }
+                for label, url in candidates.items():
+                    link = build_link(url, label, "ddjj", idx)
+                    if link:
+                        key = (link["url"], link["filename"])
+                        if key not in seen:
+                            seen.add(key)
+                            links.append(link)
+    if not links:
+        links = collect_minio_links(data, "ddjj")
+    return links
+
+
+def json_filename_from_item(item: Dict[str, Any], index: int, header: Dict[str, Any], cuit_repr: str) -> str:
+    for key in ("link_minio_ddjj_excel", "link_minio_dj", "link_minio_vep"):
+        url = item.get(key)
+        if isinstance(url, str) and url.strip():
+            link = build_link(url, None, "ddjj", index)
+            if link:
+                base = os.path.splitext(link["filename"][0] if isinstance(link["filename"], list) else link["filename"])[0]
+                return f"{base}.json"
+    periodo = None
+    datos = item.get("datos")
+    if isinstance(datos, dict):
+        periodo = datos.get("periodo")
+        if not periodo:
+            datos_base = datos.get("datos")
+            if isinstance(datos_base, dict):
+                periodo = datos_base.get("Mes - Año")
+    cuit = cuit_repr
+    if not cuit and isinstance(header, dict):
+        representado = header.get("Representado")
+        if isinstance(representado, dict):
+            cuit = representado.get("cuit")
+    parts = ["ddjj"]
+    if cuit:
+        parts.append(str(cuit))
+    if periodo:
+        parts.append(str(periodo))
+    parts.append(str(index))
+    name = "_".join(sanitize_identifier(p) for p in parts if p)
+    return f"{name}.json" if name else f"ddjj_{index}.json"
+
+
+def json_fallback_name(header: Dict[str, Any], cuit_repr: str) -> str:
+    periodo = None
+    if isinstance(header, dict):
+        periodo_info = header.get("Periodo")
+        if isinstance(periodo_info, dict):
+            periodo = periodo_info.get("periodo") or periodo_info.get("desde") or periodo_info.get("hasta")
+    parts = ["ddjj"]
+    if cuit_repr:
+        parts.append(str(cuit_repr))
+    if periodo:
+        parts.append(str(periodo))
+    name = "_".join(sanitize_identifier(p) for p in parts if p)
+    return f"{name}.json" if name else "ddjj.json"
+
+
+def save_json_from_data(data: Any, download_dir: Optional[str], cuit_repr: str) -> tuple[int, List[str]]:
+    if not download_dir:
+        return 0, ["No hay ruta de descarga disponible."]
+    if not isinstance(data, dict) or not data:
+        return 0, []
+    header = data.get("header") if isinstance(data.get("header"), dict) else {}
+    archivos = data.get("archivos")
+    saved = 0
+    errors: List[str] = []
+    if isinstance(archivos, list) and archivos:
+        for idx, item in enumerate(archivos, start=1):
+            if not isinstance(item, dict):
+                continue
+            payload = item.get("datos")
+            if not isinstance(payload, dict) or not payload:
+                continue
+            filename = json_filename_from_item(item, idx, header, cuit_repr)
+            target = os.path.join(download_dir, filename)
+            try:
+                with open(target, "w", encoding="utf-8") as fh:
+                    json.dump(
+                        {"header": header, "declaracion": payload},
+                        fh,
+                        ensure_ascii=False,
+                        indent=2,
+                    )
+                saved += 1
+            except Exception as exc:
+                errors.append(f"{filename}: {exc}")
+        if saved or errors:
+            return saved, errors
+    fallback_name = json_fallback_name(header, cuit_repr)
+    try:
+        with open(os.path.join(download_dir, fallback_name), "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2)
+        saved += 1
+    except Exception as exc:
+        errors.append(f"{fallback_name}: {exc}")
+    return saved, errors
+
+
+class DeclaracionEnLineaJob(RowJob):
+    MODULE_DIR = "Declaracion_en_linea"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], download_dir: str = "", default_proxy: bool = False):
+        super().__init__(log, url, headers, download_dir)
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_ddjj_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = optional_value(str(row.get("cuit_representado", "")))
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "cuit_representante": cuit_rep,
+            "clave_representante": str(row.get("clave_representante", "")),
+            "cuit_representado": cuit_repr,
+            "representado_nombre": optional_value(str(row.get("representado_nombre", ""))),
+            "periodo_desde": str(row.get("periodo_desde", "")).strip(),
+            "periodo_hasta": str(row.get("periodo_hasta", "")).strip(),
+            "carga_minio": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave_representante",)),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_rep,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+
+        json_saved, json_errors = save_json_from_data(data, download_dir, cuit_folder)
+        if json_saved:
+            self.log.log_info(f"JSON guardados: {json_saved} -> {download_dir}")
+        for err in json_errors:
+            self.log.log_error(f"JSON: {err}")
+
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import format_date_str, parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+
+def optional_value(value: Any) -> Optional[str]:
+    clean = str(value or "").strip()
+    return clean if clean else None
+
+
+def extract_granos_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[tuple[str, str]] = set()
+    if isinstance(data, dict):
+        comprobantes = data.get("comprobantes")
+        if isinstance(comprobantes, list):
+            for idx, item in enumerate(comprobantes, start=1):
+                if not isinstance(item, dict):
+                    continue
+                url = item.get("url_minio")
+                name_hint = item.get("archivo") or item.get("tipo") or item.get("consulta")
+                link = build_link(url, name_hint, "liquidacion_granos", idx)
+                if link:
+                    key = (link["url"], link["filename"])
+                    if key not in seen:
+                        seen.add(key)
+                        links.append(link)
+    if not links:
+        links = collect_minio_links(data, "liquidacion_granos")
+    return links
+
+
+class LiquidacionGranosJob(RowJob):
+    MODULE_DIR = "Liquidacion_Granos"
+    SERVICE_KEY = "liquidacion_granos"
+
+    def __init__(
+        self,
+        log,
+        url: str,
+        headers: Dict[str, str],
+        download_dir: str = "",
+        default_desde: str = "",
+        default_hasta: str = "",
+        default_proxy: bool = False,
+    ):
+        super().__init__(log, url, headers, download_dir)
+        self.default_desde = default_desde
+        self.default_hasta = default_hasta
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_granos_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = optional_value(row.get("cuit_representado") or row.get("representado_cuit"))
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "desde": format_date_str(row.get("desde", "")) or self.default_desde,
+            "hasta": format_date_str(row.get("hasta", "")) or self.default_hasta,
+            "cuit_representante": cuit_rep,
+            "clave": str(row.get("clave", "")),
+            "denominacion": str(row.get("denominacion", "")).strip(),
+            "cuit_representado": cuit_repr,
+            "minio_upload": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_rep or "desconocido",
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
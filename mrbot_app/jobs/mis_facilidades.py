@@ -0,0 +1,115 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def extract_api_error(data: Any) -> Optional[str]:
+    if not isinstance(data, dict):
+        return None
+    raw = data.get("error")
+    if raw is None:
+        raw = data.get("errores")
+    if raw is None:
+        return None
+    if isinstance(raw, list):
+        parts = [str(item).strip() for item in raw if str(item).strip()]
+        return "; ".join(parts) if parts else None
+    if isinstance(raw, dict):
+        return json.dumps(raw, ensure_ascii=False)
+    text = str(raw).strip()
+    return text if text else None
+
+
+def extract_facilidades_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[tuple[str, str]] = set()
+    if isinstance(data, dict):
+        archivos = data.get("archivos")
+        if isinstance(archivos, list):
+            for idx, item in enumerate(archivos, start=1):
+                if not isinstance(item, dict):
+                    continue
+                plan_num = str(item.get("plan_num", "")).strip()
+                prefix = f"plan_{plan_num}_" if plan_num else ""
+                candidates = {
+                    "tablas_excel": item.get("tablas_excel_url_minio"),
+                    "pagos_pdf": item.get("pagos_pdf_url_minio"),
+                    "cuotas_pdf": item.get("cuotas_pdf_url_minio"),
+                    "obligaciones_pdf": item.get("obligaciones_pdf_url_minio"),
+                    "obligaciones_previsionales_pdf": item.get("obligaciones_previsionales_pdf_url_minio"),
+                }
+                for label, url in candidates.items():
+                    hint = f"{prefix}{label}"
+                    link = build_link(url, hint, "facilidades", idx)
+                    if link:
+                        key = (link["url"], link["filename"])
+                        if key not in seen:
+                            seen.add(key)
+                            links.append(link)
+    if not links:
+        links = collect_minio_links(data, "facilidades")
+    return links
+
+
+class MisFacilidadesJob(RowJob):
+    MODULE_DIR = "Mis_Facilidades"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], download_dir: str = "", default_proxy: bool = False):
+        super().__init__(log, url, headers, download_dir)
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_facilidades_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_login = str(row.get("cuit_login", "")).strip()
+        cuit_repr = optional_value(str(row.get("cuit_representado", "")))
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "cuit_login": cuit_login,
+            "clave": str(row.get("clave", "")),
+            "cuit_representado": cuit_repr,
+            "denominacion": optional_value(str(row.get("denominacion", ""))),
+            "carga_minio": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_login,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        api_error = extract_api_error(data)
+        if api_error:
+            self.log.log_error(api_error)
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "error": api_error,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
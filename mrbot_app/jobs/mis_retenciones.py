@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import format_date_str, parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+ALLOWED_IMPUESTOS = ["216", "217", "219", "353", "767", "787"]
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def coerce_impuesto(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    if text.isdigit():
+        return text
+    return None
+
+
+def parse_impuestos(value: Any, allowed_impuestos: Optional[List[str]] = None) -> tuple[List[str], Optional[str]]:
+    allowed_list = allowed_impuestos or ALLOWED_IMPUESTOS
+    if value is None:
+        return [], None
+    if isinstance(value, list):
+        items = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return [], None
+        text = text.replace(";", ",").replace("|", ",")
+        items = [part.strip() for part in text.split(",") if part.strip()]
+
+    impuestos: List[str] = []
+    invalid: List[str] = []
+    allowed = set(allowed_list)
+
+    for item in items:
+        impuesto = coerce_impuesto(item)
+        if impuesto is None or impuesto not in allowed:
+            invalid.append(str(item).strip())
+            continue
+        if impuesto not in impuestos:
+            impuestos.append(impuesto)
+
+    if invalid:
+        valid_text = ", ".join(allowed_list)
+        invalid_text = ", ".join(invalid)
+        return [], f"Impuestos invalidos: {invalid_text}. Valores permitidos: {valid_text}."
+
+    return impuestos, None
+
+
+def extract_retenciones_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[tuple[str, str]] = set()
+    if isinstance(data, dict):
+        archivos = data.get("archivos")
+        if isinstance(archivos, list):
+            for idx, item in enumerate(archivos, start=1):
+                if not isinstance(item, dict):
+                    continue
+                url = item.get("url_minio")
+                name_hint = item.get("archivo") or item.get("tipo") or item.get("impuesto_label")
+                link = build_link(url, name_hint, "retencion", idx)
+                if link:
+                    key = (link["url"], link["filename"])
+                    if key not in seen:
+                        seen.add(key)
+                        links.append(link)
+    if not links:
+        links = collect_minio_links(data, "retencion")
+    return links
+
+
+class MisRetencionesJob(RowJob):
+    MODULE_DIR = "Mis_Retenciones"
+    SERVICE_KEY = "retencion"
+
+    def __init__(
+        self,
+        log,
+        url: str,
+        headers: Dict[str, str],
+        download_dir: str = "",
+        default_desde: str = "",
+        default_hasta: str = "",
+        default_proxy: bool = False,
+    ):
+        super().__init__(log, url, headers, download_dir)
+        self.default_desde = default_desde
+        self.default_hasta = default_hasta
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_retenciones_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = optional_value(str(row.get("cuit_representado", "")))
+        impuestos, error = parse_impuestos(row.get("impuestos", ""))
+        if error:
+            self.log.log_error(error)
+            return {
+                "result": {
+                    "cuit_representado": cuit_repr or cuit_rep,
+                    "http_status": None,
+                    "success": False,
+                    "message": error,
+                    "descargas": 0,
+                    "errores_descarga": None,
+                    "carpeta_descarga": None,
+                }
+            }
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "cuit_representante": cuit_rep,
+            "clave_representante": str(row.get("clave_representante", "")),
+            "cuit_representado": cuit_repr,
+            "denominacion": str(row.get("denominacion", "")).strip(),
+            "desde": format_date_str(row.get("desde", "")) or self.default_desde,
+            "hasta": format_date_str(row.get("hasta", "")) or self.default_hasta,
+            "impuestos": impuestos,
+            "carga_minio": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave_representante",)),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_rep,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
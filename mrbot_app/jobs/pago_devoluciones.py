@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def bool_cell(value: Any, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value or "").strip().lower()
+    if text in {"si", "sí", "1", "true", "yes", "y"}:
+        return True
+    if text in {"no", "0", "false", "n"}:
+        return False
+    return default
+
+
+def extract_api_error(data: Any) -> Optional[str]:
+    if not isinstance(data, dict):
+        return None
+    raw = data.get("error")
+    if raw is None:
+        return None
+    if isinstance(raw, list):
+        parts = [str(item).strip() for item in raw if str(item).strip()]
+        return "; ".join(parts) if parts else None
+    if isinstance(raw, dict):
+        return json.dumps(raw, ensure_ascii=False)
+    text = str(raw).strip()
+    return text if text else None
+
+
+def extract_pago_devoluciones_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    if isinstance(data, dict):
+        archivo = data.get("archivo")
+        if isinstance(archivo, dict):
+            link = build_link(
+                archivo.get("url_minio"),
+                archivo.get("nombre"),
+                "pago_devoluciones",
+                1,
+            )
+            if link:
+                links.append(link)
+    if not links:
+        links = collect_minio_links(data, "pago_devoluciones")
+    return links
+
+
+class PagoDevolucionesJob(RowJob):
+    MODULE_DIR = "Pago_Devoluciones"
+    SERVICE_KEY = "pago_devoluciones"
+
+    def __init__(
+        self,
+        log,
+        url: str,
+        headers: Dict[str, str],
+        download_dir: str = "",
+        default_proxy: bool = False,
+        default_carga_minio: bool = True,
+    ):
+        super().__init__(log, url, headers, download_dir)
+        self.default_proxy = default_proxy
+        self.default_carga_minio = default_carga_minio
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_pago_devoluciones_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = optional_value(str(row.get("cuit_representado", "")))
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = bool_cell(row.get("proxy_request", ""), self.default_proxy)
+        payload = {
+            "cuit_representante": cuit_rep,
+            "clave_representante": str(row.get("clave_representante", "")),
+            "cuit_representado": cuit_repr,
+            "carga_minio": bool_cell(row.get("carga_minio", ""), self.default_carga_minio),
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave_representante",)),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr or cuit_rep or "desconocido",
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        api_error = extract_api_error(data)
+        if api_error:
+            self.log.log_error(api_error)
+        cuit_folder = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_folder, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_folder,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "error": api_error,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
@@ -0,0 +1,198 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from mrbot_app.artifact_manifest import record_artifacts
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.control_monotributistas import MODULO_CONTROL, TIPO_RCEL_JSON
+from mrbot_app.helpers import format_date_str, parse_bool_cell
+
+
+def is_pdf_url(url: Any) -> bool:
+    if not isinstance(url, str):
+        return False
+    clean = url.strip()
+    if not clean.lower().startswith("http"):
+        return False
+    lowered = clean.lower()
+    if "minio" in lowered:
+        return True
+    return lowered.split("?")[0].endswith(".pdf")
+
+
+def extract_pdf_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[Tuple[str, str]] = set()
+
+    def add_link(url: str) -> None:
+        if not is_pdf_url(url):
+            return
+        url = url.strip()
+        filename = os.path.basename(urlparse(url).path) or "factura.pdf"
+        key = (url, filename)
+        if key in seen:
+            return
+        seen.add(key)
+        links.append({"url": url, "filename": filename})
+
+    def walk(obj: Any) -> None:
+        if isinstance(obj, dict):
+            for _, val in obj.items():
+                if isinstance(val, (dict, list)):
+                    walk(val)
+                elif isinstance(val, str):
+                    add_link(val)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+
+    walk(data)
+    return links
+
+
+def extract_item_pdf_url(item: Dict[str, Any]) -> Optional[str]:
+    for key in ("URL_MINIO", "url_minio", "url_pdf", "link_pdf", "url", "link"):
+        url = item.get(key)
+        if is_pdf_url(url):
+            return str(url).strip()
+    for value in item.values():
+        if is_pdf_url(value):
+            return str(value).strip()
+    return None
+
+
+def collect_pdf_items(data: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    if not isinstance(data, dict):
+        return []
+    collected: List[Tuple[str, Dict[str, Any]]] = []
+    for key in ("facturas_emitidas", "facturas_recibidas", "comprobantes", "facturas"):
+        items = data.get(key)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            url = extract_item_pdf_url(item)
+            if url:
+                collected.append((url, item))
+    return collected
+
+
+def save_pdf_jsons(
+    items: List[Tuple[str, Dict[str, Any]]], dest_dir: Optional[str], cuit: str = ""
+) -> Tuple[int, List[str]]:
+    if not dest_dir:
+        return 0, ["No hay ruta de descarga disponible."]
+    saved = 0
+    errors: List[str] = []
+    seen: set[str] = set()
+    json_paths: List[str] = []
+    for idx, (url, payload) in enumerate(items, start=1):
+        filename = os.path.basename(urlparse(url).path) or f"factura_{idx}.pdf"
+        if filename in seen:
+            continue
+        seen.add(filename)
+        pdf_path = os.path.join(dest_dir, filename)
+        if not os.path.exists(pdf_path):
+            errors.append(f"{filename}: PDF no encontrado para guardar JSON")
+            continue
+        json_name = os.path.splitext(filename)[0] + ".json"
+        json_path = os.path.join(dest_dir, json_name)
+        try:
+            with open(json_path, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False, indent=2)
+            saved += 1
+            json_paths.append(json_path)
+        except Exception as exc:
+            errors.append(f"{json_name}: {exc}")
+    # Los JSON de RCEL son los que cruza "Generar Reporte" del control
+    record_artifacts(json_paths, modulo=MODULO_CONTROL, cuit=cuit, tipo=TIPO_RCEL_JSON)
+    return saved, errors
+
+
+class RcelJob(RowJob):
+    MODULE_DIR = "RCEL"
+
+    def __init__(
+        self,
+        log,
+        url: str,
+        headers: Dict[str, str],
+        download_dir: str = "",
+        default_desde: str = "",
+        default_hasta: str = "",
+        b64_pdf: bool = False,
+        minio_upload: bool = True,
+        default_proxy: bool = False,
+    ):
+        super().__init__(log, url, headers, download_dir)
+        self.default_desde = default_desde
+        self.default_hasta = default_hasta
+        self.b64_pdf = b64_pdf
+        self.minio_upload = minio_upload
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_pdf_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        cuit_repr = str(row.get("representado_cuit", "")).strip()
+        payload = {
+            "desde": format_date_str(row.get("desde", "")) or self.default_desde,
+            "hasta": format_date_str(row.get("hasta", "")) or self.default_hasta,
+            "cuit_representante": str(row.get("cuit_representante", "")).strip(),
+            "nombre_rcel": str(row.get("nombre_rcel", "")).strip(),
+            "representado_cuit": cuit_repr,
+            "clave": str(row.get("clave", "")),
+            "b64_pdf": self.b64_pdf,
+            "minio_upload": self.minio_upload,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave",)),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        downloads, download_errors, download_dir_used = self.process_downloads(
+            data, request["cuit_folder"], override_dir=row_download_dir(row)
+        )
+
+        if downloads:
+            self.log.log_info(f"Descargas completadas: {downloads} -> {download_dir_used}")
+        elif isinstance(data, dict):
+            self.log.log_info("Sin links de PDF para descargar")
+
+        if isinstance(data, dict):
+            pdf_items = collect_pdf_items(data)
+            if pdf_items:
+                saved_json, json_errors = save_pdf_jsons(pdf_items, download_dir_used, request["cuit_folder"])
+                if saved_json:
+                    self.log.log_info(f"JSON guardados: {saved_json} -> {download_dir_used}")
+                for err in json_errors:
+                    self.log.log_error(f"JSON: {err}")
+
+        for err in download_errors:
+            self.log.log_error(f"Descarga: {err}")
+
+        return {
+            "representado_cuit": request["payload"]["representado_cuit"],
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(download_errors) if download_errors else None,
+            "carpeta_descarga": download_dir_used,
+        }
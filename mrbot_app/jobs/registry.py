@@ -0,0 +1,137 @@
+"""
+Registro modulo -> RowJob para ejecutar el motor masivo sin las ventanas.
+
+Cada entrada indica la clase del job, el endpoint relativo a la URL base y las
+opciones por defecto (los mismos valores iniciales que los checkboxes/fechas de
+la ventana). Las opciones se pueden sobreescribir por nombre.
+"""
+from datetime import date
+from typing import Any, Dict, Optional
+
+from mrbot_app.helpers import ensure_trailing_slash, format_date_str, make_today_str, parse_bool_cell
+from mrbot_app.jobs.apocrifos import ApocrifosJob
+from mrbot_app.jobs.aportes_en_linea import AportesEnLineaJob
+from mrbot_app.jobs.ccma import CcmaJob
+from mrbot_app.jobs.declaracion_en_linea import DeclaracionEnLineaJob
+from mrbot_app.jobs.hacienda import HaciendaJob
+from mrbot_app.jobs.liquidacion_granos import LiquidacionGranosJob
+from mrbot_app.jobs.mis_facilidades import MisFacilidadesJob
+from mrbot_app.jobs.mis_retenciones import MisRetencionesJob
+from mrbot_app.jobs.pago_devoluciones import PagoDevolucionesJob
+from mrbot_app.jobs.rcel import RcelJob
+from mrbot_app.jobs.sct import SctJob
+from mrbot_app.jobs.sifere import SifereJob
+
+_PERIODO = {"default_desde": "", "default_hasta": ""}
+
+JOB_REGISTRY: Dict[str, Dict[str, Any]] = {
+    "apocrifos": {"job": ApocrifosJob, "endpoint": None, "opciones": {}},
+    "aportes_en_linea": {
+        "job": AportesEnLineaJob,
+        "endpoint": "api/v1/aportes-en-linea/consulta",
+        "opciones": {"default_proxy": False},
+    },
+    "ccma": {
+        "job": CcmaJob,
+        "endpoint": "api/v1/ccma/consulta",
+        "opciones": {"movimientos_default": True, "pdf_default": False, "proxy_default": False},
+    },
+    "declaracion_en_linea": {
+        "job": DeclaracionEnLineaJob,
+        "endpoint": "api/v1/declaracion-en-linea/consulta",
+        "opciones": {"default_proxy": False},
+    },
+    "hacienda": {
+        "job": HaciendaJob,
+        "endpoint": "api/v1/hacienda/consulta",
+        "opciones": {**_PERIODO, "default_proxy": False},
+    },
+    "liquidacion_granos": {
+        "job": LiquidacionGranosJob,
+        "endpoint": "api/v1/liquidacion_granos/consulta",
+        "opciones": {**_PERIODO, "default_proxy": False},
+    },
+    "mis_facilidades": {
+        "job": MisFacilidadesJob,
+        "endpoint": "api/v1/mis_facilidades/consulta",
+        "opciones": {"default_proxy": False},
+    },
+    "mis_retenciones": {
+        "job": MisRetencionesJob,
+        "endpoint": "api/v1/mis_retenciones/consulta",
+        "opciones": {**_PERIODO, "default_proxy": False},
+    },
+    "pago_devoluciones": {
+        "job": PagoDevolucionesJob,
+        "endpoint": "api/v1/pago_devoluciones/consulta",
+        "opciones": {"default_proxy": False, "default_carga_minio": True},
+    },
+    "rcel": {
+        "job": RcelJob,
+        "endpoint": "api/v1/rcel/consulta",
+        "opciones": {**_PERIODO, "b64_pdf": False, "minio_upload": True, "default_proxy": False},
+    },
+    "sct": {
+        "job": SctJob,
+        "endpoint": "api/v1/sct/consulta",
+        # SctJob recibe estas opciones juntas en el dict "defaults"
+        "opciones": {
+            "deuda": True,
+            "vencimientos": True,
+            "presentacion": True,
+            "proxy": False,
+            "excel": True,
+            "csv": False,
+            "pdf": False,
+        },
+    },
+    "sifere": {
+        "job": SifereJob,
+        "endpoint": "api/v1/sifere/consulta",
+        "opciones": {"default_proxy": False},
+    },
+}
+
+
+def resolve_options(modulo: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Combina las opciones por defecto del modulo con overrides (texto o valores).
+    Los booleanos aceptan si/no/true/false/1/0; las fechas se normalizan a DD/MM/AAAA
+    y, si quedan vacias, toman el mismo periodo que la ventana (01/01 del año -> hoy).
+    """
+    spec = JOB_REGISTRY[modulo]
+    opciones = dict(spec["opciones"])
+    for key, value in (overrides or {}).items():
+        if key not in opciones:
+            raise ValueError(f"Opcion desconocida para {modulo}: {key} (validas: {', '.join(sorted(opciones)) or '-'})")
+        if isinstance(opciones[key], bool):
+            opciones[key] = value if isinstance(value, bool) else parse_bool_cell(value, default=opciones[key])
+        else:
+            opciones[key] = format_date_str(value) if key in _PERIODO else value
+    if "default_desde" in opciones and not opciones["default_desde"]:
+        opciones["default_desde"] = f"01/01/{date.today().year}"
+    if "default_hasta" in opciones and not opciones["default_hasta"]:
+        opciones["default_hasta"] = make_today_str()
+    return opciones
+
+
+def build_job(
+    modulo: str,
+    log,
+    base_url: str,
+    headers: Dict[str, str],
+    download_dir: str = "",
+    overrides: Optional[Dict[str, Any]] = None,
+):
+    """Instancia el RowJob del modulo con la misma configuracion que usaria su ventana."""
+    if modulo not in JOB_REGISTRY:
+        raise ValueError(f"Modulo desconocido: {modulo}")
+    spec = JOB_REGISTRY[modulo]
+    opciones = resolve_options(modulo, overrides)
+    job_cls = spec["job"]
+    if spec["endpoint"] is None:
+        return job_cls(log, base_url, headers)
+    url = ensure_trailing_slash(base_url) + spec["endpoint"]
+    if job_cls is SctJob:
+        return job_cls(log, url, headers, opciones)
+    return job_cls(log, url, headers, download_dir, **opciones)
@@ -0,0 +1,279 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import download_targets, format_throughput, prepare_download_dir
+
+
+def ensure_report_extension(name: str, ext: str) -> str:
+    clean = (name or "").strip()
+    if not clean:
+        clean = "reporte"
+    if not clean.lower().endswith(f".{ext}"):
+        clean = f"{clean}.{ext}"
+    return clean
+
+
+def resolve_variant(
+    data: Dict[str, Any],
+    outputs: Dict[str, bool],
+    prefix: str,
+    fmt: str,
+    dest_dir: str,
+    base_name: str,
+    cuit_repr: str,
+) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    """
+    Arma el destino de descarga ({"url", "dest_dir", "filename"}) de un bloque/formato.
+    Devuelve (None, None) si la variante no se pidio y (None, error) si falta el link o la carpeta.
+    """
+    ext_map = {"excel": "xls", "csv": "csv", "pdf": "pdf"}
+    ext = ext_map[fmt]
+    minio_flag = outputs.get(f"{prefix}_{fmt}_minio")
+    if not minio_flag:
+        return None, None
+
+    minio_keys = [f"{prefix}_{fmt}_minio_url", f"{prefix}_{fmt}_url_minio"]
+    url = None
+    for key in minio_keys:
+        candidate = data.get(key)
+        if isinstance(candidate, str):
+            candidate = candidate.strip()
+        if candidate:
+            url = candidate
+            break
+    if not url:
+        return None, f"Link inexistente o vacío ({' / '.join(minio_keys)})"
+
+    # Logic for filename fallback
+    if not base_name or not base_name.strip():
+        # Fallback to name from URL
+        base_from_url = unquote(os.path.basename(urlparse(url).path))
+        if not base_from_url:
+            base_from_url = f"{prefix}_{fmt}"
+        filename = ensure_report_extension(base_from_url, ext)
+    else:
+        filename = ensure_report_extension(base_name, ext)
+
+    final_dir, dir_msgs = prepare_download_dir("SCT", dest_dir or "", cuit_repr)
+    if not final_dir:
+        return None, "; ".join(dir_msgs)
+
+    return {"url": url, "dest_dir": final_dir, "filename": filename}, None
+
+
+def process_downloads_per_block(
+    data: Dict[str, Any],
+    outputs: Dict[str, bool],
+    block_config: Dict[str, Dict[str, Any]],
+    cuit_repr: str,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Descarga en paralelo todas las variantes pedidas (hasta 3 bloques x excel/csv/pdf).
+    Devuelve (reporte de download_targets, errores).
+    """
+    targets: List[Dict[str, str]] = []
+    errors: List[str] = []
+    for prefix, cfg in block_config.items():
+        if not cfg.get("enabled"):
+            continue
+        dest_dir = cfg.get("path", "")
+        for fmt in ("excel", "csv", "pdf"):
+            target, err = resolve_variant(data, outputs, prefix, fmt, dest_dir, cfg.get("name", prefix), cuit_repr)
+            if target:
+                target["label"] = f"{prefix}-{fmt}"
+                targets.append(target)
+            elif err:
+                errors.append(f"{prefix}-{fmt}: {err}")
+    report = download_targets(targets)
+    errors.extend(report["errores"])
+    return report, errors
+
+
+def row_format_flags(
+    row: Optional[pd.Series] = None,
+    prefer_row: bool = False,
+    default_excel: bool = False,
+    default_csv: bool = False,
+    default_pdf: bool = False,
+) -> Tuple[bool, bool, bool]:
+    """
+    Calculates output flags based on row data or defaults.
+    Pass defaults as arguments to ensure thread safety when running in worker.
+    """
+    excel_enabled = default_excel
+    csv_enabled = default_csv
+    pdf_enabled = default_pdf
+
+    if row is not None:
+        def pick(key: str, current: bool) -> bool:
+            if key in row:
+                value = row.get(key)
+                if value is None or str(value).strip() == "":
+                    return current if not prefer_row else False
+                return parse_bool_cell(value, default=current if not prefer_row else False)
+            return current if not prefer_row else current
+
+        excel_enabled = pick("excel", excel_enabled)
+        csv_enabled = pick("csv", csv_enabled)
+        pdf_enabled = pick("pdf", pdf_enabled)
+
+    return excel_enabled, csv_enabled, pdf_enabled
+
+
+def build_output_flags(
+    include_deuda: bool,
+    include_vencimientos: bool,
+    include_ddjj: bool,
+    excel_enabled: bool,
+    csv_enabled: bool,
+    pdf_enabled: bool,
+) -> Tuple[Dict[str, bool], bool]:
+    outputs: Dict[str, bool] = {
+        "vencimientos_excel_minio": False,
+        "vencimientos_csv_minio": False,
+        "vencimientos_pdf_minio": False,
+        "deudas_excel_minio": False,
+        "deudas_csv_minio": False,
+        "deudas_pdf_minio": False,
+        "ddjj_pendientes_excel_minio": False,
+        "ddjj_pendientes_csv_minio": False,
+        "ddjj_pendientes_pdf_minio": False,
+    }
+
+    selected = False
+
+    def apply(prefix: str, enabled: bool) -> None:
+        nonlocal selected
+        if not enabled:
+            return
+        if excel_enabled:
+            outputs[f"{prefix}_excel_minio"] = True
+            selected = True
+        if csv_enabled:
+            outputs[f"{prefix}_csv_minio"] = True
+            selected = True
+        if pdf_enabled:
+            outputs[f"{prefix}_pdf_minio"] = True
+            selected = True
+
+    apply("deudas", include_deuda)
+    apply("vencimientos", include_vencimientos)
+    apply("ddjj_pendientes", include_ddjj)
+
+    return outputs, selected
+
+
+class SctJob(RowJob):
+    """
+    SCT: las descargas se resuelven por bloque (deudas / vencimientos / ddjj_pendientes)
+    con carpeta y nombre propios por fila, en lugar de la carpeta unica del resto de modulos.
+    """
+
+    MODULE_DIR = "SCT"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], defaults: Dict[str, bool]):
+        super().__init__(log, url, headers)
+        self.defaults = defaults
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        defaults = self.defaults
+        log = self.log
+        include_deuda = parse_bool_cell(row.get("deuda"), default=defaults["deuda"]) if "deuda" in row else defaults["deuda"]
+        include_venc = (
+            parse_bool_cell(row.get("vencimientos"), default=defaults["vencimientos"]) if "vencimientos" in row else defaults["vencimientos"]
+        )
+        include_ddjj = (
+            parse_bool_cell(row.get("presentacion_ddjj"), default=defaults["presentacion"])
+            if "presentacion_ddjj" in row
+            else defaults["presentacion"]
+        )
+
+        excel_fmt, csv_fmt, pdf_fmt = row_format_flags(
+            row,
+            prefer_row=True,
+            default_excel=defaults["excel"],
+            default_csv=defaults["csv"],
+            default_pdf=defaults["pdf"],
+        )
+
+        outputs, has_outputs = build_output_flags(include_deuda, include_venc, include_ddjj, excel_fmt, csv_fmt, pdf_fmt)
+        if not has_outputs:
+            log.log_error("Sin formato de salida seleccionado para esta fila")
+            return {
+                "result": {
+                    "cuit_representado": str(row.get("cuit_representado", "")).strip(),
+                    "http_status": None,
+                    "status": "sin_salida",
+                    "error_message": "Sin formato de salida seleccionado para esta fila",
+                }
+            }
+
+        block_config = {
+            "deudas": {
+                "enabled": include_deuda,
+                "path": str(row.get("ubicacion_deuda") or row.get("ubicacion_deudas") or ""),
+                "name": str(row.get("nombre_deuda") or row.get("nombre_deudas") or ""),
+            },
+            "vencimientos": {
+                "enabled": include_venc,
+                "path": str(row.get("ubicacion_vencimientos") or ""),
+                "name": str(row.get("nombre_vencimientos") or ""),
+            },
+            "ddjj_pendientes": {
+                "enabled": include_ddjj,
+                "path": str(row.get("ubicacion_ddjj") or row.get("ubicacion_presentacion_ddjj") or ""),
+                "name": str(row.get("nombre_ddjj") or row.get("nombre_presentacion_ddjj") or ""),
+            },
+        }
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=defaults["proxy"])
+        payload = {
+            "cuit_login": str(row.get("cuit_login", "")).strip(),
+            "clave": str(row.get("clave", "")),
+            "cuit_representado": str(row.get("cuit_representado", "")).strip(),
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        payload.update(outputs)
+        log.log_info(f"Bloques activos -> deuda={include_deuda}, vencimientos={include_venc}, ddjj={include_ddjj}")
+        log.log_info(f"Salidas solicitadas -> {json.dumps(outputs, ensure_ascii=False)}")
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave",)),
+            "attempts": row_attempts(row),
+            "outputs": outputs,
+            "block_config": block_config,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_repr = request["payload"]["cuit_representado"]
+        downloads = 0
+        download_errors: List[str] = []
+        if isinstance(data, dict):
+            report, download_errors = process_downloads_per_block(
+                data, request["outputs"], request["block_config"], cuit_repr
+            )
+            downloads = report["descargas"]
+        if downloads:
+            self.log.log_info(f"Descargas completadas: {downloads} ({format_throughput(report)})")
+        for err in download_errors:
+            self.log.log_error(f"Descarga: {err}")
+
+        return {
+            "cuit_representado": cuit_repr,
+            "http_status": resp.get("http_status"),
+            "status": data.get("status") if isinstance(data, dict) else None,
+            "error_message": data.get("error_message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(download_errors) if download_errors else None,
+        }
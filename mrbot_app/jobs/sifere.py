@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from mrbot_app.bulk import RowJob, redact, row_attempts, row_download_dir
+from mrbot_app.helpers import parse_bool_cell
+from mrbot_app.minio_helpers import build_link, collect_minio_links
+
+TODAS_JURISDICCIONES = {"todas", "todas las", "todas_las", "all"}
+
+
+def optional_value(value: str) -> Optional[str]:
+    clean = (value or "").strip()
+    return clean if clean else None
+
+
+def coerce_jurisdiccion(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if text.endswith(".0") and text[:-2].isdigit():
+        text = text[:-2]
+    if text.isdigit():
+        return int(text)
+    return None
+
+
+def parse_jurisdicciones(value: Any) -> tuple[List[int], Optional[str]]:
+    if value is None:
+        return [], None
+    if isinstance(value, list):
+        items = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return [], None
+        if text.lower() in TODAS_JURISDICCIONES:
+            return list(range(901, 925)), None
+        text = text.replace(";", ",").replace("|", ",")
+        items = [part.strip() for part in text.split(",") if part.strip()]
+    jurisdicciones: List[int] = []
+    invalid: List[str] = []
+    for item in items:
+        if str(item).strip().lower() in TODAS_JURISDICCIONES:
+            return list(range(901, 925)), None
+        num = coerce_jurisdiccion(item)
+        if num is None or not (901 <= num <= 924):
+            invalid.append(str(item).strip())
+            continue
+        jurisdicciones.append(num)
+    if invalid:
+        invalid_text = ", ".join(invalid)
+        return [], f"Jurisdicciones invalidas: {invalid_text}. Deben ser enteros entre 901 y 924."
+    return jurisdicciones, None
+
+
+def extract_sifere_links(data: Any) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[tuple[str, str]] = set()
+    if isinstance(data, dict):
+        archivos_minio = data.get("archivos_minio")
+        if isinstance(archivos_minio, list):
+            for idx, item in enumerate(archivos_minio, start=1):
+                if not isinstance(item, dict):
+                    continue
+                for key, value in item.items():
+                    if isinstance(value, str) and value.strip().lower().startswith("http"):
+                        hint = key if isinstance(key, str) and "." in key else None
+                        link = build_link(value, hint, "sifere", idx)
+                        if link:
+                            link_key = (link["url"], link["filename"])
+                            if link_key not in seen:
+                                seen.add(link_key)
+                                links.append(link)
+    if not links:
+        links = collect_minio_links(data, "sifere")
+    return links
+
+
+class SifereJob(RowJob):
+    MODULE_DIR = "SIFERE"
+
+    def __init__(self, log, url: str, headers: Dict[str, str], download_dir: str = "", default_proxy: bool = False):
+        super().__init__(log, url, headers, download_dir)
+        self.default_proxy = default_proxy
+
+    def extract_links(self, data: Any) -> List[Dict[str, str]]:
+        return extract_sifere_links(data)
+
+    def build_request(self, row: pd.Series) -> Optional[Dict[str, Any]]:
+        cuit_rep = str(row.get("cuit_representante", "")).strip()
+        cuit_repr = str(row.get("cuit_representado", "")).strip()
+        jurisdicciones, error = parse_jurisdicciones(row.get("jurisdicciones", ""))
+        if error:
+            self.log.log_error(error)
+            return {
+                "result": {
+                    "cuit_representado": cuit_repr,
+                    "http_status": None,
+                    "success": False,
+                    "message": error,
+                    "descargas": 0,
+                    "errores_descarga": None,
+                    "carpeta_descarga": None,
+                }
+            }
+        proxy_request = None
+        if "proxy_request" in row.index:
+            proxy_request = parse_bool_cell(row.get("proxy_request"), default=self.default_proxy)
+        payload = {
+            "cuit_representante": cuit_rep,
+            "clave_representante": str(row.get("clave_representante", "")),
+            "cuit_representado": cuit_repr,
+            "periodo": str(row.get("periodo", "")).strip(),
+            "representado_nombre": optional_value(str(row.get("representado_nombre", ""))),
+            "jurisdicciones": jurisdicciones,
+            "carga_minio": True,
+        }
+        if proxy_request is not None:
+            payload["proxy_request"] = proxy_request
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": payload,
+            "safe_payload": redact(payload, ("clave_representante",)),
+            "attempts": row_attempts(row),
+            "cuit_folder": cuit_repr,
+        }
+
+    def handle_response(self, row: pd.Series, request: Dict[str, Any], resp: Dict[str, Any]) -> Dict[str, Any]:
+        data = resp.get("data", {})
+        cuit_repr = request["cuit_folder"]
+        downloads, errors, download_dir = self.process_downloads(data, cuit_repr, override_dir=row_download_dir(row))
+        self.log_download_summary(downloads, errors, download_dir, data)
+        return {
+            "cuit_representado": cuit_repr,
+            "http_status": resp.get("http_status"),
+            "success": data.get("success") if isinstance(data, dict) else None,
+            "message": data.get("message") if isinstance(data, dict) else None,
+            "descargas": downloads,
+            "errores_descarga": "; ".join(errors) if errors else None,
+            "carpeta_descarga": download_dir,
+        }
@@ -0,0 +1,147 @@
+"""
+Lector de los CSV de Mis Comprobantes (export de ARCA: separador ';', decimales con ',').
+
+- El encoding se detecta con una muestra de los primeros bytes (BOM, UTF-8 valido
+  o cp1252), sin reabrir el archivo por cada encoding probado.
+- Las columnas conocidas se leen con tipo explicito: importes y tipo de cambio como
+  float64; fecha, moneda y denominaciones como texto. El resto se infiere. Si algun
+  importe trae separador de miles (p. ej. "1.234,25"), los importes de ese archivo
+  se releen como texto y se convierten a float64 con las reglas de preparar_consolidado
+  (importes sin '.' de miles y vacios en 0; tipo de cambio con ',' decimal y vacio en 1).
+- Motor: con pyarrow instalado se usa su lector CSV multihilo; si no, el motor C
+  de pandas. CSV_ENGINE=c|pyarrow|auto en el .env lo fija (default auto).
+- Acepta el CSV o el ZIP descargado (lee el CSV de adentro sin extraerlo).
+"""
+import codecs
+import zipfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from mrbot_app.config import get_csv_engine
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - depende del entorno
+    pyarrow = None
+
+MUESTRA_BYTES = 64 * 1024
+SEPARADOR = ";"
+DECIMAL = ","
+COLUMNAS_TEXTO = ("Fecha de Emisión", "Moneda", "Denominación Receptor", "Denominación Emisor")
+COLUMNAS_IMPORTE = ("Tipo Cambio", "Otros Tributos", "Total IVA")
+PREFIJOS_IMPORTE = ("Imp. ", "IVA")
+
+
+def detectar_encoding(muestra: bytes) -> str:
+    """utf-8-sig si la muestra es UTF-8 (con o sin BOM); si no, cp1252 (export viejo de ARCA)."""
+    if muestra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # final=False: un caracter cortado al final de la muestra no es un error
+        codecs.getincrementaldecoder("utf-8")().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8-sig"
+
+
+def tipos_columnas(columnas: List[str]) -> Dict[str, Any]:
+    """dtype para read_csv de las columnas MC conocidas presentes en el encabezado."""
+    tipos: Dict[str, Any] = {}
+    for columna in columnas:
+        if columna in COLUMNAS_TEXTO:
+            tipos[columna] = str
+        elif columna in COLUMNAS_IMPORTE or columna.startswith(PREFIJOS_IMPORTE):
+            tipos[columna] = "float64"
+    return tipos
+
+
+def motor_csv(engine: Optional[str] = None) -> str:
+    """Motor de read_csv a usar: "pyarrow" solo si esta instalado."""
+    engine = (engine or get_csv_engine()).lower()
+    if engine in ("pyarrow", "auto") and pyarrow is not None:
+        return "pyarrow"
+    return "c"
+
+
+def miembro_csv_de_zip(zip_ref: zipfile.ZipFile) -> Optional[str]:
+    """Nombre del CSV dentro del ZIP (el primero .csv, o el primer archivo); None si esta vacio."""
+    archivos_en_zip = zip_ref.namelist()
+    for archivo in archivos_en_zip:
+        if archivo.lower().endswith(".csv"):
+            return archivo
+    return archivos_en_zip[0] if archivos_en_zip else None
+
+
+@contextmanager
+def _abrir(path: str) -> Iterator[BinaryIO]:
+    # El CSV en modo binario; si path es el ZIP, el CSV de adentro (descomprime al vuelo)
+    if not path.lower().endswith(".zip"):
+        with open(path, "rb") as fuente:
+            yield fuente
+        return
+    with zipfile.ZipFile(path) as zip_ref:
+        miembro = miembro_csv_de_zip(zip_ref)
+        if miembro is None:
+            raise ValueError(f"El ZIP {path} esta vacio")
+        with zip_ref.open(miembro) as fuente:
+            yield fuente
+
+
+def leer_csv_mc(path: str, engine: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lee un CSV de Mis Comprobantes (o el ZIP que lo contiene) con encoding detectado
+    y columnas tipadas. engine: "c", "pyarrow" o "auto" (default CSV_ENGINE).
+    """
+    with _abrir(path) as fuente:
+        muestra = fuente.read(MUESTRA_BYTES)
+    if b"\x00" in muestra:
+        # cp1252 acepta cualquier byte: un archivo binario se leeria como basura
+        raise ValueError(f"{path} no es un CSV de texto")
+    encoding = detectar_encoding(muestra)
+    primera_linea = muestra.decode(encoding, errors="replace").splitlines()[0] if muestra else ""
+    opciones = {
+        "sep": SEPARADOR,
+        "decimal": DECIMAL,
+        "dtype": tipos_columnas([columna.strip('"') for columna in primera_linea.split(SEPARADOR)]),
+        "engine": motor_csv(engine),
+    }
+    try:
+        return _leer_con_tipos(path, encoding, opciones)
+    except UnicodeDecodeError:
+        # La muestra era UTF-8 pero el resto del archivo no
+        return _leer_con_tipos(path, "cp1252", opciones)
+
+
+def _leer_con_tipos(path: str, encoding: str, opciones: Dict[str, Any]) -> pd.DataFrame:
+    try:
+        with _abrir(path) as fuente:
+            return pd.read_csv(fuente, encoding=encoding, **opciones)
+    except UnicodeDecodeError:
+        raise
+    except ValueError:
+        # Un importe con separador de miles ("1.234,25") u otro texto: se releen los
+        # importes como texto y se convierten con las reglas de preparar_consolidado
+        importes = [columna for columna, tipo in opciones["dtype"].items() if tipo == "float64"]
+        dtype = {**opciones["dtype"], **{columna: str for columna in importes}}
+        with _abrir(path) as fuente:
+            data = pd.read_csv(fuente, encoding=encoding, **{**opciones, "dtype": dtype})
+        for columna in importes:
+            if columna == "Tipo Cambio":
+                data[columna] = tipo_cambio_a_float(data[columna])
+            else:
+                data[columna] = importe_a_float(data[columna])
+        return data
+
+
+def importe_a_float(valores: pd.Series) -> pd.Series:
+    """Importes en formato ARCA ("1.234,25") a float64; lo que no es un numero queda en 0."""
+    texto = valores.astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce").fillna(0).astype("float64")
+
+
+def tipo_cambio_a_float(valores: pd.Series) -> pd.Series:
+    """Tipo de cambio a float64: solo ',' decimal (el '.' no es de miles); lo que no es un numero queda en 1."""
+    texto = valores.astype(str).str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce").fillna(1).astype("float64")
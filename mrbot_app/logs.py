@@ -0,0 +1,163 @@
+"""
+Logs con bloques por contribuyente, compartidos por la GUI y la linea de comandos.
+
+LogMixin no depende de Tk: la clase que lo usa solo define _append_log_widget(text)
+para volcar el texto ya formateado (widget de la ventana, stdout, archivo...).
+"""
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, TextIO
+
+
+class LogMixin:
+    """
+    API de logs de las ventanas (log_info, log_error, log_block, ...).
+    Requiere self._log_block_local = threading.local() y _append_log_widget(text).
+    """
+
+    def _append_log_widget(self, text: str) -> None:
+        raise NotImplementedError
+
+    def _format_log_message(self, message: str) -> str:
+        if not message:
+            return ""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lines = str(message).splitlines() or [""]
+        formatted = "\n".join(
+            f"[{timestamp}] {line}" if line else f"[{timestamp}]"
+            for line in lines
+        )
+        return formatted + "\n"
+
+    def _format_precise_timestamp(self, value: Optional[datetime] = None) -> str:
+        dt = value or datetime.now()
+        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    def _log_block_stack(self) -> list:
+        stack = getattr(self._log_block_local, "stack", None)
+        if stack is None:
+            stack = []
+            self._log_block_local.stack = stack
+        return stack
+
+    @contextmanager
+    def log_block(self, label: str):
+        stack = self._log_block_stack()
+        block_label = str(label or "sin_identificador")
+        block = {"label": block_label, "lines": []}
+        stack.append(block)
+        self.log_message(f"EJECUCION INICIO: {self._format_precise_timestamp()}")
+        try:
+            yield
+        finally:
+            self.log_message(f"EJECUCION FIN: {self._format_precise_timestamp()}")
+            finished_block = stack.pop()
+            sep = "-" * 60
+            header = self._format_log_message(f"{sep}\nCONTRIBUYENTE: {block_label}\n{sep}")
+            content = header + "".join(finished_block["lines"])
+            content_with_gap = content + self._format_log_message("")
+            if stack:
+                stack[-1]["lines"].append(content_with_gap)
+            else:
+                self._append_log_widget(content_with_gap)
+
+    def run_with_log_block(self, label: str, fn: Callable, *args, **kwargs):
+        with self.log_block(label):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as exc:
+                self.log_error(f"Excepcion en bloque: {exc}")
+                return None
+
+    def _prefix_lines(self, prefix: str, message: str) -> str:
+        lines = str(message).splitlines() or [""]
+        return "\n".join(f"{prefix}{line}" if line else prefix.rstrip() for line in lines)
+
+    def log_message(self, message: str) -> None:
+        formatted = self._format_log_message(message)
+        stack = getattr(self._log_block_local, "stack", None)
+        if stack:
+            stack[-1]["lines"].append(formatted)
+            return
+        self._append_log_widget(formatted)
+
+    def log_info(self, message: str) -> None:
+        self.log_message(self._prefix_lines("INFO: ", message))
+
+    def log_error(self, message: str) -> None:
+        self.log_message(self._prefix_lines("ERROR: ", message))
+
+    def log_request(self, payload: Any, label: str = "REQUEST") -> None:
+        serialized = json.dumps(payload, ensure_ascii=False, default=str)
+        self.log_message(self._prefix_lines(f"{label}: ", serialized))
+
+    def log_response(self, http_status: Any, payload: Any) -> None:
+        serialized = json.dumps(payload, ensure_ascii=False, default=str)
+        self.log_message(self._prefix_lines("RESPONSE: ", f"HTTP {http_status} - {serialized}"))
+
+    def log_request_started(
+        self,
+        payload: Any,
+        label: str = "REQUEST",
+        started_at: Optional[datetime] = None,
+        attempt: Optional[int] = None,
+        total_attempts: Optional[int] = None,
+    ) -> None:
+        if attempt is not None and total_attempts is not None:
+            self.log_info(f"Intento {attempt}/{total_attempts}")
+        self.log_message(f"{label} INICIO: {self._format_precise_timestamp(started_at)}")
+        self.log_request(payload, label=label)
+
+    def log_response_finished(
+        self,
+        http_status: Any,
+        payload: Any,
+        finished_at: Optional[datetime] = None,
+    ) -> None:
+        self.log_message("")
+        self.log_message(f"RESPONSE FIN: {self._format_precise_timestamp(finished_at)}")
+        self.log_response(http_status, payload)
+        self.log_message("")
+
+    def log_start(self, title: str, details: Optional[Dict[str, Any]] = None) -> None:
+        detail_text = ""
+        if details:
+            detail_text = " | " + json.dumps(details, ensure_ascii=False, default=str)
+        self.log_message(f"INICIADOR: {title}{detail_text}")
+
+    def log_separator(self, label: str) -> None:
+        sep = "-" * 60
+        self.log_message(f"{sep}\nCONTRIBUYENTE: {label}\n{sep}")
+
+
+class ConsoleLogger(LogMixin):
+    """Logger sin Tk para la linea de comandos: escribe en stdout y, opcionalmente, en un archivo."""
+
+    def __init__(self, stream: Optional[TextIO] = None, log_file: Optional[str] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self._file = open(log_file, "a", encoding="utf-8") if log_file else None
+        self._write_lock = threading.Lock()
+        self._log_block_local = threading.local()
+        self.error_count = 0
+
+    def _append_log_widget(self, text: str) -> None:
+        if not text:
+            return
+        with self._write_lock:
+            self.stream.write(text)
+            self.stream.flush()
+            if self._file is not None:
+                self._file.write(text)
+                self._file.flush()
+
+    def log_error(self, message: str) -> None:
+        self.error_count += 1
+        super().log_error(message)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,273 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from mrbot_app.artifact_manifest import artifact_context, record_artifacts
+from mrbot_app.config import get_download_limits
+from mrbot_app.consulta import descargar_archivo_minio
+from mrbot_app.download_queue import get_download_queue
+from mrbot_app.helpers import get_unique_filename
+
+# Nombres reservados por descargas en curso (ruta completa) y semaforos por host
+_reserved_paths: Set[str] = set()
+_reserved_lock = threading.Lock()
+_host_semaphores: Dict[str, Tuple[int, threading.BoundedSemaphore]] = {}
+_host_lock = threading.Lock()
+# Archivos descargados por el hilo actual (ver record_downloads)
+_recorder = threading.local()
+
+
+def sanitize_identifier(value: str, fallback: str = "desconocido") -> str:
+    cleaned = re.sub(r"[^0-9A-Za-z._-]", "_", (value or "").strip())
+    cleaned = cleaned.strip("_")
+    return cleaned or fallback
+
+
+def _ensure_extension(name: str, url: str) -> str:
+    if "." in name:
+        return name
+    ext = os.path.splitext(urlparse(url).path)[1]
+    if ext:
+        return f"{name}{ext}"
+    return name
+
+
+def build_link(url: str, filename_hint: Optional[str], fallback_prefix: str, index: int) -> Optional[Dict[str, str]]:
+    if not isinstance(url, str):
+        return None
+    clean_url = url.strip()
+    if not clean_url.lower().startswith("http"):
+        return None
+    base = unquote(os.path.basename(urlparse(clean_url).path))
+    name = base.strip()
+    if not name:
+        hint = (filename_hint or "").strip() or f"{fallback_prefix}_{index}"
+        name = _ensure_extension(hint, clean_url)
+    return {"url": clean_url, "filename": name}
+
+
+def is_writable_dir(path: str) -> bool:
+    try:
+        if not path:
+            return False
+        os.makedirs(path, exist_ok=True)
+        probe = os.path.join(path, ".mrbot_write_test")
+        with open(probe, "w", encoding="utf-8") as fh:
+            fh.write("ok")
+        os.remove(probe)
+        return True
+    except Exception:
+        return False
+
+
+def prepare_download_dir(module_name: str, desired_path: str, cuit_repr: str) -> Tuple[Optional[str], List[str]]:
+    messages: List[str] = []
+    target = (desired_path or "").strip()
+    if target:
+        if is_writable_dir(target):
+            return target, messages
+        messages.append(f"No se pudo usar la carpeta indicada '{target}'. Se intentará con la ruta por defecto.")
+    fallback = os.path.join("descargas", module_name, sanitize_identifier(cuit_repr or "desconocido"))
+    if is_writable_dir(fallback):
+        messages.append(f"Usando carpeta por defecto: {fallback}")
+        return fallback, messages
+    messages.append(f"No se pudo preparar la ruta por defecto '{fallback}'.")
+    return None, messages
+
+
+def reserve_filename(dest_dir: str, filename: str) -> str:
+    """
+    Nombre libre en dest_dir (get_unique_filename) reservado hasta release_filename,
+    para que dos descargas concurrentes con el mismo nombre no se pisen.
+    """
+    with _reserved_lock:
+        unique = get_unique_filename(dest_dir, filename, taken=_reserved_paths)
+        _reserved_paths.add(os.path.join(dest_dir, unique))
+    return unique
+
+
+def release_filename(dest_dir: str, filename: str) -> None:
+    with _reserved_lock:
+        _reserved_paths.discard(os.path.join(dest_dir, filename))
+
+
+def _host_semaphore(url: str, per_host: int) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc.lower()
+    with _host_lock:
+        current = _host_semaphores.get(host)
+        if current is None or current[0] != per_host:
+            current = (per_host, threading.BoundedSemaphore(per_host))
+            _host_semaphores[host] = current
+        return current[1]
+
+
+def _download_target(target: Dict[str, str], per_host: int) -> Dict[str, Any]:
+    url = target.get("url")
+    dest_dir = target.get("dest_dir") or ""
+    filename = target.get("filename") or "archivo"
+    if not url:
+        return {"success": False, "filename": filename, "label": target.get("label") or filename, "error": "URL vacía"}
+    filename_unique = reserve_filename(dest_dir, filename)
+    try:
+        with _host_semaphore(url, per_host):
+            res = descargar_archivo_minio(url, os.path.join(dest_dir, filename_unique))
+    finally:
+        release_filename(dest_dir, filename_unique)
+    res["filename"] = filename
+    res["label"] = target.get("label") or filename
+    return res
+
+
+@contextmanager
+def record_downloads():
+    """
+    Junta en una lista las rutas descargadas por download_targets desde el hilo actual
+    (las descargas de una fila del motor masivo ocurren en el hilo de esa fila).
+    """
+    previous = getattr(_recorder, "files", None)
+    files: List[str] = []
+    _recorder.files = files
+    try:
+        yield files
+    finally:
+        _recorder.files = previous
+
+
+def download_targets(
+    targets: List[Dict[str, str]],
+    max_workers: Optional[int] = None,
+    per_host: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Descarga en paralelo una lista de {"url", "dest_dir", "filename"} ("label" opcional
+    para prefijar los errores; por defecto el nombre de archivo).
+    Las descargas corren en la cola compartida del proceso (download_queue), con a lo
+    sumo DOWNLOAD_MAX_WORKERS archivos del lote en vuelo y un tope de conexiones por
+    host (DOWNLOAD_MAX_PER_HOST) compartido por todo el proceso.
+    Los archivos descargados se registran en el manifiesto (ver artifact_context).
+    Devuelve {"descargas", "errores", "bytes", "segundos"}.
+    """
+    default_workers, default_per_host = get_download_limits()
+    workers = max(1, min(max_workers or default_workers, len(targets) or 1))
+    host_limit = max(1, per_host or default_per_host)
+    report: Dict[str, Any] = {"descargas": 0, "errores": [], "bytes": 0, "segundos": 0.0}
+    if not targets:
+        return report
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_download_target(target, host_limit) for target in targets]
+    else:
+        results = get_download_queue().map(lambda target: _download_target(target, host_limit), targets, window=workers)
+    report["segundos"] = time.perf_counter() - started
+
+    recorded = getattr(_recorder, "files", None)
+    downloaded: List[str] = []
+    for res in results:
+        if res.get("success"):
+            report["descargas"] += 1
+            report["bytes"] += int(res.get("size") or 0)
+            downloaded.append(res.get("destino"))
+        else:
+            report["errores"].append(f"{res.get('label')}: {res.get('error') or 'Error al descargar'}")
+    if recorded is not None:
+        recorded.extend(downloaded)
+    record_artifacts(downloaded)
+    return report
+
+
+def format_throughput(report: Dict[str, Any]) -> str:
+    """Resumen legible de un reporte de download_targets (archivos, MB, MB/s)."""
+    megabytes = report.get("bytes", 0) / (1024 * 1024)
+    seconds = report.get("segundos", 0.0)
+    speed = megabytes / seconds if seconds > 0 else 0.0
+    return f"{report.get('descargas', 0)} archivo(s), {megabytes:.1f} MB en {seconds:.1f} s ({speed:.1f} MB/s)"
+
+
+def download_links(
+    links: List[Dict[str, str]],
+    dest_dir: Optional[str],
+    log_fn: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, List[str]]:
+    if not dest_dir:
+        return 0, ["No hay ruta de descarga disponible."]
+    targets = [
+        {"url": link.get("url"), "dest_dir": dest_dir, "filename": link.get("filename") or "archivo"}
+        for link in links
+    ]
+    report = download_targets(targets)
+    if log_fn and report["descargas"]:
+        log_fn(f"Throughput descargas: {format_throughput(report)}")
+    return report["descargas"], report["errores"]
+
+
+def process_downloads(
+    links: List[Dict[str, str]],
+    module_name: str,
+    desired_path: str,
+    cuit_repr: str,
+    log_fn: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, List[str], Optional[str]]:
+    """
+    Prepara la carpeta de descarga (con fallback por defecto) y descarga los links.
+    Devuelve (descargas_ok, errores, carpeta_usada).
+    """
+    if not links:
+        return 0, [], None
+    download_dir, dir_msgs = prepare_download_dir(module_name, desired_path, cuit_repr)
+    if log_fn:
+        for msg in dir_msgs:
+            log_fn(msg)
+    with artifact_context(modulo=module_name, cuit=cuit_repr):
+        downloads, errors = download_links(links, download_dir, log_fn=log_fn)
+    return downloads, errors, download_dir
+
+
+def collect_minio_links(data: Any, fallback_prefix: str) -> List[Dict[str, str]]:
+    links: List[Dict[str, str]] = []
+    seen: set[Tuple[str, str]] = set()
+
+    def looks_like_download(url: str, key: Optional[str]) -> bool:
+        lowered = url.lower()
+        if "minio" in lowered:
+            return True
+        if key and "minio" in key.lower():
+            return True
+        if lowered.split("?")[0].endswith((".pdf", ".xls", ".xlsx", ".csv", ".zip")):
+            return True
+        if key and key.lower().endswith(("url", "link")):
+            return True
+        return False
+
+    def add(url: str, hint: Optional[str]) -> None:
+        link = build_link(url, hint, fallback_prefix, len(links) + 1)
+        if not link:
+            return
+        key = (link["url"], link["filename"])
+        if key in seen:
+            return
+        seen.add(key)
+        links.append(link)
+
+    def walk(obj: Any) -> None:
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if isinstance(v, (dict, list)):
+                    walk(v)
+                elif isinstance(v, str):
+                    if v.strip().lower().startswith("http") and looks_like_download(v, str(k)):
+                        hint = k if isinstance(k, str) and "." in k else None
+                        add(v, hint)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+        elif isinstance(obj, str):
+            if obj.strip().lower().startswith("http") and looks_like_download(obj, None):
+                add(obj, None)
+
+    walk(data)
+    return links
@@ -9,8 +9,12 @@ import pandas as pd
 import requests
 from dotenv import load_dotenv
 
+from mrbot_app.artifact_manifest import artifact_context, record_artifacts
 from mrbot_app.consulta import descargar_archivos_minio_concurrente
-from mrbot_app.helpers import format_date_str
+from mrbot_app.helpers import copy_zip_member, format_date_str
+from mrbot_app.job_store import JobStore, payload_hash
+from mrbot_app.lector_csv_mc import MUESTRA_BYTES, detectar_encoding, miembro_csv_de_zip
+from mrbot_app.rate_limit import get_api_limiter
 
 
 load_dotenv(".env", override=True)
@@ -180,7 +184,9 @@ def consulta_mc(
     _log_request(safe_payload, log_fn)
     _log_message("", log_fn)
 
-    response = requests.post(url, headers=headers, json=payload)
+    with get_api_limiter().slot() as outcome:
+        response = requests.post(url, headers=headers, json=payload)
+        outcome["http_status"] = response.status_code
     http_status = response.status_code
     response_end = datetime.now()
 
@@ -215,61 +221,56 @@ def save_to_csv(data, filename):
             writer.writerows(data)
 
 
-def leer_csv_con_encoding(archivo, log_fn: Optional[Callable[[str], None]] = None):
+def leer_csv_con_encoding(archivo, log_fn: Optional[Callable[[str], None]] = None, delimitador: str = "|"):
     """
-    Intenta leer un archivo CSV con diferentes encodings.
-    Primero intenta cp1252, luego utf-8.
+    Lee un archivo CSV detectando el encoding (BOM/UTF-8 o cp1252) con una muestra
+    de los primeros bytes. Devuelve la lista de filas (dicts); el archivo ya queda cerrado.
     """
-    encodings = ["cp1252", "utf-8"]
-
-    for encoding in encodings:
+    try:
+        with open(archivo, "rb") as f:
+            encoding = detectar_encoding(f.read(MUESTRA_BYTES))
         try:
-            with open(archivo, "r", encoding=encoding) as f:
-                return csv.DictReader(f, delimiter="|")
+            with open(archivo, "r", encoding=encoding, newline="") as f:
+                return list(csv.DictReader(f, delimiter=delimitador))
         except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            _log_info(f"Advertencia: no se pudo leer archivo con encoding {encoding}: {e}", log_fn)
-            continue
-
-    raise ValueError(
-        f"No se pudo leer el archivo {archivo} con los encodings disponibles (cp1252, utf-8)"
-    )
+            # La muestra era UTF-8 pero el resto del archivo no
+            _log_info(f"Advertencia: {archivo} no es {encoding} completo, se lee como cp1252", log_fn)
+            with open(archivo, "r", encoding="cp1252", newline="") as f:
+                return list(csv.DictReader(f, delimiter=delimitador))
+    except (OSError, UnicodeDecodeError) as e:
+        raise ValueError(f"No se pudo leer el archivo {archivo}: {e}") from e
 
 
-def extraer_csv_de_zip(zip_path, destino_csv, log_fn: Optional[Callable[[str], None]] = None):
+def extraer_csv_de_zip(
+    zip_path,
+    destino_csv,
+    log_fn: Optional[Callable[[str], None]] = None,
+    encoding_origen: Optional[str] = None,
+    encoding_destino: Optional[str] = None,
+):
     """
     Extrae el único archivo CSV de un ZIP y lo guarda con el nombre especificado.
+    La copia es por bloques (no carga el CSV descomprimido en memoria).
 
     Args:
         zip_path: Ruta al archivo ZIP descargado
         destino_csv: Ruta completa donde guardar el CSV extraído
+        encoding_origen / encoding_destino: Opcionales; si se indican ambos (ej. "cp1252" -> "utf-8")
+            el CSV se re-codifica en la misma pasada.
 
     Returns:
         bool: True si se extrajo exitosamente, False en caso contrario
     """
     try:
         with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            archivos_en_zip = zip_ref.namelist()
+            archivo_csv = miembro_csv_de_zip(zip_ref)
 
-            if not archivos_en_zip:
+            if not archivo_csv:
                 _log_error(f"El ZIP {zip_path} esta vacio", log_fn)
                 return False
 
-            archivo_csv = None
-            for archivo in archivos_en_zip:
-                if archivo.lower().endswith(".csv"):
-                    archivo_csv = archivo
-                    break
-
-            if not archivo_csv:
-                archivo_csv = archivos_en_zip[0]
-
-            contenido = zip_ref.read(archivo_csv)
-
             os.makedirs(os.path.dirname(destino_csv), exist_ok=True)
-            with open(destino_csv, "wb") as f:
-                f.write(contenido)
+            copy_zip_member(zip_ref, archivo_csv, destino_csv, encoding_origen, encoding_destino)
 
             _log_info(f"Extraido: {os.path.basename(destino_csv)}", log_fn)
             return True
@@ -338,7 +339,10 @@ def consulta_mc_csv(
     progress_callback: Optional[Callable[[int, int], None]] = None,
     log_fn: Optional[Callable[[str], None]] = None,
     log_start: bool = True,
-):
+    show_summary: bool = True,
+    store: Optional[JobStore] = None,
+    reset: bool = False,
+) -> Optional[Dict[str, int]]:
     """
     Procesa el archivo Excel (o CSV legacy) de consultas masivas de Mis Comprobantes.
 
@@ -354,6 +358,12 @@ def consulta_mc_csv(
         progress_callback: Funcion opcional que recibe (current, total) para actualizar progreso.
         log_fn: Funcion opcional para registrar logs (UI/CLI).
         log_start: True para emitir un iniciador de proceso.
+        show_summary: True para mostrar el resumen final en un messagebox (False en modo consola).
+        store: JobStore opcional; registra cada fila y, si la corrida anterior del mismo archivo
+            quedo incompleta, omite las filas que ya terminaron bien.
+        reset: True para descartar el avance registrado y reprocesar todas las filas.
+
+    Devuelve {"total", "exitosos", "errores", "errores_api"} o None si no se pudo leer el archivo.
 
     El archivo Excel se lee con pandas. Si no existe, se intenta usar el CSV con cp1252 y luego utf-8.
     """
@@ -417,7 +427,7 @@ def consulta_mc_csv(
         _log_info("El archivo de configuracion no contiene filas para procesar", log_fn)
         if progress_callback:
             progress_callback(0, 0)
-        return
+        return {"total": 0, "exitosos": 0, "errores": 0, "errores_api": 0}
 
     filas_a_procesar = [dato for dato in datos_normalizados if _to_bool(dato.get("procesar", ""), default=False)]
     if not filas_a_procesar:
@@ -430,6 +440,15 @@ def consulta_mc_csv(
     if progress_callback:
         progress_callback(0, total_filas)
 
+    run = None
+    if store is not None:
+        run = store.open_run("mis_comprobantes", payload_hash("mis_comprobantes", filas_a_procesar), reset=reset)
+        if run.resumed:
+            _log_info(
+                f"Reanudando ejecucion anterior: {run.counts().get('ok', 0)} fila(s) ya completadas se omiten",
+                log_fn,
+            )
+
     errores = []
     errores2 = []
 
@@ -466,6 +485,24 @@ def consulta_mc_csv(
 
         label = f"{representado_nombre} ({representado_cuit})" if representado_cuit else representado_nombre
         _log_separator(label, log_fn)
+        request_info = {
+            "desde": desde,
+            "hasta": hasta,
+            "cuit_inicio_sesion": cuit_inicio_sesion,
+            "representado_nombre": representado_nombre,
+            "representado_cuit": representado_cuit,
+            "descarga_emitidos": descarga_emitidos,
+            "descarga_recibidos": descarga_recibidos,
+            "proxy_request": proxy_request,
+        }
+        row_key = payload_hash(request_info)
+        if run is not None:
+            if run.completed_result(row_key) is not None:
+                _log_info("Fila ya procesada correctamente en una ejecucion anterior: se omite", log_fn)
+                if progress_callback:
+                    progress_callback(idx, total_filas)
+                continue
+            run.mark_pending(row_key)
         _log_info(f"Periodo: {desde} - {hasta}", log_fn)
         _log_info(f"CUIT inicio sesion: {cuit_inicio_sesion}", log_fn)
         _log_info(
@@ -491,22 +528,10 @@ def consulta_mc_csv(
 
             if not response.get("success", False):
                 error_msg = response.get("error", response.get("detail", response.get("message", "Error desconocido")))
-                errores2.append(
-                    {
-                        "request": {
-                            "desde": desde,
-                            "hasta": hasta,
-                            "cuit_inicio_sesion": cuit_inicio_sesion,
-                            "representado_nombre": representado_nombre,
-                            "representado_cuit": representado_cuit,
-                            "descarga_emitidos": descarga_emitidos,
-                            "descarga_recibidos": descarga_recibidos,
-                            "proxy_request": proxy_request,
-                        },
-                        "error": str(error_msg),
-                    }
-                )
+                errores2.append({"request": request_info, "error": str(error_msg)})
                 _log_error(f"Error en la consulta: {error_msg}", log_fn)
+                if run is not None:
+                    run.record(row_key, False, response.get("http_status"), resultado={"error": str(error_msg)})
                 if progress_callback:
                     progress_callback(idx, total_filas)
                 continue
@@ -617,12 +642,16 @@ def consulta_mc_csv(
 
             if archivos_a_descargar:
                 _log_info(f"Descargando {len(archivos_a_descargar)} archivo(s) desde MinIO...", log_fn)
-                resultados_descarga = descargar_archivos_minio_concurrente(archivos_a_descargar, log_fn=log_fn)
+                with artifact_context(modulo="mis_comprobantes", cuit=representado_cuit, periodo=f"{desde} - {hasta}"):
+                    resultados_descarga = descargar_archivos_minio_concurrente(archivos_a_descargar, log_fn=log_fn)
 
                 _log_info("Extrayendo archivos CSV de los ZIPs...", log_fn)
                 for info in archivos_info:
                     if os.path.exists(info["zip"]):
                         if extraer_csv_de_zip(info["zip"], info["csv"], log_fn=log_fn):
+                            record_artifacts(
+                                [info["csv"]], modulo="mis_comprobantes", cuit=representado_cuit, periodo=f"{desde} - {hasta}"
+                            )
                             try:
                                 os.remove(info["zip"])
                             except Exception:
@@ -639,6 +668,9 @@ def consulta_mc_csv(
                 _log_info("No hay archivos de MinIO para descargar", log_fn)
 
             _log_info(f"Procesamiento completado para {representado_nombre}", log_fn)
+            if run is not None:
+                archivos = [info["csv"] for info in archivos_info if os.path.exists(info["csv"])]
+                run.record(row_key, True, 200, archivos, {"success": True})
             if progress_callback:
                 progress_callback(idx, total_filas)
 
@@ -646,6 +678,8 @@ def consulta_mc_csv(
             error_msg = f"Error en {representado_nombre} - {representado_cuit}: {str(e)}"
             errores.append(error_msg)
             _log_error(error_msg, log_fn)
+            if run is not None:
+                run.record(row_key, False, resultado={"error": error_msg})
             if progress_callback:
                 progress_callback(idx, total_filas)
 
@@ -661,15 +695,25 @@ def consulta_mc_csv(
 
     _log_message(f"{'-' * 60}\nProcesamiento masivo finalizado\n{'-' * 60}", log_fn)
 
+    if run is not None:
+        run.finish(not errores and not errores2)
+
+    total_procesados = len(filas_a_procesar)
+    resumen = {
+        "total": total_procesados,
+        "exitosos": total_procesados - len(errores) - len(errores2),
+        "errores": len(errores),
+        "errores_api": len(errores2),
+    }
+    if not show_summary:
+        return resumen
+
     try:
         from tkinter import messagebox
 
-        total_procesados = len(filas_a_procesar)
-        exitosos = total_procesados - len(errores) - len(errores2)
-
         mensaje = "Procesamiento completado\n\n"
         mensaje += f"Total procesados: {total_procesados}\n"
-        mensaje += f"Exitosos: {exitosos}\n"
+        mensaje += f"Exitosos: {resumen['exitosos']}\n"
 
         if errores:
             mensaje += f"Errores de ejecución: {len(errores)}\n"
@@ -684,3 +728,4 @@ def consulta_mc_csv(
             messagebox.showinfo("Procesamiento Exitoso", mensaje)
     except ImportError:
         pass
+    return resumen
@@ -0,0 +1,241 @@
+"""
+Limitador global de requests a la API de Mr Bot.
+
+Todas las ventanas comparten una sola instancia (get_api_limiter) que combina:
+- un token bucket (requests por segundo + rafaga), y
+- un controlador AIMD de concurrencia: suma 1 slot cada vez que se completa
+  una "ventana" de respuestas sanas (HTTP ok y latencia estable) y divide a la
+  mitad ante 429 / 5xx / timeouts o errores de conexion.
+
+safe_post/safe_get toman un slot del limitador en cada llamada, asi que el
+limite aplica tanto al motor masivo como a las consultas individuales.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from mrbot_app.config import get_api_rate_limits
+
+HISTORY_SIZE = 50
+# Una respuesta se considera lenta si supera LATENCY_FACTOR veces la latencia media
+LATENCY_FACTOR = 2.0
+LATENCY_ALPHA = 0.2
+
+
+def is_backoff_status(http_status: Optional[int]) -> bool:
+    """
+    429, 5xx y timeouts/errores de conexion (http_status None) piden bajar la concurrencia.
+    Un status que no es un entero no da ninguna senal: no pide bajar.
+    """
+    if http_status is None:
+        return True
+    if not isinstance(http_status, int) or isinstance(http_status, bool):
+        return False
+    return http_status == 429 or http_status >= 500
+
+
+class TokenBucket:
+    """Token bucket thread-safe. rate <= 0 desactiva el limite de requests por segundo."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Consume un token si hay; si no, devuelve los segundos a esperar (0.0 = concedido)."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self, abort_event=None) -> bool:
+        """Bloquea hasta obtener un token. Devuelve False si se aborto mientras esperaba."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return True
+            if abort_event is not None and abort_event.wait(min(wait, 0.5)):
+                return False
+            if abort_event is None:
+                time.sleep(wait)
+
+
+class AimdController:
+    """
+    Controla cuantas requests pueden estar en vuelo (additive increase /
+    multiplicative decrease). Los fallos de requests iniciadas antes de la
+    ultima reduccion se ignoran, para no dividir varias veces por la misma rafaga.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = min(self.maximum, max(self.minimum, int(initial)))
+        self.latency_target = float(latency_target)
+        self._clock = clock
+        self._in_flight = 0
+        self._healthy_streak = 0
+        self._latency_avg: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+        self._record(self.limit, "inicio")
+
+    def _record(self, limit: int, motivo: str) -> None:
+        self.history.append({"ts": time.time(), "limit": limit, "motivo": motivo})
+
+    def acquire(self, abort_event=None) -> Optional[float]:
+        """Espera un slot libre. Devuelve el instante de inicio o None si se aborto."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                if abort_event is not None and abort_event.is_set():
+                    return None
+                self._cond.wait(0.5)
+            self._in_flight += 1
+            return self._clock()
+
+    def cancel(self) -> None:
+        """Libera un slot sin contar la request (abortada antes de enviarse)."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify_all()
+
+    def _is_slow(self, latency: float) -> bool:
+        if self.latency_target > 0:
+            return latency > self.latency_target
+        return self._latency_avg is not None and latency > self._latency_avg * LATENCY_FACTOR
+
+    def release(self, started: float, http_status: Optional[int]) -> None:
+        """Libera el slot y ajusta el limite segun el resultado de la request."""
+        now = self._clock()
+        latency = max(0.0, now - started)
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if is_backoff_status(http_status):
+                self._healthy_streak = 0
+                if started >= self._last_decrease:
+                    new_limit = max(self.minimum, self.limit // 2)
+                    self._last_decrease = now
+                    motivo = "timeout" if http_status is None else f"HTTP {http_status}"
+                    if new_limit != self.limit:
+                        self.limit = new_limit
+                        self._record(new_limit, motivo)
+            else:
+                slow = self._is_slow(latency)
+                if self._latency_avg is None:
+                    self._latency_avg = latency
+                else:
+                    self._latency_avg += LATENCY_ALPHA * (latency - self._latency_avg)
+                if slow:
+                    self._healthy_streak = 0
+                else:
+                    self._healthy_streak += 1
+                    if self._healthy_streak >= self.limit and self.limit < self.maximum:
+                        self.limit += 1
+                        self._healthy_streak = 0
+                        self._record(self.limit, "aumento")
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "min": self.minimum,
+                "max": self.maximum,
+                "in_flight": self._in_flight,
+                "latency_avg": self._latency_avg,
+                "history": list(self.history),
+            }
+
+
+class ApiLimiter:
+    """Token bucket + controlador AIMD compartidos por todas las requests a la API."""
+
+    def __init__(self, rate: float, burst: int, initial: int, minimum: int, maximum: int, latency_target: float = 0.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.controller = AimdController(initial, minimum, maximum, latency_target)
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.controller.maximum
+
+    @contextmanager
+    def slot(self, abort_event=None):
+        """
+        with limiter.slot() as outcome: ...; outcome["http_status"] = status
+        Si no se asigna http_status la request cuenta como fallida (backoff).
+        """
+        started = self.controller.acquire(abort_event)
+        if started is None:
+            raise RuntimeError("Proceso abortado esperando turno de la API")
+        if not self.bucket.acquire(abort_event):
+            self.controller.cancel()
+            raise RuntimeError("Proceso abortado esperando turno de la API")
+        outcome: Dict[str, Any] = {"http_status": None}
+        try:
+            yield outcome
+        finally:
+            self.controller.release(started, outcome.get("http_status"))
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = self.controller.snapshot()
+        snap["rate"] = self.bucket.rate
+        return snap
+
+
+def format_limiter_status(snapshot: Dict[str, Any], history_len: int = 6) -> str:
+    """Texto corto para la UI: limite actual, rango, en vuelo y ultimos cambios."""
+    history: List[Dict[str, Any]] = snapshot.get("history") or []
+    recent = " > ".join(str(item["limit"]) for item in history[-history_len:])
+    text = (
+        f"API: {snapshot.get('in_flight', 0)}/{snapshot.get('limit')} en vuelo "
+        f"(rango {snapshot.get('min')}-{snapshot.get('max')})"
+    )
+    if history and history[-1]["motivo"] not in ("inicio", "aumento"):
+        text += f" | ultimo ajuste: {history[-1]['motivo']}"
+    if recent:
+        text += f" | historial: {recent}"
+    return text
+
+
+_limiter: Optional[ApiLimiter] = None
+_limiter_config: Optional[Tuple[Any, ...]] = None
+_limiter_lock = threading.Lock()
+
+
+def get_api_limiter() -> ApiLimiter:
+    """
+    Devuelve el limitador global. Igual que get_session(), si la configuracion
+    del .env cambia se crea uno nuevo; las requests en curso liberan su slot
+    en la instancia anterior.
+    """
+    global _limiter, _limiter_config
+    config = get_api_rate_limits()
+    with _limiter_lock:
+        if _limiter is None or _limiter_config != config:
+            rate, burst, initial, minimum, maximum, latency_target = config
+            _limiter = ApiLimiter(rate, burst, initial, minimum, maximum, latency_target)
+            _limiter_config = config
+        return _limiter
@@ -0,0 +1,132 @@
+"""
+Memoizacion del reporte del Control de Monotributistas por huella de entradas.
+
+Junto al reporte (carpeta oculta .mrbot_cache) se guarda:
+- un indice con la huella de la ultima corrida: CSV de MC y JSON de RCEL (ruta,
+  tamaño y fecha de modificacion), contenido de Categorias.xlsx, ventanas de
+  control y opciones, y el tamaño/fecha del reporte generado;
+- por cliente, su consolidado ya prorrateado y sus tablas parciales.
+
+Si la huella coincide y el reporte sigue igual en disco, no se regenera. Si solo
+cambiaron algunos clientes, se recalculan esos y el resto se toma de la memo.
+Las categorias se aplican despues de sumar los parciales, asi que cambiar solo
+las escalas de Categorias.xlsx no obliga a recalcular ningun cliente.
+CONTROL_MEMO=0 en el .env la desactiva.
+"""
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Iterable, Optional
+
+MEMO_DIRNAME = ".mrbot_cache"
+# Subir si cambia el calculo de preparar_consolidado/prorratear o lo que se guarda por cliente
+MEMO_VERSION = 1
+
+
+def huella_valor(valor: Any) -> str:
+    """sha256 de un valor serializable a JSON (claves ordenadas; lo demas como str)."""
+    crudo = json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(crudo.encode("utf-8")).hexdigest()
+
+
+def huella_archivos(paths: Iterable[str]) -> str:
+    """Huella de ruta + tamaño + fecha de modificacion de cada archivo (sin leerlos)."""
+    firmas = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            firmas.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            firmas.append([os.path.abspath(path), None, None])
+    return huella_valor(firmas)
+
+
+def huella_contenido(path: str) -> str:
+    """sha256 del contenido del archivo (Categorias.xlsx es chico)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for bloque in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def _firma_salida(path: str) -> Optional[Dict[str, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class MemoReporte:
+    """Indice y entradas por cliente de la memo de un reporte (output_path)."""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        nombre = hashlib.sha1(os.path.basename(output_path).encode("utf-8")).hexdigest()[:12]
+        self.carpeta = os.path.join(os.path.dirname(os.path.abspath(output_path)), MEMO_DIRNAME, f"reporte-{nombre}")
+        self.indice_path = os.path.join(self.carpeta, "indice.json")
+        self.indice = self._leer_indice()
+
+    def _leer_indice(self) -> Dict[str, Any]:
+        try:
+            with open(self.indice_path, "r", encoding="utf-8") as fh:
+                indice = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return indice if indice.get("version") == MEMO_VERSION else {}
+
+    def _entrada_path(self, cliente: str) -> str:
+        return os.path.join(self.carpeta, hashlib.sha1(cliente.encode("utf-8")).hexdigest() + ".pkl")
+
+    def sin_cambios(self, huella: str) -> bool:
+        """La ultima corrida tuvo esta huella y el reporte sigue como se genero."""
+        if not self.indice or self.indice.get("huella") != huella:
+            return False
+        firma = _firma_salida(self.output_path)
+        return firma is not None and firma == self.indice.get("salida")
+
+    def cargar_cliente(self, cliente: str, huella: str) -> Optional[Dict[str, Any]]:
+        """Entrada del cliente si fue calculada con esta huella, si no None."""
+        try:
+            with open(self._entrada_path(cliente), "rb") as fh:
+                entrada = pickle.load(fh)
+        except Exception:
+            # Entrada corrupta o de otra version de pandas: se recalcula
+            return None
+        return entrada["datos"] if entrada.get("huella") == huella else None
+
+    def guardar_cliente(self, cliente: str, huella: str, datos: Dict[str, Any]) -> None:
+        path = self._entrada_path(cliente)
+        temporal = path + ".part"
+        try:
+            os.makedirs(self.carpeta, exist_ok=True)
+            with open(temporal, "wb") as fh:
+                pickle.dump({"huella": huella, "datos": datos}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, path)
+        except Exception:
+            # Sin memo para este cliente: la proxima corrida lo recalcula
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+    def guardar_indice(self, huella: str, clientes: Dict[str, str]) -> None:
+        """Registra la corrida terminada y borra las entradas de clientes que ya no estan."""
+        vigentes = {os.path.basename(self._entrada_path(cliente)) for cliente in clientes}
+        if os.path.isdir(self.carpeta):
+            for nombre in os.listdir(self.carpeta):
+                if nombre.endswith(".pkl") and nombre not in vigentes:
+                    os.remove(os.path.join(self.carpeta, nombre))
+        self.indice = {
+            "version": MEMO_VERSION,
+            "huella": huella,
+            "clientes": clientes,
+            "salida": _firma_salida(self.output_path),
+        }
+        try:
+            os.makedirs(self.carpeta, exist_ok=True)
+            with open(self.indice_path + ".part", "w", encoding="utf-8") as fh:
+                json.dump(self.indice, fh, ensure_ascii=False)
+            os.replace(self.indice_path + ".part", self.indice_path)
+        except OSError:
+            pass
@@ -0,0 +1,213 @@
+"""
+Cache en disco (SQLite) de respuestas de la API, opcional (RESPONSE_CACHE=1).
+
+Sirve para re-ejecuciones cercanas del mismo CUIT/periodo (por ejemplo, al
+corregir una fila del Excel y volver a procesarlo): safe_post/safe_get devuelven
+la respuesta guardada sin gastar cuota ni esperar al backend.
+
+- Clave: metodo + URL + email + payload con las claves redactadas.
+- TTL por endpoint (primer segmento despues de api/v1/). Solo se cachean las
+  consultas (ruta con segmento "consulta") y endpoints con TTL explicito;
+  los endpoints de usuario nunca.
+- Tamaño acotado (RESPONSE_CACHE_MAX_MB) con desalojo LRU.
+- set_cache_bypass(True) (checkbox del ConfigPane) ignora la cache y no la actualiza.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from mrbot_app.config import get_response_cache_settings
+
+SECRET_KEYS = ("clave", "clave_representante", "contrasena", "clave_fiscal", "password")
+# TTL (segundos) por endpoint; el resto de las consultas usa RESPONSE_CACHE_TTL
+ENDPOINT_TTLS: Dict[str, int] = {
+    "apoc": 3600,
+    "consulta_cuit": 3600,
+    "ccma": 900,
+    "sct": 900,
+    "user": 0,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS respuestas (
+    clave TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    http_status INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    creada REAL NOT NULL,
+    expira REAL NOT NULL,
+    usada REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS respuestas_usada ON respuestas (usada);
+"""
+
+_bypass = threading.Event()
+
+
+def set_cache_bypass(enabled: bool) -> None:
+    """Activa/desactiva el bypass global (no se lee ni se escribe la cache)."""
+    if enabled:
+        _bypass.set()
+    else:
+        _bypass.clear()
+
+
+def is_cache_bypassed() -> bool:
+    return _bypass.is_set()
+
+
+def redact_secrets(value: Any) -> Any:
+    """Copia del payload con las claves reemplazadas por '***' (recursivo)."""
+    if isinstance(value, dict):
+        return {k: ("***" if k in SECRET_KEYS else redact_secrets(v)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact_secrets(item) for item in value]
+    return value
+
+
+def endpoint_name(url: str) -> str:
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if "v1" in parts:
+        parts = parts[parts.index("v1") + 1 :]
+    return parts[0] if parts else ""
+
+
+def endpoint_ttl(url: str, default_ttl: int, overrides: Optional[Dict[str, int]] = None) -> int:
+    """TTL en segundos para la URL (0 = no cachear)."""
+    name = endpoint_name(url)
+    if overrides and name in overrides:
+        return max(0, overrides[name])
+    if name in ENDPOINT_TTLS:
+        return ENDPOINT_TTLS[name]
+    segments = [part for part in urlparse(url).path.split("/") if part]
+    return max(0, default_ttl) if "consulta" in segments else 0
+
+
+def cache_key(method: str, url: str, headers: Optional[Dict[str, str]], payload: Any) -> str:
+    identity = (headers or {}).get("email", "")
+    raw = json.dumps(
+        [method.upper(), url, identity, redact_secrets(payload)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(http_status: Any, data: Any) -> bool:
+    return http_status == 200 and isinstance(data, dict) and data.get("success") is not False
+
+
+class ResponseCache:
+    """Cache SQLite con TTL por endpoint y desalojo LRU por tamaño total."""
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: int, ttl_overrides: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.max_bytes = max(0, int(max_bytes))
+        self.default_ttl = default_ttl
+        self.ttl_overrides = dict(ttl_overrides or {})
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def ttl_for(self, url: str) -> int:
+        return endpoint_ttl(url, self.default_ttl, self.ttl_overrides)
+
+    def get(self, method: str, url: str, headers: Optional[Dict[str, str]], payload: Any) -> Optional[Dict[str, Any]]:
+        if self.ttl_for(url) <= 0:
+            return None
+        key = cache_key(method, url, headers, payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT http_status, data, expira FROM respuestas WHERE clave = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            http_status, data, expira = row
+            if expira <= now:
+                self._conn.execute("DELETE FROM respuestas WHERE clave = ?", (key,))
+                return None
+            self._conn.execute("UPDATE respuestas SET usada = ? WHERE clave = ?", (now, key))
+        return {"http_status": http_status, "data": json.loads(data), "cached": True}
+
+    def put(self, method: str, url: str, headers: Optional[Dict[str, str]], payload: Any, resp: Dict[str, Any]) -> bool:
+        ttl = self.ttl_for(url)
+        if ttl <= 0 or not is_cacheable(resp.get("http_status"), resp.get("data")):
+            return False
+        data = json.dumps(resp.get("data"), ensure_ascii=False, default=str)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+        key = cache_key(method, url, headers, payload)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respuestas (clave, endpoint, http_status, data, tamano, creada, expira, usada) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint_name(url), resp["http_status"], data, size, now, now + ttl, now),
+            )
+            self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM respuestas WHERE expira <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Desalojo LRU: se borran las menos usadas hasta volver al limite
+        for key, size in self._conn.execute("SELECT clave, tamano FROM respuestas ORDER BY usada ASC").fetchall():
+            self._conn.execute("DELETE FROM respuestas WHERE clave = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()
+        return {"entradas": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM respuestas")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_config: Optional[Tuple[Any, ...]] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Devuelve la cache compartida, o None si esta desactivada (RESPONSE_CACHE distinto de 1)
+    o con bypass activo.
+    """
+    global _cache, _cache_config
+    if is_cache_bypassed():
+        return None
+    enabled, path, max_bytes, default_ttl, overrides = get_response_cache_settings()
+    if not enabled:
+        return None
+    config = (path, max_bytes, default_ttl, tuple(sorted(overrides.items())))
+    with _cache_lock:
+        if _cache is None or _cache_config != config:
+            try:
+                _cache = ResponseCache(path, max_bytes, default_ttl, overrides)
+            except (OSError, sqlite3.Error):
+                return None
+            _cache_config = config
+        return _cache
@@ -1,14 +1,13 @@
-import concurrent.futures
 import json
-from typing import Any, Dict, List, Optional
+from typing import Dict, Optional
 import os
 
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_get
+from mrbot_app.helpers import build_headers, df_preview, safe_get
+from mrbot_app.jobs.apocrifos import ApocrifosJob, apocrifos_url
 from mrbot_app.windows.base import BaseWindow
 from mrbot_app.windows.mixins import ExcelHandlerMixin
 
@@ -53,7 +52,7 @@ class ApocrifosWindow(BaseWindow, ExcelHandlerMixin):
         base_url, api_key, email = self._get_config()
         headers = build_headers(api_key, email)
         cuit = self.cuit_var.get().strip()
-        url = ensure_trailing_slash(base_url) + f"api/v1/apoc/consulta/{cuit}"
+        url = apocrifos_url(base_url, cuit)
 
         self.run_in_thread(self._worker_individual, url, headers)
 
@@ -80,48 +79,7 @@ class ApocrifosWindow(BaseWindow, ExcelHandlerMixin):
         self.run_in_thread(self._worker_excel, df_copy, base_url, headers)
 
     def _worker_excel(self, df, base_url, headers):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self._process_row_apocrifos, row, base_url, headers): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception as e:
-                    self.log_error(f"Error en fila {idx}: {e}")
-
-                self.set_progress(completed, total)
-
+        job = ApocrifosJob(self, base_url, headers)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
-
-    def _process_row_apocrifos(self, row, base_url, headers):
-        if self._abort_event.is_set():
-            return None
-
-        cuit = str(row.get("cuit", "")).strip()
-        url = ensure_trailing_slash(base_url) + f"api/v1/apoc/consulta/{cuit}"
-        resp = safe_get(url, headers)
-        data = resp.get("data", {})
-        return {
-            "cuit": cuit,
-            "http_status": resp.get("http_status"),
-            "apoc": data.get("apoc") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-        }
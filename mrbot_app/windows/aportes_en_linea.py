@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,9 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, parse_bool_cell, safe_post
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.aportes_en_linea import AportesEnLineaJob, extract_aportes_links, optional_value
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
@@ -87,19 +85,10 @@ class AportesEnLineaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        if isinstance(data, dict):
-            url = data.get("archivo_historico_minio_url")
-            link = build_link(url, "aportes_historico", "aportes", 1)
-            if link:
-                links.append(link)
-        if not links:
-            links = collect_minio_links(data, "aportes")
-        return links
+        return extract_aportes_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -161,96 +150,7 @@ class AportesEnLineaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self._process_row_aportes, row, url, headers, default_proxy): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception as e:
-                    self.log_error(f"Error en fila {idx}: {e}")
-
-                self.set_progress(completed, total)
-
+        job = AportesEnLineaJob(self, url, headers, self.download_dir_var.get(), default_proxy=default_proxy)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
-
-    def _process_row_aportes(self, row, url, headers, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_login = str(row.get("cuit_login", "")).strip()
-        cuit_repr = self._optional_value(str(row.get("cuit_representado", "")))
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        self.log_separator(cuit_repr or cuit_login)
-        payload = {
-            "cuit_login": cuit_login,
-            "clave": str(row.get("clave", "")),
-            "cuit_representado": cuit_repr,
-            "archivo_historico_b64": False,
-            "archivo_historico_minio": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave"] = "***"
-        self.log_request(safe_payload)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            if attempt > 1:
-                self.log_info(f"Reintentando... (Intento {attempt}/{total_attempts})")
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            if resp.get("http_status") == 200:
-                break
-
-        self.log_response(resp.get("http_status"), data)
-        cuit_folder = cuit_repr or cuit_login
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_folder, override_dir=row_download
-        )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "status": data.get("status") if isinstance(data, dict) else None,
-            "error_message": data.get("error_message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
@@ -1,22 +1,25 @@
-import json
 import os
 import threading
 import queue
-from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional, Callable
+from typing import Optional, Callable
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 
 import pandas as pd
 
+from mrbot_app.bulk import run_bulk
 from mrbot_app.config import DEFAULT_API_KEY, DEFAULT_BASE_URL, DEFAULT_EMAIL, reload_env_defaults
 from mrbot_app.constants import BG, FG
 from mrbot_app.helpers import _format_dates_str
+from mrbot_app.job_store import get_job_store
+from mrbot_app.logs import LogMixin
+from mrbot_app.rate_limit import format_limiter_status, get_api_limiter
+from mrbot_app.response_cache import is_cache_bypassed, set_cache_bypass
 
 
-class BaseWindow(tk.Toplevel):
+class BaseWindow(LogMixin, tk.Toplevel):
     def __init__(self, master=None, title: str = "", config_provider=None):
         super().__init__(master)
         self.config_provider = config_provider
@@ -90,117 +93,6 @@ class BaseWindow(tk.Toplevel):
 
         self.after(0, _update)
 
-    def _format_log_message(self, message: str) -> str:
-        if not message:
-            return ""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        lines = str(message).splitlines() or [""]
-        formatted = "\n".join(
-            f"[{timestamp}] {line}" if line else f"[{timestamp}]"
-            for line in lines
-        )
-        return formatted + "\n"
-
-    def _format_precise_timestamp(self, value: Optional[datetime] = None) -> str:
-        dt = value or datetime.now()
-        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
-    def _log_block_stack(self) -> list:
-        stack = getattr(self._log_block_local, "stack", None)
-        if stack is None:
-            stack = []
-            self._log_block_local.stack = stack
-        return stack
-
-    @contextmanager
-    def log_block(self, label: str):
-        stack = self._log_block_stack()
-        block_label = str(label or "sin_identificador")
-        block = {"label": block_label, "lines": []}
-        stack.append(block)
-        self.log_message(f"EJECUCION INICIO: {self._format_precise_timestamp()}")
-        try:
-            yield
-        finally:
-            self.log_message(f"EJECUCION FIN: {self._format_precise_timestamp()}")
-            finished_block = stack.pop()
-            sep = "-" * 60
-            header = self._format_log_message(f"{sep}\nCONTRIBUYENTE: {block_label}\n{sep}")
-            content = header + "".join(finished_block["lines"])
-            content_with_gap = content + self._format_log_message("")
-            if stack:
-                stack[-1]["lines"].append(content_with_gap)
-            else:
-                self._append_log_widget(content_with_gap)
-
-    def run_with_log_block(self, label: str, fn: Callable, *args, **kwargs):
-        with self.log_block(label):
-            try:
-                return fn(*args, **kwargs)
-            except Exception as exc:
-                self.log_error(f"Excepcion en bloque: {exc}")
-                return None
-
-    def _prefix_lines(self, prefix: str, message: str) -> str:
-        lines = str(message).splitlines() or [""]
-        return "\n".join(f"{prefix}{line}" if line else prefix.rstrip() for line in lines)
-
-    def log_message(self, message: str) -> None:
-        formatted = self._format_log_message(message)
-        stack = getattr(self._log_block_local, "stack", None)
-        if stack:
-            stack[-1]["lines"].append(formatted)
-            return
-        self._append_log_widget(formatted)
-
-    def log_info(self, message: str) -> None:
-        self.log_message(self._prefix_lines("INFO: ", message))
-
-    def log_error(self, message: str) -> None:
-        self.log_message(self._prefix_lines("ERROR: ", message))
-
-    def log_request(self, payload: Any, label: str = "REQUEST") -> None:
-        serialized = json.dumps(payload, ensure_ascii=False, default=str)
-        self.log_message(self._prefix_lines(f"{label}: ", serialized))
-
-    def log_response(self, http_status: Any, payload: Any) -> None:
-        serialized = json.dumps(payload, ensure_ascii=False, default=str)
-        self.log_message(self._prefix_lines("RESPONSE: ", f"HTTP {http_status} - {serialized}"))
-
-    def log_request_started(
-        self,
-        payload: Any,
-        label: str = "REQUEST",
-        started_at: Optional[datetime] = None,
-        attempt: Optional[int] = None,
-        total_attempts: Optional[int] = None,
-    ) -> None:
-        if attempt is not None and total_attempts is not None:
-            self.log_info(f"Intento {attempt}/{total_attempts}")
-        self.log_message(f"{label} INICIO: {self._format_precise_timestamp(started_at)}")
-        self.log_request(payload, label=label)
-
-    def log_response_finished(
-        self,
-        http_status: Any,
-        payload: Any,
-        finished_at: Optional[datetime] = None,
-    ) -> None:
-        self.log_message("")
-        self.log_message(f"RESPONSE FIN: {self._format_precise_timestamp(finished_at)}")
-        self.log_response(http_status, payload)
-        self.log_message("")
-
-    def log_start(self, title: str, details: Optional[Dict[str, Any]] = None) -> None:
-        detail_text = ""
-        if details:
-            detail_text = " | " + json.dumps(details, ensure_ascii=False, default=str)
-        self.log_message(f"INICIADOR: {title}{detail_text}")
-
-    def log_separator(self, label: str) -> None:
-        sep = "-" * 60
-        self.log_message(f"{sep}\nCONTRIBUYENTE: {label}\n{sep}")
-
     def add_progress_bar(self, parent, label: str = "Progreso") -> ttk.LabelFrame:
         style = ttk.Style(self)
         style.configure("Progress.TLabel", background="#1b1b1b", foreground="#ffffff")
@@ -223,8 +115,24 @@ class BaseWindow(tk.Toplevel):
         self.abort_btn.pack(side="left")
         self.throbber_frame.grid_remove() # Hide initially
 
+        # Estado del limitador global de la API (compartido por todas las ventanas)
+        self._api_status_var = tk.StringVar(value="")
+        ttk.Label(frame, textvariable=self._api_status_var, style="Progress.TLabel").grid(
+            row=1, column=0, columnspan=3, sticky="w", pady=(4, 0)
+        )
+        self._refresh_api_status()
+
         return frame
 
+    def _refresh_api_status(self) -> None:
+        try:
+            if not self.winfo_exists():
+                return
+            self._api_status_var.set(format_limiter_status(get_api_limiter().snapshot()))
+            self.after(1000, self._refresh_api_status)
+        except tk.TclError:
+            pass
+
     def add_collapsible_log(
         self,
         parent,
@@ -399,6 +307,23 @@ class BaseWindow(tk.Toplevel):
         t = threading.Thread(target=_wrapper, daemon=True)
         t.start()
 
+    def run_bulk_job(self, df: pd.DataFrame, job, max_concurrency: Optional[int] = None) -> list:
+        """
+        Procesa df con el motor masivo (mrbot_app.bulk) usando este BaseWindow
+        como logger, la barra de progreso y el evento de aborto de la ventana.
+        La corrida se registra en el JobStore: si se aborta, al reprocesar el mismo
+        Excel solo se reenvian las filas fallidas o pendientes.
+        Debe llamarse desde el hilo de trabajo (run_in_thread).
+        """
+        return run_bulk(
+            df,
+            job,
+            max_concurrency=max_concurrency,
+            progress_fn=self.set_progress,
+            abort_event=self._abort_event,
+            store=get_job_store(),
+        )
+
     def _on_thread_finished(self) -> None:
         """Called on main thread when worker thread finishes."""
         if self.throbber:
@@ -437,6 +362,15 @@ class ConfigPane(ttk.Frame):
         ttk.Label(self, text="Mail").grid(row=2, column=0, sticky="w", padx=4, pady=2)
         ttk.Entry(self, textvariable=self.email_var, width=40).grid(row=2, column=1, sticky="ew", padx=4, pady=2)
 
+        # Cache de respuestas (RESPONSE_CACHE=1 en .env): permite forzar consultas frescas
+        self.bypass_cache_var = tk.BooleanVar(value=is_cache_bypassed())
+        ttk.Checkbutton(
+            self,
+            text="Omitir caché de respuestas (consultar siempre a la API)",
+            variable=self.bypass_cache_var,
+            command=lambda: set_cache_bypass(bool(self.bypass_cache_var.get())),
+        ).grid(row=3, column=0, columnspan=2, sticky="w", padx=4, pady=2)
+
         self.columnconfigure(1, weight=1)
 
     def get_config(self) -> tuple[str, str, str]:
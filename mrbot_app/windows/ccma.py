@@ -1,47 +1,26 @@
-import concurrent.futures
 import json
 import os
-import re
-from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.formatos import aplicar_formato_encabezado, agregar_filtros, autoajustar_columnas
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, parse_bool_cell, safe_post
+from mrbot_app.formatos import escribir_excel
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.ccma import (
+    CcmaJob,
+    extract_ccma_links,
+    parse_amount,
+    parse_optional_bool,
+    resolve_cuit_label,
+    save_ccma_response_json,
+)
+from mrbot_app.minio_helpers import sanitize_identifier
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
-def _parse_amount(value: Any) -> Optional[float]:
-    """
-    Convierte strings con separador de miles y decimal a float.
-    Admite formatos tipo 22,307.22 (coma miles, punto decimal) y 22.307,22.
-    """
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    text = str(value).strip().replace("\xa0", "").replace(" ", "")
-    if text == "":
-        return None
-    try:
-        if "," in text and "." in text:
-            if text.rfind(".") > text.rfind(","):
-                text = text.replace(",", "")
-            else:
-                text = text.replace(".", "").replace(",", ".")
-        elif "," in text:
-            text = text.replace(".", "").replace(",", ".")
-        return float(text)
-    except Exception:
-        return None
-
-
 class CcmaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
     MODULE_DIR = "CCMA"
 
@@ -108,69 +87,19 @@ class CcmaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.log_text.configure(state="disabled")
 
     def _sanitize_filename_part(self, value: str, fallback: str = "desconocido") -> str:
-        cleaned = re.sub(r"[^0-9A-Za-z._-]", "_", (value or "").strip())
-        cleaned = cleaned.strip("_")
-        return cleaned or fallback
+        return sanitize_identifier(value, fallback)
 
     def _parse_optional_bool(self, value: Any) -> Optional[bool]:
-        if value is None:
-            return None
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                if pd.isna(value):
-                    return None
-            except Exception:
-                pass
-            return bool(value)
-        text = str(value).strip()
-        if not text:
-            return None
-        lowered = text.lower()
-        if lowered in {"true", "1", "si", "sí", "yes", "y"}:
-            return True
-        if lowered in {"false", "0", "no", "n"}:
-            return False
-        return None
+        return parse_optional_bool(value)
 
     def _resolve_cuit_label(self, cuit_repr: str, cuit_rep: str, data: Any) -> str:
-        if cuit_repr:
-            return cuit_repr
-        if isinstance(data, dict):
-            response_ccma = data.get("response_ccma")
-            if isinstance(response_ccma, dict):
-                cuit_data = str(response_ccma.get("cuit", "")).strip()
-                if cuit_data:
-                    return cuit_data
-        return cuit_rep
+        return resolve_cuit_label(cuit_repr, cuit_rep, data)
 
     def _save_ccma_response_json(self, dest_dir: Optional[str], cuit_label: str, data: Any) -> Tuple[Optional[str], Optional[str]]:
-        if not dest_dir:
-            return None, "No hay carpeta de descarga disponible."
-        try:
-            os.makedirs(dest_dir, exist_ok=True)
-            safe_cuit = self._sanitize_filename_part(cuit_label)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
-            filename = f"{safe_cuit}_{timestamp}.json"
-            path = os.path.join(dest_dir, filename)
-            with open(path, "w", encoding="utf-8") as fh:
-                json.dump(data, fh, ensure_ascii=False, indent=2, default=str)
-            return path, None
-        except Exception as exc:
-            return None, str(exc)
+        return save_ccma_response_json(dest_dir, cuit_label, data)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        if not isinstance(data, dict):
-            return []
-        response_obj = data.get("response_ccma", data)
-        if not isinstance(response_obj, dict):
-            return []
-        url = response_obj.get("pdf_url_minio")
-        if isinstance(url, str) and url.strip().lower().startswith("http"):
-            link = build_link(url, None, "ccma", 1)
-            return [link] if link else []
-        return []
+        return extract_ccma_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -268,196 +197,30 @@ class CcmaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         movimientos_rows: List[Dict[str, Any]] = []
         movimientos_requested = False
 
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_ccma,
-                    row,
-                    url,
-                    headers,
-                    movimientos_default,
-                    pdf_default,
-                    proxy_default,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if not result:
-                        self.set_progress(completed, total)
-                        continue
-                    result_row, result_movs, req_movs = result
-                    if result_row:
-                        rows.append(result_row)
-                    if result_movs:
-                        movimientos_rows.extend(result_movs)
-                    if req_movs:
-                        movimientos_requested = True
-                except Exception:
-                    pass
-                self.set_progress(completed, total)
+        job = CcmaJob(
+            self,
+            url,
+            headers,
+            self.download_dir_var.get(),
+            movimientos_default=movimientos_default,
+            pdf_default=pdf_default,
+            proxy_default=proxy_default,
+        )
+        for result in self.run_bulk_job(df, job):
+            if not result:
+                continue
+            result_row, result_movs, req_movs = result
+            if result_row:
+                rows.append(result_row)
+            if result_movs:
+                movimientos_rows.extend(result_movs)
+            if req_movs:
+                movimientos_requested = True
 
         # Post processing involves creating DataFrame and saving Excel, which is safe in thread as it doesn't touch UI directly except via log_error
         self._post_process_excel(rows, movimientos_rows, movimientos_requested)
         self.log_info("Procesamiento masivo finalizado.")
 
-    def _process_row_ccma(self, row, url, headers, movimientos_default, pdf_default, proxy_default):
-        if self._abort_event.is_set():
-            return None, [], False
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = str(row.get("cuit_representado", "")).strip()
-        movimientos_flag = parse_bool_cell(row.get("movimientos"), default=movimientos_default)
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=proxy_default)
-
-        # Special case for pdf flag from excel which could be None to use default
-        pdf_flag = self._parse_optional_bool(row.get("pdf"))
-        if pdf_flag is None:
-            pdf_flag = pdf_default
-
-        payload = {
-            "cuit_representante": cuit_rep,
-            "clave_representante": str(row.get("clave_representante", "")),
-            "cuit_representado": cuit_repr,
-            "movimientos": movimientos_flag,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        if pdf_flag:
-            payload["pdf"] = True
-
-        safe_payload = dict(payload)
-        safe_payload["clave_representante"] = "***"
-        self.log_separator(cuit_repr or cuit_rep)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        http_status = None
-
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            http_status = resp.get("http_status")
-            data = resp.get("data")
-            self.log_response_finished(http_status, data)
-            if http_status == 200:
-                break
-
-        if http_status != 200:
-            detail = resp.get("error") or resp.get("detail") or data
-            self.log_error(f"HTTP {http_status}: {detail}")
-
-        cuit_label = self._resolve_cuit_label(cuit_repr, cuit_rep, data)
-        row_download = str(
-            row.get("ubicacion_descarga")
-            or row.get("path_descarga")
-            or row.get("carpeta_descarga")
-            or ""
-        ).strip()
-
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_label, override_dir=row_download
-        )
-
-        json_path, json_error = self._save_ccma_response_json(download_dir, cuit_label, data)
-        if json_path:
-            self.log_info(f"JSON guardado: {json_path}")
-        if json_error:
-            self.log_error(f"JSON: {json_error}")
-
-        if downloads:
-            self.log_info(f"PDF descargado: {downloads} -> {download_dir}")
-        elif pdf_flag:
-            self.log_info("PDF: no se encontro link en la respuesta.")
-
-        for err in errors:
-            self.log_error(f"PDF: {err}")
-
-        row_result = {}
-        movs_result = []
-
-        if http_status == 200 and isinstance(data, dict):
-            # Extraer clave "response_ccma" si existe, para replicar ejemplo
-            response_obj = data.get("response_ccma", data)
-            if isinstance(response_obj, dict):
-                row_result = {
-                    "cuit_representante": cuit_rep,
-                    "cuit_representado": cuit_repr,
-                    "cuit": response_obj.get("cuit"),
-                    "periodo": response_obj.get("periodo"),
-                    "deuda_capital": _parse_amount(response_obj.get("deuda_capital")),
-                    "deuda_accesorios": _parse_amount(response_obj.get("deuda_accesorios")),
-                    "total_deuda": _parse_amount(response_obj.get("total_deuda")),
-                    "credito_capital": _parse_amount(response_obj.get("credito_capital")),
-                    "credito_accesorios": _parse_amount(response_obj.get("credito_accesorios")),
-                    "total_a_favor": _parse_amount(response_obj.get("total_a_favor")),
-                    "pdf_url_minio": response_obj.get("pdf_url_minio"),
-                    "response_json": json.dumps({"response_ccma": response_obj}, ensure_ascii=False),
-                    "movimientos_solicitados": movimientos_flag,
-                    "pdf_solicitado": pdf_flag,
-                    "error": None,
-                }
-                movimientos_list = response_obj.get("movimientos")
-                if movimientos_flag and isinstance(movimientos_list, list):
-                    for mov in movimientos_list:
-                        if not isinstance(mov, dict):
-                            continue
-                        movs_result.append(
-                            {
-                                "cuit_representante": cuit_rep,
-                                "cuit_representado": cuit_repr or response_obj.get("cuit"),
-                                **mov,
-                            }
-                        )
-            else:
-                row_result = {
-                    "cuit_representante": cuit_rep,
-                    "cuit_representado": cuit_repr,
-                    "movimientos_solicitados": movimientos_flag,
-                    "pdf_url_minio": None,
-                    "response_json": json.dumps(data, ensure_ascii=False),
-                    "pdf_solicitado": pdf_flag,
-                    "error": None,
-                }
-        else:
-            row_result = {
-                "cuit_representante": cuit_rep,
-                "cuit_representado": cuit_repr,
-                "movimientos_solicitados": movimientos_flag,
-                "pdf_url_minio": None,
-                "response_json": None,
-                "pdf_solicitado": pdf_flag,
-                "error": json.dumps(resp, ensure_ascii=False),
-            }
-
-        return row_result, movs_result, movimientos_flag
-
     def _post_process_excel(self, rows, movimientos_rows, movimientos_requested):
         out_df = pd.DataFrame(rows)
         movimientos_df = pd.DataFrame(movimientos_rows)
@@ -471,7 +234,7 @@ class CcmaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         ]
         for col in numeric_fields_ccma:
             if col in out_df.columns:
-                out_df[col] = out_df[col].apply(_parse_amount)
+                out_df[col] = out_df[col].apply(parse_amount)
         columnas_movimientos = [
             "cuit_representante",
             "cuit_representado",
@@ -492,25 +255,15 @@ class CcmaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
             movimientos_df = movimientos_df[mov_cols + otros_cols]
             for monto_col in ("debe", "haber"):
                 if monto_col in movimientos_df.columns:
-                    movimientos_df[monto_col] = movimientos_df[monto_col].apply(_parse_amount)
+                    movimientos_df[monto_col] = movimientos_df[monto_col].apply(parse_amount)
         # Guardar consolidado en ./descargas/ReporteCCMA.xlsx
         out_path = os.path.join("descargas/CCMA/", "ReporteCCMA.xlsx")
         try:
             os.makedirs("descargas/CCMA", exist_ok=True)
-            with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-                out_df.to_excel(writer, index=False, sheet_name="CCMA")
-                hojas_creadas = ["CCMA"]
-                if movimientos_requested or not movimientos_df.empty:
-                    movimientos_df.to_excel(writer, index=False, sheet_name="Movimientos")
-                    hojas_creadas.append("Movimientos")
-                for hoja_nombre in hojas_creadas:
-                    hoja = writer.sheets.get(hoja_nombre)
-                    if hoja is None:
-                        continue
-                    aplicar_formato_encabezado(hoja)
-                    agregar_filtros(hoja)
-                    if hoja_nombre == "Movimientos":
-                        autoajustar_columnas(hoja)
+            hojas = [{"nombre": "CCMA", "df": out_df, "anchos": False}]
+            if movimientos_requested or not movimientos_df.empty:
+                hojas.append({"nombre": "Movimientos", "df": movimientos_df, "moneda": ["debe", "haber"]})
+            escribir_excel(out_path, hojas)
         except Exception as exc:
             self.log_error(f"Error guardando ReporteCCMA.xlsx: {exc}")
             return
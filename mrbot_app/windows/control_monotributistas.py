@@ -1,18 +1,20 @@
 import concurrent.futures
 import os
-import glob
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
 from typing import Optional, Dict
 
-from mrbot_app.config import get_max_workers
+from mrbot_app.download_queue import rows_in_flight
+from mrbot_app.rate_limit import get_api_limiter
 from mrbot_app.windows.base import BaseWindow
 from mrbot_app.windows.mixins import ExcelHandlerMixin
 from mrbot_app.control_monotributistas import (
     procesar_descarga_mc,
     procesar_descarga_rcel,
-    generar_reporte_control
+    buscar_archivos_control,
+    generar_reporte_en_proceso,
+    PipelineMC,
 )
 from mrbot_app.constants import EXAMPLE_DIR
 
@@ -96,11 +98,15 @@ class ControlMonotributistasWindow(BaseWindow, ExcelHandlerMixin):
         df = self.excel_df
         total = len(df)
         self.set_progress(0, total)
-        max_workers = get_max_workers()
+        # Las consultas las acota el limitador; mientras una fila espera sus descargas
+        # (cola compartida) otras ya pueden consultar
+        max_workers = rows_in_flight(get_api_limiter().max_concurrency)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Extraccion y parseo a cache corren mientras siguen las descargas
+        with PipelineMC(abort_event=self._abort_event, log_fn=self.log_message) as pipeline, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
-                executor.submit(self._process_row_mc_control, row): idx
+                executor.submit(self._process_row_mc_control, row, pipeline): idx
                 for idx, (_, row) in enumerate(df.iterrows(), start=1)
             }
 
@@ -121,10 +127,10 @@ class ControlMonotributistasWindow(BaseWindow, ExcelHandlerMixin):
 
         self.log_info("Descarga MC finalizada.")
 
-    def _process_row_mc_control(self, row):
+    def _process_row_mc_control(self, row, pipeline=None):
         if self._abort_event.is_set():
             return
-        procesar_descarga_mc(row, log_fn=self.log_message)
+        procesar_descarga_mc(row, log_fn=self.log_message, pipeline=pipeline)
 
     def descargar_rcel(self) -> None:
         if self.excel_df is None or self.excel_df.empty:
@@ -141,7 +147,9 @@ class ControlMonotributistasWindow(BaseWindow, ExcelHandlerMixin):
         total = len(df)
         self.set_progress(0, total)
         config = self._get_config()  # (url, api_key, email)
-        max_workers = get_max_workers()
+        # Las consultas las acota el limitador; mientras una fila espera sus descargas
+        # (cola compartida) otras ya pueden consultar
+        max_workers = rows_in_flight(get_api_limiter().max_concurrency)
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
@@ -185,39 +193,14 @@ class ControlMonotributistasWindow(BaseWindow, ExcelHandlerMixin):
             self.clear_logs()
             self.log_start("Control Monotributistas", {"accion": "Generar Reporte"})
 
-            # Use 'descargas/RCEL' and 'descargas' generally as search paths?
-            # Or assume paths from Excel?
-            # The control function expects list of files.
-            # We need to find them.
-
-            # We can scan the whole 'descargas' folder or use specific paths if we knew them.
-            # Since `procesar_descarga_mc` defaults to `descargas/mis_compobantes` (fallback) or user defined.
-            # And `procesar_descarga_rcel` to `descargas/RCEL`.
-            # We'll scan recursively in 'descargas' or '.'?
-            # External repo scans `DOWNLOADS_MC_PATH` and `DOWNLOADS_RCEL_PATH`.
-
-            # Let's assume standard paths or ask user?
-            # Better: Scan 'descargas' directory recursively.
-
+            # Los archivos salen del manifiesto de descargas; "descargas" solo se
+            # recorre la primera vez para registrar descargas anteriores
             search_path = "descargas" if os.path.exists("descargas") else "."
 
             self.run_in_thread(self._worker_process, cat_path, search_path)
 
     def _worker_process(self, cat_path, search_path):
-        self.log_info(f"Buscando archivos en: {search_path}")
-
-        # MC: extraido/*.csv
-        archivos_mc = glob.glob(f"{search_path}/**/extraido/*.csv", recursive=True)
-        # RCEL: *.json
-        archivos_json = glob.glob(f"{search_path}/**/RCEL/**/*.json", recursive=True)
-        # Note: glob might be slow if many files.
-        # External repo glob: f"{downloads_mc_path}/**/extraido/*.csv"
-
-        # Fallback if RCEL is not in RCEL subfolder (user might have changed path)
-        if not archivos_json:
-             archivos_json = glob.glob(f"{search_path}/**/*.json", recursive=True)
-             # Filter out non-RCEL jsons? Rcel jsons usually are named like the pdf.
-             # We can rely on control logic to filter/match.
+        archivos_mc, archivos_json = buscar_archivos_control(search_path, log_fn=self.log_message)
 
         self.log_info(f"Encontrados: {len(archivos_mc)} CSVs (MC), {len(archivos_json)} JSONs (RCEL)")
 
@@ -231,10 +214,26 @@ class ControlMonotributistasWindow(BaseWindow, ExcelHandlerMixin):
 
         output_file = os.path.join(output_dir, "Reporte Recategorizaciones de Monotributistas.xlsx")
 
-        generar_reporte_control(
+        # En otro proceso: la ventana sigue respondiendo y "Abortar" mata la generación
+        generar_reporte_en_proceso(
             archivos_mc,
             archivos_json,
             cat_path,
             output_file,
-            log_fn=self.log_message
+            log_fn=self.log_message,
+            progress_fn=self._progreso_reporte,
+            abort_event=self._abort_event,
         )
+
+    def _progreso_reporte(self, evento: Dict) -> None:
+        etapa = evento.get("etapa")
+        if etapa == "cliente":
+            self.set_progress(evento["actual"], evento["total"])
+            return
+        if etapa == "fin":
+            self.log_info(f"Reporte listo en {evento.get('segundos', 0):.1f} s")
+            return
+        detalle = f"{evento['filas']} filas" if "filas" in evento else ""
+        if "archivos" in evento:
+            detalle = f"{evento['archivos']} archivos, {detalle}"
+        self.log_info(f"Etapa {etapa}: {evento.get('segundos', 0):.1f} s ({detalle})")
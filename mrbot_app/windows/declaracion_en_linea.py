@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,14 +6,14 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, parse_bool_cell, safe_post
-from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import (
-    build_link,
-    collect_minio_links,
-    sanitize_identifier,
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.declaracion_en_linea import (
+    DeclaracionEnLineaJob,
+    extract_ddjj_links,
+    optional_value,
+    save_json_from_data,
 )
+from mrbot_app.windows.base import BaseWindow
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
@@ -100,123 +99,13 @@ class DeclaracionEnLineaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMix
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        seen: set[tuple[str, str]] = set()
-        if isinstance(data, dict):
-            archivos = data.get("archivos")
-            if isinstance(archivos, list):
-                for idx, item in enumerate(archivos, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    candidates = {
-                        "ddjj_excel": item.get("link_minio_ddjj_excel"),
-                        "dj": item.get("link_minio_dj"),
-                        "vep": item.get("link_minio_vep"),
-                    }
-                    for label, url in candidates.items():
-                        link = build_link(url, label, "ddjj", idx)
-                        if link:
-                            key = (link["url"], link["filename"])
-                            if key not in seen:
-                                seen.add(key)
-                                links.append(link)
-        if not links:
-            links = collect_minio_links(data, "ddjj")
-        return links
-
-    def _json_filename_from_item(
-        self,
-        item: Dict[str, Any],
-        index: int,
-        header: Dict[str, Any],
-        cuit_repr: str,
-    ) -> str:
-        for key in ("link_minio_ddjj_excel", "link_minio_dj", "link_minio_vep"):
-            url = item.get(key)
-            if isinstance(url, str) and url.strip():
-                link = build_link(url, None, "ddjj", index)
-                if link:
-                    base = os.path.splitext(link["filename"][0] if isinstance(link["filename"], list) else link["filename"])[0]
-                    return f"{base}.json"
-        periodo = None
-        datos = item.get("datos")
-        if isinstance(datos, dict):
-            periodo = datos.get("periodo")
-            if not periodo:
-                datos_base = datos.get("datos")
-                if isinstance(datos_base, dict):
-                    periodo = datos_base.get("Mes - Año")
-        cuit = cuit_repr
-        if not cuit and isinstance(header, dict):
-            representado = header.get("Representado")
-            if isinstance(representado, dict):
-                cuit = representado.get("cuit")
-        parts = ["ddjj"]
-        if cuit:
-            parts.append(str(cuit))
-        if periodo:
-            parts.append(str(periodo))
-        parts.append(str(index))
-        name = "_".join(sanitize_identifier(p) for p in parts if p)
-        return f"{name}.json" if name else f"ddjj_{index}.json"
-
-    def _json_fallback_name(self, header: Dict[str, Any], cuit_repr: str) -> str:
-        periodo = None
-        if isinstance(header, dict):
-            periodo_info = header.get("Periodo")
-            if isinstance(periodo_info, dict):
-                periodo = periodo_info.get("periodo") or periodo_info.get("desde") or periodo_info.get("hasta")
-        parts = ["ddjj"]
-        if cuit_repr:
-            parts.append(str(cuit_repr))
-        if periodo:
-            parts.append(str(periodo))
-        name = "_".join(sanitize_identifier(p) for p in parts if p)
-        return f"{name}.json" if name else "ddjj.json"
+        return extract_ddjj_links(data)
 
     def _save_json_from_data(self, data: Any, download_dir: Optional[str], cuit_repr: str) -> tuple[int, List[str]]:
-        if not download_dir:
-            return 0, ["No hay ruta de descarga disponible."]
-        if not isinstance(data, dict) or not data:
-            return 0, []
-        header = data.get("header") if isinstance(data.get("header"), dict) else {}
-        archivos = data.get("archivos")
-        saved = 0
-        errors: List[str] = []
-        if isinstance(archivos, list) and archivos:
-            for idx, item in enumerate(archivos, start=1):
-                if not isinstance(item, dict):
-                    continue
-                payload = item.get("datos")
-                if not isinstance(payload, dict) or not payload:
-                    continue
-                filename = self._json_filename_from_item(item, idx, header, cuit_repr)
-                target = os.path.join(download_dir, filename)
-                try:
-                    with open(target, "w", encoding="utf-8") as fh:
-                        json.dump(
-                            {"header": header, "declaracion": payload},
-                            fh,
-                            ensure_ascii=False,
-                            indent=2,
-                        )
-                    saved += 1
-                except Exception as exc:
-                    errors.append(f"{filename}: {exc}")
-            if saved or errors:
-                return saved, errors
-        fallback_name = self._json_fallback_name(header, cuit_repr)
-        try:
-            with open(os.path.join(download_dir, fallback_name), "w", encoding="utf-8") as fh:
-                json.dump(data, fh, ensure_ascii=False, indent=2)
-            saved += 1
-        except Exception as exc:
-            errors.append(f"{fallback_name}: {exc}")
-        return saved, errors
+        return save_json_from_data(data, download_dir, cuit_repr)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -300,113 +189,8 @@ class DeclaracionEnLineaWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMix
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_ddjj,
-                    row,
-                    url,
-                    headers,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = DeclaracionEnLineaJob(self, url, headers, self.download_dir_var.get(), default_proxy=default_proxy)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_ddjj(self, row, url, headers, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = self._optional_value(str(row.get("cuit_representado", "")))
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        cuit_folder = cuit_repr or cuit_rep
-        payload = {
-            "cuit_representante": cuit_rep,
-            "clave_representante": str(row.get("clave_representante", "")),
-            "cuit_representado": cuit_repr,
-            "representado_nombre": self._optional_value(str(row.get("representado_nombre", ""))),
-            "periodo_desde": str(row.get("periodo_desde", "")).strip(),
-            "periodo_hasta": str(row.get("periodo_hasta", "")).strip(),
-            "carga_minio": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave_representante"] = "***"
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-
-            if resp.get("http_status") == 200:
-                break
-
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_folder, override_dir=row_download
-        )
-
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        json_saved, json_errors = self._save_json_from_data(data, download_dir, cuit_folder)
-        if json_saved:
-            self.log_info(f"JSON guardados: {json_saved} -> {download_dir}")
-        for err in json_errors:
-            self.log_error(f"JSON: {err}")
-
-        return {
-            "cuit_representado": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
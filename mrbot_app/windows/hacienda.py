@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,10 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, parse_bool_cell, safe_post
+from mrbot_app.bulk import redact
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, safe_post
+from mrbot_app.jobs.hacienda import HaciendaJob, extract_hacienda_links
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import (
     DateRangeHandlerMixin,
     DownloadHandlerMixin,
@@ -96,31 +95,10 @@ class HaciendaWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downl
         self.log_message(text)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        seen: set[tuple[str, str]] = set()
-        if isinstance(data, dict):
-            comprobantes = data.get("comprobantes")
-            if isinstance(comprobantes, list):
-                for idx, item in enumerate(comprobantes, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    url = item.get("url_minio")
-                    name_hint = item.get("archivo") or item.get("consulta")
-                    link = build_link(url, name_hint, "hacienda", idx)
-                    if link:
-                        key = (link["url"], link["filename"])
-                        if key not in seen:
-                            seen.add(key)
-                            links.append(link)
-        if not links:
-            links = collect_minio_links(data, "hacienda")
-        return links
+        return extract_hacienda_links(data)
 
     def _redact(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        safe = dict(payload)
-        if "clave" in safe:
-            safe["clave"] = "***"
-        return safe
+        return redact(payload, ("clave",))
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -193,110 +171,16 @@ class HaciendaWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downl
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_desde, default_hasta, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_desde, default_hasta, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("representado_cuit") or row.get("cuit_representado") or row.get("cuit_representante") or "").strip()
-                    or "sin_cuit",
-                    self._process_row_hacienda,
-                    row,
-                    url,
-                    headers,
-                    default_desde,
-                    default_hasta,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = HaciendaJob(
+            self,
+            url,
+            headers,
+            self.download_dir_var.get(),
+            default_desde=default_desde,
+            default_hasta=default_hasta,
+            default_proxy=default_proxy,
+        )
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_hacienda(self, row, url, headers, default_desde, default_hasta, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = str(row.get("representado_cuit") or row.get("cuit_representado") or "").strip()
-        desde = format_date_str(row.get("desde", "")) or default_desde
-        hasta = format_date_str(row.get("hasta", "")) or default_hasta
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-
-        payload = {
-            "desde": desde,
-            "hasta": hasta,
-            "cuit_representante": cuit_rep,
-            "denominacion": str(row.get("denominacion", "")).strip(),
-            "representado_cuit": cuit_repr,
-            "clave": str(row.get("clave", "")),
-            "minio_upload": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        self.log_separator(cuit_repr or cuit_rep or "sin_cuit")
-        safe_payload = self._redact(payload)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (TypeError, ValueError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp: Dict[str, Any] = {}
-        data: Dict[str, Any] = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        cuit_folder = cuit_repr or cuit_rep or "desconocido"
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_folder, override_dir=row_download, service_key="hacienda"
-        )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "representado_cuit": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
@@ -8,7 +8,10 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from urllib.parse import urlparse, unquote
 
-from mrbot_app.config import get_max_workers
+from mrbot_app.job_store import get_job_store, payload_hash
+from mrbot_app.minio_helpers import record_downloads
+from mrbot_app.download_queue import rows_in_flight
+from mrbot_app.rate_limit import get_api_limiter
 from mrbot_app.mis_comprobantes import consulta_mc
 from mrbot_app.helpers import (
     build_headers,
@@ -270,7 +273,7 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
         return errors
 
     def _download_links_direct(self, links: List[Dict[str, str]], dest_dir: str) -> tuple[int, List[str]]:
-        from mrbot_app.windows.minio_helpers import download_links
+        from mrbot_app.minio_helpers import download_links
         return download_links(links, dest_dir)
 
     def consulta_individual(self) -> None:
@@ -359,7 +362,18 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
     def _worker_excel(self, df, default_desde, default_hasta, default_proxy):
         total = len(df)
         self.set_progress(0, total)
-        max_workers = get_max_workers()
+        # Las consultas las acota el limitador; mientras una fila espera sus descargas
+        # (cola compartida) otras ya pueden consultar
+        max_workers = rows_in_flight(get_api_limiter().max_concurrency)
+
+        store = get_job_store()
+        run = None
+        if store is not None:
+            run_id = payload_hash("GuiDescargaMC", default_desde, default_hasta, default_proxy, df.to_json(orient="records", force_ascii=False))
+            run = store.open_run(self.MODULE_DIR, run_id)
+            if run.resumed:
+                self.log_info(f"Reanudando ejecucion anterior: {run.counts().get('ok', 0)} fila(s) ya completadas se omiten")
+        outcomes = []
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
@@ -379,6 +393,7 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
                     default_desde,
                     default_hasta,
                     default_proxy,
+                    run,
                 ): idx
                 for idx, (_, row) in enumerate(df.iterrows(), start=1)
             }
@@ -392,17 +407,20 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
                     break
 
                 try:
-                    future.result()
+                    outcomes.append(future.result())
                 except Exception:
-                    pass
+                    outcomes.append(False)
 
                 self.set_progress(completed, total)
 
+        if run is not None:
+            run.finish(len(outcomes) == total and all(outcomes) and not self._abort_event.is_set())
         self.log_info("Procesamiento masivo finalizado.")
 
-    def _process_row_mc(self, row, default_desde, default_hasta, default_proxy):
+    def _process_row_mc(self, row, default_desde, default_hasta, default_proxy, run=None) -> bool:
+        """Procesa una fila del Excel. Devuelve True si la consulta y las descargas terminaron bien."""
         if self._abort_event.is_set():
-            return
+            return False
 
         desde = format_date_str(row.get("desde", "")) or default_desde
         hasta = format_date_str(row.get("hasta", "")) or default_hasta
@@ -455,6 +473,16 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
 
         self.log_info(f"Periodo: {desde} - {hasta}")
 
+        row_key = payload_hash(
+            desde, hasta, cuit_inicio, nombre_repr, cuit_repr, d_emitidos, d_recibidos, proxy_request,
+            ub_emitidos, nom_emitidos, ub_recibidos, nom_recibidos, row_download,
+        )
+        if run is not None:
+            if run.completed_result(row_key) is not None:
+                self.log_info("Fila ya procesada correctamente en una ejecucion anterior: se omite")
+                return True
+            run.mark_pending(row_key)
+
         try:
             retry_val = int(row.get("retry", 0))
         except (ValueError, TypeError):
@@ -476,10 +504,15 @@ class GuiDescargaMC(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, Downlo
                 break
 
         # Use new processing method
-        self._process_response_excel(
-            response, cuit_repr, nombre_repr,
-            d_emitidos, d_recibidos,
-            ub_emitidos, nom_emitidos,
-            ub_recibidos, nom_recibidos,
-            fallback_dir
-        )
+        with record_downloads() as archivos:
+            errors = self._process_response_excel(
+                response, cuit_repr, nombre_repr,
+                d_emitidos, d_recibidos,
+                ub_emitidos, nom_emitidos,
+                ub_recibidos, nom_recibidos,
+                fallback_dir
+            )
+        ok = bool(response.get("success", False)) and not errors
+        if run is not None:
+            run.record(row_key, ok, response.get("http_status"), archivos, {"success": ok, "errores": errors})
+        return ok
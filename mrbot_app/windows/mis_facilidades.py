@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,14 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, parse_bool_cell, safe_post
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.mis_facilidades import (
+    MisFacilidadesJob,
+    extract_api_error,
+    extract_facilidades_links,
+    optional_value,
+)
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
@@ -90,54 +93,13 @@ class MisFacilidadesWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _extract_api_error(self, data: Any) -> Optional[str]:
-        if not isinstance(data, dict):
-            return None
-        raw = data.get("error")
-        if raw is None:
-            raw = data.get("errores")
-        if raw is None:
-            return None
-        if isinstance(raw, list):
-            parts = [str(item).strip() for item in raw if str(item).strip()]
-            return "; ".join(parts) if parts else None
-        if isinstance(raw, dict):
-            return json.dumps(raw, ensure_ascii=False)
-        text = str(raw).strip()
-        return text if text else None
+        return extract_api_error(data)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        seen: set[tuple[str, str]] = set()
-        if isinstance(data, dict):
-            archivos = data.get("archivos")
-            if isinstance(archivos, list):
-                for idx, item in enumerate(archivos, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    plan_num = str(item.get("plan_num", "")).strip()
-                    prefix = f"plan_{plan_num}_" if plan_num else ""
-                    candidates = {
-                        "tablas_excel": item.get("tablas_excel_url_minio"),
-                        "pagos_pdf": item.get("pagos_pdf_url_minio"),
-                        "cuotas_pdf": item.get("cuotas_pdf_url_minio"),
-                        "obligaciones_pdf": item.get("obligaciones_pdf_url_minio"),
-                        "obligaciones_previsionales_pdf": item.get("obligaciones_previsionales_pdf_url_minio"),
-                    }
-                    for label, url in candidates.items():
-                        hint = f"{prefix}{label}"
-                        link = build_link(url, hint, "facilidades", idx)
-                        if link:
-                            key = (link["url"], link["filename"])
-                            if key not in seen:
-                                seen.add(key)
-                                links.append(link)
-        if not links:
-            links = collect_minio_links(data, "facilidades")
-        return links
+        return extract_facilidades_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -211,109 +173,8 @@ class MisFacilidadesWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_login", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_facilidades,
-                    row,
-                    url,
-                    headers,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = MisFacilidadesJob(self, url, headers, self.download_dir_var.get(), default_proxy=default_proxy)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_facilidades(self, row, url, headers, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_login = str(row.get("cuit_login", "")).strip()
-        cuit_repr = self._optional_value(str(row.get("cuit_representado", "")))
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        self.log_separator(cuit_repr or cuit_login)
-        payload = {
-            "cuit_login": cuit_login,
-            "clave": str(row.get("clave", "")),
-            "cuit_representado": cuit_repr,
-            "denominacion": self._optional_value(str(row.get("denominacion", ""))),
-            "carga_minio": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave"] = "***"
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        api_error = self._extract_api_error(data)
-        if api_error:
-            self.log_error(api_error)
-        cuit_folder = cuit_repr or cuit_login
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_folder, override_dir=row_download
-        )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "error": api_error,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,16 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, parse_bool_cell, safe_post
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, safe_post
+from mrbot_app.jobs.mis_retenciones import (
+    ALLOWED_IMPUESTOS,
+    MisRetencionesJob,
+    coerce_impuesto,
+    extract_retenciones_links,
+    optional_value,
+    parse_impuestos,
+)
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import (
     DateRangeHandlerMixin,
     DownloadHandlerMixin,
@@ -20,7 +25,7 @@ from mrbot_app.windows.mixins import (
 
 class MisRetencionesWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, DownloadHandlerMixin):
     MODULE_DIR = "Mis_Retenciones"
-    ALLOWED_IMPUESTOS = ["216", "217", "219", "353", "767", "787"]
+    ALLOWED_IMPUESTOS = ALLOWED_IMPUESTOS
 
     def __init__(self, master=None, config_provider=None, example_paths: Optional[Dict[str, str]] = None):
         super().__init__(master, title="Mis Retenciones", config_provider=config_provider)
@@ -102,78 +107,16 @@ class MisRetencionesWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin,
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _coerce_impuesto(self, value: Any) -> Optional[str]:
-        if value is None or isinstance(value, bool):
-            return None
-        if isinstance(value, int):
-            return str(value)
-        if isinstance(value, float):
-            if value.is_integer():
-                return str(int(value))
-            return None
-        text = str(value).strip()
-        if not text:
-            return None
-        if text.endswith(".0") and text[:-2].isdigit():
-            text = text[:-2]
-        if text.isdigit():
-            return text
-        return None
+        return coerce_impuesto(value)
 
     def _parse_impuestos(self, value: Any) -> tuple[List[str], Optional[str]]:
-        if value is None:
-            return [], None
-        if isinstance(value, list):
-            items = value
-        else:
-            text = str(value).strip()
-            if not text:
-                return [], None
-            text = text.replace(";", ",").replace("|", ",")
-            items = [part.strip() for part in text.split(",") if part.strip()]
-
-        impuestos: List[str] = []
-        invalid: List[str] = []
-        allowed = set(self.ALLOWED_IMPUESTOS)
-
-        for item in items:
-            impuesto = self._coerce_impuesto(item)
-            if impuesto is None or impuesto not in allowed:
-                invalid.append(str(item).strip())
-                continue
-            if impuesto not in impuestos:
-                impuestos.append(impuesto)
-
-        if invalid:
-            valid_text = ", ".join(self.ALLOWED_IMPUESTOS)
-            invalid_text = ", ".join(invalid)
-            return [], f"Impuestos invalidos: {invalid_text}. Valores permitidos: {valid_text}."
-
-        return impuestos, None
+        return parse_impuestos(value, self.ALLOWED_IMPUESTOS)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        seen: set[tuple[str, str]] = set()
-        if isinstance(data, dict):
-            archivos = data.get("archivos")
-            if isinstance(archivos, list):
-                for idx, item in enumerate(archivos, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    url = item.get("url_minio")
-                    name_hint = item.get("archivo") or item.get("tipo") or item.get("impuesto_label")
-                    link = build_link(url, name_hint, "retencion", idx)
-                    if link:
-                        key = (link["url"], link["filename"])
-                        if key not in seen:
-                            seen.add(key)
-                            links.append(link)
-        if not links:
-            links = collect_minio_links(data, "retencion")
-        return links
+        return extract_retenciones_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -260,127 +203,16 @@ class MisRetencionesWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin,
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_desde, default_hasta, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_desde, default_hasta, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_retenciones,
-                    row,
-                    url,
-                    headers,
-                    default_desde,
-                    default_hasta,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = MisRetencionesJob(
+            self,
+            url,
+            headers,
+            self.download_dir_var.get(),
+            default_desde=default_desde,
+            default_hasta=default_hasta,
+            default_proxy=default_proxy,
+        )
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_retenciones(self, row, url, headers, default_desde, default_hasta, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = self._optional_value(str(row.get("cuit_representado", "")))
-        desde = format_date_str(row.get("desde", "")) or default_desde
-        hasta = format_date_str(row.get("hasta", "")) or default_hasta
-        impuestos, error = self._parse_impuestos(row.get("impuestos", ""))
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        self.log_separator(cuit_repr or cuit_rep)
-        if error:
-            self.log_error(error)
-            return {
-                "cuit_representado": cuit_repr or cuit_rep,
-                "http_status": None,
-                "success": False,
-                "message": error,
-                "descargas": 0,
-                "errores_descarga": None,
-                "carpeta_descarga": None,
-            }
-
-        payload = {
-            "cuit_representante": cuit_rep,
-            "clave_representante": str(row.get("clave_representante", "")),
-            "cuit_representado": cuit_repr,
-            "denominacion": str(row.get("denominacion", "")).strip(),
-            "desde": desde,
-            "hasta": hasta,
-            "impuestos": impuestos,
-            "carga_minio": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave_representante"] = "***"
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        cuit_folder = cuit_repr or cuit_rep
-
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_folder, override_dir=row_download, service_key="retencion"
-        )
-
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
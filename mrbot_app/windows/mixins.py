@@ -6,12 +6,12 @@ from typing import Any, Dict, List, Optional
 import pandas as pd
 from tkinter import filedialog, messagebox, ttk
 
+from mrbot_app.bulk import filter_procesar
 from mrbot_app.files import open_with_default_app
 from mrbot_app.helpers import df_preview, make_today_str
-from mrbot_app.windows.minio_helpers import (
+from mrbot_app.minio_helpers import (
     collect_minio_links,
-    download_links,
-    prepare_download_dir,
+    process_downloads,
 )
 
 
@@ -77,11 +77,7 @@ class ExcelHandlerMixin:
         """Filtra las filas donde la columna 'procesar' es afirmativa."""
         if df is None:
             return None
-        filtered = df
-        if "procesar" in filtered.columns:
-            procesar_series = filtered["procesar"].astype(str).str.strip().str.lower()
-            filtered = filtered[procesar_series.isin(["si", "sí", "yes", "y", "1"])]
-        return filtered
+        return filter_procesar(df)
 
 
 class DateRangeHandlerMixin:
@@ -152,12 +148,6 @@ class DownloadHandlerMixin:
             return 0, [], None
 
         target_dir = override_dir or self.download_dir_var.get()
-        download_dir, dir_msgs = prepare_download_dir(module_name, target_dir, cuit_repr)
-
         # Loggear mensajes de directorio si existe log_info
-        if hasattr(self, "log_info"):
-            for msg in dir_msgs:
-                self.log_info(msg)
-
-        downloads, errors = download_links(links, download_dir)
-        return downloads, errors, download_dir
+        log_fn = self.log_info if hasattr(self, "log_info") else None
+        return process_downloads(links, module_name, target_dir, cuit_repr, log_fn=log_fn)
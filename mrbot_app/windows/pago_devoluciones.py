@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,15 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
 from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.pago_devoluciones import (
+    PagoDevolucionesJob,
+    bool_cell,
+    extract_api_error,
+    extract_pago_devoluciones_links,
+    optional_value,
+)
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
@@ -89,49 +93,16 @@ class PagoDevolucionesWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _bool_cell(self, value: Any, default: bool) -> bool:
-        if isinstance(value, bool):
-            return value
-        text = str(value or "").strip().lower()
-        if text in {"si", "sí", "1", "true", "yes", "y"}:
-            return True
-        if text in {"no", "0", "false", "n"}:
-            return False
-        return default
+        return bool_cell(value, default)
 
     def _extract_api_error(self, data: Any) -> Optional[str]:
-        if not isinstance(data, dict):
-            return None
-        raw = data.get("error")
-        if raw is None:
-            return None
-        if isinstance(raw, list):
-            parts = [str(item).strip() for item in raw if str(item).strip()]
-            return "; ".join(parts) if parts else None
-        if isinstance(raw, dict):
-            return json.dumps(raw, ensure_ascii=False)
-        text = str(raw).strip()
-        return text if text else None
+        return extract_api_error(data)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        if isinstance(data, dict):
-            archivo = data.get("archivo")
-            if isinstance(archivo, dict):
-                link = build_link(
-                    archivo.get("url_minio"),
-                    archivo.get("nombre"),
-                    "pago_devoluciones",
-                    1,
-                )
-                if link:
-                    links.append(link)
-        if not links:
-            links = collect_minio_links(data, "pago_devoluciones")
-        return links
+        return extract_pago_devoluciones_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -211,114 +182,15 @@ class PagoDevolucionesWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_proxy, default_carga_minio)
 
     def _worker_excel(self, df, url, headers, default_proxy, default_carga_minio):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_pago_devoluciones,
-                    row,
-                    url,
-                    headers,
-                    default_proxy,
-                    default_carga_minio,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = PagoDevolucionesJob(
+            self,
+            url,
+            headers,
+            self.download_dir_var.get(),
+            default_proxy=default_proxy,
+            default_carga_minio=default_carga_minio,
+        )
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_pago_devoluciones(self, row, url, headers, default_proxy, default_carga_minio):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = self._optional_value(str(row.get("cuit_representado", "")))
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = self._bool_cell(row.get("proxy_request", ""), default_proxy)
-        carga_minio = self._bool_cell(row.get("carga_minio", ""), default_carga_minio)
-
-        payload = {
-            "cuit_representante": cuit_rep,
-            "clave_representante": str(row.get("clave_representante", "")),
-            "cuit_representado": cuit_repr,
-            "carga_minio": carga_minio,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave_representante"] = "***"
-        self.log_separator(cuit_repr or cuit_rep)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp: Dict[str, Any] = {}
-        data: Dict[str, Any] = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        api_error = self._extract_api_error(data)
-        if api_error:
-            self.log_error(api_error)
-
-        cuit_folder = cuit_repr or cuit_rep or "desconocido"
-        downloads, errors, download_dir = self._process_downloads(
-            data,
-            self.MODULE_DIR,
-            cuit_folder,
-            override_dir=row_download,
-            service_key="pago_devoluciones",
-        )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": cuit_folder,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "error": api_error,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
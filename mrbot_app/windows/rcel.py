@@ -1,17 +1,22 @@
-import concurrent.futures
 import json
 import os
 import re
 from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urlparse
 
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.consulta import descargar_archivo_minio
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, parse_bool_cell, safe_post
+from mrbot_app.bulk import redact
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, format_date_str, safe_post
+from mrbot_app.jobs.rcel import (
+    RcelJob,
+    collect_pdf_items,
+    extract_item_pdf_url,
+    extract_pdf_links,
+    is_pdf_url,
+    save_pdf_jsons,
+)
 from mrbot_app.windows.base import BaseWindow
 from mrbot_app.windows.mixins import (
     DateRangeHandlerMixin,
@@ -112,102 +117,25 @@ class RcelWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, DownloadH
         return cleaned or fallback
 
     def _is_pdf_url(self, url: Any) -> bool:
-        if not isinstance(url, str):
-            return False
-        clean = url.strip()
-        if not clean.lower().startswith("http"):
-            return False
-        lowered = clean.lower()
-        if "minio" in lowered:
-            return True
-        return lowered.split("?")[0].endswith(".pdf")
+        return is_pdf_url(url)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
         """Overrides mixin method to extract PDF links specifically."""
-        links: List[Dict[str, str]] = []
-        seen: set[Tuple[str, str]] = set()
-
-        def add_link(url: str) -> None:
-            if not self._is_pdf_url(url):
-                return
-            url = url.strip()
-            filename = os.path.basename(urlparse(url).path) or "factura.pdf"
-            key = (url, filename)
-            if key in seen:
-                return
-            seen.add(key)
-            links.append({"url": url, "filename": filename})
-
-        def walk(obj: Any) -> None:
-            if isinstance(obj, dict):
-                for _, val in obj.items():
-                    if isinstance(val, (dict, list)):
-                        walk(val)
-                    elif isinstance(val, str):
-                        add_link(val)
-            elif isinstance(obj, list):
-                for item in obj:
-                    walk(item)
-
-        walk(data)
-        return links
+        return extract_pdf_links(data)
 
     def _extract_item_pdf_url(self, item: Dict[str, Any]) -> Optional[str]:
-        for key in ("URL_MINIO", "url_minio", "url_pdf", "link_pdf", "url", "link"):
-            url = item.get(key)
-            if self._is_pdf_url(url):
-                return str(url).strip()
-        for value in item.values():
-            if self._is_pdf_url(value):
-                return str(value).strip()
-        return None
+        return extract_item_pdf_url(item)
 
     def _collect_pdf_items(self, data: Any) -> List[Tuple[str, Dict[str, Any]]]:
-        if not isinstance(data, dict):
-            return []
-        collected: List[Tuple[str, Dict[str, Any]]] = []
-        for key in ("facturas_emitidas", "facturas_recibidas", "comprobantes", "facturas"):
-            items = data.get(key)
-            if not isinstance(items, list):
-                continue
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                url = self._extract_item_pdf_url(item)
-                if url:
-                    collected.append((url, item))
-        return collected
-
-    def _save_pdf_jsons(self, items: List[Tuple[str, Dict[str, Any]]], dest_dir: Optional[str]) -> Tuple[int, List[str]]:
-        if not dest_dir:
-            return 0, ["No hay ruta de descarga disponible."]
-        saved = 0
-        errors: List[str] = []
-        seen: set[str] = set()
-        for idx, (url, payload) in enumerate(items, start=1):
-            filename = os.path.basename(urlparse(url).path) or f"factura_{idx}.pdf"
-            if filename in seen:
-                continue
-            seen.add(filename)
-            pdf_path = os.path.join(dest_dir, filename)
-            if not os.path.exists(pdf_path):
-                errors.append(f"{filename}: PDF no encontrado para guardar JSON")
-                continue
-            json_name = os.path.splitext(filename)[0] + ".json"
-            json_path = os.path.join(dest_dir, json_name)
-            try:
-                with open(json_path, "w", encoding="utf-8") as fh:
-                    json.dump(payload, fh, ensure_ascii=False, indent=2)
-                saved += 1
-            except Exception as exc:
-                errors.append(f"{json_name}: {exc}")
-        return saved, errors
+        return collect_pdf_items(data)
+
+    def _save_pdf_jsons(
+        self, items: List[Tuple[str, Dict[str, Any]]], dest_dir: Optional[str], cuit: str = ""
+    ) -> Tuple[int, List[str]]:
+        return save_pdf_jsons(items, dest_dir, cuit)
 
     def _redact(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        safe = dict(payload)
-        if "clave" in safe:
-            safe["clave"] = "***"
-        return safe
+        return redact(payload, ("clave",))
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -256,7 +184,7 @@ class RcelWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, DownloadH
         if isinstance(data, dict):
             pdf_items = self._collect_pdf_items(data)
             if pdf_items:
-                saved_json, json_errors = self._save_pdf_jsons(pdf_items, download_dir)
+                saved_json, json_errors = self._save_pdf_jsons(pdf_items, download_dir, cuit_folder)
                 if saved_json:
                     self.log_info(f"JSON guardados: {saved_json} -> {download_dir}")
                 for err in json_errors:
@@ -297,128 +225,18 @@ class RcelWindow(BaseWindow, ExcelHandlerMixin, DateRangeHandlerMixin, DownloadH
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_desde, default_hasta, b64_pdf, minio_upload, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_desde, default_hasta, b64_pdf, minio_upload, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("representado_cuit", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_rcel,
-                    row,
-                    url,
-                    headers,
-                    default_desde,
-                    default_hasta,
-                    b64_pdf,
-                    minio_upload,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result_row = future.result()
-                    if result_row:
-                        rows.append(result_row)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = RcelJob(
+            self,
+            url,
+            headers,
+            self.download_dir_var.get(),
+            default_desde=default_desde,
+            default_hasta=default_hasta,
+            b64_pdf=b64_pdf,
+            minio_upload=minio_upload,
+            default_proxy=default_proxy,
+        )
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_rcel(self, row, url, headers, default_desde, default_hasta, b64_pdf, minio_upload, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        desde = format_date_str(row.get("desde", "")) or default_desde
-        hasta = format_date_str(row.get("hasta", "")) or default_hasta
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        row_download = str(
-            row.get("ubicacion_descarga")
-            or row.get("path_descarga")
-            or row.get("carpeta_descarga")
-            or ""
-        ).strip()
-        cuit_repr = str(row.get("representado_cuit", "")).strip()
-        self.log_separator(cuit_repr)
-        payload = {
-            "desde": desde,
-            "hasta": hasta,
-            "cuit_representante": str(row.get("cuit_representante", "")).strip(),
-            "nombre_rcel": str(row.get("nombre_rcel", "")).strip(),
-            "representado_cuit": cuit_repr,
-            "clave": str(row.get("clave", "")),
-            "b64_pdf": b64_pdf,
-            "minio_upload": minio_upload,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = self._redact(payload)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-
-            if resp.get("http_status") == 200:
-                break
-
-        downloads, download_errors, download_dir_used = self._process_downloads(
-            data, self.MODULE_DIR, cuit_repr, override_dir=row_download
-        )
-
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir_used}")
-        elif isinstance(data, dict):
-            self.log_info("Sin links de PDF para descargar")
-
-        if isinstance(data, dict):
-            pdf_items = self._collect_pdf_items(data)
-            if pdf_items:
-                saved_json, json_errors = self._save_pdf_jsons(pdf_items, download_dir_used)
-                if saved_json:
-                    self.log_info(f"JSON guardados: {saved_json} -> {download_dir_used}")
-                for err in json_errors:
-                    self.log_error(f"JSON: {err}")
-
-        for err in download_errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "representado_cuit": payload["representado_cuit"],
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(download_errors) if download_errors else None,
-            "carpeta_descarga": download_dir_used,
-        }
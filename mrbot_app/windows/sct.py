@@ -1,26 +1,22 @@
-import concurrent.futures
 import json
 import os
-import re
 from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import unquote, urlparse
 
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.consulta import descargar_archivo_minio
-from mrbot_app.helpers import (
-    build_headers,
-    df_preview,
-    ensure_trailing_slash,
-    get_unique_filename,
-    parse_bool_cell,
-    safe_post,
+from mrbot_app.bulk import redact
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.sct import (
+    SctJob,
+    build_output_flags,
+    ensure_report_extension,
+    process_downloads_per_block,
+    row_format_flags,
 )
+from mrbot_app.minio_helpers import sanitize_identifier
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import prepare_download_dir
 from mrbot_app.windows.mixins import ExcelHandlerMixin
 
 
@@ -125,78 +121,13 @@ class SctWindow(BaseWindow, ExcelHandlerMixin):
         self.log_message(formatted)
 
     def _redact(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        safe = dict(payload)
-        if "clave" in safe:
-            safe["clave"] = "***"
-        return safe
+        return redact(payload, ("clave",))
 
     def _ensure_extension(self, name: str, ext: str) -> str:
-        clean = (name or "").strip()
-        if not clean:
-            clean = "reporte"
-        if not clean.lower().endswith(f".{ext}"):
-            clean = f"{clean}.{ext}"
-        return clean
+        return ensure_report_extension(name, ext)
 
     def _sanitize_identifier(self, value: str, fallback: str = "desconocido") -> str:
-        cleaned = re.sub(r"[^0-9A-Za-z._-]", "_", (value or "").strip())
-        cleaned = cleaned.strip("_")
-        return cleaned or fallback
-
-    def _download_variant(
-        self,
-        data: Dict[str, Any],
-        outputs: Dict[str, bool],
-        prefix: str,
-        fmt: str,
-        dest_dir: str,
-        base_name: str,
-        cuit_repr: str,
-    ) -> Tuple[bool, Optional[str]]:
-        ext_map = {"excel": "xls", "csv": "csv", "pdf": "pdf"}
-        ext = ext_map[fmt]
-        minio_flag = outputs.get(f"{prefix}_{fmt}_minio")
-        if not minio_flag:
-            return False, None
-
-        minio_keys = [f"{prefix}_{fmt}_minio_url", f"{prefix}_{fmt}_url_minio"]
-        url = None
-        for key in minio_keys:
-            candidate = data.get(key)
-            if isinstance(candidate, str):
-                candidate = candidate.strip()
-            if candidate:
-                url = candidate
-                break
-        if not url:
-            return False, f"Link inexistente o vacío ({' / '.join(minio_keys)})"
-
-        # Logic for filename fallback
-        if not base_name or not base_name.strip():
-             # Fallback to name from URL
-             base_from_url = unquote(os.path.basename(urlparse(url).path))
-             if not base_from_url:
-                 base_from_url = f"{prefix}_{fmt}"
-             filename = self._ensure_extension(base_from_url, ext)
-        else:
-             filename = self._ensure_extension(base_name, ext)
-
-        target_dir = dest_dir or ""
-
-        final_dir, dir_msgs = prepare_download_dir("SCT", target_dir, cuit_repr)
-
-        if not final_dir:
-             return False, "; ".join(dir_msgs)
-
-        # Collision handling
-        filename_unique = get_unique_filename(final_dir, filename)
-        target_path = os.path.join(final_dir, filename_unique)
-
-        res = descargar_archivo_minio(url, target_path)
-        if res.get("success"):
-            return True, None
-
-        return False, res.get("error") or f"Error al descargar en {target_path}"
+        return sanitize_identifier(value, fallback)
 
     def _process_downloads_per_block(
         self,
@@ -205,45 +136,12 @@ class SctWindow(BaseWindow, ExcelHandlerMixin):
         block_config: Dict[str, Dict[str, str]],
         cuit_repr: str,
         cuit_login: str,
-    ) -> Tuple[int, List[str]]:
-        total_downloaded = 0
-        errors: List[str] = []
-        for prefix, cfg in block_config.items():
-            if not cfg.get("enabled"):
-                continue
-            dest_dir = cfg.get("path", "")
-            for fmt in ("excel", "csv", "pdf"):
-                success, err = self._download_variant(data, outputs, prefix, fmt, dest_dir, cfg.get("name", prefix), cuit_repr)
-                if success:
-                    total_downloaded += 1
-                elif err:
-                    errors.append(f"{prefix}-{fmt}: {err}")
-        return total_downloaded, errors
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        return process_downloads_per_block(data, outputs, block_config, cuit_repr)
 
     def _row_format_flags(self, row: Optional[pd.Series] = None, prefer_row: bool = False,
                           default_excel: bool = False, default_csv: bool = False, default_pdf: bool = False) -> Tuple[bool, bool, bool]:
-        """
-        Calculates output flags based on row data or defaults.
-        Pass defaults as arguments to ensure thread safety when running in worker.
-        """
-        excel_enabled = default_excel
-        csv_enabled = default_csv
-        pdf_enabled = default_pdf
-
-        if row is not None:
-            def pick(key: str, current: bool) -> bool:
-                if key in row:
-                    value = row.get(key)
-                    if value is None or str(value).strip() == "":
-                        return current if not prefer_row else False
-                    return parse_bool_cell(value, default=current if not prefer_row else False)
-                return current if not prefer_row else current
-
-            excel_enabled = pick("excel", excel_enabled)
-            csv_enabled = pick("csv", csv_enabled)
-            pdf_enabled = pick("pdf", pdf_enabled)
-
-        return excel_enabled, csv_enabled, pdf_enabled
+        return row_format_flags(row, prefer_row, default_excel, default_csv, default_pdf)
 
     def build_output_flags(
         self,
@@ -254,39 +152,7 @@ class SctWindow(BaseWindow, ExcelHandlerMixin):
         csv_enabled: bool,
         pdf_enabled: bool,
     ) -> Tuple[Dict[str, bool], bool]:
-        outputs: Dict[str, bool] = {
-            "vencimientos_excel_minio": False,
-            "vencimientos_csv_minio": False,
-            "vencimientos_pdf_minio": False,
-            "deudas_excel_minio": False,
-            "deudas_csv_minio": False,
-            "deudas_pdf_minio": False,
-            "ddjj_pendientes_excel_minio": False,
-            "ddjj_pendientes_csv_minio": False,
-            "ddjj_pendientes_pdf_minio": False,
-        }
-
-        selected = False
-
-        def apply(prefix: str, enabled: bool) -> None:
-            nonlocal selected
-            if not enabled:
-                return
-            if excel_enabled:
-                outputs[f"{prefix}_excel_minio"] = True
-                selected = True
-            if csv_enabled:
-                outputs[f"{prefix}_csv_minio"] = True
-                selected = True
-            if pdf_enabled:
-                outputs[f"{prefix}_pdf_minio"] = True
-                selected = True
-
-        apply("deudas", include_deuda)
-        apply("vencimientos", include_vencimientos)
-        apply("ddjj_pendientes", include_ddjj)
-
-        return outputs, selected
+        return build_output_flags(include_deuda, include_vencimientos, include_ddjj, excel_enabled, csv_enabled, pdf_enabled)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -374,147 +240,8 @@ class SctWindow(BaseWindow, ExcelHandlerMixin):
         self.run_in_thread(self._worker_excel, df_copy, url, headers, defaults)
 
     def _worker_excel(self, df, url, headers, defaults):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_login", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_sct,
-                    row,
-                    url,
-                    headers,
-                    defaults,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = SctJob(self, url, headers, defaults)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_sct(self, row, url, headers, defaults):
-        if self._abort_event.is_set():
-            return None
-
-        include_deuda = parse_bool_cell(row.get("deuda"), default=defaults["deuda"]) if "deuda" in row else defaults["deuda"]
-        include_venc = (
-            parse_bool_cell(row.get("vencimientos"), default=defaults["vencimientos"]) if "vencimientos" in row else defaults["vencimientos"]
-        )
-        include_ddjj = (
-            parse_bool_cell(row.get("presentacion_ddjj"), default=defaults["presentacion"])
-            if "presentacion_ddjj" in row
-            else defaults["presentacion"]
-        )
-
-        # Pass defaults to helper to avoid UI access
-        excel_fmt, csv_fmt, pdf_fmt = self._row_format_flags(
-            row, prefer_row=True,
-            default_excel=defaults["excel"],
-            default_csv=defaults["csv"],
-            default_pdf=defaults["pdf"]
-        )
-
-        outputs, has_outputs = self.build_output_flags(include_deuda, include_venc, include_ddjj, excel_fmt, csv_fmt, pdf_fmt)
-        if not has_outputs:
-            self.log_separator(str(row.get("cuit_representado", "")).strip())
-            self.log_error("Sin formato de salida seleccionado para esta fila")
-            return {
-                "cuit_representado": str(row.get("cuit_representado", "")).strip(),
-                "http_status": None,
-                "status": "sin_salida",
-                "error_message": "Sin formato de salida seleccionado para esta fila",
-            }
-
-        block_config = {
-            "deudas": {
-                "enabled": include_deuda,
-                "path": str(row.get("ubicacion_deuda") or row.get("ubicacion_deudas") or ""),
-                "name": str(row.get("nombre_deuda") or row.get("nombre_deudas") or ""),
-            },
-            "vencimientos": {
-                "enabled": include_venc,
-                "path": str(row.get("ubicacion_vencimientos") or ""),
-                "name": str(row.get("nombre_vencimientos") or ""),
-            },
-            "ddjj_pendientes": {
-                "enabled": include_ddjj,
-                "path": str(row.get("ubicacion_ddjj") or row.get("ubicacion_presentacion_ddjj") or ""),
-                "name": str(row.get("nombre_ddjj") or row.get("nombre_presentacion_ddjj") or ""),
-            },
-        }
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=defaults["proxy"])
-        payload = {
-            "cuit_login": str(row.get("cuit_login", "")).strip(),
-            "clave": str(row.get("clave", "")),
-            "cuit_representado": str(row.get("cuit_representado", "")).strip(),
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        payload.update(outputs)
-        self.log_separator(payload["cuit_representado"])
-        self.log_info(f"Bloques activos -> deuda={include_deuda}, vencimientos={include_venc}, ddjj={include_ddjj}")
-        self.log_info(f"Salidas solicitadas -> {json.dumps(outputs, ensure_ascii=False)}")
-        safe_payload = self._redact(payload)
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        downloads = 0
-        download_errors: List[str] = []
-        if isinstance(data, dict):
-            downloads, download_errors = self._process_downloads_per_block(
-                data, outputs, block_config, payload["cuit_representado"], payload["cuit_login"]
-            )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads}")
-        for err in download_errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": payload["cuit_representado"],
-            "http_status": resp.get("http_status"),
-            "status": data.get("status") if isinstance(data, dict) else None,
-            "error_message": data.get("error_message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(download_errors) if download_errors else None,
-        }
@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -7,10 +6,15 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from mrbot_app.config import get_max_workers
-from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, parse_bool_cell, safe_post
+from mrbot_app.helpers import build_headers, df_preview, ensure_trailing_slash, safe_post
+from mrbot_app.jobs.sifere import (
+    SifereJob,
+    coerce_jurisdiccion,
+    extract_sifere_links,
+    optional_value,
+    parse_jurisdicciones,
+)
 from mrbot_app.windows.base import BaseWindow
-from mrbot_app.windows.minio_helpers import build_link, collect_minio_links
 from mrbot_app.windows.mixins import DownloadHandlerMixin, ExcelHandlerMixin
 
 
@@ -96,78 +100,16 @@ class SifereWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.log_message(text)
 
     def _optional_value(self, value: str) -> Optional[str]:
-        clean = (value or "").strip()
-        return clean if clean else None
+        return optional_value(value)
 
     def _coerce_jurisdiccion(self, value: Any) -> Optional[int]:
-        if value is None:
-            return None
-        if isinstance(value, bool):
-            return None
-        if isinstance(value, int):
-            return value
-        if isinstance(value, float):
-            if value.is_integer():
-                return int(value)
-            return None
-        text = str(value).strip()
-        if not text:
-            return None
-        if text.endswith(".0") and text[:-2].isdigit():
-            text = text[:-2]
-        if text.isdigit():
-            return int(text)
-        return None
+        return coerce_jurisdiccion(value)
 
     def _parse_jurisdicciones(self, value: Any) -> tuple[List[int], Optional[str]]:
-        if value is None:
-            return [], None
-        if isinstance(value, list):
-            items = value
-        else:
-            text = str(value).strip()
-            if not text:
-                return [], None
-            if text.lower() in {"todas", "todas las", "todas_las", "all"}:
-                return list(range(901, 925)), None
-            text = text.replace(";", ",").replace("|", ",")
-            items = [part.strip() for part in text.split(",") if part.strip()]
-        jurisdicciones: List[int] = []
-        invalid: List[str] = []
-        for item in items:
-            if str(item).strip().lower() in {"todas", "todas las", "todas_las", "all"}:
-                return list(range(901, 925)), None
-            num = self._coerce_jurisdiccion(item)
-            if num is None or not (901 <= num <= 924):
-                invalid.append(str(item).strip())
-                continue
-            jurisdicciones.append(num)
-        if invalid:
-            invalid_text = ", ".join(invalid)
-            return [], f"Jurisdicciones invalidas: {invalid_text}. Deben ser enteros entre 901 y 924."
-        return jurisdicciones, None
+        return parse_jurisdicciones(value)
 
     def _extract_links(self, data: Any) -> List[Dict[str, str]]:
-        links: List[Dict[str, str]] = []
-        seen: set[tuple[str, str]] = set()
-        if isinstance(data, dict):
-            archivos_minio = data.get("archivos_minio")
-            if isinstance(archivos_minio, list):
-                for idx, item in enumerate(archivos_minio, start=1):
-                    if not isinstance(item, dict):
-                        continue
-                    for key, value in item.items():
-                        if isinstance(value, str) and value.strip().lower().startswith("http"):
-                            hint = key if isinstance(key, str) and "." in key else None
-                            link = build_link(value, hint, "sifere", idx)
-                            if link:
-                                link_key = (link["url"], link["filename"])
-                                if link_key not in seen:
-                                    seen.add(link_key)
-                                    links.append(link)
-        if not links:
-            links = collect_minio_links(data, "sifere")
-        return links
+        return extract_sifere_links(data)
 
     def consulta_individual(self) -> None:
         base_url, api_key, email = self._get_config()
@@ -242,119 +184,8 @@ class SifereWindow(BaseWindow, ExcelHandlerMixin, DownloadHandlerMixin):
         self.run_in_thread(self._worker_excel, df_copy, url, headers, default_proxy)
 
     def _worker_excel(self, df, url, headers, default_proxy):
-        rows: List[Dict[str, Any]] = []
-        total = len(df)
-        self.set_progress(0, total)
-        max_workers = get_max_workers()
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    self.run_with_log_block,
-                    str(row.get("cuit_representado", "")).strip()
-                    or str(row.get("cuit_representante", "")).strip()
-                    or "sin_cuit",
-                    self._process_row_sifere,
-                    row,
-                    url,
-                    headers,
-                    default_proxy,
-                ): idx
-                for idx, (_, row) in enumerate(df.iterrows(), start=1)
-            }
-
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                idx = futures[future]
-                completed += 1
-                if self._abort_event.is_set():
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    break
-
-                try:
-                    result = future.result()
-                    if result:
-                        rows.append(result)
-                except Exception:
-                    pass
-
-                self.set_progress(completed, total)
-
+        job = SifereJob(self, url, headers, self.download_dir_var.get(), default_proxy=default_proxy)
+        rows = [result for result in self.run_bulk_job(df, job) if result]
         out_df = pd.DataFrame(rows)
         self.set_preview(self.result_box, df_preview(out_df, rows=min(20, len(out_df))))
         self.log_info("Procesamiento masivo finalizado.")
-
-    def _process_row_sifere(self, row, url, headers, default_proxy):
-        if self._abort_event.is_set():
-            return None
-
-        cuit_rep = str(row.get("cuit_representante", "")).strip()
-        cuit_repr = str(row.get("cuit_representado", "")).strip()
-        row_download = str(row.get("ubicacion_descarga") or row.get("path_descarga") or row.get("carpeta_descarga") or "").strip()
-        jurisdicciones, error = self._parse_jurisdicciones(row.get("jurisdicciones", ""))
-        proxy_request = None
-        if "proxy_request" in row.index:
-            proxy_request = parse_bool_cell(row.get("proxy_request"), default=default_proxy)
-        self.log_separator(cuit_repr)
-        if error:
-            self.log_error(error)
-            return {
-                "cuit_representado": cuit_repr,
-                "http_status": None,
-                "success": False,
-                "message": error,
-                "descargas": 0,
-                "errores_descarga": None,
-                "carpeta_descarga": None,
-            }
-
-        payload = {
-            "cuit_representante": cuit_rep,
-            "clave_representante": str(row.get("clave_representante", "")),
-            "cuit_representado": cuit_repr,
-            "periodo": str(row.get("periodo", "")).strip(),
-            "representado_nombre": self._optional_value(str(row.get("representado_nombre", ""))),
-            "jurisdicciones": jurisdicciones,
-            "carga_minio": True,
-        }
-        if proxy_request is not None:
-            payload["proxy_request"] = proxy_request
-        safe_payload = dict(payload)
-        safe_payload["clave_representante"] = "***"
-
-        try:
-            retry_val = int(row.get("retry", 0))
-        except (ValueError, TypeError):
-            retry_val = 0
-        total_attempts = retry_val if retry_val > 1 else 1
-
-        resp = {}
-        data = {}
-        for attempt in range(1, total_attempts + 1):
-            self.log_request_started(safe_payload, attempt=attempt, total_attempts=total_attempts)
-
-            resp = safe_post(url, headers, payload)
-            data = resp.get("data", {})
-            self.log_response_finished(resp.get("http_status"), data)
-            if resp.get("http_status") == 200:
-                break
-
-        downloads, errors, download_dir = self._process_downloads(
-            data, self.MODULE_DIR, cuit_repr, override_dir=row_download
-        )
-        if downloads:
-            self.log_info(f"Descargas completadas: {downloads} -> {download_dir}")
-        elif data:
-            self.log_info("Sin links de descarga")
-        for err in errors:
-            self.log_error(f"Descarga: {err}")
-
-        return {
-            "cuit_representado": cuit_repr,
-            "http_status": resp.get("http_status"),
-            "success": data.get("success") if isinstance(data, dict) else None,
-            "message": data.get("message") if isinstance(data, dict) else None,
-            "descargas": downloads,
-            "errores_descarga": "; ".join(errors) if errors else None,
-            "carpeta_descarga": download_dir,
-        }
@@ -0,0 +1,106 @@
+"""
+Benchmark de los puntos calientes de generar_reporte_control (no es un test de pytest).
+
+    python tests/bench_control_monotributistas.py [--comprobantes 1000000] [--clientes 800]
+
+Compara, sobre una cartera sintetica, la implementacion anterior (apply por fila
+para la categoria y zfill por columna para AUX) contra categorizar/construir_aux,
+y verifica que los resultados sean identicos.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mrbot_app.control_monotributistas import categorizar, construir_aux  # noqa: E402
+
+CATEGORIAS = pd.DataFrame(
+    {
+        "Categoria": list("ABCDEFGHIJK"),
+        "Ingresos brutos": [
+            7_813_063, 11_447_046, 16_050_091, 19_926_340, 23_439_190, 29_374_695,
+            35_128_502, 53_298_417, 59_657_887, 68_318_880, 82_370_281,
+        ],
+    }
+)
+
+
+def cartera_sintetica(comprobantes: int, clientes: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Fin CUIT": rng.integers(20_000_000_000, 27_999_999_999, clientes)[rng.integers(0, clientes, comprobantes)],
+            "Tipo": rng.choice([1, 3, 6, 8, 11, 13], comprobantes).astype(float),
+            "Punto de Venta": rng.integers(1, 20, comprobantes),
+            "Número Desde": rng.integers(1, 99_999_999, comprobantes),
+            "Cliente": rng.integers(0, clientes, comprobantes),
+            "Importe": rng.uniform(1_000, 250_000, comprobantes),
+        }
+    )
+
+
+def aux_anterior(df: pd.DataFrame) -> pd.Series:
+    return (
+        df['Fin CUIT'].astype(int).astype(str) + "-"
+        + df['Tipo'].astype(int).astype(str).str.zfill(3) + "-"
+        + df['Punto de Venta'].astype(int).astype(str).str.zfill(5) + "-"
+        + df['Número Desde'].astype(int).astype(str).str.zfill(8)
+    )
+
+
+def categorizar_anterior(importes: pd.Series, categorias: pd.DataFrame):
+    def get_max_ingresos(x):
+        matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Ingresos brutos']
+        return matches.iloc[0] if not matches.empty else 0
+
+    def get_categoria(x):
+        matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Categoria']
+        return matches.iloc[0] if not matches.empty else "Excedido"
+
+    return importes.apply(get_max_ingresos), importes.apply(get_categoria)
+
+
+def _medir(nombre: str, fn):
+    inicio = time.perf_counter()
+    resultado = fn()
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<10} {segundos:8.3f} s")
+    return resultado, segundos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comprobantes", type=int, default=1_000_000)
+    parser.add_argument("--clientes", type=int, default=800)
+    parser.add_argument("--muestra", type=int, default=50_000, help="Importes para la categorizacion por comprobante")
+    args = parser.parse_args()
+
+    df = cartera_sintetica(args.comprobantes, args.clientes)
+    print(f"Cartera sintetica: {len(df):,} comprobantes, {args.clientes} clientes")
+
+    print("Clave AUX:")
+    anterior, t_anterior = _medir("anterior", lambda: aux_anterior(df))
+    nuevo, t_nuevo = _medir("nuevo", lambda: construir_aux(df['Fin CUIT'], df['Tipo'], df['Punto de Venta'], df['Número Desde']))
+    assert anterior.tolist() == nuevo.tolist()
+    print(f"  speed-up   {t_anterior / t_nuevo:8.1f}x")
+
+    # Igual que la tabla dinamica: un importe por cliente; ademas una muestra por comprobante
+    # (el apply anterior sobre 1M de importes tarda varios minutos)
+    importes = df.groupby("Cliente")["Importe"].sum() * 12
+    muestra = df["Importe"].head(args.muestra) * 200
+    for etiqueta, serie in (("por cliente", importes), ("por comprobante", muestra)):
+        print(f"Categorizacion ({etiqueta}, {len(serie):,} importes):")
+        (max_a, cat_a), t_anterior = _medir("anterior", lambda: categorizar_anterior(serie, CATEGORIAS))
+        (max_n, cat_n), t_nuevo = _medir("nuevo", lambda: categorizar(serie, CATEGORIAS))
+        pd.testing.assert_series_equal(max_a, max_n)
+        assert cat_a.tolist() == cat_n.tolist()
+        print(f"  speed-up   {t_anterior / t_nuevo:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark del lector de CSV de Mis Comprobantes (no es un test de pytest).
+
+    python tests/bench_lector_csv_mc.py [--filas 1000000] [--archivos 4]
+
+Genera CSV sinteticos con el formato de ARCA (utf-8 con BOM, cp1252 y ZIP) y
+compara la lectura anterior (pd.read_csv con utf-8-sig fijo; cp1252 probando
+encodings en cascada) contra lector_csv_mc.leer_csv_mc con el motor C y, si
+pyarrow esta instalado, con el motor Arrow multihilo. Verifica que los resultados
+sean identicos.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mrbot_app.lector_csv_mc import leer_csv_mc, motor_csv  # noqa: E402
+
+COLUMNAS = [
+    "Fecha de Emisión", "Tipo de Comprobante", "Punto de Venta", "Número Desde", "Número Hasta",
+    "Cód. Autorización", "Tipo Doc. Receptor", "Nro. Doc. Receptor", "Denominación Receptor",
+    "Tipo Cambio", "Moneda", "Imp. Neto Gravado", "Imp. Neto No Gravado", "Imp. Op. Exentas",
+    "Otros Tributos", "IVA", "Imp. Total",
+]
+
+
+def csv_sintetico(filas: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    numeros = rng.integers(1, 99_999_999, filas)
+    neto = rng.uniform(1_000, 250_000, filas).round(2)
+
+    def importe(valores: np.ndarray) -> pd.Series:
+        return pd.Series(valores).map("{:.2f}".format).str.replace(".", ",", regex=False)
+
+    df = pd.DataFrame(
+        {
+            "Fecha de Emisión": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, filas), unit="D"),
+            "Tipo de Comprobante": rng.choice([1, 6, 11, 13], filas),
+            "Punto de Venta": rng.integers(1, 20, filas),
+            "Número Desde": numeros,
+            "Número Hasta": numeros,
+            "Cód. Autorización": rng.integers(70_000_000_000_000, 79_999_999_999_999, filas),
+            "Tipo Doc. Receptor": 80,
+            "Nro. Doc. Receptor": rng.integers(20_000_000_000, 27_999_999_999, filas),
+            "Denominación Receptor": rng.choice(["Peña SRL", "Muñoz Hnos", "Acuña y Cía", "Pérez SA"], filas),
+            "Tipo Cambio": "1,00",
+            "Moneda": "$",
+            "Imp. Neto Gravado": importe(neto),
+            "Imp. Neto No Gravado": "0,00",
+            "Imp. Op. Exentas": "0,00",
+            "Otros Tributos": "0,00",
+            "IVA": importe((neto * 0.21).round(2)),
+            "Imp. Total": importe((neto * 1.21).round(2)),
+        }
+    )
+    df["Fecha de Emisión"] = df["Fecha de Emisión"].dt.strftime("%Y-%m-%d")
+    return df[COLUMNAS].to_csv(sep=";", index=False)
+
+
+def lectura_anterior(path: str) -> pd.DataFrame:
+    # control_monotributistas._leer_csv_mc antes del lector: utf-8-sig fijo
+    return pd.read_csv(path, sep=";", decimal=",", encoding="utf-8-sig")
+
+
+def lectura_anterior_cascada(path: str) -> pd.DataFrame:
+    # Probar encodings reabriendo el archivo (como leer_csv_con_encoding)
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return pd.read_csv(path, sep=";", decimal=",", encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(path)
+
+
+def _medir(nombre: str, fn, archivos):
+    inicio = time.perf_counter()
+    resultados = [fn(path) for path in archivos]
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<22} {segundos:8.3f} s")
+    return resultados, segundos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1_000_000, help="Filas por archivo")
+    parser.add_argument("--archivos", type=int, default=4)
+    args = parser.parse_args()
+
+    texto = csv_sintetico(args.filas)
+    with tempfile.TemporaryDirectory() as carpeta:
+        utf8, cp1252, zips = [], [], []
+        for i in range(args.archivos):
+            path = os.path.join(carpeta, f"utf8-{i}.csv")
+            with open(path, "w", encoding="utf-8-sig", newline="") as fh:
+                fh.write(texto)
+            utf8.append(path)
+            path = os.path.join(carpeta, f"cp1252-{i}.csv")
+            with open(path, "w", encoding="cp1252", newline="") as fh:
+                fh.write(texto)
+            cp1252.append(path)
+            path = os.path.join(carpeta, f"zip-{i}.zip")
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.write(utf8[-1], "comprobantes.csv")
+            zips.append(path)
+        megabytes = sum(os.path.getsize(path) for path in utf8) / (1024 * 1024)
+        print(f"{args.archivos} archivos de {args.filas:,} filas ({megabytes:.0f} MB en UTF-8)")
+        motores = ["c"] + (["pyarrow"] if motor_csv("pyarrow") == "pyarrow" else [])
+        if len(motores) == 1:
+            print("(pyarrow no instalado: solo motor C)")
+
+        for etiqueta, archivos, anterior in (
+            ("UTF-8 con BOM", utf8, lectura_anterior),
+            ("cp1252", cp1252, lectura_anterior_cascada),
+            ("ZIP sin extraer", zips, lectura_anterior),
+        ):
+            print(f"{etiqueta}:")
+            esperado, t_anterior = _medir("anterior", anterior, archivos)
+            for motor in motores:
+                obtenido, t_nuevo = _medir(f"leer_csv_mc ({motor})", lambda path: leer_csv_mc(path, engine=motor), archivos)
+                for a, b in zip(esperado, obtenido):
+                    pd.testing.assert_frame_equal(a, b, check_dtype=False)
+                print(f"  speed-up {motor:<13} {t_anterior / t_nuevo:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _manifiesto_temporal(tmp_path, monkeypatch):
+    # Las descargas registran artefactos: que los tests no escriban el manifiesto real
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", str(tmp_path / "mrbot_artifacts.sqlite3"))
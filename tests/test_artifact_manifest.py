@@ -0,0 +1,74 @@
+from mrbot_app.artifact_manifest import artifact_context, get_artifact_manifest, record_artifacts
+from mrbot_app.control_monotributistas import MODULO_CONTROL, TIPO_MC_CSV, buscar_archivos_control
+from mrbot_app.jobs.rcel import save_pdf_jsons
+
+
+def _archivo(path, contenido="x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contenido, encoding="utf-8")
+    return str(path)
+
+
+def test_registro_con_contexto_filtros_y_archivos_borrados(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", str(tmp_path / "artefactos.sqlite3"))
+    pdf = _archivo(tmp_path / "a" / "factura.pdf")
+    zip_path = _archivo(tmp_path / "a" / "mc.zip")
+
+    with artifact_context(modulo="rcel", cuit="20123456789", periodo="01/01/2024 - 31/01/2024"):
+        assert record_artifacts([pdf, str(tmp_path / "no_existe.pdf")]) == 1
+        with artifact_context(tipo="comprobante"):
+            record_artifacts([zip_path], modulo="mis_comprobantes")
+
+    manifest = get_artifact_manifest()
+    assert manifest.find(modulo="rcel", tipo="pdf") == [str(tmp_path / "a" / "factura.pdf")]
+    assert manifest.find(cuit="20123456789") == sorted([pdf, zip_path])
+    assert manifest.find(modulo="mis_comprobantes", tipo="comprobante", periodo="01/01/2024 - 31/01/2024") == [zip_path]
+
+    (tmp_path / "a" / "factura.pdf").unlink()
+    assert manifest.find(modulo="rcel") == []
+    assert manifest.stats()["archivos"] == 1
+
+
+def test_reporte_toma_archivos_del_manifiesto(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", str(tmp_path / "artefactos.sqlite3"))
+    descargas = tmp_path / "descargas"
+    previo = _archivo(descargas / "Cliente" / "extraido" / "MC-previo.csv")
+    rcel = _archivo(descargas / "RCEL" / "20123456789" / "factura.json", "{}")
+    _archivo(descargas / "otro" / "config.json", "{}")
+
+    # La primera vez se registran las descargas anteriores al manifiesto
+    archivos_mc, archivos_json = buscar_archivos_control(str(descargas))
+    assert archivos_mc == [previo]
+    assert archivos_json == [rcel]
+
+    # Despues solo cuenta lo registrado, y solo lo que esta dentro de "descargas"
+    _archivo(descargas / "Cliente" / "extraido" / "sin_registrar.csv")
+    nuevo = _archivo(descargas / "otra_ubicacion" / "MC-nuevo.csv")
+    afuera = _archivo(tmp_path / "descargas-2" / "extraido" / "MC-afuera.csv")
+    record_artifacts([nuevo, afuera], modulo=MODULO_CONTROL, tipo=TIPO_MC_CSV)
+    archivos_mc, _ = buscar_archivos_control(str(descargas))
+    assert archivos_mc == sorted([previo, nuevo])
+
+
+def test_sin_manifiesto_recorre_la_carpeta(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", "")
+    csv_path = _archivo(tmp_path / "Cliente" / "extraido" / "MC.csv")
+    json_path = _archivo(tmp_path / "Cliente" / "factura.json", "{}")
+
+    assert get_artifact_manifest() is None
+    assert record_artifacts([csv_path]) == 0
+    assert buscar_archivos_control(str(tmp_path)) == ([csv_path], [json_path])
+
+
+def test_json_de_la_ventana_rcel_llegan_al_reporte(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", str(tmp_path / "artefactos.sqlite3"))
+    descargas = tmp_path / "descargas"
+    descargas.mkdir()
+    assert buscar_archivos_control(str(descargas)) == ([], [])
+
+    carpeta = descargas / "RCEL" / "20123456789"
+    _archivo(carpeta / "factura-1.pdf")
+    saved, errores = save_pdf_jsons([("https://minio/x/factura-1.pdf", {"nro": 1})], str(carpeta), "20123456789")
+
+    assert (saved, errores) == (1, [])
+    assert buscar_archivos_control(str(descargas)) == ([], [str(carpeta / "factura-1.json")])
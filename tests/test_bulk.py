@@ -0,0 +1,140 @@
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+import mrbot_app.bulk as bulk
+from mrbot_app.bulk import RowJob, row_attempts, run_bulk
+
+
+class FakeLog:
+    def __init__(self):
+        self.lines = []
+        self.lock = threading.Lock()
+
+    def _add(self, text):
+        with self.lock:
+            self.lines.append(text)
+
+    @contextmanager
+    def log_block(self, label):
+        yield
+
+    def log_info(self, message):
+        self._add(f"INFO: {message}")
+
+    def log_error(self, message):
+        self._add(f"ERROR: {message}")
+
+    def log_request_started(self, payload, attempt=None, total_attempts=None):
+        self._add(f"REQUEST {attempt}/{total_attempts}")
+
+    def log_response_finished(self, http_status, payload):
+        self._add(f"RESPONSE {http_status}")
+
+
+class EchoJob(RowJob):
+    def build_request(self, row):
+        if row.get("skip") == "SI":
+            return {"result": {"cuit": row["cuit"], "http_status": None}}
+        return {
+            "url": self.url,
+            "headers": self.headers,
+            "payload": {"cuit": row["cuit"]},
+            "attempts": row_attempts(row),
+        }
+
+    def handle_response(self, row, request, resp):
+        return {"cuit": row["cuit"], "http_status": resp["http_status"]}
+
+
+def test_row_attempts():
+    assert row_attempts(pd.Series({"retry": "3"})) == 3
+    assert row_attempts(pd.Series({"retry": "x"})) == 1
+    assert row_attempts(pd.Series({})) == 1
+
+
+def test_run_bulk_keeps_order_and_retries(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_post(url, headers, payload):
+        with lock:
+            calls.append(payload["cuit"])
+            seen = calls.count(payload["cuit"])
+        status = 500 if payload["cuit"] == "2" and seen == 1 else 200
+        return {"http_status": status, "data": {}}
+
+    monkeypatch.setattr(bulk, "safe_post", fake_post)
+    df = pd.DataFrame(
+        [
+            {"cuit": "1", "retry": "", "skip": ""},
+            {"cuit": "2", "retry": "2", "skip": ""},
+            {"cuit": "3", "retry": "", "skip": "SI"},
+            {"cuit": "4", "retry": "", "skip": ""},
+        ]
+    )
+    progress = []
+    results = run_bulk(df, EchoJob(FakeLog(), "http://x", {}), max_concurrency=2, progress_fn=lambda c, t: progress.append((c, t)))
+
+    assert [r["cuit"] for r in results] == ["1", "2", "3", "4"]
+    assert results[1]["http_status"] == 200
+    assert results[2]["http_status"] is None
+    assert calls.count("2") == 2
+    assert "3" not in calls
+    assert progress[0] == (0, 4) and progress[-1] == (4, 4)
+
+
+def test_run_bulk_abort_skips_rows(monkeypatch):
+    monkeypatch.setattr(bulk, "safe_post", lambda *a: {"http_status": 200, "data": {}})
+    abort = threading.Event()
+    abort.set()
+    df = pd.DataFrame([{"cuit": "1"}, {"cuit": "2"}])
+    results = run_bulk(df, EchoJob(FakeLog(), "http://x", {}), abort_event=abort)
+    assert results == [None, None]
+
+
+def test_exception_in_row_is_logged(monkeypatch):
+    def boom(*args):
+        raise RuntimeError("falla")
+
+    monkeypatch.setattr(bulk, "safe_post", boom)
+    log = FakeLog()
+    results = run_bulk(pd.DataFrame([{"cuit": "1"}]), EchoJob(log, "http://x", {}))
+    assert results == [None]
+    assert any("Excepcion en bloque: falla" in line for line in log.lines)
+
+
+def test_descargas_no_retienen_el_lugar_de_la_api(monkeypatch):
+    import time
+
+    from mrbot_app.download_queue import get_download_queue
+
+    monkeypatch.setenv("DOWNLOAD_QUEUE_WORKERS", "8")
+    en_vuelo = {"actual": 0, "maximo": 0}
+    lock = threading.Lock()
+
+    def slow_post(url, headers, payload):
+        with lock:
+            en_vuelo["actual"] += 1
+            en_vuelo["maximo"] = max(en_vuelo["maximo"], en_vuelo["actual"])
+        time.sleep(0.1)
+        with lock:
+            en_vuelo["actual"] -= 1
+        return {"http_status": 200, "data": {}}
+
+    class DownloadJob(EchoJob):
+        def handle_response(self, row, request, resp):
+            get_download_queue().map(lambda _: time.sleep(0.3), [1, 2])
+            return super().handle_response(row, request, resp)
+
+    monkeypatch.setattr(bulk, "safe_post", slow_post)
+    df = pd.DataFrame([{"cuit": str(i)} for i in range(4)])
+    inicio = time.perf_counter()
+    results = run_bulk(df, DownloadJob(FakeLog(), "http://x", {}), max_concurrency=1)
+    segundos = time.perf_counter() - inicio
+
+    assert [r["http_status"] for r in results] == [200] * 4
+    assert en_vuelo["maximo"] == 1
+    # En serie serian 4 x (0.1 + 0.3) s; con la cola aparte las descargas se superponen
+    assert segundos < 1.2
@@ -0,0 +1,83 @@
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from mrbot_app.cli import EXIT_OK, EXIT_ROWS_FAILED, EXIT_USAGE, main, row_failed
+from mrbot_app.jobs.registry import resolve_options
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cuit = self.path.rstrip("/").rsplit("/", 1)[-1]
+        status = 500 if cuit == "20000000002" else 200
+        body = json.dumps({"apoc": False, "message": "ok"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(autouse=True)
+def registro_temporal(monkeypatch, tmp_path):
+    monkeypatch.setenv("JOB_STORE_PATH", str(tmp_path / "jobs.sqlite3"))
+
+
+@pytest.fixture
+def servidor():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+
+
+def _excel(tmp_path, cuits):
+    path = tmp_path / "apocrifos.xlsx"
+    pd.DataFrame({"procesar": ["SI"] * len(cuits), "cuit": cuits}).to_excel(path, index=False)
+    return str(path)
+
+
+def test_cli_no_importa_tkinter():
+    code = "import sys, mrbot_app.cli; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_cli_apocrifos_ok_y_resultado(servidor, tmp_path):
+    resultado = tmp_path / "salida.csv"
+    log_file = tmp_path / "run.log"
+    argv = ["apocrifos", _excel(tmp_path, ["20111111112", "20222222223"]), "--url", servidor,
+            "--resultado", str(resultado), "--log-file", str(log_file)]
+    assert main(argv) == EXIT_OK
+    out = pd.read_csv(resultado, sep=";", dtype=str)
+    assert sorted(out["cuit"]) == ["20111111112", "20222222223"]
+    assert "CONTRIBUYENTE: 20111111112" in log_file.read_text(encoding="utf-8")
+
+
+def test_cli_sale_con_error_si_falla_una_fila(servidor, tmp_path):
+    argv = ["apocrifos", _excel(tmp_path, ["20111111112", "20000000002"]), "--url", servidor]
+    assert main(argv) == EXIT_ROWS_FAILED
+
+
+def test_cli_opcion_desconocida(tmp_path):
+    argv = ["rcel", _excel(tmp_path, ["20111111112"]), "--opcion", "inexistente=si"]
+    assert main(argv) == EXIT_USAGE
+
+
+def test_resolve_options_y_row_failed():
+    opciones = resolve_options("rcel", {"b64_pdf": "si", "default_desde": "2024-01-05"})
+    assert opciones["b64_pdf"] is True
+    assert opciones["default_desde"] == "05/01/2024"
+    assert opciones["default_hasta"]
+    assert row_failed(None)
+    assert row_failed({"http_status": 429})
+    assert row_failed(({"http_status": 200, "success": False}, [], False))
+    assert not row_failed({"http_status": 200, "success": True})
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from mrbot_app.control_monotributistas import categorizar, compactar_consolidado, construir_aux, leer_categorias
+
+
+def _categorizar_por_fila(importes, categorias):
+    def get_max_ingresos(x):
+        matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Ingresos brutos']
+        return matches.iloc[0] if not matches.empty else 0
+
+    def get_categoria(x):
+        matches = categorias.loc[categorias['Ingresos brutos'] >= x, 'Categoria']
+        return matches.iloc[0] if not matches.empty else "Excedido"
+
+    return importes.apply(get_max_ingresos), importes.apply(get_categoria)
+
+
+def test_categorizar_igual_a_la_busqueda_por_fila():
+    importes = pd.Series([0, 100_000, 100_001, 450_000, 2_000_000, np.nan, -5.5])
+    ordenadas = pd.DataFrame({"Categoria": list("ABCD"), "Ingresos brutos": [100_000, 200_000, 500_000, 1_000_000]})
+    desordenadas = pd.DataFrame({"Categoria": list("ABCD"), "Ingresos brutos": [500_000, 100_000, np.nan, 1_000_000]})
+
+    for categorias in (ordenadas, desordenadas):
+        maximos, asignadas = categorizar(importes, categorias)
+        esperado_max, esperado_cat = _categorizar_por_fila(importes, categorias)
+        pd.testing.assert_series_equal(maximos, esperado_max)
+        assert asignadas.tolist() == esperado_cat.tolist()
+
+
+def test_construir_aux_igual_a_zfill():
+    df = pd.DataFrame({"cuit": [20123456789, 27000000001], "tipo": [11.0, 3.0], "pv": [1, 12345], "nro": [42, 123456789]})
+
+    esperado = (
+        df['cuit'].astype(int).astype(str) + "-"
+        + df['tipo'].astype(int).astype(str).str.zfill(3) + "-"
+        + df['pv'].astype(int).astype(str).str.zfill(5) + "-"
+        + df['nro'].astype(int).astype(str).str.zfill(8)
+    )
+
+    assert construir_aux(df['cuit'], df['tipo'], df['pv'], df['nro']).tolist() == esperado.tolist()
+
+
+def test_leer_categorias_abre_el_libro_una_vez(tmp_path):
+    path = tmp_path / "Categorias.xlsx"
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"Categoria": ["A"], "Ingresos brutos": [100]}).to_excel(writer, sheet_name="Categorias", index=False)
+        pd.DataFrame({"Fecha Inicial": ["01/01/2024"], "Fecha Final": ["31/12/2024"]}).to_excel(
+            writer, sheet_name="Rango de Fechas", index=False
+        )
+
+    categorias, desde, hasta = leer_categorias(str(path))
+
+    assert categorias["Categoria"].tolist() == ["A"]
+    assert (desde, hasta) == ("01/01/2024", "31/12/2024")
+
+
+def test_compactar_consolidado_conserva_valores():
+    n = 1000
+    df = pd.DataFrame(
+        {
+            "Tipo": np.tile([11, 13], n // 2),
+            "Moneda": ["$"] * n,
+            "Cliente": [f"Cliente {i % 7}" for i in range(n)],
+            "Punto de Venta": np.arange(n) % 5 + 1,
+            "Número Desde": np.arange(n) + 10_000_000,
+            "Imp. Total": np.linspace(-100.5, 99999.99, n),
+            "AUX": [f"aux-{i}" for i in range(n)],
+        }
+    )
+    original = df.copy()
+    logs = []
+
+    compacto = compactar_consolidado(df, log_fn=logs.append)
+
+    assert isinstance(compacto["Cliente"].dtype, pd.CategoricalDtype)
+    assert str(compacto["Punto de Venta"].dtype) == "Int32"
+    assert compacto["Tipo"].dtype == np.int8
+    assert compacto["AUX"].dtype == original["AUX"].dtype
+    assert compacto["Imp. Total"].dtype == np.float64
+    assert compacto.astype(object).equals(original.astype(object))
+    assert "Memoria del consolidado" in logs[-1]
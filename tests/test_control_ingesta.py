@@ -0,0 +1,104 @@
+import json
+import zipfile
+
+import pandas as pd
+
+from mrbot_app.artifact_manifest import get_artifact_manifest
+from mrbot_app.control_monotributistas import PipelineMC, leer_archivos_csv_batch, leer_archivos_json_batch
+from mrbot_app.csv_cache import cache_stats, invalidar_cache, load_cached
+
+CSV_MC = (
+    "Fecha de Emisión;Tipo de Comprobante;Punto de Venta;Número Desde;Número Hasta;Cód. Autorización;"
+    "Tipo Cambio;Moneda;Imp. Total;Nro. Doc. Receptor;Denominación Receptor\n"
+    "2024-01-{dia:02d};11;{pv};{nro};{nro};123;1,00;$;{total},50;20111111112;Cliente {pv}\n"
+)
+
+
+def _archivos_mc(tmp_path, cantidad):
+    archivos = []
+    for i in range(cantidad):
+        path = tmp_path / f"MC-Emitidos-2024-01-20123456789-Cliente {i}.csv"
+        path.write_text(CSV_MC.format(dia=i % 28 + 1, pv=i + 1, nro=i * 10, total=i * 100), encoding="utf-8-sig")
+        archivos.append(str(path))
+    return archivos
+
+
+def test_lectura_en_paralelo_igual_a_secuencial(tmp_path):
+    archivos = _archivos_mc(tmp_path, 40)
+    roto = tmp_path / "roto.csv"
+    roto.write_bytes(b"\x00\xff;\n\xfe")
+    archivos.insert(5, str(roto))
+    archivos.append(str(tmp_path / "no_existe.csv"))
+    logs_secuencial, logs_paralelo = [], []
+
+    secuencial = leer_archivos_csv_batch(archivos, logs_secuencial.append, workers=1, usar_cache=False)
+    paralelo = leer_archivos_csv_batch(archivos, logs_paralelo.append, workers=4, usar_cache=False)
+
+    assert len(secuencial) == 40
+    pd.testing.assert_frame_equal(paralelo, secuencial)
+    assert logs_paralelo == logs_secuencial
+    assert any("roto.csv" in msg for msg in logs_paralelo)
+
+
+def test_json_en_paralelo_conserva_orden(tmp_path):
+    carpeta = tmp_path / "20123456789_Cliente SA"
+    carpeta.mkdir()
+    archivos = []
+    for i in range(30):
+        path = carpeta / f"20123456789-011-00001-{i:08d}.json"
+        path.write_text(json.dumps({"AUX": f"aux-{i}", "Desde": "01/01/2024"}), encoding="utf-8")
+        archivos.append(str(path))
+
+    secuencial = leer_archivos_json_batch(archivos, workers=1)
+    paralelo = leer_archivos_json_batch(archivos, workers=3)
+
+    pd.testing.assert_frame_equal(paralelo, secuencial)
+    assert paralelo["AUX"].tolist() == [f"aux-{i}" for i in range(30)]
+    assert set(paralelo["Cliente"]) == {"Cliente SA"}
+
+
+def test_cache_de_csv_reutiliza_y_detecta_cambios(tmp_path):
+    archivos = _archivos_mc(tmp_path, 3)
+    logs = []
+
+    original = leer_archivos_csv_batch(archivos, workers=1, usar_cache=True)
+    cacheado = leer_archivos_csv_batch(archivos, logs.append, workers=1, usar_cache=True)
+
+    pd.testing.assert_frame_equal(cacheado, original)
+    assert "3 desde cache, 0 parseados" in logs[-1]
+    assert cache_stats(str(tmp_path))["vigentes"] == 3
+
+    with open(archivos[0], "a", encoding="utf-8") as fh:
+        fh.write("2024-02-01;11;9;99;99;1;1,00;$;5,00;1;Otro\n")
+    actualizado = leer_archivos_csv_batch(archivos, logs.append, workers=1, usar_cache=True)
+
+    assert len(actualizado) == 4
+    assert "2 desde cache, 1 parseados" in logs[-1]
+    assert invalidar_cache(str(tmp_path)) == 3
+    assert cache_stats(str(tmp_path))["entradas"] == 0
+
+
+def test_pipeline_extrae_y_deja_en_cache_mientras_llegan_los_zip(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_MANIFEST_PATH", str(tmp_path / "artefactos.sqlite3"))
+    descargas = tmp_path / "descargas"
+    descargas.mkdir()
+    zips = []
+    for csv_path in _archivos_mc(tmp_path, 6):
+        zip_path = descargas / (csv_path.rsplit("/", 1)[-1][: -len(".csv")] + ".zip")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.write(csv_path, "comprobantes.csv")
+        zips.append(zip_path)
+    roto = descargas / "roto.zip"
+    roto.write_bytes(b"no es un zip")
+    logs = []
+
+    with PipelineMC(extractores=2, workers=2, capacidad=2, usar_cache=True, log_fn=logs.append) as pipeline:
+        for zip_path in zips + [roto]:
+            pipeline.zip_descargado(str(zip_path), str(descargas / "extraido" / (zip_path.stem + ".csv")), "20123456789")
+
+    assert pipeline.contadores == {"descargados": 7, "listos": 6, "parseados": 6, "errores": 1}
+    extraidos = sorted(str(p) for p in (descargas / "extraido").glob("*.csv"))
+    assert len(extraidos) == 6
+    assert all(load_cached(path) is not None for path in extraidos)
+    assert get_artifact_manifest().find(cuit="20123456789", tipo="csv") == extraidos
+    assert any("Pipeline MC: 7 ZIP descargados" in msg for msg in logs)
@@ -0,0 +1,181 @@
+import threading
+import zipfile
+
+import pandas as pd
+
+from mrbot_app.control_monotributistas import agrupar_por_cliente, generar_reporte_control, generar_reporte_en_proceso
+
+ENCABEZADO = (
+    "Fecha de Emisión;Tipo de Comprobante;Punto de Venta;Número Desde;Número Hasta;Cód. Autorización;"
+    "Tipo Cambio;Moneda;Imp. Neto Gravado Total;Imp. Neto No Gravado;Imp. Op. Exentas;Otros Tributos;"
+    "Total IVA;Imp. Total;Nro. Doc. Receptor;Denominación Receptor\n"
+)
+FILA = "2024-{mes:02d}-15;{tipo};1;{nro};{nro};123;1,00;$;0,00;0,00;0,00;0,00;0,00;{total},25;20111111112;Receptor\n"
+
+
+def _cartera(tmp_path):
+    archivos = []
+    for cliente in range(4):
+        for mc in ("Emitidos", "Recibidos"):
+            for anio in (2023, 2024):
+                path = tmp_path / f"MC-{mc}-{anio}-01-2012345678{cliente}-Cliente {cliente}.csv"
+                filas = [
+                    FILA.format(mes=mes, tipo=13 if mes == 3 else 11, nro=anio * 100 + mes, total=1000 * (cliente + 1) + mes)
+                    for mes in range(1, 7)
+                ]
+                path.write_text(ENCABEZADO + "".join(filas), encoding="utf-8-sig")
+                archivos.append(str(path))
+    categorias = tmp_path / "Categorias.xlsx"
+    with pd.ExcelWriter(categorias, engine="openpyxl") as writer:
+        pd.DataFrame({"Categoria": list("ABC"), "Ingresos brutos": [5_000, 15_000, 30_000]}).to_excel(
+            writer, sheet_name="Categorias", index=False
+        )
+        pd.DataFrame({"Fecha Inicial": ["01/06/2023"], "Fecha Final": ["31/05/2024"]}).to_excel(
+            writer, sheet_name="Rango de Fechas", index=False
+        )
+    return archivos, str(categorias)
+
+
+def test_reporte_por_cliente_igual_al_reporte_en_memoria(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    en_memoria, por_cliente = tmp_path / "memoria.xlsx", tmp_path / "por_cliente.xlsx"
+    logs = []
+
+    generar_reporte_control(archivos, [], categorias, str(en_memoria), por_cliente=False)
+    generar_reporte_control(archivos, [], categorias, str(por_cliente), logs.append, por_cliente=True)
+
+    assert len(agrupar_por_cliente(archivos)) == 4
+    assert any("4 clientes por partes" in msg for msg in logs)
+    tabla_memoria = pd.read_excel(en_memoria, sheet_name="Tabla Dinámica")
+    tabla_partes = pd.read_excel(por_cliente, sheet_name="Tabla Dinámica")
+    pd.testing.assert_frame_equal(tabla_partes, tabla_memoria)
+    assert len(tabla_partes) == 8
+
+    clave = ["Archivo", "Número Desde"]
+    consolidado_memoria = pd.read_excel(en_memoria, sheet_name="Consolidado").sort_values(clave, ignore_index=True)
+    consolidado_partes = pd.read_excel(por_cliente, sheet_name="Consolidado").sort_values(clave, ignore_index=True)
+    pd.testing.assert_frame_equal(consolidado_partes, consolidado_memoria)
+
+
+def test_ventanas_igual_a_un_reporte_por_ventana(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    ventanas = [("01/06/2023", "31/05/2024"), ("01/01/2023", "31/12/2023"), ("15/02/2024", "10/04/2024")]
+    reporte = tmp_path / "ventanas.xlsx"
+
+    generar_reporte_control(archivos, [], categorias, str(reporte), ventanas=ventanas, por_cliente=False)
+    generar_reporte_control(archivos, [], categorias, str(tmp_path / "partes.xlsx"), ventanas=ventanas, por_cliente=True)
+
+    tabla_ventanas = pd.read_excel(reporte, sheet_name="Ventanas")
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "partes.xlsx", sheet_name="Ventanas"), tabla_ventanas)
+    assert tabla_ventanas["Ventana"].unique().tolist() == ["01/06/2023 - 31/05/2024", "01/01/2023 - 31/12/2023", "15/02/2024 - 10/04/2024"]
+    for ventana in ventanas:
+        individual = tmp_path / "individual.xlsx"
+        generar_reporte_control(archivos, [], categorias, str(individual), ventanas=[ventana], por_cliente=False)
+        esperado = pd.read_excel(individual, sheet_name="Tabla Dinámica")
+        obtenido = tabla_ventanas[tabla_ventanas["Ventana"] == " - ".join(ventana)].drop(columns="Ventana").reset_index(drop=True)
+        pd.testing.assert_frame_equal(obtenido[esperado.columns], esperado, check_exact=False, check_dtype=False, rtol=1e-9)
+
+
+def test_reporte_en_proceso_reenvia_avance_y_se_puede_abortar(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    salida = tmp_path / "proceso.xlsx"
+    logs, eventos = [], []
+
+    assert generar_reporte_en_proceso(archivos, [], categorias, str(salida), logs.append, eventos.append, por_cliente=False)
+
+    assert any("Reporte generado exitosamente" in msg for msg in logs)
+    assert [evento["etapa"] for evento in eventos][-1] == "fin"
+    assert next(evento for evento in eventos if evento["etapa"] == "lectura")["archivos"] == len(archivos)
+    assert len(pd.read_excel(salida, sheet_name="Tabla Dinámica")) == 8
+
+    abortado = tmp_path / "abortado.xlsx"
+    abort_event = threading.Event()
+    abort_event.set()
+    assert not generar_reporte_en_proceso(archivos, [], categorias, str(abortado), logs.append, abort_event=abort_event)
+    assert not abortado.exists()
+    assert not (tmp_path / "abortado.xlsx.part").exists()
+    assert "cancelada" in logs[-1]
+
+
+def _hojas(path):
+    return pd.read_excel(path, sheet_name=None)
+
+
+def test_memo_del_reporte_omite_o_recalcula_solo_clientes_cambiados(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    salida, referencia = tmp_path / "memo.xlsx", tmp_path / "referencia.xlsx"
+    logs = []
+
+    assert generar_reporte_control(archivos, [], categorias, str(salida), memo=True, por_cliente=False)
+    firma = salida.stat().st_mtime_ns
+    assert generar_reporte_control(archivos, [], categorias, str(salida), logs.append, memo=True, por_cliente=False)
+    assert any("Sin cambios" in msg for msg in logs)
+    assert salida.stat().st_mtime_ns == firma
+
+    with open(archivos[0], "a", encoding="utf-8") as fh:
+        fh.write(FILA.format(mes=9, tipo=11, nro=999, total=777))
+    logs.clear()
+    assert generar_reporte_control(archivos, [], categorias, str(salida), logs.append, memo=True, por_cliente=False)
+    assert any("1 clientes recalculados, 3 sin cambios" in msg for msg in logs)
+    generar_reporte_control(archivos, [], categorias, str(referencia), memo=False, por_cliente=False)
+    obtenido, esperado = _hojas(salida), _hojas(referencia)
+    for hoja in esperado:
+        pd.testing.assert_frame_equal(obtenido[hoja], esperado[hoja])
+
+    # Solo cambian las escalas: ningun cliente se recalcula, pero la categoria si
+    with pd.ExcelWriter(categorias, engine="openpyxl") as writer:
+        pd.DataFrame({"Categoria": ["A", "B"], "Ingresos brutos": [10_000, 100_000]}).to_excel(writer, sheet_name="Categorias", index=False)
+        pd.DataFrame({"Fecha Inicial": ["01/06/2023"], "Fecha Final": ["31/05/2024"]}).to_excel(
+            writer, sheet_name="Rango de Fechas", index=False
+        )
+    logs.clear()
+    assert generar_reporte_control(archivos, [], categorias, str(salida), logs.append, memo=True, por_cliente=True)
+    assert any("0 clientes recalculados, 4 sin cambios" in msg for msg in logs)
+    generar_reporte_control(archivos, [], categorias, str(referencia), memo=False, por_cliente=True)
+    pd.testing.assert_frame_equal(_hojas(salida)["Tabla Dinámica"], _hojas(referencia)["Tabla Dinámica"])
+    assert set(_hojas(salida)["Tabla Dinámica"]["Categoría"]) == {"A", "B"}
+
+
+def test_reporte_desde_zip_sin_extraer_igual_al_de_csv(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    zips = []
+    for csv_path in archivos:
+        zip_path = csv_path[: -len(".csv")] + ".zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.write(csv_path, "comprobantes.csv")
+        zips.append(zip_path)
+    desde_csv, desde_zip = tmp_path / "csv.xlsx", tmp_path / "zip.xlsx"
+
+    assert generar_reporte_control(archivos, [], categorias, str(desde_csv), memo=False)
+    assert generar_reporte_control(zips, [], categorias, str(desde_zip), memo=False, por_cliente=True)
+
+    obtenido, esperado = _hojas(desde_zip), _hojas(desde_csv)
+    pd.testing.assert_frame_equal(obtenido["Tabla Dinámica"], esperado["Tabla Dinámica"])
+    clave = ["Archivo", "Número Desde"]
+    pd.testing.assert_frame_equal(
+        obtenido["Consolidado"].sort_values(clave, ignore_index=True),
+        esperado["Consolidado"].sort_values(clave, ignore_index=True),
+    )
+
+
+def test_importe_con_separador_de_miles_no_descarta_el_archivo(tmp_path):
+    archivos, categorias = _cartera(tmp_path)
+    base, con_miles = tmp_path / "base.xlsx", tmp_path / "miles.xlsx"
+    assert generar_reporte_control(archivos, [], categorias, str(base), memo=False)
+
+    # Mismo archivo con "1.001,25" en lugar de "1001,25" en Imp. Total
+    texto = open(archivos[0], encoding="utf-8-sig").read()
+    filas = [linea.rsplit(";", 3) for linea in texto.splitlines()[1:]]
+    miles = []
+    for inicio, total, doc, nombre in filas:
+        enteros, decimales = total.split(",")
+        total_miles = f"{int(enteros):,}".replace(",", ".")
+        miles.append(f"{inicio};{total_miles},{decimales};{doc};{nombre}")
+    with open(archivos[0], "w", encoding="utf-8-sig") as fh:
+        fh.write(ENCABEZADO + "\n".join(miles) + "\n")
+    assert "1.001,25" in open(archivos[0], encoding="utf-8-sig").read()
+    assert generar_reporte_control(archivos, [], categorias, str(con_miles), memo=False)
+
+    obtenido, esperado = _hojas(con_miles), _hojas(base)
+    assert len(obtenido["Tabla Dinámica"]) == 8
+    pd.testing.assert_frame_equal(obtenido["Tabla Dinámica"], esperado["Tabla Dinámica"])
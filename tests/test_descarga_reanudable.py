@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mrbot_app.consulta import DOWNLOAD_JOURNAL_NAME, PART_SUFFIX, descargar_archivo_minio
+
+CONTENT = bytes(range(256)) * 4096  # 1 MiB
+
+
+class _Handler(BaseHTTPRequestHandler):
+    cortes = 0
+    rangos = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start = 0
+        rango = self.headers.get("Range")
+        type(self).rangos.append(rango)
+        if rango:
+            start = int(rango.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT) - start))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        if type(self).cortes > 0:
+            type(self).cortes -= 1
+            self.wfile.write(CONTENT[start : start + 300_000])
+            self.wfile.flush()
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(CONTENT[start:])
+
+
+@pytest.fixture
+def servidor():
+    _Handler.cortes = 0
+    _Handler.rangos = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/bucket/archivo.zip"
+    httpd.shutdown()
+
+
+def test_reanuda_con_range_tras_corte(servidor, tmp_path):
+    _Handler.cortes = 2
+    destino = str(tmp_path / "archivo.zip")
+    res = descargar_archivo_minio(servidor + "?X-Amz-Signature=a", destino, reintentos=3)
+    assert res["success"], res
+    assert res["resumed"]
+    with open(destino, "rb") as fh:
+        assert fh.read() == CONTENT
+    assert _Handler.rangos[0] is None
+    # Reanuda desde lo ya escrito en el .part, no desde el byte 0
+    assert _Handler.rangos[1].startswith("bytes=") and _Handler.rangos[1] != "bytes=0-"
+    assert not os.path.exists(destino + PART_SUFFIX)
+    assert not os.path.exists(tmp_path / DOWNLOAD_JOURNAL_NAME)
+
+
+def test_journal_permite_reanudar_en_otra_ejecucion(servidor, tmp_path):
+    _Handler.cortes = 1
+    destino = str(tmp_path / "archivo.zip")
+    res = descargar_archivo_minio(servidor + "?X-Amz-Signature=a", destino, reintentos=0)
+    assert not res["success"]
+    assert not os.path.exists(destino)
+    with open(tmp_path / DOWNLOAD_JOURNAL_NAME, encoding="utf-8") as fh:
+        assert json.load(fh)["archivo.zip"]["etag"] == '"v1"'
+
+    # Nueva ejecucion: la URL prefirmada cambia, el objeto es el mismo
+    res = descargar_archivo_minio(servidor + "?X-Amz-Signature=b", destino, reintentos=0)
+    assert res["success"], res
+    assert res["resumed"]
+    with open(destino, "rb") as fh:
+        assert fh.read() == CONTENT
+
+
+def test_part_huerfano_se_descarta(servidor, tmp_path):
+    destino = str(tmp_path / "archivo.zip")
+    with open(destino + PART_SUFFIX, "wb") as fh:
+        fh.write(b"basura")
+    res = descargar_archivo_minio(servidor, destino)
+    assert res["success"]
+    assert not res["resumed"]
+    with open(destino, "rb") as fh:
+        assert fh.read() == CONTENT
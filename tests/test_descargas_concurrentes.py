@@ -0,0 +1,88 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mrbot_app.download_queue import get_download_queue
+from mrbot_app.minio_helpers import download_targets, format_throughput
+
+CONTENT = b"x" * 50_000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    activos = 0
+    maximo = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.activos += 1
+            cls.maximo = max(cls.maximo, cls.activos)
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        self.end_headers()
+        self.wfile.write(CONTENT)
+        with cls.lock:
+            cls.activos -= 1
+
+
+@pytest.fixture
+def servidor():
+    _Handler.activos = 0
+    _Handler.maximo = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/bucket"
+    httpd.shutdown()
+
+
+def test_nombres_unicos_y_tope_por_host(servidor, tmp_path):
+    targets = [
+        {"url": f"{servidor}/{idx}.pdf", "dest_dir": str(tmp_path), "filename": "comprobante.pdf"}
+        for idx in range(8)
+    ]
+    report = download_targets(targets, max_workers=8, per_host=3)
+    assert report["descargas"] == 8, report["errores"]
+    assert report["bytes"] == 8 * len(CONTENT)
+    assert len(list(tmp_path.glob("comprobante*.pdf"))) == 8
+    assert _Handler.maximo <= 3
+    assert "8 archivo(s)" in format_throughput(report)
+
+
+def test_errores_usan_label():
+    report = download_targets([{"url": "", "dest_dir": "", "filename": "a.pdf", "label": "bloque-pdf"}])
+    assert report["errores"] == ["bloque-pdf: URL vacía"]
+
+
+def test_cambiar_tamano_de_la_cola_no_corta_lotes_en_curso(monkeypatch):
+    monkeypatch.setenv("DOWNLOAD_QUEUE_WORKERS", "4")
+    anterior = get_download_queue()
+    empezo = threading.Event()
+
+    def descarga(n):
+        empezo.set()
+        time.sleep(0.05)
+        return n * 10
+
+    resultado = {}
+    lote = threading.Thread(target=lambda: resultado.update(valores=anterior.map(descarga, list(range(6)), window=2)))
+    lote.start()
+    assert empezo.wait(5)
+    # Cambia el tamano a mitad del lote: el lote sigue encolando en la cola anterior
+    monkeypatch.setenv("DOWNLOAD_QUEUE_WORKERS", "2")
+    nueva = get_download_queue()
+    lote.join(5)
+
+    assert nueva is not anterior and nueva.workers == 2
+    assert resultado["valores"] == [0, 10, 20, 30, 40, 50]
+    assert anterior._closed
+    # Un lote que tomo la cola anterior despues de apagada va a la vigente
+    assert anterior.map(lambda n: n + 1, [1, 2]) == [2, 3]
+    assert nueva.map(lambda n: n + 1, [1, 2]) == [2, 3]
@@ -0,0 +1,50 @@
+import os
+import zipfile
+
+from mrbot_app.mis_comprobantes import extraer_csv_de_zip
+
+
+def _zip_con_csv(tmp_path, contenido: bytes):
+    zip_path = tmp_path / "mc.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("comprobantes.csv", contenido)
+    return str(zip_path)
+
+
+def test_extraccion_copia_bytes_identicos(tmp_path):
+    contenido = ("Fecha;Denominación\r\n01/02/2024;Peña SA\r\n" * 5000).encode("cp1252")
+    destino = tmp_path / "salida" / "mc.csv"
+
+    assert extraer_csv_de_zip(_zip_con_csv(tmp_path, contenido), str(destino))
+    assert destino.read_bytes() == contenido
+    assert not os.path.exists(str(destino) + ".part")
+
+
+def test_extraccion_transcodifica_en_una_pasada(tmp_path):
+    texto = "Fecha;Denominación\r\n01/02/2024;Peña SA\r\n" * 5000
+    destino = tmp_path / "mc.csv"
+
+    ok = extraer_csv_de_zip(
+        _zip_con_csv(tmp_path, texto.encode("cp1252")),
+        str(destino),
+        encoding_origen="cp1252",
+        encoding_destino="utf-8",
+    )
+
+    assert ok
+    assert destino.read_bytes() == texto.encode("utf-8")
+
+
+def test_extraccion_fallida_no_deja_archivo_parcial(tmp_path):
+    destino = tmp_path / "mc.csv"
+
+    ok = extraer_csv_de_zip(
+        _zip_con_csv(tmp_path, b"\xff\xfe invalido"),
+        str(destino),
+        encoding_origen="utf-8",
+        encoding_destino="cp1252",
+    )
+
+    assert not ok
+    assert not destino.exists()
+    assert not os.path.exists(str(destino) + ".part")
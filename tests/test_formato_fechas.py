@@ -0,0 +1,74 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from mrbot_app.helpers import _format_dates_str, format_date_str, format_dates_series
+
+VALORES = [
+    "01/02/2024",
+    "1/2/2024",
+    " 31/12/2023 ",
+    "05/13/2024",
+    "31/02/2024",
+    "2024-01-05",
+    "2024-1-5",
+    "2024-01-05 00:00:00",
+    "2024-01-05T10:30:00",
+    "2024-06-06 23:59:59",
+    "2024-06-06 25:69:00",
+    "2024-06-06 24:00:00",
+    "2024-06-06 12:60:00",
+    "2024-06-06 12:00:60",
+    "2024-02-30 10:00:00",
+    "2024/01/05",
+    "2024-13-01",
+    "20240105",
+    "20241399",
+    "30000101",
+    "45292",
+    "0",
+    "99999",
+    "",
+    "   ",
+    "sin fecha",
+    "5 de enero",
+    45292,
+    45292.0,
+    45292.5,
+    3.5,
+    None,
+    np.nan,
+    pd.Timestamp("2024-03-04"),
+    datetime(2024, 3, 4, 10, 30),
+    date(2024, 3, 4),
+]
+
+
+def test_vectorizado_igual_a_format_date_str():
+    serie = pd.Series(VALORES * 3, index=[7] * len(VALORES) + list(range(len(VALORES) * 2)), dtype=object)
+
+    esperado = serie.apply(format_date_str)
+    obtenido = format_dates_series(serie)
+
+    assert obtenido.tolist() == esperado.tolist()
+    assert obtenido.index.equals(serie.index)
+
+
+def test_format_dates_str_columnas_de_texto():
+    df = pd.DataFrame(
+        {
+            "cuit": ["20123456789", "27123456789", "30123456789"],
+            "desde": ["01/01/2024", "2024-02-01", "45292"],
+            "fecha_hasta": ["20240131", "", "31/12/2024"],
+            "periodo_desde": ["202401", "2024-02", "202403.0"],
+        },
+        dtype=str,
+    )
+
+    out = _format_dates_str(df)
+
+    assert out["cuit"].tolist() == df["cuit"].tolist()
+    assert out["desde"].tolist() == ["01/01/2024", "01/02/2024", "01/01/2024"]
+    assert out["fecha_hasta"].tolist() == ["31/01/2024", "", "31/12/2024"]
+    assert out["periodo_desde"].tolist() == ["202401", "202402", "202403"]
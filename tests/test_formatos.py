@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment
+
+from mrbot_app.formatos import (
+    COLOR_ENCABEZADO,
+    FORMATO_MONEDA,
+    alinear_columnas,
+    aplicar_formato_moneda,
+    calcular_anchos,
+    escribir_excel,
+)
+from mrbot_app.helpers import to_excel_bytes
+
+
+def test_escribir_excel_aplica_estilos_en_una_pasada():
+    df = pd.DataFrame(
+        {
+            "Cliente": ["Cliente con nombre largo", "B", None],
+            "Importe": [1500.5, np.nan, -20.0],
+            "Cantidad": [3, 1, 2],
+        }
+    )
+    buf = io.BytesIO()
+
+    escribir_excel(buf, [{"nombre": "Tabla", "df": df, "moneda": ["Importe"], "alineacion": {"Cantidad": "center"}}])
+
+    ws = load_workbook(io.BytesIO(buf.getvalue()))["Tabla"]
+    assert [c.value for c in ws[1]] == ["Cliente", "Importe", "Cantidad"]
+    assert ws["A1"].fill.start_color.rgb.endswith(COLOR_ENCABEZADO)
+    assert ws["B2"].value == 1500.5 and ws["B2"].number_format == FORMATO_MONEDA
+    assert ws["B3"].value is None and ws["A4"].value is None
+    assert ws["C2"].alignment.horizontal == "center"
+    assert ws.auto_filter.ref == "A1:C4"
+    assert ws.column_dimensions["A"].width == len("Cliente con nombre largo") + 2
+
+
+def test_to_excel_bytes_se_lee_igual():
+    df = pd.DataFrame({"cuit": ["20123456789"], "total": [10.25]})
+
+    leido = pd.read_excel(io.BytesIO(to_excel_bytes(df, "Datos")), sheet_name="Datos", dtype={"cuit": str})
+
+    pd.testing.assert_frame_equal(leido, df)
+
+
+def test_calcular_anchos_con_percentil_y_tope():
+    df = pd.DataFrame({"a": ["x" * 4] * 99 + ["x" * 200], "b": [None] * 100})
+
+    assert calcular_anchos(df) == [202, 3]
+    assert calcular_anchos(df, percentil=95) == [6, 3]
+    assert calcular_anchos(df, maximo=50) == [50, 3]
+    assert calcular_anchos(df, muestra=10, percentil=50) == [6, 3]
+
+
+def test_estilos_con_nombre_en_hoja_existente():
+    libro = Workbook()
+    hoja = libro.active
+    hoja.append(["Importe", "Tipo"])
+    for fila in range(3):
+        hoja.append([fila * 1.5, "A"])
+
+    aplicar_formato_moneda(hoja, 1, 1)
+    alinear_columnas(hoja, 2, 2, "center")
+
+    assert "mrbot moneda" in libro.named_styles
+    assert all(hoja.cell(row=fila, column=1).number_format == FORMATO_MONEDA for fila in range(2, 5))
+    assert hoja["A1"].number_format == "General"
+    assert hoja["B4"].alignment.horizontal == "center"
+    hoja["B4"].alignment = Alignment(horizontal="left")
+    assert hoja["B3"].alignment.horizontal == "center"
@@ -0,0 +1,59 @@
+import pandas as pd
+
+import mrbot_app.bulk as bulk
+from mrbot_app.bulk import run_bulk
+from mrbot_app.job_store import JobStore
+from tests.test_bulk import EchoJob, FakeLog
+
+
+def _df():
+    return pd.DataFrame({"cuit": ["1", "2", "3"]})
+
+
+def test_reanuda_solo_filas_fallidas(monkeypatch, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    enviados = []
+    falla = {"2"}
+
+    def fake_post(url, headers, payload):
+        enviados.append(payload["cuit"])
+        return {"http_status": 500 if payload["cuit"] in falla else 200, "data": {}}
+
+    monkeypatch.setattr(bulk, "safe_post", fake_post)
+    job = EchoJob(FakeLog(), "http://api", {})
+
+    primera = run_bulk(_df(), job, max_concurrency=2, store=store)
+    assert [r["http_status"] for r in primera] == [200, 500, 200]
+    assert sorted(enviados) == ["1", "2", "3"]
+
+    # Segunda corrida del mismo Excel: solo se reenvia la fila que fallo
+    enviados.clear()
+    falla.clear()
+    segunda = run_bulk(_df(), job, max_concurrency=2, store=store)
+    assert enviados == ["2"]
+    assert [r["http_status"] for r in segunda] == [200, 200, 200]
+    assert any("Reanudando" in line for line in job.log.lines)
+
+    # Corrida completa: la siguiente ejecucion arranca de cero
+    enviados.clear()
+    run_bulk(_df(), job, max_concurrency=2, store=store)
+    assert sorted(enviados) == ["1", "2", "3"]
+
+
+def test_aborto_deja_la_corrida_para_reanudar(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    run = store.open_run("rcel", "corrida")
+    run.mark_pending("a")
+    run.record("a", True, 200, ["/tmp/a.pdf"], ({"ok": 1}, [], False))
+    run.mark_pending("b")
+    run.finish(complete=False)
+
+    reanudada = store.open_run("rcel", "corrida")
+    assert reanudada.resumed
+    previo = reanudada.completed_result("a")
+    assert previo["archivos"] == ["/tmp/a.pdf"]
+    assert previo["resultado"] == ({"ok": 1}, [], False)
+    assert reanudada.completed_result("b") is None
+    assert reanudada.counts() == {"ok": 1, "pendiente": 1}
+
+    assert not store.open_run("rcel", "corrida", reset=True).resumed
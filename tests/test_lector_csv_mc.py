@@ -0,0 +1,98 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+from mrbot_app.lector_csv_mc import detectar_encoding, leer_csv_mc
+from mrbot_app.mis_comprobantes import leer_csv_con_encoding
+
+CSV_MC = (
+    "Fecha de Emisión;Tipo de Comprobante;Punto de Venta;Número Desde;Tipo Cambio;Moneda;"
+    "Imp. Neto Gravado;IVA;Imp. Total;Denominación Receptor\n"
+    "2024-01-15;11;2;15;1,00;$;100;21;121,50;Señor Pérez\n"
+    "2024-02-20;13;2;16;1,00;$;;;-50;Compañía\n"
+)
+
+
+def test_detecta_encoding_por_muestra():
+    texto = "Denominación;Imp. Total\nPeña;1,00\n"
+    assert detectar_encoding(texto.encode("utf-8-sig")) == "utf-8-sig"
+    assert detectar_encoding(texto.encode("utf-8")) == "utf-8-sig"
+    assert detectar_encoding(texto.encode("cp1252")) == "cp1252"
+    # Un caracter de varios bytes cortado al final de la muestra sigue siendo UTF-8
+    assert detectar_encoding("Peña".encode("utf-8")[:3]) == "utf-8-sig"
+
+
+def test_lee_cp1252_utf8_y_zip_con_tipos(tmp_path):
+    utf8, cp1252 = tmp_path / "utf8.csv", tmp_path / "cp1252.csv"
+    utf8.write_text(CSV_MC, encoding="utf-8-sig")
+    cp1252.write_bytes(CSV_MC.encode("cp1252"))
+    zip_path = tmp_path / "mc.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.write(cp1252, "comprobantes.csv")
+
+    esperado = pd.read_csv(utf8, sep=";", decimal=",", encoding="utf-8-sig")
+    for path in (utf8, cp1252, zip_path):
+        data = leer_csv_mc(str(path), engine="c")
+        assert data["Denominación Receptor"].tolist() == ["Señor Pérez", "Compañía"]
+        for columna in ("Tipo Cambio", "Imp. Neto Gravado", "IVA", "Imp. Total"):
+            assert data[columna].dtype == "float64"
+        pd.testing.assert_frame_equal(data, esperado, check_dtype=False)
+    assert leer_csv_mc(str(utf8), engine="c")["Imp. Total"].tolist() == [121.5, -50.0]
+
+
+def test_leer_csv_con_encoding_devuelve_filas_ya_leidas(tmp_path):
+    path = tmp_path / "datos.csv"
+    path.write_bytes("Nombre|Importe\nMuñoz|10\nAcuña|20\n".encode("cp1252"))
+
+    filas = leer_csv_con_encoding(str(path))
+
+    assert filas == [{"Nombre": "Muñoz", "Importe": "10"}, {"Nombre": "Acuña", "Importe": "20"}]
+
+
+def test_importe_con_separador_de_miles_sigue_siendo_float(tmp_path):
+    path = tmp_path / "miles.csv"
+    path.write_text(CSV_MC.replace("121,50", "1.234,25"), encoding="utf-8-sig")
+
+    data = leer_csv_mc(str(path), engine="c")
+
+    assert len(data) == 2
+    assert data["Imp. Total"].dtype == "float64"
+    assert data["Imp. Total"].tolist() == [1234.25, -50.0]
+    # Como preparar_consolidado: importes vacios en 0, el tipo de cambio no pierde el '.'
+    assert data["IVA"].tolist() == [21.0, 0.0]
+    assert data["Tipo Cambio"].tolist() == [1.0, 1.0]
+
+
+def test_tipo_cambio_con_punto_decimal_no_escala_los_importes(tmp_path):
+    path = tmp_path / "tc.csv"
+    path.write_text(CSV_MC.replace("1,00;$;100", "1.00;$;1.100").replace("1,00;$;;", ";$;;"), encoding="utf-8-sig")
+
+    data = leer_csv_mc(str(path), engine="c")
+
+    assert data["Tipo Cambio"].tolist() == [1.0, 1.0]
+    assert data["Imp. Neto Gravado"].tolist() == [1100.0, 0.0]
+
+
+def _variantes(tmp_path, texto):
+    utf8, cp1252 = tmp_path / "utf8.csv", tmp_path / "cp1252.csv"
+    utf8.write_text(texto, encoding="utf-8-sig")
+    cp1252.write_bytes(texto.encode("cp1252"))
+    zip_path = tmp_path / "mc.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.write(cp1252, "comprobantes.csv")
+    return [str(utf8), str(cp1252), str(zip_path)]
+
+
+@pytest.mark.parametrize(
+    "texto",
+    [CSV_MC, CSV_MC.replace("121,50", "1.234,25")],
+    ids=["simple", "separador_de_miles"],
+)
+def test_motor_pyarrow_igual_al_motor_c(tmp_path, texto):
+    pytest.importorskip("pyarrow")
+    for path in _variantes(tmp_path, texto):
+        obtenido = leer_csv_mc(path, engine="pyarrow")
+        esperado = leer_csv_mc(path, engine="c")
+        pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False)
+        assert obtenido["Imp. Total"].dtype == "float64"
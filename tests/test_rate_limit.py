@@ -0,0 +1,101 @@
+import threading
+
+from mrbot_app.rate_limit import AimdController, ApiLimiter, TokenBucket, format_limiter_status, is_backoff_status
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _completar(ctrl, clock, status, latency=1.0):
+    started = ctrl.acquire()
+    clock.now += latency
+    ctrl.release(started, status)
+
+
+def test_aimd_sube_con_respuestas_sanas_y_respeta_el_maximo():
+    clock = _Clock()
+    ctrl = AimdController(initial=2, minimum=1, maximum=4, clock=clock)
+    for _ in range(20):
+        _completar(ctrl, clock, 200)
+    assert ctrl.limit == 4
+    assert [item["limit"] for item in ctrl.history] == [2, 3, 4]
+
+
+def test_aimd_divide_ante_429_5xx_y_timeouts():
+    clock = _Clock()
+    ctrl = AimdController(initial=8, minimum=1, maximum=8, clock=clock)
+    _completar(ctrl, clock, 429)
+    assert ctrl.limit == 4
+    _completar(ctrl, clock, 503)
+    assert ctrl.limit == 2
+    _completar(ctrl, clock, None)
+    _completar(ctrl, clock, None)
+    assert ctrl.limit == 1
+    assert [item["motivo"] for item in ctrl.history] == ["inicio", "HTTP 429", "HTTP 503", "timeout"]
+
+
+def test_aimd_ignora_fallos_de_requests_previas_a_la_reduccion():
+    clock = _Clock()
+    ctrl = AimdController(initial=8, minimum=1, maximum=8, clock=clock)
+    inicios = [ctrl.acquire() for _ in range(3)]
+    clock.now += 1
+    for started in inicios:
+        ctrl.release(started, 429)
+    assert ctrl.limit == 4
+
+
+def test_aimd_no_sube_si_la_latencia_se_dispara():
+    clock = _Clock()
+    ctrl = AimdController(initial=1, minimum=1, maximum=4, latency_target=5.0, clock=clock)
+    for _ in range(5):
+        _completar(ctrl, clock, 200, latency=10.0)
+    assert ctrl.limit == 1
+
+
+def test_token_bucket_rafaga_y_espera():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.5
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+
+
+def test_slot_limita_requests_en_vuelo():
+    limiter = ApiLimiter(rate=0, burst=1, initial=2, minimum=2, maximum=2)
+    en_vuelo = []
+    maximo = []
+    lock = threading.Lock()
+    liberar = threading.Event()
+
+    def _request():
+        with limiter.slot() as outcome:
+            with lock:
+                en_vuelo.append(1)
+                maximo.append(len(en_vuelo))
+            liberar.wait(0.2)
+            with lock:
+                en_vuelo.pop()
+            outcome["http_status"] = 200
+
+    hilos = [threading.Thread(target=_request) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert max(maximo) == 2
+    assert "0/2 en vuelo" in format_limiter_status(limiter.snapshot())
+
+
+def test_solo_los_status_enteros_dan_senal():
+    assert is_backoff_status(None)
+    assert is_backoff_status(429) and is_backoff_status(503)
+    assert not is_backoff_status(200)
+    for sin_senal in ("500", 503.0, True, object()):
+        assert not is_backoff_status(sin_senal)
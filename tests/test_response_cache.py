@@ -0,0 +1,52 @@
+import time
+
+from mrbot_app.response_cache import ResponseCache, cache_key, endpoint_ttl
+
+URL_CCMA = "https://api-bots.mrbot.com.ar/api/v1/ccma/consulta"
+
+
+def _cache(tmp_path, max_bytes=10_000, overrides=None):
+    return ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes, 600, overrides)
+
+
+def test_clave_ignora_la_contrasena():
+    a = cache_key("POST", URL_CCMA, {"email": "x@y"}, {"cuit": "1", "clave": "uno"})
+    b = cache_key("POST", URL_CCMA, {"email": "x@y"}, {"cuit": "1", "clave": "dos"})
+    c = cache_key("POST", URL_CCMA, {"email": "x@y"}, {"cuit": "2", "clave": "uno"})
+    assert a == b != c
+
+
+def test_ttl_por_endpoint():
+    base = "https://api/api/v1/"
+    assert endpoint_ttl(base + "ccma/consulta", 600) == 900
+    assert endpoint_ttl(base + "rcel/consulta", 600) == 600
+    assert endpoint_ttl(base + "rcel/consulta", 600, {"rcel": 0}) == 0
+    assert endpoint_ttl(base + "apoc/consulta/20111111112", 600) == 3600
+    assert endpoint_ttl(base + "user/consultas/x@y", 600) == 0
+    assert endpoint_ttl(base + "user/", 600) == 0
+
+
+def test_hit_expiracion_y_solo_respuestas_ok(tmp_path):
+    cache = _cache(tmp_path, overrides={"ccma": 1})
+    payload = {"cuit": "1", "clave": "secreta"}
+    assert cache.get("POST", URL_CCMA, {}, payload) is None
+    assert not cache.put("POST", URL_CCMA, {}, payload, {"http_status": 500, "data": {}})
+    assert not cache.put("POST", URL_CCMA, {}, payload, {"http_status": 200, "data": {"success": False}})
+    assert cache.put("POST", URL_CCMA, {}, payload, {"http_status": 200, "data": {"success": True}})
+    hit = cache.get("POST", URL_CCMA, {}, payload)
+    assert hit == {"http_status": 200, "data": {"success": True}, "cached": True}
+    time.sleep(1.1)
+    assert cache.get("POST", URL_CCMA, {}, payload) is None
+
+
+def test_desalojo_lru_por_tamano(tmp_path):
+    cache = _cache(tmp_path, max_bytes=250)
+    data = {"success": True, "texto": "x" * 80}
+    for cuit in ("1", "2"):
+        cache.put("POST", URL_CCMA, {}, {"cuit": cuit}, {"http_status": 200, "data": data})
+    time.sleep(0.01)
+    assert cache.get("POST", URL_CCMA, {}, {"cuit": "1"}) is not None  # "1" pasa a ser la mas reciente
+    cache.put("POST", URL_CCMA, {}, {"cuit": "3"}, {"http_status": 200, "data": data})
+    assert cache.get("POST", URL_CCMA, {}, {"cuit": "2"}) is None
+    assert cache.get("POST", URL_CCMA, {}, {"cuit": "1"}) is not None
+    assert cache.stats()["bytes"] <= 250